@@ -0,0 +1,163 @@
+"""
+Background jobs of the compare app: scraping Birds of the World and generating the AI
+comparison for a ComparisonRequest (run by ``manage.py run_jobs``, see jizz.job_queue).
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from jizz.job_queue import job_task
+from jizz.models import Species
+
+from .ai_service import AIComparisonService
+from .models import ComparisonRequest, SpeciesComparison, SpeciesTrait
+from .scraper import BirdsOfTheWorldScraper
+
+
+def find_existing_comparison(data: dict, comparison_type: str) -> SpeciesComparison | None:
+    if comparison_type == 'species':
+        return SpeciesComparison.objects.filter(
+            comparison_type='species',
+            species_1_id=data['species_1_id'],
+            species_2_id=data['species_2_id']
+        ).first()
+    if comparison_type == 'family':
+        return SpeciesComparison.objects.filter(
+            comparison_type='family',
+            family_1=data['family_1'],
+            family_2=data['family_2']
+        ).first()
+    if comparison_type == 'order':
+        return SpeciesComparison.objects.filter(
+            comparison_type='order',
+            order_1=data['order_1'],
+            order_2=data['order_2']
+        ).first()
+    return None
+
+
+def get_species_traits(species: Species) -> dict:
+    """Get traits for a species, organized by category."""
+    traits = SpeciesTrait.objects.filter(species=species)
+
+    result = {}
+    for trait in traits:
+        if trait.category not in result:
+            result[trait.category] = []
+        result[trait.category].append({
+            'title': trait.title,
+            'content': trait.content
+        })
+
+    # Convert to format expected by AI service
+    formatted = {}
+    for category, trait_list in result.items():
+        formatted[category] = {
+            'title': category.replace('_', ' ').title(),
+            'content': '\n\n'.join([t['content'] for t in trait_list])
+        }
+
+    return formatted
+
+
+def _get_or_scrape_traits(scraper: BirdsOfTheWorldScraper, species: Species) -> dict:
+    traits = get_species_traits(species)
+    if traits:
+        return traits
+    scraped_data = scraper.scrape_species(
+        species.code,
+        species_name=species.name,
+        scientific_name=species.name_latin
+    )
+    if scraped_data and 'traits' in scraped_data:
+        with transaction.atomic():
+            for category, trait_data in scraped_data['traits'].items():
+                SpeciesTrait.objects.get_or_create(
+                    species=species,
+                    category=category,
+                    title=trait_data['title'],
+                    defaults={
+                        'content': trait_data['content'],
+                        'source_url': scraped_data.get('source_url'),
+                        'section': trait_data.get('section')
+                    }
+                )
+        traits = get_species_traits(species)
+    return traits
+
+
+def generate_comparison(data: dict, comparison_type: str) -> SpeciesComparison:
+    """Generate a comparison using AI, scraping species traits first when we have none."""
+    ai_service = AIComparisonService()
+
+    if comparison_type == 'species':
+        species_1 = Species.objects.get(id=data['species_1_id'])
+        species_2 = Species.objects.get(id=data['species_2_id'])
+
+        scraper = BirdsOfTheWorldScraper()
+        traits_1 = _get_or_scrape_traits(scraper, species_1)
+        traits_2 = _get_or_scrape_traits(scraper, species_2)
+        if not traits_1:
+            raise ValueError(f"No traits found for {species_1.name} even after scraping")
+        if not traits_2:
+            raise ValueError(f"No traits found for {species_2.name} even after scraping")
+
+        # Add scientific names for better name matching in Similar Species section
+        traits_1['name_latin'] = species_1.name_latin
+        traits_2['name_latin'] = species_2.name_latin
+
+        comparison_data = ai_service.generate_species_comparison(
+            traits_1, traits_2, species_1.name, species_2.name
+        )
+        return SpeciesComparison.objects.create(
+            comparison_type='species',
+            species_1=species_1,
+            species_2=species_2,
+            **comparison_data
+        )
+
+    if comparison_type == 'family':
+        # For family comparisons, we'd need to aggregate species data
+        # This is a simplified version
+        comparison_data = ai_service.generate_family_comparison(
+            data['family_1'], data['family_2'], [], []
+        )
+        return SpeciesComparison.objects.create(
+            comparison_type='family',
+            family_1=data['family_1'],
+            family_2=data['family_2'],
+            **comparison_data
+        )
+
+    raise ValueError(f"Unsupported comparison type: {comparison_type}")
+
+
+@job_task('comparison_request', queue='ai', max_attempts=2, lease=timedelta(minutes=15))
+def comparison_request(request_id: int) -> dict:
+    request_obj = ComparisonRequest.objects.get(pk=request_id)
+    data = {
+        field: getattr(request_obj, field)
+        for field in ('species_1_id', 'species_2_id', 'family_1', 'family_2', 'order_1', 'order_2')
+    }
+    request_obj.status = 'processing'
+    request_obj.save(update_fields=['status'])
+    try:
+        # An identical request may have finished while this one waited.
+        comparison = (
+            find_existing_comparison(data, request_obj.comparison_type)
+            or generate_comparison(data, request_obj.comparison_type)
+        )
+    except Exception as e:
+        request_obj.status = 'failed'
+        request_obj.error_message = str(e)
+        request_obj.save(update_fields=['status', 'error_message'])
+        raise
+    request_obj.comparison = comparison
+    request_obj.status = 'completed'
+    request_obj.error_message = None
+    request_obj.completed_at = timezone.now()
+    request_obj.save(update_fields=['comparison', 'status', 'error_message', 'completed_at'])
+    return {'comparison_request_id': request_obj.pk, 'comparison_id': comparison.pk}
@@ -1,21 +1,26 @@
 from __future__ import annotations
 
+from datetime import timedelta
+
 from django.contrib.admin.views.decorators import staff_member_required
 from django.http import JsonResponse
 from django.shortcuts import render
+from django.utils import timezone
 from rest_framework import serializers, status
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework.views import APIView
 
+from jizz.request_profiling import request_profile_stats
+from jizz.tiered_cache import cache_stats
 from jizz.usage_analytics import (
-    _filtered_queryset,
+    build_usage_event,
     default_date_range,
     parse_date_param,
-    record_usage_event,
     usage_stats_payload,
     usage_top_ips,
 )
+from jizz.usage_event_buffer import submit_usage_event
 
 
 class UsageEventCreateSerializer(serializers.Serializer):
@@ -34,7 +39,7 @@ class UsageEventCreateView(APIView):
         serializer = UsageEventCreateSerializer(data=request.data)
         serializer.is_valid(raise_exception=True)
         data = serializer.validated_data
-        record_usage_event(
+        submit_usage_event(build_usage_event(
             request,
             path=data['path'],
             event_type=data.get('event_type', 'page_view'),
@@ -42,7 +47,7 @@ class UsageEventCreateView(APIView):
             session_key=data.get('session_key', ''),
             country_code=data.get('country_code') or None,
             metadata=data.get('metadata') or {},
-        )
+        ))
         return Response(status=status.HTTP_204_NO_CONTENT)
 
 
@@ -58,32 +63,18 @@ def _usage_query_params(request):
     return start, end, platform, device_type, country_code, event_type, ip_address
 
 
-def _usage_filtered_qs(request):
-    start, end, platform, device_type, country_code, event_type, ip_address = _usage_query_params(request)
-    return start, end, platform, device_type, country_code, event_type, ip_address, _filtered_queryset(
-        start,
-        end,
-        platform=platform,
-        device_type=device_type,
-        country_code=country_code,
-        event_type=event_type,
-        ip_address=ip_address,
-    )
-
-
 @staff_member_required
 def staff_usage_view(request):
-    start, end, platform, device_type, country_code, event_type, ip_address, qs = _usage_filtered_qs(request)
-    payload = usage_stats_payload(
-        start,
-        end,
-        platform=platform,
-        device_type=device_type,
-        country_code=country_code,
-        event_type=event_type,
-        ip_address=ip_address,
-    )
-    top_ips = usage_top_ips(qs)
+    start, end, platform, device_type, country_code, event_type, ip_address = _usage_query_params(request)
+    filters = {
+        'platform': platform,
+        'device_type': device_type,
+        'country_code': country_code,
+        'event_type': event_type,
+        'ip_address': ip_address,
+    }
+    payload = usage_stats_payload(start, end, **filters)
+    top_ips = usage_top_ips(start, end, **filters)
     return render(
         request,
         'jizz/staff_usage.html',
@@ -116,3 +107,26 @@ def staff_usage_api_view(request):
             ip_address=ip_address,
         )
     )
+
+
+@staff_member_required
+def staff_request_profiles_api_view(request):
+    """Per-route query, DB, serializer, size and latency percentiles over the last ``hours``."""
+    try:
+        hours = min(max(int(request.GET.get('hours', 24)), 1), 24 * 31)
+    except ValueError:
+        hours = 24
+    kind = (request.GET.get('kind') or '').strip().lower() or None
+    since = timezone.now() - timedelta(hours=hours)
+    return JsonResponse({
+        'since': since.isoformat(),
+        'hours': hours,
+        'kind': kind,
+        'routes': request_profile_stats(since, kind=kind),
+    })
+
+
+@staff_member_required
+def staff_cache_api_view(request):
+    """Hit/miss counters of the serving process and size of the shared cache table."""
+    return JsonResponse(cache_stats())
@@ -1,8 +1,20 @@
 from django.apps import AppConfig
+from django.utils.module_loading import autodiscover_modules
 
 class JizzConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'jizz'
 
     def ready(self):
-        import jizz.signals  # noqa 
\ No newline at end of file
+        import jizz.signals  # noqa
+        autodiscover_modules('tasks')  # register background job functions (jizz.job_queue)
+
+        from django.db import connections
+        from django.db.backends.signals import connection_created
+
+        from jizz.request_profiling import install_query_wrapper, install_serializer_timing
+
+        connection_created.connect(install_query_wrapper, dispatch_uid='jizz.request_profiling')
+        for connection in connections.all(initialized_only=True):
+            install_query_wrapper(sender=None, connection=connection)
+        install_serializer_timing()
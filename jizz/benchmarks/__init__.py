@@ -0,0 +1 @@
+"""Synthetic production-scale dataset and hot-path benchmarks (see ``dataset`` and ``suite``)."""
@@ -0,0 +1,484 @@
+"""
+Synthetic production-scale dataset for the benchmark suite (``manage.py generate_benchmark_dataset``).
+
+At full size it holds ~11k species in a generated taxonomy, country checklists, users and
+players, a year of games with their questions, player scores and answers (millions of
+rows), media with reviews and three months of usage events. The big tables are filled
+with ``INSERT ... SELECT`` over ``generate_series`` so generation takes minutes, not hours.
+Derived tables (leaderboard, mistake counters, user checklists, media review state, usage
+rollups) are rebuilt from the generated rows, as they would be in production.
+
+Shapes follow production loosely: a few countries and heavy players account for most
+games, common species are asked more often, and wrong answers pick taxonomic neighbours.
+Generate into a scratch database; drop it to start over. Generated rows are recognisable
+by ``Species.code`` / ``Country.code`` / ``User.username`` prefixes. ``generate_dataset``
+refuses to run unless ``DEBUG`` is on, the database name marks it as a test or benchmark
+database, or the caller passes ``allow_production=True``
+(``--i-know-this-is-not-production``).
+"""
+
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass, replace
+from datetime import timedelta
+from pathlib import Path
+from typing import Callable, Iterable
+
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.utils import timezone
+
+from jizz.leaderboard import rebuild_leaderboard
+from jizz.models import (
+    Answer,
+    Country,
+    CountrySpecies,
+    Game,
+    Player,
+    PlayerScore,
+    Question,
+    Species,
+    TaxonomicFamily,
+    TaxonomicGenus,
+    TaxonomicOrder,
+    UsageEvent,
+)
+from jizz.quiz_mistake_counters import rebuild_mistake_stats
+from jizz.services.checklist_entries import rebuild_user_checklists
+from jizz.usage_rollups import update_usage_rollups
+from media.models import Media, MediaReview
+from media.review_state import rebuild_media_review_state
+
+SPECIES_CODE_PREFIX = 'syn'
+COUNTRY_CODE_PREFIX = 'SYN'
+USERNAME_PREFIX = 'synthetic-user-'
+# Database names (lowercased) that mark a scratch database, e.g. test_jizz or jizz_bench.
+_SCRATCH_DATABASE_MARKERS = ('test', 'bench')
+
+_SCALED_FIELDS = ('species', 'countries', 'checklist_species', 'users', 'players', 'games', 'usage_events')
+
+_USAGE_PATHS = [
+    '/', '/game/', '/game/play/', '/scores/', '/checklist/', '/species/', '/challenge/',
+    '/flocks/', '/profile/', '/updates/', '/api/games/', '/api/scores/', '/api/checklist/',
+    '/api/species/', '/api/answer/', '/api/daily-challenges/',
+]
+
+
+@dataclass(frozen=True)
+class DatasetSize:
+    species: int = 11_000
+    countries: int = 40
+    checklist_species: int = 1_000  # average checklist length per country
+    users: int = 20_000
+    players: int = 60_000  # the first ``users`` players are linked to a user
+    games: int = 1_000_000
+    questions_per_game: int = 5  # average; most games are abandoned before the end
+    multiplayer_share: float = 0.1
+    media_per_species: int = 25  # average
+    reviewed_media_share: float = 0.5
+    usage_events: int = 2_000_000
+    usage_days: int = 90
+
+    def scaled(self, factor: float) -> DatasetSize:
+        """Row counts times ``factor``; per-game and per-species shapes stay the same."""
+        counts = {name: max(1, round(getattr(self, name) * factor)) for name in _SCALED_FIELDS}
+        counts['countries'] = max(2, counts['countries'])
+        counts['species'] = max(60, counts['species'])
+        counts['checklist_species'] = min(counts['species'], max(40, counts['checklist_species']))
+        counts['players'] = max(counts['users'], counts['players'])
+        return replace(self, **counts)
+
+
+def _table(model) -> str:
+    return connection.ops.quote_name(model._meta.db_table)
+
+
+def _insert_select(model, values: dict[str, str], source: str, params: Iterable = (), *, prefix: str = '',
+                   suffix: str = '') -> int:
+    """
+    ``INSERT INTO <model> SELECT ... FROM <source>``: ``values`` maps field names to SQL
+    expressions over ``source`` (placeholders belong in ``prefix`` / ``source`` only); other
+    fields get their Python default, ``now()`` for auto dates.
+    """
+    columns, exprs = [], []
+    with connection.cursor() as cursor:
+        for field in model._meta.concrete_fields:
+            if field.primary_key and field.name not in values:
+                continue
+            columns.append(connection.ops.quote_name(field.column))
+            if field.name in values:
+                if '%s' in values[field.name]:
+                    raise ValueError(f'Move the placeholder of {field.name} into the source.')
+                exprs.append(values[field.name])
+            elif getattr(field, 'auto_now', False) or getattr(field, 'auto_now_add', False):
+                exprs.append('now()')
+            elif field.has_default() or not field.null:
+                literal = cursor.mogrify('%s', [field.get_db_prep_save(field.get_default(), connection)])
+                exprs.append(f"{literal.decode().replace('%', '%%')}::{field.db_type(connection)}")
+            else:
+                exprs.append('NULL')
+        cursor.execute(
+            f'{prefix} INSERT INTO {_table(model)} ({", ".join(columns)}) '
+            f'SELECT {", ".join(exprs)} FROM {source} {suffix}',
+            list(params),
+        )
+        return cursor.rowcount
+
+
+def _execute(sql: str, params: Iterable = ()) -> int:
+    with connection.cursor() as cursor:
+        cursor.execute(sql, list(params))
+        return cursor.rowcount
+
+
+def _taxonomy(size: DatasetSize) -> list[Species]:
+    n_orders = max(4, size.species // 275)
+    n_families = max(8, size.species // 45)
+    n_genera = max(16, size.species // 5)
+    orders = TaxonomicOrder.objects.bulk_create(
+        TaxonomicOrder(name_latin=f'Synthetiformes {i}', name_en=f'Synthetic order {i}', name_nl=f'Synthetische orde {i}')
+        for i in range(n_orders)
+    )
+    families = TaxonomicFamily.objects.bulk_create(
+        TaxonomicFamily(
+            taxonomic_order=orders[i * n_orders // n_families],
+            name_latin=f'Synthetidae {i}',
+            name_en=f'Synthetic family {i}',
+            name_nl=f'Synthetische familie {i}',
+        )
+        for i in range(n_families)
+    )
+    genera = TaxonomicGenus.objects.bulk_create(
+        TaxonomicGenus(taxonomic_family=families[i * n_families // n_genera], name_latin=f'Synthetica{i}')
+        for i in range(n_genera)
+    )
+    species = []
+    for i in range(size.species):
+        genus = genera[i * n_genera // size.species]
+        family = genus.taxonomic_family
+        species.append(Species(
+            name=f'Synthetic bird {i}',
+            name_latin=f'{genus.name_latin} avis{i}',
+            name_nl=f'Synthetische vogel {i}',
+            code=f'{SPECIES_CODE_PREFIX}{i}',
+            taxonomic_genus=genus,
+            taxonomic_family=family,
+            taxonomic_order=family.taxonomic_order,
+            tax_ordering=float(i),
+        ))
+    return Species.objects.bulk_create(species, batch_size=2000)
+
+
+def _checklists(size: DatasetSize, country_codes: list[str], species_ids: list[int]) -> int:
+    # Frequency tiers from one uniform draw, cumulative: roughly eBird's spread per country.
+    return _insert_select(
+        CountrySpecies,
+        {
+            'country': 'x.code',
+            'species': 'x.id',
+            'status': "CASE WHEN x.r2 < 0.9 THEN 'native' WHEN x.r2 < 0.95 THEN 'rare' "
+                      "WHEN x.r2 < 0.98 THEN 'introduced' ELSE 'endemic' END",
+            'frequency': "CASE WHEN x.r < 0.04 THEN 'abundant' WHEN x.r < 0.12 THEN 'very_common' "
+                         "WHEN x.r < 0.30 THEN 'common' WHEN x.r < 0.45 THEN 'fairly_common' "
+                         "WHEN x.r < 0.62 THEN 'uncommon' WHEN x.r < 0.78 THEN 'rare' "
+                         "WHEN x.r < 0.88 THEN 'very_rare' WHEN x.r < 0.96 THEN 'vagrant' END",
+        },
+        '(SELECT c.code, s.id, random() AS r, random() AS r2 '
+        'FROM unnest(%s::text[]) c(code) CROSS JOIN unnest(%s::bigint[]) s(id) '
+        'WHERE random() < %s OFFSET 0) x',
+        [country_codes, species_ids, size.checklist_species / size.species],
+    )
+
+
+def _media(size: DatasetSize, species_ids: list[int]) -> int:
+    return _insert_select(
+        Media,
+        {
+            'species': 'm.species_id',
+            'type': "CASE WHEN m.r < 0.8 THEN 'image' WHEN m.r < 0.95 THEN 'audio' ELSE 'video' END",
+            'source': "(ARRAY['inaturalist', 'wikimedia', 'observation', 'xeno_canto'])[1 + mod(m.n, 4)]",
+            'contributor': "'Synthetic contributor ' || mod(m.species_id + m.n, 500)",
+            'url': "'https://media.example.org/synthetic/' || m.species_id || '/' || m.n || '.jpg'",
+            'hide': 'm.r2 < 0.03',
+            'created': "now() - m.r2 * interval '1000 days'",
+        },
+        # Per-row counts are drawn first: random() in a generate_series argument runs once.
+        '(SELECT s.id AS species_id, g.n, random() AS r, random() AS r2 FROM ('
+        'SELECT id, 1 + floor(random() * %s)::int AS k FROM unnest(%s::bigint[]) id OFFSET 0) s '
+        'CROSS JOIN LATERAL generate_series(1, s.k) g(n) OFFSET 0) m',
+        [max(1, 2 * size.media_per_species - 1), species_ids],
+    )
+
+
+def _reviews(size: DatasetSize, species_ids: list[int], player_ids: list[int]) -> int:
+    share = size.reviewed_media_share
+    rows = _insert_select(
+        MediaReview,
+        {
+            'media': 'x.id',
+            'player': 'x.player_id',
+            'review_type': f"CASE WHEN x.r < {share * 0.85} THEN 'approved' "
+                           f"WHEN x.r < {share * 0.95} THEN 'rejected' ELSE 'not_sure' END",
+            'created': "now() - x.r2 * interval '500 days'",
+        },
+        '(SELECT m.id, m.r, m.r2, (%s::bigint[])[1 + floor(m.r2 * %s)::int] AS player_id FROM ('
+        f'SELECT id, random() AS r, random() AS r2 FROM {_table(Media)} WHERE species_id = ANY(%s) OFFSET 0'
+        ') m WHERE m.r < %s) x',
+        [player_ids, len(player_ids), species_ids, share],
+    )
+    # MediaReview.save hides rejected media; bulk inserts bypass it.
+    _execute(
+        f"UPDATE {_table(Media)} SET hide = true WHERE id IN ("
+        f"SELECT media_id FROM {_table(MediaReview)} WHERE review_type = 'rejected' AND media_id IN ("
+        f"SELECT id FROM {_table(Media)} WHERE species_id = ANY(%s)))",
+        [species_ids],
+    )
+    return rows
+
+
+def _users(size: DatasetSize) -> list[int]:
+    _insert_select(
+        User,
+        {
+            'username': f"'{USERNAME_PREFIX}' || i",
+            'email': f"'{USERNAME_PREFIX}' || i || '@example.org'",
+            'password': "'!'",
+            'date_joined': "now() - random() * interval '720 days'",
+        },
+        'generate_series(0, %s) i',
+        [size.users - 1],
+    )
+    return list(
+        User.objects.filter(username__startswith=USERNAME_PREFIX).order_by('pk').values_list('pk', flat=True)
+    )
+
+
+def _players(size: DatasetSize, user_ids: list[int]) -> list[int]:
+    _insert_select(
+        Player,
+        {
+            'user': 'p.user_id',
+            'name': "'Synthetic player ' || p.i",
+            'language': "CASE WHEN mod(p.i, 5) = 0 THEN 'nl' ELSE 'en' END",
+            'token': 'md5(random()::text || p.i)',
+            'created': "now() - random() * interval '720 days'",
+        },
+        # Indexes past the end of the user array are NULL: anonymous players.
+        '(SELECT i, (%s::bigint[])[i + 1] AS user_id FROM generate_series(0, %s) i) p',
+        [user_ids, size.players - 1],
+    )
+    return list(
+        Player.objects.filter(name__startswith='Synthetic player ').order_by('pk').values_list('pk', flat=True)
+    )
+
+
+def _games(size: DatasetSize, country_codes: list[str], player_ids: list[int]) -> int:
+    # Squared/1.5-power draws: the first countries and players get most of the games.
+    return _insert_select(
+        Game,
+        {
+            'country': 'g.country_id',
+            'host': 'g.host_id',
+            'token': 'substr(md5(g.i::text || g.r3::text), 1, 8)',
+            'created': "now() - g.r4 * interval '365 days'",
+            'level': "CASE WHEN g.r3 < 0.55 THEN 'advanced' WHEN g.r3 < 0.9 THEN 'beginner' ELSE 'expert' END",
+            'length': '(ARRAY[10, 10, 10, 20, 20, 35, 50])[1 + mod(g.i, 7)]',
+            'media': "CASE mod(g.i, 20) WHEN 0 THEN 'audio' WHEN 1 THEN 'video' ELSE 'images' END",
+            'rarity': "(ARRAY['familiar', 'regular', 'regular', 'exceptional'])[1 + mod(g.i / 7, 4)]",
+            'multiplayer': 'g.multiplayer',
+        },
+        '(SELECT i, r3, r4, (%s::text[])[1 + floor(power(r1, 2) * %s)::int] AS country_id, '
+        '(%s::bigint[])[1 + floor(power(r2, 1.5) * %s)::int] AS host_id, r5 < %s AS multiplayer FROM ('
+        'SELECT i, random() AS r1, random() AS r2, random() AS r3, random() AS r4, random() AS r5 '
+        'FROM generate_series(0, %s) i OFFSET 0) r) g',
+        [country_codes, len(country_codes), player_ids, len(player_ids), size.multiplayer_share, size.games - 1],
+    )
+
+
+def _questions(size: DatasetSize, country_codes: list[str]) -> int:
+    # Lower checklist positions are picked more often (power draw): "common" species.
+    return _insert_select(
+        Question,
+        {
+            'game': 'p.game_id',
+            'species': 'c.species_id',
+            'sequence': 'p.seq',
+            'done': 'true',
+            'created': "p.created + p.seq * interval '20 seconds'",
+        },
+        'picks p JOIN syn_checklist c ON c.country_id = p.country_id AND c.rn = p.rn',
+        prefix=(
+            'WITH sizes AS (SELECT country_id, max(n) AS n FROM syn_checklist GROUP BY country_id), '
+            'games AS MATERIALIZED ('
+            'SELECT id, created, country_id, least(length, 1 + floor(random() * %s)::int) AS rounds '
+            f'FROM {_table(Game)} WHERE country_id = ANY(%s)), '
+            'picks AS MATERIALIZED ('
+            'SELECT g.id AS game_id, g.created, g.country_id, q.seq, '
+            '1 + floor(power(random(), 1.6) * s.n)::int AS rn '
+            'FROM games g JOIN sizes s ON s.country_id = g.country_id '
+            'CROSS JOIN LATERAL generate_series(1, g.rounds) q(seq))'
+        ),
+        params=[max(1, 2 * size.questions_per_game - 1), country_codes],
+    )
+
+
+def _player_scores(country_codes: list[str], player_ids: list[int]) -> int:
+    hosts = _insert_select(
+        PlayerScore,
+        {'player': 'g.host_id', 'game': 'g.id'},
+        f'{_table(Game)} g WHERE g.country_id = ANY(%s)',
+        [country_codes],
+    )
+    guests = _insert_select(
+        PlayerScore,
+        {'player': 'x.player_id', 'game': 'x.game_id'},
+        '(SELECT g.id AS game_id, (%s::bigint[])[1 + floor(random() * %s)::int] AS player_id FROM ('
+        f'SELECT id, 1 + floor(random() * 4)::int AS guests FROM {_table(Game)} '
+        'WHERE multiplayer AND country_id = ANY(%s) OFFSET 0) g '
+        'CROSS JOIN LATERAL generate_series(1, g.guests) n) x',
+        [player_ids, len(player_ids), country_codes],
+        suffix='ON CONFLICT DO NOTHING',
+    )
+    return hosts + guests
+
+
+def _answers(country_codes: list[str]) -> int:
+    # Every player answers every round; 70% correct, otherwise a taxonomic neighbour.
+    correct = '(a.r < 0.7 OR w.species_id IS NULL OR w.species_id = a.species_id)'
+    rows = _insert_select(
+        Answer,
+        {
+            'question': 'a.question_id',
+            'player_score': 'a.player_score_id',
+            'answer': f'CASE WHEN {correct} THEN a.species_id ELSE w.species_id END',
+            'correct': correct,
+            'score': f'CASE WHEN {correct} THEN 100 + floor(a.r2 * 400)::int ELSE 0 END',
+            'created': "a.created + a.r2 * interval '15 seconds'",
+        },
+        'a JOIN syn_checklist t ON t.country_id = a.country_id AND t.species_id = a.species_id '
+        'LEFT JOIN syn_checklist w ON w.country_id = a.country_id '
+        'AND w.rn = 1 + mod(t.rn + floor(a.r2 * 3)::int, t.n)',
+        prefix=(
+            'WITH a AS MATERIALIZED ('
+            'SELECT ps.id AS player_score_id, q.id AS question_id, q.species_id, q.created, g.country_id, '
+            'random() AS r, random() AS r2 '
+            f'FROM {_table(PlayerScore)} ps JOIN {_table(Game)} g ON g.id = ps.game_id '
+            f'JOIN {_table(Question)} q ON q.game_id = g.id WHERE g.country_id = ANY(%s))'
+        ),
+        params=[country_codes],
+    )
+    _execute(
+        f'UPDATE {_table(PlayerScore)} ps SET score = s.total FROM ('
+        f'SELECT a.player_score_id, sum(a.score) AS total FROM {_table(Answer)} a '
+        f'JOIN {_table(PlayerScore)} p ON p.id = a.player_score_id '
+        f'JOIN {_table(Game)} g ON g.id = p.game_id WHERE g.country_id = ANY(%s) '
+        'GROUP BY a.player_score_id) s WHERE ps.id = s.player_score_id',
+        [country_codes],
+    )
+    return rows
+
+
+def _usage_events(size: DatasetSize, user_ids: list[int]) -> int:
+    return _insert_select(
+        UsageEvent,
+        {
+            'event_type': "CASE WHEN e.r < 0.6 THEN 'page_view' WHEN e.r < 0.85 THEN 'api' "
+                          "WHEN e.r < 0.95 THEN 'feature' ELSE 'websocket' END",
+            'path': 'e.path',
+            'platform': "(ARRAY['web', 'web', 'web', 'ios', 'android'])[1 + mod(e.i, 5)]",
+            'device_type': "(ARRAY['desktop', 'mobile', 'mobile', 'tablet'])[1 + mod(e.i / 5, 4)]",
+            'country_code': "(ARRAY['NL', 'US', 'GB', 'DE', 'BE', 'FR', 'ES', 'AU', 'CA', 'IN'])"
+                            "[1 + floor(power(e.r3, 2) * 10)::int]",
+            'ip_address': "'10.0.0.0'::inet + floor(e.r3 * 65536)::int",
+            # Half of the events are anonymous: indexes past the end of the array are NULL.
+            'user': 'e.user_id',
+            'session_key': "'syn-' || md5((e.i / 25)::text)",
+            'created_at': 'e.created_at',
+        },
+        '(SELECT i, r, r3, (%s::text[])[1 + floor(r2 * %s)::int] AS path, '
+        '(%s::bigint[])[1 + floor(r4 * %s)::int] AS user_id, '
+        "now() - r2 * r3 * interval '1 day' * %s AS created_at FROM ("
+        'SELECT i, random() AS r, random() AS r2, random() AS r3, random() AS r4 '
+        'FROM generate_series(0, %s) i OFFSET 0) r) e',
+        [_USAGE_PATHS, len(_USAGE_PATHS), user_ids, 2 * len(user_ids), size.usage_days, size.usage_events - 1],
+    )
+
+
+def _check_scratch_database(allow_production: bool) -> None:
+    name = Path(str(connection.settings_dict.get('NAME') or '')).name.lower()
+    if allow_production or settings.DEBUG or any(marker in name for marker in _SCRATCH_DATABASE_MARKERS):
+        return
+    raise ValueError(
+        f'Database {name!r} does not look like a scratch database (DEBUG is off and its name has no '
+        f'{" / ".join(_SCRATCH_DATABASE_MARKERS)}); pass --i-know-this-is-not-production to generate anyway.'
+    )
+
+
+def generate_dataset(
+    size: DatasetSize,
+    *,
+    seed: float = 0.42,
+    log: Callable[[str], None] | None = None,
+    allow_production: bool = False,
+) -> dict[str, int]:
+    """Insert a synthetic dataset of ``size`` in one transaction; returns rows per table."""
+    log = log or (lambda message: None)
+    _check_scratch_database(allow_production)
+    if Species.objects.filter(code=f'{SPECIES_CODE_PREFIX}0').exists():
+        raise ValueError('Synthetic data already exists; generate into a fresh database.')
+    counts: dict[str, int] = {}
+
+    def step(label: str, func, *args):
+        started = time.perf_counter()
+        result = func(*args)
+        rows = counts[label] = len(result) if isinstance(result, list) else result
+        log(f'{label}: {rows} rows in {time.perf_counter() - started:.1f}s')
+        return result
+
+    with transaction.atomic():
+        _execute('SELECT setseed(%s)', [seed])
+        species_ids = [sp.pk for sp in step('species', _taxonomy, size)]
+        country_codes = [
+            country.code for country in Country.objects.bulk_create(
+                Country(code=f'{COUNTRY_CODE_PREFIX}{i:02d}', name=f'Synthetic country {i}')
+                for i in range(size.countries)
+            )
+        ]
+        step('country species', _checklists, size, country_codes, species_ids)
+        _execute(
+            'CREATE TEMP TABLE syn_checklist ON COMMIT DROP AS '
+            'SELECT country_id, species_id, '
+            'row_number() OVER (PARTITION BY country_id ORDER BY species_id)::int AS rn, '
+            'count(*) OVER (PARTITION BY country_id)::int AS n '
+            f'FROM {_table(CountrySpecies)} WHERE country_id = ANY(%s)',
+            [country_codes],
+        )
+        _execute('CREATE INDEX ON syn_checklist (country_id, rn)')
+        _execute('CREATE INDEX ON syn_checklist (country_id, species_id)')
+        _execute('ANALYZE syn_checklist')
+        step('media', _media, size, species_ids)
+        user_ids = step('users', _users, size)
+        player_ids = step('players', _players, size, user_ids)
+        step('media reviews', _reviews, size, species_ids, player_ids)
+        step('games', _games, size, country_codes, player_ids)
+        _execute(f'ANALYZE {_table(Game)}')
+        step('questions', _questions, size, country_codes)
+        step('player scores', _player_scores, country_codes, player_ids)
+        _execute(f'ANALYZE {_table(PlayerScore)}')
+        _execute(f'ANALYZE {_table(Question)}')
+        step('answers', _answers, country_codes)
+        step('usage events', _usage_events, size, user_ids)
+
+        step('leaderboard entries', rebuild_leaderboard)
+        step('media review summaries', rebuild_media_review_state)
+        step('mistake stats', lambda: sum(rebuild_mistake_stats().values()))
+        step('checklist entries', lambda: sum(
+            rebuild_user_checklists(user_ids[start:start + 1000]) for start in range(0, len(user_ids), 1000)
+        ))
+        step('usage rollup hours', lambda: update_usage_rollups(
+            since=(timezone.now() - timedelta(days=size.usage_days + 1)).date()
+        )['hours'])
+    _execute('ANALYZE')
+    return counts
@@ -0,0 +1,344 @@
+"""
+Benchmarks of the hot request paths (``manage.py run_benchmarks``).
+
+Each benchmark is registered with ``@benchmark(name)``. It receives a ``BenchmarkContext``,
+does its setup and returns the callable to time; objects it creates are removed through
+``ctx.add_cleanup``. ``measure`` records the first (cold) call, the median / p95 of the
+timed calls, the queries of one call and its peak Python memory (``tracemalloc``), so a
+report shows both where time goes and whether a change added queries.
+
+Reports are plain JSON (``run_benchmarks`` / ``compare_reports``) so results of two commits
+can be diffed; run against the synthetic dataset of ``jizz.benchmarks.dataset``.
+"""
+
+from __future__ import annotations
+
+import json
+import platform
+import statistics
+import subprocess
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from datetime import timedelta
+from functools import cached_property
+from typing import Any, Callable, Iterable
+
+import django
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+from django.contrib.auth.models import User
+from django.db import connection
+from django.db.models import Count
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIRequestFactory
+
+from jizz.consumers import QuizConsumer
+from jizz.game_question_selection import create_question_for_game
+from jizz.models import Answer, Game, Player, PlayerScore, UserChecklistEntry
+from jizz.quiz_mistake_stats import get_species_mistake_rows
+from jizz.scoreboard import _pending_ticks, broadcast_scoreboard
+from jizz.services.checklist import ChecklistParams, build_checklist
+from jizz.usage_analytics import usage_stats_payload
+from jizz.views import PlayerScoreListView
+
+# Tables whose (estimated) size is stored with every report.
+REPORT_TABLES = (
+    'jizz_species', 'jizz_countryspecies', 'jizz_player', 'jizz_game', 'jizz_question',
+    'jizz_playerscore', 'jizz_answer', 'media_media', 'media_mediareview', 'jizz_usageevent',
+)
+
+
+@dataclass(frozen=True)
+class Benchmark:
+    name: str
+    func: Callable[['BenchmarkContext'], Callable[[], Any]]
+    description: str
+
+
+BENCHMARKS: dict[str, Benchmark] = {}
+
+
+def benchmark(name: str):
+    """Register ``func(ctx) -> callable``; the first docstring line describes it in reports."""
+
+    def decorator(func):
+        description = (func.__doc__ or '').strip().splitlines()[0] if func.__doc__ else ''
+        BENCHMARKS[name] = Benchmark(name, func, description)
+        return func
+
+    return decorator
+
+
+class BenchmarkContext:
+    """Setup helpers shared by benchmarks; ``runs`` is how often the returned callable is called."""
+
+    def __init__(self, runs: int):
+        self.runs = runs
+        self._cleanups: list[Callable[[], Any]] = []
+
+    def add_cleanup(self, func: Callable[[], Any]) -> None:
+        self._cleanups.append(func)
+
+    def cleanup(self) -> None:
+        while self._cleanups:
+            self._cleanups.pop()()
+
+    @cached_property
+    def country_code(self) -> str:
+        """The country with the most games."""
+        row = (
+            Game.objects.exclude(country=None).values('country_id')
+            .annotate(games=Count('id')).order_by('-games').first()
+        )
+        if row is None:
+            raise LookupError('No games to benchmark; run generate_benchmark_dataset first.')
+        return row['country_id']
+
+    @cached_property
+    def checklist_user(self):
+        """The user with the longest life list in ``country_code``."""
+        row = (
+            UserChecklistEntry.objects.filter(country_id=self.country_code).values('user_id')
+            .annotate(species=Count('id')).order_by('-species').first()
+        )
+        if row is None:
+            raise LookupError(f'No checklist entries for {self.country_code}.')
+        return User.objects.get(pk=row['user_id'])
+
+    def new_players(self, count: int) -> list[Player]:
+        players = Player.objects.bulk_create(Player(name=f'Benchmark player {i}') for i in range(count))
+        self.add_cleanup(lambda: Player.objects.filter(pk__in=[p.pk for p in players]).delete())
+        return players
+
+    def new_game(self, host: Player, **kwargs) -> Game:
+        game = Game.objects.create(**{
+            'country_id': self.country_code, 'level': 'advanced', 'length': 10, 'media': 'images',
+            'rarity': Game.RARIT_REGULAR, 'host': host, **kwargs,
+        })
+        self.add_cleanup(lambda: Game.objects.filter(pk=game.pk).delete())
+        return game
+
+
+@benchmark('create_question_for_game')
+def _create_question(ctx: BenchmarkContext):
+    """First question of a new standard game: target, media and answer options."""
+    host, = ctx.new_players(1)
+    games = iter([ctx.new_game(host) for _ in range(ctx.runs)])
+    return lambda: create_question_for_game(next(games))
+
+
+@benchmark('build_checklist')
+def _checklist(ctx: BenchmarkContext):
+    """First page of the life list of the user with the longest checklist."""
+    user = ctx.checklist_user
+    params = ChecklistParams(country_code=ctx.country_code)
+    return lambda: build_checklist(user, params)
+
+
+@benchmark('species_mistake_rows')
+def _mistake_rows(ctx: BenchmarkContext):
+    """Per-species mistake statistics of the busiest country."""
+    country_code = ctx.country_code
+    return lambda: get_species_mistake_rows(country_code)
+
+
+@benchmark('usage_stats_payload')
+def _usage_stats(ctx: BenchmarkContext):
+    """Staff usage dashboard for the last 30 days."""
+    end = timezone.localdate()
+    return lambda: usage_stats_payload(end - timedelta(days=30), end)
+
+
+@benchmark('player_score_list')
+def _score_list(ctx: BenchmarkContext):
+    """Hiscores page (GET /api/scores/) of the busiest country, rendered."""
+    view = PlayerScoreListView.as_view()
+    factory = APIRequestFactory()
+    query = {'game__level': 'advanced', 'game__country': ctx.country_code, 'game__media': 'images', 'game__length': 10}
+    return lambda: view(factory.get('/api/scores/', query)).render()
+
+
+def _quiz_game(ctx: BenchmarkContext, players: int) -> tuple[Game, list[PlayerScore]]:
+    host, *guests = ctx.new_players(players)
+    game = ctx.new_game(host, multiplayer=True)
+    scores = PlayerScore.objects.bulk_create(PlayerScore(player=player, game=game) for player in [host, *guests])
+    create_question_for_game(game)
+    return game, scores
+
+
+@benchmark('quiz_submit_answer')
+def _quiz_submit(ctx: BenchmarkContext):
+    """QuizConsumer ``submit_answer``: answer row, checklist flags and the ``answer_checked`` reply."""
+    game, scores = _quiz_game(ctx, ctx.runs)
+    question = game.questions.get()
+    consumer = QuizConsumer()
+    consumer.scope = {'type': 'websocket', 'path': f'/mpg/{game.token}', 'headers': [], 'client': ('127.0.0.1', 0)}
+    consumer.game_token = game.token
+    consumer.game_group_name = f'quiz_{game.token}'
+    consumer.channel_layer = get_channel_layer()
+    replies = []
+
+    async def send(text_data=None, bytes_data=None, close=False):
+        replies.append(text_data)
+
+    consumer.send = send
+    players = iter(score.player for score in scores)
+
+    async def submit():
+        await consumer.receive(json.dumps({
+            'action': 'submit_answer',
+            'player_token': next(players).token,
+            'question_id': question.pk,
+            'answer_id': question.species_id,
+        }))
+        reply = json.loads(replies.pop())
+        if reply['action'] != 'answer_checked':
+            raise RuntimeError(f'submit_answer failed: {reply}')
+        # The coalesced scoreboard broadcast is measured by quiz_scoreboard_broadcast.
+        tick = _pending_ticks.pop(game.token, None)
+        if tick is not None:
+            tick.cancel()
+
+    return async_to_sync(submit)
+
+
+@benchmark('quiz_scoreboard_broadcast')
+def _quiz_scoreboard(ctx: BenchmarkContext):
+    """Scoreboard (``update_players``) broadcast of a 25-player game after everyone answered."""
+    game, scores = _quiz_game(ctx, 25)
+    question = game.questions.get()
+    Answer.objects.bulk_create(
+        Answer(question=question, player_score=score, answer_id=question.species_id, correct=True, score=300)
+        for score in scores
+    )
+    layer = get_channel_layer()
+    return lambda: async_to_sync(broadcast_scoreboard)(layer, game.token)
+
+
+@dataclass
+class BenchmarkResult:
+    name: str
+    description: str
+    runs: int
+    cold_ms: float
+    median_ms: float
+    p95_ms: float
+    min_ms: float
+    max_ms: float
+    queries: int
+    peak_memory_kb: float
+    query_log: list[str] = field(default_factory=list, repr=False)
+
+    def as_dict(self, *, with_queries: bool = False) -> dict[str, Any]:
+        data = asdict(self)
+        if not with_queries:
+            data.pop('query_log')
+        return data
+
+
+def _elapsed_ms(func: Callable[[], Any]) -> float:
+    started = time.perf_counter()
+    func()
+    return (time.perf_counter() - started) * 1000
+
+
+def measure(bench: Benchmark, repeat: int = 10) -> BenchmarkResult:
+    """Cold call, one profiled call (queries, peak memory), then ``repeat`` timed calls."""
+    ctx = BenchmarkContext(runs=repeat + 2)
+    try:
+        run = bench.func(ctx)
+        cold = _elapsed_ms(run)
+        with CaptureQueriesContext(connection) as queries:
+            tracemalloc.start()
+            try:
+                run()
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+        timings = sorted(_elapsed_ms(run) for _ in range(repeat))
+    finally:
+        ctx.cleanup()
+    p95 = statistics.quantiles(timings, n=20)[18] if len(timings) > 1 else timings[0]
+    return BenchmarkResult(
+        name=bench.name,
+        description=bench.description,
+        runs=repeat,
+        cold_ms=round(cold, 3),
+        median_ms=round(statistics.median(timings), 3),
+        p95_ms=round(p95, 3),
+        min_ms=round(timings[0], 3),
+        max_ms=round(timings[-1], 3),
+        queries=len(queries),
+        peak_memory_kb=round(peak / 1024, 1),
+        query_log=[query['sql'] for query in queries.captured_queries],
+    )
+
+
+def _git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'],
+            cwd=settings.BASE_DIR, capture_output=True, text=True, timeout=5, check=True,
+        ).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def _table_rows() -> dict[str, int]:
+    # Planner estimates: exact counts of the answer table take seconds at production size.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT relname, greatest(reltuples, 0)::bigint FROM pg_class WHERE relname = ANY(%s)',
+            [list(REPORT_TABLES)],
+        )
+        return dict(cursor.fetchall())
+
+
+def run_benchmarks(
+    names: Iterable[str] | None = None,
+    *,
+    repeat: int = 10,
+    with_queries: bool = False,
+    log: Callable[[BenchmarkResult], None] | None = None,
+) -> dict[str, Any]:
+    """Measure the named benchmarks (all by default) and return a JSON-ready report."""
+    names = list(names or BENCHMARKS)
+    unknown = [name for name in names if name not in BENCHMARKS]
+    if unknown:
+        raise KeyError(f'Unknown benchmarks: {", ".join(unknown)}')
+    results = {}
+    for name in names:
+        result = measure(BENCHMARKS[name], repeat)
+        results[name] = result.as_dict(with_queries=with_queries)
+        if log is not None:
+            log(result)
+    return {
+        'created': timezone.now().isoformat(),
+        'commit': _git_commit(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'repeat': repeat,
+        'table_rows': _table_rows(),
+        'results': results,
+    }
+
+
+def compare_reports(baseline: dict, current: dict, *, threshold: float = 0.25, min_ms: float = 1.0) -> list[str]:
+    """
+    Regressions of ``current`` against ``baseline``: a median more than ``threshold`` slower
+    (and at least ``min_ms``), or more queries per call.
+    """
+    regressions = []
+    for name, now in current.get('results', {}).items():
+        before = baseline.get('results', {}).get(name)
+        if before is None:
+            continue
+        slower = now['median_ms'] - before['median_ms']
+        if slower >= min_ms and now['median_ms'] > before['median_ms'] * (1 + threshold):
+            regressions.append(f'{name}: median {before["median_ms"]:.1f} -> {now["median_ms"]:.1f} ms')
+        if now['queries'] > before['queries']:
+            regressions.append(f'{name}: queries {before["queries"]} -> {now["queries"]}')
+    return regressions
@@ -0,0 +1,377 @@
+"""
+PostgreSQL-backed channel layer, so several Daphne workers (or hosts) can share games.
+
+Every layer instance (one per process) has a random id that is embedded in the channel
+names it hands out, so a message always has exactly one owning worker. Messages are
+stored in ``ChannelLayerMessage`` (NOTIFY payloads are capped at 8000 bytes) and
+``pg_notify('jizz_chl_<id>')`` wakes the owner's listener thread, which claims its rows
+and feeds the waiting ``receive()`` calls. ``group_send`` fans out in one statement:
+one row per worker that has members, not one per channel.
+
+Group memberships live in ``ChannelLayerGroup`` and expire after ``group_expiry``
+seconds unless ``group_add`` is called again. Messages older than ``expiry`` are
+dropped; a worker that leaves expired messages unclaimed is considered dead and its
+memberships are removed. ``capacity`` bounds both a channel's local buffer (overflow is
+dropped and counted in ``dropped``) and a worker's unclaimed backlog (``send`` raises
+``ChannelFull``).
+
+Enable with ``CHANNEL_LAYER_BACKEND=postgres``. Messages must be JSON-serializable
+(``DjangoJSONEncoder``), which holds for every event the quiz consumers send.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import copy
+import json
+import logging
+import random
+import select
+import string
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+import psycopg2
+from channels.exceptions import ChannelFull
+from channels.layers import BaseChannelLayer
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connections
+
+from jizz.models import ChannelLayerGroup, ChannelLayerMessage
+
+logger = logging.getLogger(__name__)
+
+NOTIFY_PREFIX = 'jizz_chl_'
+_ALPHABET = string.ascii_lowercase + string.digits
+_INSTANCE_LENGTH = 12
+
+_GROUPS = ChannelLayerGroup._meta.db_table
+_MESSAGES = ChannelLayerMessage._meta.db_table
+
+_SEND_SQL = f"""
+WITH ins AS (
+    INSERT INTO {_MESSAGES} (instance, channels, payload, expires_at)
+    SELECT %(instance)s, %(channels)s::jsonb, %(payload)s::jsonb,
+           now() + %(expiry)s * interval '1 second'
+    WHERE (SELECT count(*) FROM {_MESSAGES} WHERE instance = %(instance)s) < %(capacity)s
+    RETURNING id, instance
+)
+SELECT pg_notify(%(prefix)s || instance, id::text) FROM ins
+"""
+
+_GROUP_SEND_SQL = f"""
+WITH targets AS (
+    SELECT instance, jsonb_agg(channel ORDER BY channel) AS channels
+    FROM {_GROUPS}
+    WHERE group_name = %(group)s AND expires_at > now()
+    GROUP BY instance
+), ins AS (
+    INSERT INTO {_MESSAGES} (instance, channels, payload, expires_at)
+    SELECT t.instance, t.channels, %(payload)s::jsonb, now() + %(expiry)s * interval '1 second'
+    FROM targets t
+    WHERE (SELECT count(*) FROM {_MESSAGES} m WHERE m.instance = t.instance) < %(capacity)s
+    RETURNING id, instance
+)
+SELECT pg_notify(%(prefix)s || instance, id::text) FROM ins
+"""
+
+_GROUP_ADD_SQL = f"""
+INSERT INTO {_GROUPS} (group_name, channel, instance, expires_at)
+VALUES (%(group)s, %(channel)s, %(instance)s, now() + %(group_expiry)s * interval '1 second')
+ON CONFLICT (group_name, channel)
+DO UPDATE SET instance = EXCLUDED.instance, expires_at = EXCLUDED.expires_at
+"""
+
+_CLAIM_SQL = f"""
+DELETE FROM {_MESSAGES} WHERE instance = %s
+RETURNING id, channels, payload, expires_at > now()
+"""
+
+_CLEANUP_SQL = f"""
+DELETE FROM {_GROUPS}
+WHERE expires_at <= now()
+   OR instance IN (
+       SELECT instance FROM {_MESSAGES} WHERE expires_at <= now() AND instance <> %(instance)s
+   );
+DELETE FROM {_MESSAGES} WHERE expires_at <= now();
+"""
+
+
+def _random_string(length: int) -> str:
+    return ''.join(random.choices(_ALPHABET, k=length))
+
+
+def _wake(future: asyncio.Future) -> None:
+    if not future.done():
+        future.set_result(None)
+
+
+class PostgresChannelLayer(BaseChannelLayer):
+    extensions = ['groups', 'flush']
+
+    def __init__(
+        self,
+        expiry=60,
+        group_expiry=86400,
+        capacity=100,
+        channel_capacity=None,
+        database='default',
+        pool_size=2,
+        poll_interval=1.0,
+        cleanup_interval=30.0,
+    ):
+        super().__init__(expiry=expiry, capacity=capacity, channel_capacity=channel_capacity)
+        self.group_expiry = group_expiry
+        self.database = database
+        self.poll_interval = poll_interval
+        self.cleanup_interval = cleanup_interval
+        self.instance = _random_string(_INSTANCE_LENGTH)
+        self.notify_channel = NOTIFY_PREFIX + self.instance
+        self.dropped = 0
+        self._buffers: dict[str, deque] = {}
+        self._waiters: dict[str, list[tuple[asyncio.AbstractEventLoop, asyncio.Future]]] = {}
+        self._lock = threading.Lock()
+        self.pool_size = pool_size
+        self._executor = self._new_executor()
+        self._local = threading.local()
+        self._connections = []
+        self._listener: threading.Thread | None = None
+        self._stopping = threading.Event()
+
+    # Connections
+
+    def _new_executor(self) -> ThreadPoolExecutor:
+        return ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='channel-layer')
+
+    def _connect(self):
+        params = connections[self.database].get_connection_params()
+        params.pop('cursor_factory', None)
+        conn = psycopg2.connect(**params)
+        conn.autocommit = True
+        with self._lock:
+            self._connections.append(conn)
+        return conn
+
+    def _execute(self, sql, params=None):
+        conn = getattr(self._local, 'conn', None)
+        if conn is None or conn.closed:
+            conn = self._local.conn = self._connect()
+        try:
+            with conn.cursor() as cursor:
+                cursor.execute(sql, params)
+                return cursor.fetchall() if cursor.description else []
+        except (psycopg2.OperationalError, psycopg2.InterfaceError):
+            conn.close()
+            self._local.conn = None
+            raise
+
+    async def _run(self, sql, params=None):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, self._execute, sql, params)
+
+    # Naming
+
+    def _instance_of(self, channel: str) -> str:
+        """Owning layer instance of a channel made by ``new_channel``."""
+        name, bang, _ = channel.partition('!')
+        instance = name.rsplit('.', 1)[-1]
+        if not bang or len(instance) != _INSTANCE_LENGTH:
+            raise ValueError(
+                f'{channel!r} is not a process-specific channel; '
+                'PostgresChannelLayer only routes channels created by new_channel().'
+            )
+        return instance
+
+    async def new_channel(self, prefix='specific'):
+        self._ensure_listener()
+        return f'{prefix}.{self.instance}!{_random_string(12)}'
+
+    # Local delivery (listener thread and same-process sends)
+
+    def _deliver(self, channels, message) -> int:
+        """Buffer ``message`` for local channels; returns how many buffers were full."""
+        deadline = time.monotonic() + self.expiry
+        full = 0
+        with self._lock:
+            for i, channel in enumerate(channels):
+                buffer = self._buffers.setdefault(channel, deque())
+                if len(buffer) >= self.get_capacity(channel):
+                    full += 1
+                    continue
+                buffer.append((deadline, message if i == 0 else copy.deepcopy(message)))
+                for loop, future in self._waiters.pop(channel, ()):
+                    try:
+                        loop.call_soon_threadsafe(_wake, future)
+                    except RuntimeError:
+                        pass  # receiver's event loop already closed
+        return full
+
+    def _claim(self, conn) -> None:
+        with conn.cursor() as cursor:
+            cursor.execute(_CLAIM_SQL, [self.instance])
+            rows = sorted(cursor.fetchall())
+        for _, channels, payload, fresh in rows:
+            if not fresh:
+                self.dropped += len(channels)
+                continue
+            self.dropped += self._deliver(channels, payload)
+
+    def _prune_buffers(self) -> None:
+        now = time.monotonic()
+        with self._lock:
+            for channel in list(self._buffers):
+                buffer = self._buffers[channel]
+                while buffer and buffer[0][0] < now:
+                    buffer.popleft()
+                    self.dropped += 1
+                if not buffer and channel not in self._waiters:
+                    del self._buffers[channel]
+
+    def _ensure_listener(self) -> None:
+        if self._listener is not None and self._listener.is_alive():
+            return
+        self._stopping.clear()
+        self._listener = threading.Thread(
+            target=self._listen,
+            name=f'channel-layer-{self.instance}',
+            daemon=True,
+        )
+        self._listener.start()
+
+    def _listen(self) -> None:
+        conn = None
+        last_cleanup = time.monotonic()
+        while not self._stopping.is_set():
+            try:
+                if conn is None:
+                    conn = self._connect()
+                    with conn.cursor() as cursor:
+                        cursor.execute(f'LISTEN {self.notify_channel}')
+                    # Anything stored before LISTEN took effect.
+                    self._claim(conn)
+                # Notifies can also arrive while a claim query runs on this connection.
+                wait = 0 if conn.notifies else self.poll_interval
+                if select.select([conn], [], [], wait) != ([], [], []):
+                    conn.poll()
+                if conn.notifies:
+                    conn.notifies.clear()
+                    self._claim(conn)
+                if time.monotonic() - last_cleanup >= self.cleanup_interval:
+                    last_cleanup = time.monotonic()
+                    with conn.cursor() as cursor:
+                        cursor.execute(_CLEANUP_SQL, {'instance': self.instance})
+                    self._prune_buffers()
+            except (psycopg2.Error, OSError, ValueError):
+                if self._stopping.is_set():
+                    break
+                logger.exception('Channel layer listener %s lost its connection', self.instance)
+                if conn is not None:
+                    conn.close()
+                conn = None
+                self._stopping.wait(self.poll_interval)
+        if conn is not None:
+            conn.close()
+
+    # Channel layer API
+
+    async def send(self, channel, message):
+        assert isinstance(message, dict), 'message is not a dict'
+        assert self.valid_channel_name(channel), 'Channel name not valid'
+        assert '__asgi_channel__' not in message
+        instance = self._instance_of(channel)
+        if instance == self.instance:
+            if self._deliver([channel], copy.deepcopy(message)):
+                raise ChannelFull(channel)
+            return
+        rows = await self._run(_SEND_SQL, {
+            'instance': instance,
+            'channels': json.dumps([channel]),
+            'payload': json.dumps(message, cls=DjangoJSONEncoder),
+            'expiry': self.expiry,
+            'capacity': self.get_capacity(channel),
+            'prefix': NOTIFY_PREFIX,
+        })
+        if not rows:
+            raise ChannelFull(channel)
+
+    async def receive(self, channel):
+        assert self.valid_channel_name(channel)
+        self._ensure_listener()
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._lock:
+                buffer = self._buffers.get(channel)
+                while buffer:
+                    deadline, message = buffer.popleft()
+                    if deadline >= time.monotonic():
+                        return message
+                    self.dropped += 1
+                future = loop.create_future()
+                waiter = (loop, future)
+                self._waiters.setdefault(channel, []).append(waiter)
+            try:
+                await future
+            finally:
+                with self._lock:
+                    waiters = self._waiters.get(channel)
+                    if waiters and waiter in waiters:
+                        waiters.remove(waiter)
+                        if not waiters:
+                            del self._waiters[channel]
+
+    async def group_add(self, group, channel):
+        assert self.valid_group_name(group), 'Group name not valid'
+        assert self.valid_channel_name(channel), 'Channel name not valid'
+        self._ensure_listener()
+        await self._run(_GROUP_ADD_SQL, {
+            'group': group,
+            'channel': channel,
+            'instance': self._instance_of(channel),
+            'group_expiry': self.group_expiry,
+        })
+
+    async def group_discard(self, group, channel):
+        assert self.valid_group_name(group), 'Group name not valid'
+        assert self.valid_channel_name(channel), 'Channel name not valid'
+        await self._run(
+            f'DELETE FROM {_GROUPS} WHERE group_name = %s AND channel = %s',
+            [group, channel],
+        )
+
+    async def group_send(self, group, message):
+        assert isinstance(message, dict), 'Message is not a dict'
+        assert self.valid_group_name(group), 'Group name not valid'
+        await self._run(_GROUP_SEND_SQL, {
+            'group': group,
+            'payload': json.dumps(message, cls=DjangoJSONEncoder),
+            'expiry': self.expiry,
+            'capacity': self.capacity,
+            'prefix': NOTIFY_PREFIX,
+        })
+
+    async def flush(self):
+        """Empty every group and pending message (shared by all workers; meant for tests)."""
+        await self._run(f'DELETE FROM {_GROUPS}; DELETE FROM {_MESSAGES};')
+        with self._lock:
+            self._buffers.clear()
+
+    async def close(self):
+        """Leave all groups, drop this worker's backlog and release connections."""
+        if self._listener is not None:
+            self._stopping.set()
+            self._listener.join(timeout=self.poll_interval + 1)
+            self._listener = None
+        await self._run(
+            f'DELETE FROM {_GROUPS} WHERE instance = %(instance)s; '
+            f'DELETE FROM {_MESSAGES} WHERE instance = %(instance)s;',
+            {'instance': self.instance},
+        )
+        self._executor.shutdown(wait=True)
+        self._executor = self._new_executor()
+        with self._lock:
+            conns, self._connections = self._connections, []
+        for conn in conns:
+            conn.close()
+        self._local = threading.local()
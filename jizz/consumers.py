@@ -19,7 +19,10 @@ from typing import Optional
 from channels.db import database_sync_to_async
 from channels.generic.websocket import AsyncWebsocketConsumer
 
-from jizz.usage_analytics import record_websocket_usage_event
+from jizz.models import RequestProfile
+from jizz.request_profiling import current_profile, profile_request
+from jizz.usage_analytics import build_websocket_usage_event
+from jizz.usage_event_buffer import asubmit_usage_event
 
 logger = logging.getLogger(__name__)
 
@@ -46,6 +49,8 @@ class QuizConsumer(AsyncWebsocketConsumer):
     All per-connection state must live on self (never rely on class attributes for instance data).
     """
 
+    ACTIONS = ("join_game", "start_game", "next_question", "submit_answer", "rematch", "end_game")
+
     async def connect(self):
         self.game_token = self.scope["url_route"]["kwargs"]["game_token"]
         self.game_group_name = f"quiz_{self.game_token}"
@@ -69,6 +74,11 @@ class QuizConsumer(AsyncWebsocketConsumer):
         if not action:
             return
 
+        route = f"WS {action}" if action in self.ACTIONS else "WS unknown"
+        with profile_request(RequestProfile.KIND_WEBSOCKET, route):
+            await self._dispatch_action(action, data)
+
+    async def _dispatch_action(self, action: str, data: dict):
         try:
             if action == "join_game":
                 await self._handle_join_game(data)
@@ -90,13 +100,19 @@ class QuizConsumer(AsyncWebsocketConsumer):
                 )
             )
 
+    async def send(self, text_data=None, bytes_data=None, close=False):
+        profile = current_profile()
+        if profile is not None:
+            profile.response_bytes += len(text_data.encode()) if text_data else len(bytes_data or b"")
+        await super().send(text_data=text_data, bytes_data=bytes_data, close=close)
+
     async def _log_websocket_action(self, action: str):
         try:
-            await database_sync_to_async(record_websocket_usage_event)(
+            await asubmit_usage_event(build_websocket_usage_event(
                 self.scope,
                 action=action,
                 metadata={'game_token': self.game_token},
-            )
+            ))
         except Exception:
             logger.exception("Failed to record websocket usage for %s", action)
 
@@ -261,16 +277,17 @@ class QuizConsumer(AsyncWebsocketConsumer):
             return
 
         def submit_and_serialize():
-            from jizz.models import PlayerScore, Player, Question, Answer, Game
+            from jizz.models import PlayerScore, Question, Answer
             from jizz.serializers import AnswerSerializer
             from jizz.services.checklist import (
                 compute_checklist_added,
                 compute_checklist_missed,
             )
 
-            player = Player.objects.select_related('user').get(token=player_token)
-            game = Game.objects.get(token=self.game_token)
-            player_score = PlayerScore.objects.get(player=player, game=game)
+            player_score = PlayerScore.objects.select_related('player__user', 'game').get(
+                player__token=player_token, game__token=self.game_token
+            )
+            player, game = player_score.player, player_score.game
             question = Question.objects.select_related('game__country', 'species').get(
                 id=question_id
             )
@@ -290,19 +307,22 @@ class QuizConsumer(AsyncWebsocketConsumer):
                 row.checklist_added = False
                 row.checklist_missed = False
             else:
+                # Checklist flags compare against earlier answers: compute before the insert.
+                checklist_user = player.user if player.user_id else None
+                checklist_added = compute_checklist_added(
+                    player, question, correct, user=checklist_user
+                )
+                checklist_missed = compute_checklist_missed(
+                    player, question, correct, user=checklist_user
+                )
                 row = Answer.objects.create(
                     answer_id=answer_id,
                     player_score=player_score,
                     question=question,
                     correct=correct,
                 )
-                checklist_user = player.user if player.user_id else None
-                row.checklist_added = compute_checklist_added(
-                    player, question, correct, user=checklist_user
-                )
-                row.checklist_missed = compute_checklist_missed(
-                    player, question, correct, user=checklist_user
-                )
+                row.checklist_added = checklist_added
+                row.checklist_missed = checklist_missed
 
             serializer = AnswerSerializer(row, context={"game": game})
             return serializer.data
@@ -319,7 +339,10 @@ class QuizConsumer(AsyncWebsocketConsumer):
             text_data=json.dumps({"action": "answer_checked", "answer": answer_data})
         )
 
-        await self._broadcast_players_update()
+        # Coalesced: a burst of answers results in one scoreboard broadcast per tick.
+        from jizz.scoreboard import schedule_scoreboard_broadcast
+
+        schedule_scoreboard_broadcast(self.channel_layer, self.game_token)
         await self._log_websocket_action("submit_answer")
 
     async def _handle_rematch(self, data):
@@ -376,38 +399,32 @@ class QuizConsumer(AsyncWebsocketConsumer):
             return game.add_question()
 
         question = await database_sync_to_async(advance)()
-        if question:
-            await self._broadcast_question_payload(question.id)
-        else:
+        if question is None:
             await self._broadcast_current_question()
+        elif getattr(question, "play_payload", None) is not None:
+            # Prepared round (jizz.question_prefetch): payload was serialized ahead of time.
+            await self.channel_layer.group_send(
+                self.game_group_name,
+                {
+                    "type": "new_question",
+                    "question": {**question.play_payload, "game": {"token": str(self.game_token)}},
+                },
+            )
+        else:
+            await self._broadcast_question_payload(question.id)
 
     async def _broadcast_players_update(self):
-        player_data = await self._get_player_data()
-        await self.channel_layer.group_send(
-            self.game_group_name,
-            {"type": "update_players", "players": player_data},
-        )
-
-    async def _get_player_data(self):
-        from .models import Game
-        from .serializers import PlayerScoreSerializer
+        from .scoreboard import broadcast_scoreboard
 
-        def get_data():
-            game = Game.objects.get(token=self.game_token)
-            scores = list(
-                game.scores.select_related('player', 'game__country').order_by('-score')
-            )
-            return PlayerScoreSerializer(scores, many=True).data
-
-        return await database_sync_to_async(get_data)()
+        await broadcast_scoreboard(self.channel_layer, self.game_token)
 
     async def _send_game_update_to_self(self):
+        from .game_state import build_game_state
         from .models import Game
-        from .serializers import GameSerializer
 
         def get_game_data():
             g = Game.objects.select_related('host', 'country').get(token=self.game_token)
-            return GameSerializer(g).data
+            return build_game_state(g)
 
         game_data = await database_sync_to_async(get_game_data)()
         await self.send(
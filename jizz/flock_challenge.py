@@ -16,6 +16,7 @@ from jizz.game_question_selection import (
     candidate_species_ids,
     media_type_for_game,
     pick_species_with_eligible_media,
+    playable_index_key,
     question_target_species_ids,
 )
 from jizz.models import (
@@ -23,6 +24,7 @@ from jizz.models import (
     Question,
 )
 from jizz.question_play import fetch_eligible_media_for_species
+from jizz.question_pools import get_pool, pool_size, take_cards
 from media.models import Media
 
 # Club Mix: difficulty ramps in fixed play order (never shuffled after snapshot).
@@ -125,7 +127,27 @@ def _build_slot_items(
     items: list[SnapshotItem] = []
     local_used = set(used_species_ids)
 
-    for i in range(count):
+    # Ready-made cards first; only the shortfall is generated here.
+    pool = get_pool(playable_index_key(scratch), level) if pool_size() > 0 else None
+    for card in take_cards(pool, count, exclude_species_ids=local_used) if pool else ():
+        local_used.add(card.species_id)
+        option_ids_ordered = list(card.option_species_ids)
+        if card.species_id not in option_ids_ordered:
+            option_ids_ordered.append(card.species_id)
+        random.shuffle(option_ids_ordered)
+        items.append(
+            SnapshotItem(
+                sequence=start_sequence + len(items),
+                species_id=card.species_id,
+                media_id=card.media_id,
+                media_type=media_type,
+                level=level,
+                rarity=rarity,
+                option_species_ids=option_ids_ordered,
+            )
+        )
+
+    for i in range(len(items), count):
         pool = [sid for sid in target_ids if sid not in local_used]
         if not pool:
             raise InsufficientChallengeContent(
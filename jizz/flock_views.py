@@ -29,6 +29,7 @@ from jizz.flock_challenge import (
     persist_challenge_snapshot,
     unique_flock_slug,
 )
+from jizz.mobile_push.dispatch import push_batch
 from jizz.models import (
     Answer,
     Country,
@@ -71,11 +72,12 @@ def _notify_flock_challenge(flock: Flock, challenge: FlockChallenge, exclude_use
         'flock_slug': flock.slug,
         'challenge_id': challenge.id,
     }
-    for membership in memberships:
-        try:
-            send_push_to_user(membership.user, title, body, data=data)
-        except Exception:
-            pass
+    with push_batch():
+        for membership in memberships:
+            try:
+                send_push_to_user(membership.user, title, body, data=data)
+            except Exception:
+                pass
 
 
 def _active_invite(flock: Flock) -> FlockInvite | None:
@@ -2,20 +2,24 @@
 Efficient species / media selection for Game.add_question().
 
 Avoids join+distinct+ORDER BY RANDOM() on large tables; uses ID lists and random.choice.
+Eligibility (checklist, rarity, tax filter, eligible media) comes from the materialized
+``jizz.playable_species_index`` so creating a question only inserts rows.
 """
 
 from __future__ import annotations
 
 import random
+from dataclasses import dataclass
 from typing import Iterable, Sequence
 
 from django.core.cache import cache
-from django.db.models import Count, Exists, Max, OuterRef, Q
+from django.db.models import Count, Max
 
 from jizz.models import CountrySpecies, Game, Question, QuestionOption, Species
-from media.models import Media, MediaReview
+from jizz.playable_species_index import PlayableIndexKey, PlayableSpecies, get_playable_species
+from jizz.tiered_cache import checklist_tag, set_tagged, species_media_tag
+from media.review_state import count_eligible_media
 
-_GAME_OPTION_SPECIES_CACHE_TTL = 60 * 60 * 24
 _GAME_TARGET_SPECIES_CACHE_TTL = 60 * 60 * 24
 
 _MEDIA_TYPE = {
@@ -73,58 +77,33 @@ def game_has_candidate_species(game: Game) -> bool:
     return bool(question_target_species_ids(game))
 
 
-def _option_species_cache_key(game_id: int) -> str:
-    return f'jizz:game_option_species:{game_id}'
-
-
 def _target_species_cache_key(game_id: int) -> str:
     return f'jizz:game_target_species:{game_id}'
 
 
-def _query_option_species_ids(game: Game) -> list[int]:
-    """Uncached species IDs eligible for answer options."""
-    media_type = media_type_for_game(game)
-    statuses = country_statuses_for_game(game)
-
-    country_species = CountrySpecies.objects.filter(
-        country_id=game.country_id,
-        status__in=statuses,
-    ).filter(Game.country_species_rarity_q(effective_rarity(game)))
-
-    species_qs = Species.objects.filter(
-        id__in=country_species.values('species_id'),
-    ).filter(
-        Exists(
-            Media.objects.filter(
-                species_id=OuterRef('pk'),
-                type=media_type,
-                hide=False,
-            )
-        )
+def playable_index_key(game: Game) -> PlayableIndexKey:
+    return PlayableIndexKey.build(
+        country_id=game.country_id or '',
+        statuses=country_statuses_for_game(game),
+        rarity=effective_rarity(game),
+        media_type=media_type_for_game(game),
+        tax_family=game.tax_family,
+        tax_order=game.tax_order,
     )
-    if game.tax_family:
-        species_qs = species_qs.filter(taxonomic_family__name_latin=game.tax_family)
-    elif game.tax_order:
-        species_qs = species_qs.filter(taxonomic_order__name_latin=game.tax_order)
 
-    return list(species_qs.values_list('id', flat=True))
+
+def playable_species_for_game(game: Game) -> dict[int, PlayableSpecies]:
+    """Species id -> index entry (eligible media ids, frequency, taxonomy) for this game."""
+    return get_playable_species(playable_index_key(game))
 
 
 def candidate_species_ids(game: Game) -> list[int]:
     """
     Species IDs eligible for answer options: country list + rarity + tax filter + media.
 
-    Cached per game — filters are fixed for the lifetime of a session.
+    Read from the playable species index, shared by every game with the same filters.
     """
-    if not game.pk:
-        return _query_option_species_ids(game)
-    cache_key = _option_species_cache_key(game.pk)
-    cached = cache.get(cache_key)
-    if cached is not None:
-        return cached
-    ids = _query_option_species_ids(game)
-    cache.set(cache_key, ids, _GAME_OPTION_SPECIES_CACHE_TTL)
-    return ids
+    return sorted(playable_species_for_game(game))
 
 
 def question_target_species_ids(
@@ -138,31 +117,32 @@ def question_target_species_ids(
     the normal country/rarity/tax/media filters. Answer options still use the
     full candidate_species_ids pool.
     """
+    ids = list(option_ids) if option_ids is not None else candidate_species_ids(game)
+    if not game.dificult_species or not game.country_id:
+        return ids
+
     if game.pk:
         cache_key = _target_species_cache_key(game.pk)
         cached = cache.get(cache_key)
         if cached is not None:
             return cached
 
-    ids = list(option_ids) if option_ids is not None else candidate_species_ids(game)
-    if not game.dificult_species or not game.country_id:
-        target_ids = ids
-    else:
-        from jizz.quiz_mistake_stats import get_top_mistake_target_species_ids
+    from jizz.quiz_mistake_stats import get_top_mistake_target_species_ids
 
-        top_difficult = set(get_top_mistake_target_species_ids(game.country_id, limit=100))
-        if not top_difficult:
-            top_difficult = set(
-                get_top_mistake_target_species_ids(game.country_id, limit=100, min_wrong=1)
-            )
-        if top_difficult:
-            filtered = [sid for sid in ids if sid in top_difficult]
-            target_ids = filtered if filtered else ids
-        else:
-            target_ids = ids
+    top_difficult = set(get_top_mistake_target_species_ids(game.country_id, limit=100))
+    if not top_difficult:
+        top_difficult = set(
+            get_top_mistake_target_species_ids(game.country_id, limit=100, min_wrong=1)
+        )
+    if top_difficult:
+        filtered = [sid for sid in ids if sid in top_difficult]
+        target_ids = filtered if filtered else ids
+    else:
+        target_ids = ids
 
     if game.pk:
-        cache.set(_target_species_cache_key(game.pk), target_ids, _GAME_TARGET_SPECIES_CACHE_TTL)
+        tags = [checklist_tag(game.country_id), *(species_media_tag(sid) for sid in target_ids)]
+        set_tagged(_target_species_cache_key(game.pk), target_ids, _GAME_TARGET_SPECIES_CACHE_TTL, tags)
     return target_ids
 
 
@@ -180,36 +160,35 @@ def _pick_target_pool(
     game: Game,
     target_ids: Sequence[int],
     question_count: int,
+    planned_ids: Sequence[int] = (),
 ) -> tuple[list[int], set[int]]:
     """
     Choose target species pool; skip loading all past species once every target was used.
+    ``planned_ids`` are targets of prepared look-ahead rounds (included in ``question_count``).
     """
     target_list = list(target_ids)
-    if question_count >= len(target_list):
+    if question_count == 0 or question_count >= len(target_list):
         return target_list, set()
 
     used = set(game.questions.values_list('species_id', flat=True).distinct())
+    used.update(planned_ids)
     prefer_unused = [sid for sid in target_list if sid not in used]
     pool = prefer_unused if prefer_unused else target_list
     return pool, used
 
 
-def count_eligible_media(species_id: int, media_type: str) -> int:
-    """Count without loading media rows (species with many assets stay fast)."""
-    base = Media.objects.filter(species_id=species_id, type=media_type, hide=False)
-    approved = base.filter(reviews__review_type=MediaReview.APPROVED).distinct().count()
-    if approved:
-        return approved
-    return base.exclude(reviews__review_type=MediaReview.REJECTED).distinct().count()
-
-
 def _media_count(
     species_id: int,
     media_type: str,
     cache: dict[int, int],
+    playable: dict[int, PlayableSpecies] | None = None,
 ) -> int:
     if species_id not in cache:
-        cache[species_id] = count_eligible_media(species_id, media_type)
+        entry = playable.get(species_id) if playable else None
+        if entry is not None:
+            cache[species_id] = entry.media_count
+        else:
+            cache[species_id] = count_eligible_media(species_id, media_type)
     return cache[species_id]
 
 
@@ -239,8 +218,14 @@ def _species_frequency_map(country_id: str | None, species_ids: Sequence[int]) -
 def build_extreme_target_weights(
     game: Game,
     candidate_ids: Sequence[int],
+    playable: dict[int, PlayableSpecies] | None = None,
 ) -> dict[int, float]:
-    freq_map = _species_frequency_map(game.country_id, candidate_ids)
+    if playable is not None:
+        freq_map = {
+            sid: playable[sid].frequency for sid in candidate_ids if sid in playable
+        }
+    else:
+        freq_map = _species_frequency_map(game.country_id, candidate_ids)
     weights = {
         sid: EXTREME_FREQUENCY_WEIGHTS.get(freq_map.get(sid), EXTREME_FREQUENCY_WEIGHTS[None])
         for sid in candidate_ids
@@ -288,61 +273,68 @@ def pick_species_id_for_game(
     game: Game,
     candidate_ids: Sequence[int],
     exclude_ids: Iterable[int] = (),
+    playable: dict[int, PlayableSpecies] | None = None,
 ) -> int | None:
     if game.game_type == Game.GAME_TYPE_EXTREME:
-        weights = build_extreme_target_weights(game, candidate_ids)
+        weights = build_extreme_target_weights(game, candidate_ids, playable)
         return pick_weighted_species_id(candidate_ids, weights, exclude_ids)
     return pick_random_species_id(candidate_ids, exclude_ids)
 
 
-def pick_species_with_eligible_media(
+def _pick_species_id_with_eligible_media(
     game: Game,
     candidate_ids: Sequence[int],
     used_species_ids: Iterable[int],
-) -> tuple[Species, int]:
-    """
-    Pick species and 0-based media index (question.number).
-    Raises ValueError if no species with eligible media.
-    """
+    playable: dict[int, PlayableSpecies] | None = None,
+) -> tuple[int, int]:
+    """Species id + 0-based media index; media counts come from ``playable`` when given."""
     media_type = media_type_for_game(game)
     used = set(used_species_ids)
     tried: set[int] = set()
     media_counts: dict[int, int] = {}
-    species_cache: dict[int, Species] = {}
-
-    def species_for(sid: int) -> Species:
-        if sid not in species_cache:
-            species_cache.update(_species_map([sid]))
-        species = species_cache.get(sid)
-        if species is None:
-            raise ValueError(f'Species {sid} not found')
-        return species
 
     for _ in range(10):
-        sid = pick_species_id_for_game(game, candidate_ids, exclude_ids=tried)
+        sid = pick_species_id_for_game(game, candidate_ids, exclude_ids=tried, playable=playable)
         if sid is None:
             break
         tried.add(sid)
-        media_count = _media_count(sid, media_type, media_counts)
+        media_count = _media_count(sid, media_type, media_counts, playable)
         if media_count > 0:
-            number = random.randint(0, media_count - 1)
-            return species_for(sid), number
+            return sid, random.randint(0, media_count - 1)
 
         remaining = [i for i in candidate_ids if i not in tried and i not in used]
         if remaining:
-            sid = pick_species_id_for_game(game, remaining)
+            sid = pick_species_id_for_game(game, remaining, playable=playable)
             if sid is not None:
                 tried.add(sid)
-                media_count = _media_count(sid, media_type, media_counts)
+                media_count = _media_count(sid, media_type, media_counts, playable)
                 if media_count > 0:
-                    number = random.randint(0, media_count - 1)
-                    return species_for(sid), number
+                    return sid, random.randint(0, media_count - 1)
 
     raise ValueError(
         f"No species with {game.media} media available for game {game.id}"
     )
 
 
+def pick_species_with_eligible_media(
+    game: Game,
+    candidate_ids: Sequence[int],
+    used_species_ids: Iterable[int],
+    playable: dict[int, PlayableSpecies] | None = None,
+) -> tuple[Species, int]:
+    """
+    Pick species and 0-based media index (question.number).
+    Raises ValueError if no species with eligible media.
+    """
+    sid, number = _pick_species_id_with_eligible_media(
+        game, candidate_ids, used_species_ids, playable
+    )
+    species = _species_map([sid]).get(sid)
+    if species is None:
+        raise ValueError(f'Species {sid} not found')
+    return species, number
+
+
 def _species_map(ids: Iterable[int]) -> dict[int, Species]:
     if not ids:
         return {}
@@ -356,7 +348,7 @@ def _species_map(ids: Iterable[int]) -> dict[int, Species]:
     }
 
 
-def _sort_key_for_taxonomic_neighbor(species: Species) -> tuple:
+def _sort_key_for_taxonomic_neighbor(species: Species | PlayableSpecies) -> tuple:
     if species.tax_ordering is not None:
         return (0, species.tax_ordering, species.id)
     return (1, species.id)
@@ -409,12 +401,18 @@ def _pick_taxonomic_neighbors(
 
 def advanced_option_species(
     candidate_ids: Sequence[int],
-    answer_species: Species,
-) -> list[Species]:
-    """Advanced MC: distractors prefer same genus, then family, then order, then global tax order."""
+    answer_species: Species | PlayableSpecies,
+    species_by_id: dict[int, Species | PlayableSpecies] | None = None,
+) -> list[Species | PlayableSpecies]:
+    """
+    Advanced MC: distractors prefer same genus, then family, then order, then global tax order.
+
+    Pass ``species_by_id`` (e.g. the playable index) to skip loading taxonomy rows.
+    """
     answer_id = answer_species.id
     all_ids = set(candidate_ids) | {answer_id}
-    species_by_id = _species_map(all_ids)
+    if species_by_id is None:
+        species_by_id = _species_map(all_ids)
     answer = species_by_id.get(answer_id, answer_species)
 
     candidate_set = {sid for sid in candidate_ids if sid != answer_id}
@@ -626,11 +624,12 @@ def pick_species_practice_target_with_media(
         raise ValueError(f'Species practice game {game.id} is missing focus species or pool')
 
     media_type = media_type_for_game(game)
+    playable = playable_species_for_game(game)
     media_counts: dict[int, int] = {}
     species_cache: dict[int, Species] = {}
 
     def pick_with_media(sid: int) -> tuple[Species, int] | None:
-        media_count = _media_count(sid, media_type, media_counts)
+        media_count = _media_count(sid, media_type, media_counts, playable)
         if media_count <= 0:
             return None
         if sid not in species_cache:
@@ -680,22 +679,14 @@ def create_species_practice_question(game: Game) -> Question:
 
     options = advanced_option_species(option_pool, species)
     random.shuffle(options)
-    question = game.questions.create(
-        species=species, number=number, sequence=sequence
-    )
-    QuestionOption.objects.bulk_create(
-        [
-            QuestionOption(question=question, species=opt, order=index)
-            for index, opt in enumerate(options)
-        ]
-    )
-    return question
+    return _create_question_with_options(game, species.id, number, sequence, [opt.id for opt in options])
 
 
 def beginner_option_species(
     candidate_ids: Sequence[int],
-    answer_species: Species,
-) -> list[Species]:
+    answer_species: Species | PlayableSpecies,
+    species_by_id: dict[int, Species | PlayableSpecies] | None = None,
+) -> list[Species | PlayableSpecies]:
     """Three distractors (ID at least 20 away when possible) plus answer."""
     aid = answer_species.id
     far_ids = [i for i in candidate_ids if i != aid and abs(i - aid) >= 20]
@@ -710,7 +701,7 @@ def beginner_option_species(
         if need > 0 and other_ids:
             distractor_ids.extend(random.sample(other_ids, min(need, len(other_ids))))
 
-    by_id = _species_map(distractor_ids)
+    by_id = species_by_id if species_by_id is not None else _species_map(distractor_ids)
     options = [by_id[i] for i in distractor_ids if i in by_id]
     options.append(answer_species)
     return options
@@ -731,27 +722,48 @@ def create_pair_practice_question(game: Game) -> Question:
     species_map = _species_map(pool)
     options = [species_map[low_id], species_map[high_id]]
     random.shuffle(options)
+    return _create_question_with_options(game, species.id, number, sequence, [opt.id for opt in options])
+
 
+def _create_question_with_options(
+    game: Game,
+    species_id: int,
+    number: int,
+    sequence: int,
+    option_species_ids: Sequence[int] = (),
+) -> Question:
     question = game.questions.create(
-        species=species, number=number, sequence=sequence
-    )
-    QuestionOption.objects.bulk_create(
-        [
-            QuestionOption(question=question, species=opt, order=index)
-            for index, opt in enumerate(options)
-        ]
+        species_id=species_id, number=number, sequence=sequence
     )
+    if option_species_ids:
+        QuestionOption.objects.bulk_create(
+            [
+                QuestionOption(question=question, species_id=sid, order=index)
+                for index, sid in enumerate(option_species_ids)
+            ]
+        )
     return question
 
 
-def create_question_for_game(game: Game) -> Question:
-    """Build next question + options; caller holds game lock."""
-    if game.game_type == Game.GAME_TYPE_PAIR_PRACTICE:
-        return create_pair_practice_question(game)
-    if game.game_type == Game.GAME_TYPE_SPECIES_PRACTICE:
-        return create_species_practice_question(game)
+@dataclass(frozen=True)
+class PlannedQuestion:
+    """Target species, media index, sequence and ordered option ids for one round."""
 
-    option_ids = candidate_species_ids(game)
+    species_id: int
+    number: int
+    sequence: int
+    option_species_ids: tuple[int, ...]
+
+
+def plan_question_for_game(game: Game, planned_species_ids: Sequence[int] = ()) -> PlannedQuestion:
+    """
+    Choose the next standard/extreme round without writing anything.
+
+    ``planned_species_ids`` are the targets of rounds already prepared ahead
+    (``jizz.question_prefetch``); they count as asked for sequence and repeat avoidance.
+    """
+    playable = playable_species_for_game(game)
+    option_ids = sorted(playable)
     target_ids = question_target_species_ids(game, option_ids)
     if not option_ids:
         raise ValueError(f"No candidate species for game {game.id} ({game.country_id})")
@@ -759,37 +771,36 @@ def create_question_for_game(game: Game) -> Question:
         raise ValueError(f"No question target species for game {game.id} ({game.country_id})")
 
     sequence, question_count = _next_sequence_and_question_count(game)
-    pool, used_ids = _pick_target_pool(game, target_ids, question_count)
-    species, number = pick_species_with_eligible_media(game, pool, used_ids)
+    planned = list(planned_species_ids)
+    pool, used_ids = _pick_target_pool(game, target_ids, question_count + len(planned), planned)
+    species_id, number = _pick_species_id_with_eligible_media(game, pool, used_ids, playable)
+    answer = playable[species_id]
 
+    options = []
     if game.level == 'advanced':
-        options = advanced_option_species(option_ids, species)
-        random.shuffle(options)
-        question = game.questions.create(
-            species=species, number=number, sequence=sequence
-        )
-        QuestionOption.objects.bulk_create(
-            [
-                QuestionOption(question=question, species=opt, order=index)
-                for index, opt in enumerate(options)
-            ]
-        )
-        return question
+        options = advanced_option_species(option_ids, answer, species_by_id=playable)
+    elif game.level == 'beginner':
+        options = beginner_option_species(option_ids, answer, species_by_id=playable)
+    random.shuffle(options)
+    return PlannedQuestion(
+        species_id=species_id,
+        number=number,
+        sequence=sequence + len(planned),
+        option_species_ids=tuple(opt.id for opt in options),
+    )
+
+
+def create_question_for_game(game: Game) -> Question:
+    """Build next question + options; caller holds game lock."""
+    if game.game_type == Game.GAME_TYPE_PAIR_PRACTICE:
+        return create_pair_practice_question(game)
+    if game.game_type == Game.GAME_TYPE_SPECIES_PRACTICE:
+        return create_species_practice_question(game)
+
+    return create_planned_question(game, plan_question_for_game(game))
 
-    if game.level == 'beginner':
-        options = beginner_option_species(option_ids, species)
-        random.shuffle(options)
-        question = game.questions.create(
-            species=species, number=number, sequence=sequence
-        )
-        QuestionOption.objects.bulk_create(
-            [
-                QuestionOption(question=question, species=opt, order=index)
-                for index, opt in enumerate(options)
-            ]
-        )
-        return question
 
-    return game.questions.create(
-        species=species, number=number, sequence=sequence
+def create_planned_question(game: Game, plan: PlannedQuestion) -> Question:
+    return _create_question_with_options(
+        game, plan.species_id, plan.number, plan.sequence, plan.option_species_ids
     )
@@ -0,0 +1,104 @@
+"""
+Light game payloads for ``game_updated`` and the game detail resources.
+
+``GameSerializer`` nests the bucket highscore and one ``PlayerScoreSerializer`` per player
+(rank scan, status, last answer and the full answer history with species details), so its
+cost grows with the leaderboard and the game. The state built here is the game's config
+and progress plus one scoreboard row per player (``jizz.scoreboard.build_scoreboard``) with
+a compact ``answers`` list (sequence, correct, score), from a fixed number of queries.
+
+- ``/api/games/<token>/state/`` (and ``game_updated``): ``build_game_state``.
+- ``/api/games/<token>/highscore/``: ``game_highscore``, cached per leaderboard bucket.
+- ``/api/games/<token>/history/``: the full ``PlayerScoreSerializer`` rows.
+
+Every resource is served with a ``payload_etag`` so a client polling unchanged state gets
+a 304 instead of the body.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Prefetch
+
+from jizz.leaderboard import LeaderboardBucket, bucket_highscore
+from jizz.models import Answer, Game
+from jizz.scoreboard import build_scoreboard
+
+_PRACTICE_TYPES = (Game.GAME_TYPE_PAIR_PRACTICE, Game.GAME_TYPE_SPECIES_PRACTICE)
+
+
+def payload_etag(payload) -> str:
+    body = json.dumps(payload, sort_keys=True, cls=DjangoJSONEncoder).encode()
+    return '"%s"' % hashlib.sha256(body).hexdigest()[:32]
+
+
+def game_highscore(game: Game) -> dict | None:
+    """Best score in the game's leaderboard bucket (None for practice games)."""
+    if game.game_type in _PRACTICE_TYPES:
+        return None
+    best = bucket_highscore(LeaderboardBucket.for_game(game))
+    if best is None:
+        return None
+    return {**best, 'ranking': 1}
+
+
+def _answer_summaries(game: Game) -> dict[int, list[dict]]:
+    rows = (
+        Answer.objects.filter(question__game_id=game.pk, player_score__isnull=False)
+        .order_by('question__sequence', 'pk')
+        .values('id', 'player_score_id', 'correct', 'score', 'question__sequence', 'question__number')
+    )
+    answers: dict[int, list[dict]] = {}
+    for row in rows:
+        answers.setdefault(row['player_score_id'], []).append({
+            'id': row['id'],
+            'correct': row['correct'],
+            'score': row['score'],
+            'sequence': row['question__sequence'],
+            'number': row['question__number'],
+        })
+    return answers
+
+
+def build_game_state(game: Game, *, request=None) -> dict:
+    """
+    Config, progress, highscore and per-player scoreboard of ``game``. Load the game with
+    ``select_related('host', 'country')``; the query count does not depend on the number
+    of players, answers or leaderboard entries.
+    """
+    from jizz.serializers import GameConfigSerializer
+
+    state = dict(GameConfigSerializer(game, context={'request': request}).data)
+    answers = _answer_summaries(game)
+    players = build_scoreboard(game)
+    for player in players:
+        player['answers'] = answers.get(player['id'], [])
+    state['scores'] = players
+    state['current_highscore'] = game_highscore(game)
+    return state
+
+
+def game_history(game: Game, *, request=None) -> list[dict]:
+    """Every player's score with full answer details (the ``scores`` of GameSerializer)."""
+    from jizz.serializers import PlayerScoreSerializer
+
+    scores = (
+        game.scores.select_related('player')
+        .prefetch_related(
+            Prefetch(
+                'answers',
+                queryset=Answer.objects.select_related('question__species', 'answer').order_by('pk'),
+            )
+        )
+        .order_by('-score', 'pk')
+    )
+    current_question_id = game.questions.order_by('pk').values_list('pk', flat=True).last()
+    rows = []
+    for score in scores:
+        score.game = game
+        score.current_question_id = current_question_id
+        rows.append(score)
+    return PlayerScoreSerializer(rows, many=True, context={'request': request, 'game': game}).data
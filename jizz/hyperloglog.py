@@ -0,0 +1,60 @@
+"""
+Small HyperLogLog sketch for approximate distinct counts (usage rollup sessions).
+
+2**11 registers give ~2.3% standard error; sketches merge by register-wise max, so
+hourly/daily sketches can be combined for any date range. ``to_bytes`` zlib-compresses
+the registers (sparse sketches shrink to a few dozen bytes).
+"""
+
+from __future__ import annotations
+
+import hashlib
+import math
+import zlib
+
+PRECISION = 11
+REGISTERS = 1 << PRECISION
+_ALPHA = 0.7213 / (1 + 1.079 / REGISTERS)
+
+
+class HyperLogLog:
+    __slots__ = ('registers',)
+
+    def __init__(self, registers: bytes | bytearray | None = None):
+        self.registers = bytearray(registers) if registers else bytearray(REGISTERS)
+
+    def add(self, value: str) -> None:
+        h = int.from_bytes(hashlib.blake2b(value.encode('utf-8'), digest_size=8).digest(), 'big')
+        index = h >> (64 - PRECISION)
+        rest = h & ((1 << (64 - PRECISION)) - 1)
+        rank = (64 - PRECISION) - rest.bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def update(self, values) -> HyperLogLog:
+        for value in values:
+            self.add(value)
+        return self
+
+    def merge(self, other: HyperLogLog) -> HyperLogLog:
+        self.registers = bytearray(map(max, self.registers, other.registers))
+        return self
+
+    def count(self) -> int:
+        zeros = self.registers.count(0)
+        if zeros == REGISTERS:
+            return 0
+        estimate = _ALPHA * REGISTERS * REGISTERS / sum(2.0 ** -r for r in self.registers)
+        if estimate <= 2.5 * REGISTERS and zeros:
+            # Small-range correction (linear counting); exact for a handful of items.
+            estimate = REGISTERS * math.log(REGISTERS / zeros)
+        return round(estimate)
+
+    def to_bytes(self) -> bytes:
+        return zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data: bytes | memoryview | None) -> HyperLogLog:
+        if not data:
+            return cls()
+        return cls(zlib.decompress(bytes(data)))
@@ -0,0 +1,197 @@
+"""
+Database-backed background jobs.
+
+Job functions are registered with ``@job_task`` (in each app's ``tasks.py``, imported on
+startup) and queued with ``enqueue``. ``manage.py run_jobs`` workers lease the next job
+with ``SELECT ... FOR UPDATE SKIP LOCKED`` (highest priority first), run it and record
+the result. A failed job is queued again with exponential backoff until ``max_attempts``;
+a job whose worker died is picked up again once its lease expires.
+
+``JOB_QUEUE_CONCURRENCY`` caps how many jobs of one queue run at a time across all workers
+(e.g. ``{'email': 1}``). Clients poll ``/api/jobs/<uuid>/`` (``job_status_url``).
+"""
+from __future__ import annotations
+
+import logging
+import os
+import socket
+import traceback
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Iterable
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Count, Q
+from django.urls import reverse
+from django.utils import timezone
+
+from jizz.models import Job
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_LEASE = timedelta(minutes=10)
+RETRY_BACKOFF = timedelta(seconds=30)
+
+
+@dataclass(frozen=True)
+class JobTask:
+    name: str
+    func: Callable[..., Any]
+    queue: str
+    max_attempts: int
+    lease: timedelta
+
+
+JOB_TASKS: dict[str, JobTask] = {}
+
+
+def job_task(name: str, queue: str = 'default', max_attempts: int = 3, lease: timedelta = DEFAULT_LEASE):
+    """Register ``func(**payload)`` as a job; its return value (JSON) is stored as the result."""
+
+    def decorator(func):
+        JOB_TASKS[name] = JobTask(name, func, queue, max_attempts, lease)
+        return func
+
+    return decorator
+
+
+def enqueue(name: str, payload: dict[str, Any] | None = None, *, priority: int = 0, run_after=None) -> Job:
+    task = JOB_TASKS.get(name)
+    if task is None:
+        raise ValueError(f'Unknown job task: {name}')
+    return Job.objects.create(
+        name=name,
+        queue=task.queue,
+        payload=payload or {},
+        priority=priority,
+        max_attempts=task.max_attempts,
+        run_after=run_after or timezone.now(),
+    )
+
+
+def worker_name() -> str:
+    return f'{socket.gethostname()}:{os.getpid()}'
+
+
+def _queue_concurrency() -> dict[str, int]:
+    return getattr(settings, 'JOB_QUEUE_CONCURRENCY', {})
+
+
+def _full_queues(now) -> set[str]:
+    """Queues already running as many jobs as ``JOB_QUEUE_CONCURRENCY`` allows."""
+    limits = _queue_concurrency()
+    if not limits:
+        return set()
+    if connection.vendor == 'postgresql':
+        # Serialise claims per limited queue so two workers cannot both take the last slot.
+        with connection.cursor() as cursor:
+            for queue in sorted(limits):
+                cursor.execute('SELECT pg_advisory_xact_lock(hashtext(%s))', [f'jizz_job_queue:{queue}'])
+    running = dict(
+        Job.objects.filter(status=Job.STATUS_RUNNING, leased_until__gt=now, queue__in=limits)
+        .values_list('queue')
+        .annotate(n=Count('pk'))
+    )
+    return {queue for queue, limit in limits.items() if running.get(queue, 0) >= limit}
+
+
+def claim_job(queues: Iterable[str] | None = None, worker: str = '', now=None) -> Job | None:
+    """Lease the next runnable job (queued and due, or running with an expired lease)."""
+    now = now or timezone.now()
+    with transaction.atomic():
+        candidates = (
+            Job.objects.select_for_update(skip_locked=True)
+            .filter(
+                Q(status=Job.STATUS_QUEUED, run_after__lte=now)
+                | Q(status=Job.STATUS_RUNNING, leased_until__lte=now)
+            )
+            .exclude(queue__in=_full_queues(now))
+            .order_by('-priority', 'run_after', 'pk')
+        )
+        if queues:
+            candidates = candidates.filter(queue__in=list(queues))
+        for job in candidates[:10]:
+            if job.attempts >= job.max_attempts:
+                # Its last worker died mid-run.
+                job.status = Job.STATUS_FAILED
+                job.error = job.error or 'Lease expired'
+                job.finished = now
+                job.save(update_fields=['status', 'error', 'finished'])
+                continue
+            task = JOB_TASKS.get(job.name)
+            job.status = Job.STATUS_RUNNING
+            job.attempts += 1
+            job.worker = worker
+            job.leased_until = now + (task.lease if task else DEFAULT_LEASE)
+            job.save(update_fields=['status', 'attempts', 'worker', 'leased_until'])
+            return job
+    return None
+
+
+def _finish(job: Job, **fields) -> bool:
+    # Only the worker holding the lease may record the outcome.
+    updated = Job.objects.filter(
+        pk=job.pk, status=Job.STATUS_RUNNING, worker=job.worker, attempts=job.attempts
+    ).update(**fields)
+    for field, value in fields.items():
+        setattr(job, field, value)
+    return bool(updated)
+
+
+def run_job(job: Job) -> Job:
+    """Run a leased job and store its result, a retry or the failure."""
+    task = JOB_TASKS.get(job.name)
+    try:
+        if task is None:
+            raise LookupError(f'Unknown job task: {job.name}')
+        result = task.func(**job.payload)
+    except Exception:
+        error = traceback.format_exc(limit=20)
+        now = timezone.now()
+        if task is not None and job.attempts < job.max_attempts:
+            logger.warning('Job %s (%s) failed, attempt %s/%s', job.pk, job.name, job.attempts, job.max_attempts)
+            _finish(
+                job,
+                status=Job.STATUS_QUEUED,
+                error=error,
+                leased_until=None,
+                run_after=now + RETRY_BACKOFF * (2 ** (job.attempts - 1)),
+            )
+        else:
+            logger.error('Job %s (%s) failed permanently', job.pk, job.name)
+            _finish(job, status=Job.STATUS_FAILED, error=error, leased_until=None, finished=now)
+    else:
+        _finish(job, status=Job.STATUS_DONE, result=result, error='', leased_until=None, finished=timezone.now())
+    return job
+
+
+def run_pending(queues: Iterable[str] | None = None, worker: str | None = None, limit: int | None = None) -> int:
+    """Run due jobs until none are left (or ``limit`` ran). Returns the number run."""
+    worker = worker or worker_name()
+    count = 0
+    while limit is None or count < limit:
+        job = claim_job(queues, worker)
+        if job is None:
+            break
+        run_job(job)
+        count += 1
+    return count
+
+
+def job_status_url(job: Job, request=None) -> str:
+    url = reverse('job-status', args=[job.uuid])
+    return request.build_absolute_uri(url) if request is not None else url
+
+
+def job_status_payload(job: Job) -> dict[str, Any]:
+    return {
+        'id': str(job.uuid),
+        'name': job.name,
+        'status': job.status,
+        'attempts': job.attempts,
+        'result': job.result,
+        'error': job.error.strip().splitlines()[-1] if job.status == Job.STATUS_FAILED and job.error else None,
+        'created': job.created,
+        'finished': job.finished,
+    }
@@ -0,0 +1,329 @@
+"""
+Incremental leaderboard index for hiscores and end-of-game ranks.
+
+Every ``PlayerScore`` with a game has a ``LeaderboardEntry`` carrying the game's bucket
+(level, country, media, length, rarity) and the current score, indexed by
+``(bucket, -score, player_score)``. ``LeaderboardScoreCount`` is the rank table: one row
+per (bucket, listed, score) with the number of entries at that score, so a rank is the
+sum of the rows above it plus the ties with a lower id (the same order as
+``/api/scores/``) instead of a scan of the whole bucket.
+
+``sync_leaderboard_entry`` runs from ``jizz.signals`` whenever a PlayerScore is saved
+(``update_player_score`` after every answer) and updates the entry and both rank rows in
+one statement. The first ``TOP_SCORES_CACHED`` ids of every hiscores filter and the best
+score of every bucket are cached and dropped only when a change can reach them.
+``manage.py rebuild_leaderboard`` recomputes everything from PlayerScore (after
+``QuerySet.update`` or raw SQL).
+"""
+
+from __future__ import annotations
+
+from itertools import combinations
+from typing import NamedTuple
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.db.models import Count, F, Q, Sum
+
+from jizz.models import Game, LeaderboardEntry, LeaderboardScoreCount, PlayerScore
+
+TOP_SCORES_CACHED = 100
+_TOP_CACHE_TTL = 60 * 10
+
+BUCKET_FIELDS = ('level', 'country_code', 'media', 'length', 'rarity')
+# /api/scores/ query parameter -> LeaderboardEntry field
+LIST_FILTER_PARAMS = {
+    'game__level': 'level',
+    'game__country': 'country_code',
+    'game__media': 'media',
+    'game__length': 'length',
+    'game__rarity': 'rarity',
+}
+_COLUMNS = (*BUCKET_FIELDS, 'listed', 'score')
+
+_ENTRY = LeaderboardEntry._meta.db_table
+_COUNTS = LeaderboardScoreCount._meta.db_table
+_GAME = Game._meta.db_table
+_PLAYER_SCORE = PlayerScore._meta.db_table
+
+# Bucket and listed flag of a jizz_game row ``g``; practice and taxonomy-filtered games
+# are ranked but never shown on the hiscores list.
+_GAME_BUCKET_SQL = f"""
+    g.level, COALESCE(g.country_id, '') AS country_code, g.media, g.length, g.rarity,
+    (COALESCE(g.tax_order, '') = '' AND COALESCE(g.tax_family, '') = ''
+     AND g.game_type NOT IN ('{Game.GAME_TYPE_PAIR_PRACTICE}', '{Game.GAME_TYPE_SPECIES_PRACTICE}')) AS listed
+"""
+_ROW = '(level, country_code, media, length, rarity, listed, score)'
+
+
+def _row_of(alias: str) -> str:
+    return '(' + ', '.join(f'{alias}.{name}' for name in _COLUMNS) + ')'
+
+
+_SYNC_SQL = f"""
+WITH new AS (
+    SELECT {_GAME_BUCKET_SQL}, %(score)s::integer AS score
+    FROM {_GAME} g WHERE g.id = %(game)s
+), old AS (
+    SELECT {', '.join(_COLUMNS)} FROM {_ENTRY} WHERE player_score_id = %(ps)s FOR UPDATE
+), changed AS (
+    SELECT NOT EXISTS (SELECT 1 FROM old, new WHERE {_row_of('old')} = {_row_of('new')}) AS yes
+), upsert AS (
+    INSERT INTO {_ENTRY} (player_score_id, {', '.join(_COLUMNS)})
+    SELECT %(ps)s, {', '.join(_COLUMNS)} FROM new
+    ON CONFLICT (player_score_id) DO UPDATE SET
+        {', '.join(f'{name} = EXCLUDED.{name}' for name in _COLUMNS)}
+), decrement AS (
+    UPDATE {_COUNTS} c SET count = c.count - 1
+    FROM old, changed
+    WHERE changed.yes AND {_row_of('c')} = {_row_of('old')}
+), increment AS (
+    INSERT INTO {_COUNTS} ({', '.join(_COLUMNS)}, count)
+    SELECT {', '.join(f'new.{name}' for name in _COLUMNS)}, 1 FROM new, changed WHERE changed.yes
+    ON CONFLICT {_ROW} DO UPDATE SET count = {_COUNTS}.count + 1
+)
+SELECT 'old', {', '.join(_COLUMNS)} FROM old, changed WHERE changed.yes
+UNION ALL
+SELECT 'new', {', '.join(_COLUMNS)} FROM new, changed WHERE changed.yes
+"""
+
+_GAME_CHANGED_SQL = f"""
+SELECT ps.id, ps.score
+FROM {_PLAYER_SCORE} ps
+JOIN {_ENTRY} e ON e.player_score_id = ps.id
+CROSS JOIN (SELECT {_GAME_BUCKET_SQL} FROM {_GAME} g WHERE g.id = %(game)s) new
+WHERE ps.game_id = %(game)s
+  AND (e.level, e.country_code, e.media, e.length, e.rarity, e.listed)
+      IS DISTINCT FROM (new.level, new.country_code, new.media, new.length, new.rarity, new.listed)
+"""
+
+_REBUILD_SQL = (
+    f'DELETE FROM {_COUNTS}',
+    f'DELETE FROM {_ENTRY}',
+    f"""
+    INSERT INTO {_ENTRY} (player_score_id, {', '.join(_COLUMNS)})
+    SELECT ps.id, {_GAME_BUCKET_SQL}, ps.score
+    FROM {_PLAYER_SCORE} ps JOIN {_GAME} g ON g.id = ps.game_id
+    """,
+    f"""
+    INSERT INTO {_COUNTS} ({', '.join(_COLUMNS)}, count)
+    SELECT {', '.join(_COLUMNS)}, COUNT(*) FROM {_ENTRY} GROUP BY {', '.join(_COLUMNS)}
+    """,
+)
+
+
+class LeaderboardBucket(NamedTuple):
+    level: str
+    country_code: str
+    media: str
+    length: int
+    rarity: str
+
+    @classmethod
+    def for_game(cls, game: Game) -> LeaderboardBucket:
+        return cls(game.level, game.country_id or '', game.media, game.length, game.rarity)
+
+    def filter_kwargs(self) -> dict:
+        return self._asdict()
+
+
+def _top_cache_key(filters: dict) -> str:
+    parts = [f'{name}={filters[name]}' for name in BUCKET_FIELDS if name in filters]
+    return 'jizz:leaderboard:top:' + ':'.join(parts).replace(' ', '_')
+
+
+def _forget_top_scores(values: dict, scores: list[int]) -> None:
+    """Drop cached top lists of every filter matching ``values`` that ``scores`` could enter."""
+    keys = [
+        _top_cache_key({name: values[name] for name in subset})
+        for size in range(len(BUCKET_FIELDS) + 1)
+        for subset in combinations(BUCKET_FIELDS, size)
+    ]
+    stale = [
+        key for key, top in cache.get_many(keys).items()
+        if top['floor'] is None or max(scores) >= top['floor']
+    ]
+    if stale:
+        cache.delete_many(stale)
+        transaction.on_commit(lambda: cache.delete_many(stale))
+
+
+def _highscore_cache_key(bucket: dict) -> str:
+    parts = [f'{name}={bucket[name]}' for name in BUCKET_FIELDS]
+    return 'jizz:leaderboard:highscore:' + ':'.join(parts).replace(' ', '_')
+
+
+def _forget_highscore(values: dict, player_score_id: int) -> None:
+    """Drop a bucket's cached best score when ``player_score_id`` held it or may now beat it."""
+    key = _highscore_cache_key(values)
+    best = cache.get(key)
+    if best is None:
+        return
+    if best['id'] is None or best['id'] == player_score_id or values['score'] >= best['score']:
+        cache.delete(key)
+        transaction.on_commit(lambda: cache.delete(key))
+
+
+def sync_leaderboard_entry(player_score: PlayerScore) -> None:
+    """Upsert the entry for ``player_score`` and move it between rank rows (one query)."""
+    if not player_score.game_id:
+        return
+    with connection.cursor() as cursor:
+        cursor.execute(_SYNC_SQL, {
+            'ps': player_score.pk,
+            'game': player_score.game_id,
+            'score': player_score.score or 0,
+        })
+        rows = [dict(zip(_COLUMNS, row[1:])) for row in cursor.fetchall()]
+    listed = [row for row in rows if row['listed']]
+    for row in listed:
+        _forget_top_scores(row, [r['score'] for r in listed])
+    for row in rows:
+        _forget_highscore(row, player_score.pk)
+
+
+def forget_leaderboard_entry(entry: LeaderboardEntry) -> None:
+    """Rank-table bookkeeping after an entry was deleted (cascade from PlayerScore/Game)."""
+    values = {name: getattr(entry, name) for name in _COLUMNS}
+    LeaderboardScoreCount.objects.filter(**values).update(count=F('count') - 1)
+    if entry.listed:
+        _forget_top_scores(values, [entry.score])
+    _forget_highscore(values, entry.player_score_id)
+
+
+def resync_game_leaderboard(game: Game) -> int:
+    """Re-bucket a game's entries after its level/country/media/... changed."""
+    with connection.cursor() as cursor:
+        cursor.execute(_GAME_CHANGED_SQL, {'game': game.pk})
+        changed = cursor.fetchall()
+    for pk, score in changed:
+        sync_leaderboard_entry(PlayerScore(pk=pk, game_id=game.pk, score=score))
+    return len(changed)
+
+
+@transaction.atomic
+def rebuild_leaderboard() -> int:
+    """Recompute every entry and rank row from PlayerScore; returns the number of entries."""
+    with connection.cursor() as cursor:
+        for sql in _REBUILD_SQL:
+            cursor.execute(sql)
+    return LeaderboardEntry.objects.count()
+
+
+def score_rank(player_score: PlayerScore) -> int | None:
+    """1-based rank within the game's bucket: higher scores, then equal scores with a lower id."""
+    if not player_score.game_id:
+        return None
+    bucket = LeaderboardBucket.for_game(player_score.game).filter_kwargs()
+    score = player_score.score or 0
+    higher = LeaderboardScoreCount.objects.filter(score__gt=score, **bucket).aggregate(n=Sum('count'))['n']
+    ties = LeaderboardEntry.objects.filter(score=score, player_score_id__lt=player_score.pk, **bucket).count()
+    return (higher or 0) + ties + 1
+
+
+def score_ranks(game: Game, player_scores: list[PlayerScore]) -> dict[int, int]:
+    """``score_rank`` of several scores of one game, in two queries: {player_score id: rank}."""
+    if not player_scores:
+        return {}
+    bucket = LeaderboardBucket.for_game(game).filter_kwargs()
+    distinct = sorted({ps.score or 0 for ps in player_scores})
+    higher = LeaderboardScoreCount.objects.filter(score__gt=distinct[0], **bucket).aggregate(**{
+        f'gt_{i}': Sum('count', filter=Q(score__gt=score)) for i, score in enumerate(distinct)
+    })
+    ties = LeaderboardEntry.objects.filter(score__in=distinct, **bucket).aggregate(**{
+        f'tie_{ps.pk}': Count('pk', filter=Q(score=ps.score or 0, player_score_id__lt=ps.pk))
+        for ps in player_scores
+    })
+    return {
+        ps.pk: (higher[f'gt_{distinct.index(ps.score or 0)}'] or 0) + ties[f'tie_{ps.pk}'] + 1
+        for ps in player_scores
+    }
+
+
+def bucket_highscore(bucket: LeaderboardBucket) -> dict | None:
+    """
+    Best score of a bucket, listed or not (``PlayerScore.highscore_by_type``), as
+    ``{'id', 'score', 'name', 'language'}``; cached until a change can reach it.
+    """
+    key = _highscore_cache_key(bucket.filter_kwargs())
+    best = cache.get(key)
+    if best is None:
+        row = (
+            LeaderboardEntry.objects.filter(**bucket.filter_kwargs())
+            .order_by('-score', 'player_score_id')
+            .values_list('player_score_id', 'score', 'player_score__player__name', 'player_score__player__language')
+            .first()
+        )
+        best = dict(zip(('id', 'score', 'name', 'language'), row or (None, None, None, None)))
+        cache.set(key, best, _TOP_CACHE_TTL)
+    return best if best['id'] is not None else None
+
+
+def _listed_entries(filters: dict):
+    return LeaderboardEntry.objects.filter(listed=True, **filters).order_by('-score', 'player_score_id')
+
+
+def top_score_ids(filters: dict, *, refresh: bool = False) -> list[int]:
+    """PlayerScore ids of the best ``TOP_SCORES_CACHED`` listed entries for ``filters`` (cached)."""
+    key = _top_cache_key(filters)
+    top = None if refresh else cache.get(key)
+    if top is None:
+        rows = list(_listed_entries(filters).values_list('player_score_id', 'score')[:TOP_SCORES_CACHED])
+        top = {
+            'ids': [pk for pk, _score in rows],
+            'floor': rows[-1][1] if len(rows) == TOP_SCORES_CACHED else None,
+        }
+        cache.set(key, top, _TOP_CACHE_TTL)
+    return top['ids']
+
+
+class RankedScores:
+    """
+    Hiscores list for ``Paginator``: ``count()`` sums the rank table and slices read the
+    cached top ids or the score index, returning PlayerScores annotated with ``score_rank``.
+    ``order_by`` (for ``OrderingFilter``) supports ``-score`` (best first) and ``score``,
+    both read from the score index; ``score_rank`` stays the rank in the bucket.
+    """
+
+    ordering_fields = ['score']
+
+    def __init__(self, filters: dict, *, ascending: bool = False):
+        self.filters = filters
+        self.ascending = ascending
+
+    def order_by(self, *fields: str) -> 'RankedScores':
+        return RankedScores(self.filters, ascending=fields[:1] == ('score',))
+
+    def count(self) -> int:
+        total = LeaderboardScoreCount.objects.filter(listed=True, **self.filters).aggregate(n=Sum('count'))['n']
+        return total or 0
+
+    def __len__(self) -> int:
+        return self.count()
+
+    def _ids(self, start: int, stop: int | None, *, refresh: bool = False) -> list[int]:
+        if self.ascending:
+            # Backward scan of the (-score, player_score) index: exactly the reversed list.
+            entries = _listed_entries(self.filters).reverse()
+            return list(entries.values_list('player_score_id', flat=True)[start:stop])
+        if stop is not None and stop <= TOP_SCORES_CACHED:
+            return top_score_ids(self.filters, refresh=refresh)[start:stop]
+        return list(_listed_entries(self.filters).values_list('player_score_id', flat=True)[start:stop])
+
+    def __getitem__(self, key: slice) -> list[PlayerScore]:
+        if not isinstance(key, slice):
+            raise TypeError('RankedScores only supports slicing')
+        start = key.start or 0
+        ids = self._ids(start, key.stop)
+        scores = PlayerScore.objects.select_related('player', 'game', 'game__country').in_bulk(ids)
+        if len(scores) < len(ids):
+            # Cached ids of scores deleted meanwhile: read the index again.
+            ids = self._ids(start, key.stop, refresh=True)
+            scores = PlayerScore.objects.select_related('player', 'game', 'game__country').in_bulk(ids)
+        total = self.count() if self.ascending else None
+        ranked = []
+        for rank, pk in enumerate(ids, start + 1):
+            if pk in scores:
+                scores[pk].score_rank = total - rank + 1 if self.ascending else rank
+                ranked.append(scores[pk])
+        return ranked
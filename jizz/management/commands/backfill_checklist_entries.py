@@ -0,0 +1,33 @@
+from django.core.management.base import BaseCommand
+
+from jizz.models import Player
+from jizz.services.checklist_entries import rebuild_user_checklists
+
+
+class Command(BaseCommand):
+    help = (
+        'Rebuild UserChecklistEntry rows from answers, one batch of users per transaction. '
+        'Interrupted runs resume with --after-user <last printed user id>.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--after-user', type=int, default=0, help='Skip users with an id up to this one')
+        parser.add_argument('--batch-size', type=int, default=200, help='Users per transaction')
+
+    def handle(self, *args, **options):
+        after = options['after_user']
+        users = rows = 0
+        while True:
+            batch = list(
+                Player.objects.filter(user_id__gt=after)
+                .order_by('user_id')
+                .values_list('user_id', flat=True)
+                .distinct()[:options['batch_size']]
+            )
+            if not batch:
+                break
+            rows += rebuild_user_checklists(batch)
+            users += len(batch)
+            after = batch[-1]
+            self.stdout.write(f'Users up to id {after} done ({users} users, {rows} entries).')
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {rows} checklist entries for {users} users.'))
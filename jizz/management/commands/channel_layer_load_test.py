@@ -0,0 +1,149 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import secrets
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+
+def _scoreboard(players: int, seq: int) -> list[dict]:
+    """Roughly the ``update_players`` payload the quiz consumer broadcasts."""
+    return [
+        {
+            'id': i,
+            'name': f'Player {i}',
+            'language': 'en',
+            'score': (seq * 37 + i * 11) % 1000,
+            'ranking': i + 1,
+            'status': 'waiting',
+            'last_answer': {'correct': bool((seq + i) % 2), 'species': {'id': seq, 'name': 'Eurasian Wren'}},
+        }
+        for i in range(players)
+    ]
+
+
+def run_worker(db_name, group, players, messages, timeout, ready, results):
+    """Worker process: ``players`` sockets of one game, each draining the game group."""
+    import django
+
+    django.setup()
+    connections['default'].settings_dict['NAME'] = db_name
+    from jizz.channel_layers import PostgresChannelLayer
+
+    async def main():
+        layer = PostgresChannelLayer(capacity=max(100, messages))
+        channels = [await layer.new_channel() for _ in range(players)]
+        for channel in channels:
+            await layer.group_add(group, channel)
+        ready.put(os.getpid())
+        latencies = []
+
+        async def drain(channel):
+            received = 0
+            while received < messages:
+                try:
+                    message = await asyncio.wait_for(layer.receive(channel), timeout)
+                except asyncio.TimeoutError:
+                    break
+                latencies.append(time.time() - message['sent_at'])
+                received += 1
+            return received
+
+        counts = await asyncio.gather(*(drain(channel) for channel in channels))
+        await layer.close()
+        results.put({
+            'pid': os.getpid(),
+            'received': sum(counts),
+            'expected': players * messages,
+            'dropped': layer.dropped,
+            'latencies': latencies,
+        })
+
+    asyncio.run(main())
+
+
+class Command(BaseCommand):
+    help = (
+        'Load test for the PostgreSQL channel layer: spread the players of one multiplayer '
+        'game over several worker processes and fan scoreboard broadcasts out to all of them.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--workers', type=int, default=4, help='Worker processes (Daphne stand-ins)')
+        parser.add_argument('--players', type=int, default=4, help='Players (sockets) per worker')
+        parser.add_argument('--messages', type=int, default=100, help='Broadcasts sent to the game group')
+        parser.add_argument('--interval', type=float, default=0.01, help='Seconds between broadcasts')
+        parser.add_argument('--timeout', type=float, default=20.0, help='Seconds a socket waits for a message')
+
+    def handle(self, *args, **options):
+        from jizz.channel_layers import PostgresChannelLayer
+
+        workers, players, messages = options['workers'], options['players'], options['messages']
+        if min(workers, players, messages) < 1:
+            raise CommandError('--workers, --players and --messages must be positive.')
+        group = f'quiz_loadtest_{secrets.token_hex(4)}'
+        db_name = connections['default'].settings_dict['NAME']
+
+        context = multiprocessing.get_context('spawn')
+        ready, results = context.Queue(), context.Queue()
+        processes = [
+            context.Process(
+                target=run_worker,
+                args=(db_name, group, players, messages, options['timeout'], ready, results),
+            )
+            for _ in range(workers)
+        ]
+        for process in processes:
+            process.start()
+        try:
+            for _ in processes:
+                ready.get(timeout=60)
+        except queue.Empty:
+            for process in processes:
+                process.terminate()
+            raise CommandError('Workers did not join the game group in time.')
+
+        async def broadcast():
+            layer = PostgresChannelLayer()
+            total_players = workers * players
+            started = time.monotonic()
+            for seq in range(messages):
+                await layer.group_send(group, {
+                    'type': 'update_players',
+                    'players': _scoreboard(total_players, seq),
+                    'seq': seq,
+                    'sent_at': time.time(),
+                })
+                if options['interval']:
+                    await asyncio.sleep(options['interval'])
+            elapsed = time.monotonic() - started
+            await layer.close()
+            return elapsed
+
+        send_seconds = asyncio.run(broadcast())
+        reports = [results.get(timeout=options['timeout'] + 30) for _ in processes]
+        for process in processes:
+            process.join(timeout=10)
+
+        received = sum(r['received'] for r in reports)
+        expected = sum(r['expected'] for r in reports)
+        dropped = sum(r['dropped'] for r in reports)
+        latencies = sorted(latency for r in reports for latency in r['latencies'])
+        self.stdout.write(
+            f'Game group {group}: {workers} workers x {players} players, {messages} broadcasts '
+            f'sent in {send_seconds:.2f}s.'
+        )
+        self.stdout.write(f'Delivered {received}/{expected} messages, dropped {dropped}.')
+        if latencies:
+            p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+            self.stdout.write(
+                f'Latency ms: p50 {statistics.median(latencies) * 1000:.1f}, '
+                f'p95 {p95 * 1000:.1f}, max {latencies[-1] * 1000:.1f}'
+            )
+        if received < expected:
+            raise CommandError(f'{expected - received} messages were not delivered.')
+        self.stdout.write(self.style.SUCCESS('All players received every broadcast.'))
@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from jizz.quiz_mistake_counters import check_mistake_stats, rebuild_mistake_stats
+
+
+class Command(BaseCommand):
+    help = 'Compare the quiz mistake counter tables with a fresh aggregate over Answer.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--fix', action='store_true', help='Rebuild the counters when they drifted')
+
+    def handle(self, *args, **options):
+        mismatches = check_mistake_stats()
+        for table, count in mismatches.items():
+            self.stdout.write(f'{table}: {count} mismatched rows')
+        if not any(mismatches.values()):
+            self.stdout.write(self.style.SUCCESS('Mistake stats are consistent.'))
+            return
+        if options['fix']:
+            rebuild_mistake_stats()
+            self.stdout.write(self.style.SUCCESS('Rebuilt mistake stats.'))
+        else:
+            self.stdout.write(self.style.WARNING('Mistake stats drifted; run with --fix to rebuild.'))
@@ -0,0 +1,16 @@
+"""Fetch Expo push receipts and disable devices that are no longer registered. Run from cron."""
+
+from django.core.management.base import BaseCommand
+
+from jizz.mobile_push.dispatch import check_push_receipts
+
+
+class Command(BaseCommand):
+    help = 'Fetch Expo push receipts for sent notifications and disable unregistered devices.'
+
+    def handle(self, *args, **options):
+        counts = check_push_receipts()
+        self.stdout.write(self.style.SUCCESS(
+            f"Push receipts checked: {counts['checked']}, errors: {counts['errors']}, "
+            f"devices disabled: {counts['disabled']}, still pending: {counts['pending']}"
+        ))
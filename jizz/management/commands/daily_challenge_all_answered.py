@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from django.db.models import Count, F
 
+from jizz.mobile_push.dispatch import push_batch
 from jizz.models import DailyChallengeRound, DailyChallengeParticipant, Player, PlayerScore
 from jizz.notifications import send_push_to_user, send_daily_challenge_all_answered_email
 
@@ -9,6 +10,7 @@ from jizz.notifications import send_push_to_user, send_daily_challenge_all_answe
 class Command(BaseCommand):
     help = 'Check rounds that just closed; if all participants answered, send ranking notification'
 
+    @push_batch()
     def handle(self, *args, **options):
         # Rounds that closed in the last hour and are still active
         from datetime import timedelta
@@ -2,6 +2,7 @@ from django.core.management.base import BaseCommand
 from django.utils import timezone
 from datetime import timedelta
 
+from jizz.mobile_push.dispatch import push_batch
 from jizz.models import DailyChallenge, DailyChallengeParticipant, DailyChallengeRound, Player, PlayerScore
 from jizz.notifications import send_push_to_user, send_daily_challenge_final_results_email
 
@@ -9,6 +10,7 @@ from jizz.notifications import send_push_to_user, send_daily_challenge_final_res
 class Command(BaseCommand):
     help = 'End daily challenges past their duration and send final results'
 
+    @push_batch()
     def handle(self, *args, **options):
         now = timezone.now()
         challenges = DailyChallenge.objects.filter(
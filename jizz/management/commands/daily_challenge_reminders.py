@@ -3,6 +3,7 @@ from django.utils import timezone
 from django.db.models import Q
 from datetime import timedelta
 
+from jizz.mobile_push.dispatch import push_batch
 from jizz.models import DailyChallengeRound, DailyChallengeParticipant, PlayerScore, Player
 from jizz.notifications import send_push_to_user, send_daily_challenge_reminder_email
 
@@ -10,6 +11,7 @@ from jizz.notifications import send_push_to_user, send_daily_challenge_reminder_
 class Command(BaseCommand):
     help = 'Send 4h and 1h reminders for daily challenge rounds to participants who have not completed'
 
+    @push_batch()
     def handle(self, *args, **options):
         now = timezone.now()
         for hours_left in (4, 1):
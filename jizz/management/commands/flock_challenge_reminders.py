@@ -6,6 +6,7 @@ from django.core.management.base import BaseCommand
 from django.db.models import Exists, OuterRef
 from django.utils import timezone
 
+from jizz.mobile_push.dispatch import push_batch
 from jizz.models import FlockChallenge, FlockChallengeAttempt, FlockMembership
 from jizz.notifications import send_push_to_user
 
@@ -16,6 +17,7 @@ class Command(BaseCommand):
         'to members who have not completed a ranked attempt. Run daily via cron.'
     )
 
+    @push_batch()
     def handle(self, *args, **options):
         now = timezone.now()
         # Daily cron: notify once when between 12h and 24h remain.
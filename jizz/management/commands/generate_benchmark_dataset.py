@@ -0,0 +1,46 @@
+"""
+Fill a scratch database with the synthetic dataset of jizz.benchmarks.dataset.
+
+Examples:
+  ./manage.py generate_benchmark_dataset               # production scale (~10M rows)
+  ./manage.py generate_benchmark_dataset --scale 0.05  # quick local dataset
+"""
+from dataclasses import replace
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jizz.benchmarks.dataset import DatasetSize, generate_dataset
+
+
+class Command(BaseCommand):
+    help = 'Generate a synthetic production-scale dataset for run_benchmarks (use a scratch database).'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scale', type=float, default=1.0, help='Multiply every row count by this factor')
+        parser.add_argument('--seed', type=float, default=0.42, help='PostgreSQL setseed() value (-1..1)')
+        parser.add_argument('--usage-days', type=int, default=None, help='Days of usage event history')
+        parser.add_argument(
+            '--i-know-this-is-not-production',
+            action='store_true',
+            help='Generate even though DEBUG is off and the database name has no test/bench marker',
+        )
+
+    def handle(self, *args, **options):
+        if options['scale'] <= 0:
+            raise CommandError('--scale must be positive.')
+        if not -1 <= options['seed'] <= 1:
+            raise CommandError('--seed must be between -1 and 1.')
+        size = DatasetSize().scaled(options['scale'])
+        if options['usage_days']:
+            size = replace(size, usage_days=options['usage_days'])
+        self.stdout.write(f'Generating {size}')
+        try:
+            counts = generate_dataset(
+                size,
+                seed=options['seed'],
+                log=self.stdout.write,
+                allow_production=options['i_know_this_is_not_production'],
+            )
+        except ValueError as exc:
+            raise CommandError(str(exc)) from exc
+        self.stdout.write(self.style.SUCCESS(f'Generated {sum(counts.values())} rows.'))
@@ -0,0 +1,145 @@
+import random
+import statistics
+import time
+
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import F, Q, Window
+from django.db.models.functions import RowNumber
+
+from jizz.leaderboard import RankedScores, rebuild_leaderboard, score_rank, sync_leaderboard_entry
+from jizz.models import Game, LeaderboardEntry, LeaderboardScoreCount, Player, PlayerScore
+
+_LENGTHS = [10, 20, 35, 50]
+
+
+class _Rollback(Exception):
+    pass
+
+
+def _ms(fn, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - started) * 1000)
+    return statistics.median(timings)
+
+
+def _legacy_ranking(ps: PlayerScore) -> int:
+    """``PlayerScore.ranking`` before the leaderboard index."""
+    scores = PlayerScore.objects.filter(
+        game__level=ps.game.level,
+        game__country=ps.game.country,
+        game__media=ps.game.media,
+        game__length=ps.game.length,
+        game__rarity=ps.game.rarity,
+    ).order_by('-score').all()
+    return list(scores).index(ps) + 1
+
+
+def _legacy_page(filters: dict, page: int) -> int:
+    """``PlayerScoreListView`` queryset before the leaderboard index (count + one page)."""
+    qs = (
+        PlayerScore.objects
+        .filter(Q(game__tax_order='') | Q(game__tax_order__isnull=True))
+        .filter(Q(game__tax_family='') | Q(game__tax_family__isnull=True))
+        .filter(**{f'game__{name}': value for name, value in filters.items()})
+        .select_related('player', 'game', 'game__country')
+        .annotate(score_rank=Window(expression=RowNumber(), order_by=F('score').desc()))
+        .order_by('-score')
+    )
+    qs.count()
+    return len(list(qs[(page - 1) * 100:page * 100]))
+
+
+def _ranked_page(filters: dict, page: int) -> int:
+    scores = RankedScores(filters)
+    scores.count()
+    return len(scores[(page - 1) * 100:page * 100])
+
+
+class Command(BaseCommand):
+    help = (
+        'Compare hiscore ranks/pages before and after the leaderboard index on synthetic '
+        'scores. Everything runs in one transaction that is rolled back at the end.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--scores', type=int, default=1_000_000, help='Synthetic PlayerScore rows')
+        parser.add_argument('--players', type=int, default=1000, help='Players per game')
+        parser.add_argument('--samples', type=int, default=20, help='Timed repetitions per indexed query')
+        parser.add_argument('--legacy-samples', type=int, default=3, help='Timed repetitions per legacy query')
+
+    def handle(self, *args, **options):
+        players = options['players']
+        games = max(1, options['scores'] // players)
+        if players < 1:
+            raise CommandError('--players must be positive.')
+        try:
+            with transaction.atomic():
+                self._run(players, games, options['samples'], options['legacy_samples'])
+                raise _Rollback
+        except _Rollback:
+            pass
+        cache.clear()
+        self.stdout.write(self.style.SUCCESS('Benchmark data rolled back.'))
+
+    def _run(self, players: int, games: int, samples: int, legacy_samples: int):
+        started = time.perf_counter()
+        player_ids = [p.pk for p in Player.objects.bulk_create(
+            Player(name=f'Bench {i}') for i in range(players)
+        )]
+        game_ids = [g.pk for g in Game.objects.bulk_create(
+            Game(level='advanced', media='images', length=_LENGTHS[i % len(_LENGTHS)]) for i in range(games)
+        )]
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"""
+                INSERT INTO {PlayerScore._meta.db_table} (player_id, game_id, score)
+                SELECT p.id, g.id, (random() * 10000)::integer
+                FROM unnest(%s::bigint[]) g(id) CROSS JOIN unnest(%s::bigint[]) p(id)
+                """,
+                [game_ids, player_ids],
+            )
+            for model in (Player, Game, PlayerScore):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+        self.stdout.write(f'Inserted {games * players} scores in {time.perf_counter() - started:.1f}s.')
+
+        started = time.perf_counter()
+        entries = rebuild_leaderboard()
+        with connection.cursor() as cursor:
+            for model in (LeaderboardEntry, LeaderboardScoreCount):
+                cursor.execute(f'ANALYZE {model._meta.db_table}')
+        self.stdout.write(f'Built leaderboard ({entries} entries) in {time.perf_counter() - started:.1f}s.')
+
+        sample = list(
+            PlayerScore.objects.filter(game_id__in=random.sample(game_ids, min(len(game_ids), samples)))
+            .select_related('game', 'game__country')[:samples]
+        )
+        ps = sample[0]
+        bucket = {'level': 'advanced', 'media': 'images', 'length': ps.game.length}
+        if _legacy_ranking(ps) != score_rank(ps):
+            self.stdout.write(self.style.WARNING('Legacy and indexed ranks differ (tied scores).'))
+
+        rows = [
+            ('rank of one score', _ms(lambda: _legacy_ranking(ps), legacy_samples),
+             _ms(lambda: score_rank(random.choice(sample)), samples)),
+            ('hiscores page 1 (bucket)', _ms(lambda: _legacy_page(bucket, 1), legacy_samples),
+             _ms(lambda: _ranked_page(bucket, 1), samples)),
+            ('hiscores page 1 (all)', _ms(lambda: _legacy_page({}, 1), legacy_samples),
+             _ms(lambda: _ranked_page({}, 1), samples)),
+            ('hiscores page 50 (bucket)', _ms(lambda: _legacy_page(bucket, 50), legacy_samples),
+             _ms(lambda: _ranked_page(bucket, 50), samples)),
+        ]
+
+        def bump():
+            score = random.choice(sample)
+            score.score += random.randint(1, 500)
+            sync_leaderboard_entry(score)
+
+        self.stdout.write(f'{"query":<28}{"legacy ms":>12}{"indexed ms":>12}')
+        for label, legacy, indexed in rows:
+            self.stdout.write(f'{label:<28}{legacy:>12.1f}{indexed:>12.2f}')
+        self.stdout.write(f'{"score update (sync)":<28}{"-":>12}{_ms(bump, samples):>12.2f}')
@@ -24,6 +24,7 @@ from django.conf import settings
 from django.core.management.base import BaseCommand
 
 from jizz.models import CountrySpecies, Country, Species
+from jizz.playable_species_index import rebuild_playable_species_index
 from jizz.utils import (
     download_ebird_regional_zip,
     ebird_st_list_files,
@@ -297,6 +298,8 @@ class Command(BaseCommand):
 
         if to_update:
             CountrySpecies.objects.bulk_update(to_update, ['frequency', 'frequency_pct'], batch_size=500)
+            for country_id in sorted({cs.country_id for cs in to_update}):
+                rebuild_playable_species_index(country_id)
             self.stdout.write(self.style.SUCCESS(f'Updated {len(to_update)} CountrySpecies.'))
 
     def _provision_all_species(
@@ -423,4 +426,6 @@ class Command(BaseCommand):
 
         if to_update:
             CountrySpecies.objects.bulk_update(to_update, ['frequency', 'frequency_pct'], batch_size=500)
+            for country_id in sorted({cs.country_id for cs in to_update}):
+                rebuild_playable_species_index(country_id)
             self.stdout.write(self.style.SUCCESS(f'Updated {len(to_update)} CountrySpecies (all-species percentile).'))
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jizz.request_profiling import prune_request_profiles
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete RequestProfile rows older than REQUEST_PROFILE_RETENTION_DAYS. '
+        'Run daily from cron.'
+    )
+
+    def handle(self, *args, **options):
+        deleted = prune_request_profiles()
+        self.stdout.write(
+            f'Deleted {deleted} request profiles older than '
+            f'{settings.REQUEST_PROFILE_RETENTION_DAYS} days.'
+        )
@@ -0,0 +1,18 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from jizz.species_catalog import prune_species_catalog_changes
+
+
+class Command(BaseCommand):
+    help = (
+        'Delete SpeciesCatalogChange rows older than SPECIES_CATALOG_CHANGE_RETENTION_DAYS '
+        '(clients with an older catalog version get the full catalog). Run daily from cron.'
+    )
+
+    def handle(self, *args, **options):
+        deleted = prune_species_catalog_changes()
+        self.stdout.write(
+            f'Deleted {deleted} species catalog changes older than '
+            f'{settings.SPECIES_CATALOG_CHANGE_RETENTION_DAYS} days.'
+        )
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from jizz.leaderboard import rebuild_leaderboard
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute leaderboard entries and the rank table from PlayerScore. '
+        'Run after bulk PlayerScore/Game changes that bypass signals (QuerySet.update, raw SQL).'
+    )
+
+    def handle(self, *args, **options):
+        entries = rebuild_leaderboard()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt leaderboard with {entries} entries.'))
@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from jizz.quiz_mistake_counters import rebuild_mistake_stats
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the quiz mistake counter tables from Answer. '
+        'Run after bulk Answer changes that bypass signals (QuerySet.update, raw SQL).'
+    )
+
+    def handle(self, *args, **options):
+        rows = rebuild_mistake_stats()
+        self.stdout.write(self.style.SUCCESS(
+            f"Rebuilt mistake stats: {rows['species']} species, {rows['pairs']} pairs, {rows['users']} user rows."
+        ))
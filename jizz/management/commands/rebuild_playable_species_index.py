@@ -0,0 +1,46 @@
+from django.core.management.base import BaseCommand
+
+from jizz.models import Country, Game
+from jizz.playable_species_index import (
+    PlayableIndexKey,
+    get_playable_species,
+    rebuild_playable_species_index,
+)
+
+_DEFAULT_STATUSES = ['native', 'endemic', 'rare']
+_MEDIA_TYPES = ['image', 'video', 'audio']
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the playable species index used for question selection. '
+        'Run after bulk CountrySpecies/Media changes that bypass signals (QuerySet.update, raw SQL).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--country', default='', help='Only this country code (e.g. NL)')
+        parser.add_argument(
+            '--warm',
+            action='store_true',
+            help='Also build missing rows for the default status set, every rarity tier and media type',
+        )
+
+    def handle(self, *args, **options):
+        country_code = (options['country'] or '').strip().upper() or None
+        rebuilt = rebuild_playable_species_index(country_code)
+        self.stdout.write(f'Rebuilt {rebuilt} index rows.')
+
+        if not options['warm']:
+            return
+        countries = Country.objects.all()
+        if country_code:
+            countries = countries.filter(code=country_code)
+        warmed = 0
+        for code in countries.values_list('code', flat=True):
+            for rarity, _label in Game.RARIT_CHOICES:
+                for media_type in _MEDIA_TYPES:
+                    get_playable_species(
+                        PlayableIndexKey.build(code, _DEFAULT_STATUSES, rarity, media_type)
+                    )
+                    warmed += 1
+        self.stdout.write(self.style.SUCCESS(f'Warmed {warmed} index keys.'))
@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+
+from jizz.usage_event_buffer import get_usage_event_writer
+
+
+class Command(BaseCommand):
+    help = (
+        'Insert usage events that the buffered writer spooled to disk while the database '
+        'was slow or unavailable (USAGE_EVENTS_SPOOL_PATH).'
+    )
+
+    def handle(self, *args, **options):
+        writer = get_usage_event_writer()
+        replayed = writer.replay_spool()
+        self.stdout.write(self.style.SUCCESS(f'Replayed {replayed} usage events from {writer.spool_path}.'))
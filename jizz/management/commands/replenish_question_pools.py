@@ -0,0 +1,58 @@
+"""
+Top up pregenerated question pools (see jizz.question_pools); run from cron next to
+``run_jobs``, which refills pools as soon as games drain them.
+
+Examples:
+  ./manage.py replenish_question_pools
+  ./manage.py replenish_question_pools --country NL --club-mix
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from jizz.flock_challenge import CLUB_MIX_SLOTS, _scratch_game
+from jizz.game_question_selection import playable_index_key
+from jizz.models import Country, QuestionPool, QuestionPoolCard
+from jizz.question_pools import get_pool, replenish_pool
+
+
+class Command(BaseCommand):
+    help = 'Refill question pools drawn from recently and empty pools that have gone idle.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--country', default='', help='Only pools of this country code (e.g. NL)')
+        parser.add_argument(
+            '--club-mix',
+            action='store_true',
+            help='Also create the Club Mix pools of the selected countries (all countries without --country)',
+        )
+
+    def handle(self, *args, **options):
+        country_code = (options['country'] or '').strip().upper() or None
+
+        if options['club_mix']:
+            countries = Country.objects.all()
+            if country_code:
+                countries = countries.filter(code=country_code)
+            for country in countries:
+                for level, rarity, media, _count in CLUB_MIX_SLOTS:
+                    scratch = _scratch_game(country=country, level=level, rarity=rarity, media=media, host=None)
+                    get_pool(playable_index_key(scratch), level)
+
+        pools = QuestionPool.objects.all()
+        if country_code:
+            pools = pools.filter(country_id=country_code)
+        idle_since = timezone.now() - timedelta(days=settings.QUESTION_POOL_IDLE_DAYS)
+        emptied, _ = QuestionPoolCard.objects.filter(
+            pool__in=pools.filter(last_requested__lt=idle_since)
+        ).delete()
+
+        added = 0
+        active = pools.filter(last_requested__gte=idle_since).order_by('pk')
+        for pool in active:
+            added += replenish_pool(pool)
+        self.stdout.write(self.style.SUCCESS(
+            f'Added {added} cards to {active.count()} pools; dropped {emptied} cards of idle pools.'
+        ))
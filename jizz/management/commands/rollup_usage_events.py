@@ -0,0 +1,54 @@
+from datetime import date
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jizz.usage_rollups import prune_usage_events, update_usage_rollups
+
+
+class Command(BaseCommand):
+    help = (
+        'Aggregate closed hours/days of UsageEvent into the rollup tables read by the staff '
+        'usage dashboard. Run from cron (e.g. every 10 minutes).'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--since',
+            default='',
+            help='Recompute rollups from this date (YYYY-MM-DD), e.g. after replaying a spool file',
+        )
+        parser.add_argument(
+            '--lookback-hours',
+            type=int,
+            default=2,
+            help='Closed hours to recompute on each run for late (buffered) writes',
+        )
+        parser.add_argument(
+            '--prune',
+            action='store_true',
+            help='Delete raw events older than USAGE_EVENTS_RETENTION_DAYS and old hourly rollups',
+        )
+
+    def handle(self, *args, **options):
+        since = None
+        if options['since']:
+            try:
+                since = date.fromisoformat(options['since'])
+            except ValueError:
+                raise CommandError('--since must be YYYY-MM-DD.')
+
+        retention_days = settings.USAGE_EVENTS_RETENTION_DAYS
+        result = update_usage_rollups(
+            since=since,
+            lookback_hours=options['lookback_hours'],
+            retention_days=retention_days,
+        )
+        self.stdout.write(f"Rolled up {result['hours']} hours and {result['days']} closed days.")
+
+        if options['prune']:
+            pruned = prune_usage_events(retention_days)
+            self.stdout.write(
+                f"Pruned {pruned['events']} raw events and {pruned['hourly_rollups']} hourly rollups."
+            )
+        self.stdout.write(self.style.SUCCESS('Usage rollups up to date.'))
@@ -0,0 +1,73 @@
+"""
+Time the hot paths of jizz.benchmarks.suite and write a JSON report.
+
+Examples:
+  ./manage.py run_benchmarks
+  ./manage.py run_benchmarks --only build_checklist player_score_list --repeat 30
+  ./manage.py run_benchmarks --compare var/benchmarks/abc1234.json --fail-on-regression
+"""
+import json
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from jizz.benchmarks.suite import BENCHMARKS, compare_reports, run_benchmarks
+
+
+class Command(BaseCommand):
+    help = 'Benchmark question selection, checklist, stats, hiscores and quiz socket paths; write JSON.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--only', nargs='+', choices=sorted(BENCHMARKS), help='Benchmarks to run (default: all)')
+        parser.add_argument('--repeat', type=int, default=10, help='Timed calls per benchmark')
+        parser.add_argument(
+            '--output',
+            default='',
+            help='Report path (default: BASE_DIR/var/benchmarks/<commit>.json)',
+        )
+        parser.add_argument('--with-queries', action='store_true', help='Store the SQL of the profiled call')
+        parser.add_argument('--compare', default='', help='Earlier report to compare against')
+        parser.add_argument('--threshold', type=float, default=0.25, help='Median slowdown counted as regression')
+        parser.add_argument('--fail-on-regression', action='store_true', help='Exit non-zero on regressions')
+
+    def handle(self, *args, **options):
+        if options['repeat'] < 1:
+            raise CommandError('--repeat must be positive.')
+        baseline = None
+        if options['compare']:
+            try:
+                baseline = json.loads(Path(options['compare']).read_text())
+            except (OSError, ValueError) as exc:
+                raise CommandError(f'Cannot read {options["compare"]}: {exc}') from exc
+
+        self.stdout.write(
+            f'{"benchmark":<28}{"cold ms":>10}{"median ms":>11}{"p95 ms":>10}{"queries":>9}{"peak KiB":>10}'
+        )
+
+        def log(result):
+            self.stdout.write(
+                f'{result.name:<28}{result.cold_ms:>10.1f}{result.median_ms:>11.2f}{result.p95_ms:>10.2f}'
+                f'{result.queries:>9}{result.peak_memory_kb:>10.0f}'
+            )
+
+        try:
+            report = run_benchmarks(
+                options['only'], repeat=options['repeat'], with_queries=options['with_queries'], log=log,
+            )
+        except LookupError as exc:
+            raise CommandError(str(exc)) from exc
+
+        output = Path(options['output'] or Path(settings.BASE_DIR) / 'var' / 'benchmarks' / f'{report["commit"] or "report"}.json')
+        output.parent.mkdir(parents=True, exist_ok=True)
+        output.write_text(json.dumps(report, indent=2) + '\n')
+        self.stdout.write(f'Report written to {output}')
+
+        if baseline is not None:
+            regressions = compare_reports(baseline, report, threshold=options['threshold'])
+            for line in regressions:
+                self.stdout.write(self.style.WARNING(line))
+            if regressions and options['fail_on_regression']:
+                raise CommandError(f'{len(regressions)} regressions against {options["compare"]}.')
+            if not regressions:
+                self.stdout.write(self.style.SUCCESS(f'No regressions against {baseline.get("commit")}.'))
@@ -0,0 +1,76 @@
+"""
+Background job worker (see jizz.job_queue).
+
+Run one or more of these next to the web processes; each runs one job at a time and the
+per-queue limits in JOB_QUEUE_CONCURRENCY hold across all of them.
+
+Examples:
+  ./manage.py run_jobs
+  ./manage.py run_jobs --queue email --queue push
+  ./manage.py run_jobs --burst    # run what is due, then exit (cron)
+"""
+
+from __future__ import annotations
+
+import signal
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import close_old_connections
+
+from jizz.job_queue import claim_job, run_job, worker_name
+
+
+class Command(BaseCommand):
+    help = 'Run queued background jobs (email broadcasts, pushes, comparison generation).'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--queue',
+            action='append',
+            default=None,
+            help='Only run jobs from this queue (repeatable; default: all queues)',
+        )
+        parser.add_argument(
+            '--burst',
+            action='store_true',
+            help='Exit when no job is due instead of waiting for more',
+        )
+        parser.add_argument(
+            '--poll',
+            type=float,
+            default=1.0,
+            help='Seconds to wait between polls when idle (default: 1)',
+        )
+        parser.add_argument(
+            '--max-jobs',
+            type=int,
+            default=None,
+            help='Exit after running this many jobs',
+        )
+
+    def handle(self, *args, **options):
+        worker = worker_name()
+        stopping = False
+
+        def stop(signum, frame):
+            nonlocal stopping
+            stopping = True
+
+        signal.signal(signal.SIGTERM, stop)
+        signal.signal(signal.SIGINT, stop)
+
+        count = 0
+        while not stopping and (options['max_jobs'] is None or count < options['max_jobs']):
+            close_old_connections()
+            job = claim_job(options['queue'], worker)
+            if job is None:
+                if options['burst']:
+                    break
+                time.sleep(options['poll'])
+                continue
+            run_job(job)
+            count += 1
+            self.stdout.write(f'{job.name} #{job.pk}: {job.status}')
+
+        self.stdout.write(self.style.SUCCESS(f'Ran {count} job(s).'))
@@ -1,3 +1,5 @@
+import time
+
 from django.contrib.auth.models import User
 from django.core.management.base import BaseCommand
 
@@ -18,7 +20,19 @@ class Command(BaseCommand):
         parser.add_argument(
             '--sync',
             action='store_true',
-            help='Send synchronously in this process (for debugging or cron)',
+            help='Send synchronously in this process instead of queueing a job (for debugging or cron)',
+        )
+        parser.add_argument(
+            '--connections',
+            type=int,
+            default=None,
+            help='With --sync: parallel SMTP connections (default: UPDATE_EMAIL_CONNECTIONS)',
+        )
+        parser.add_argument(
+            '--rate',
+            type=float,
+            default=None,
+            help='With --sync: max emails per second, 0 for unlimited (default: UPDATE_EMAIL_SEND_RATE)',
         )
         parser.add_argument(
             '--username',
@@ -46,16 +60,21 @@ class Command(BaseCommand):
             if is_broadcast_in_progress(update):
                 self.stderr.write('A broadcast is already in progress for this update.')
                 return
-            delivery = send_update_email_broadcast(update, sent_by)
+            started = time.monotonic()
+            delivery = send_update_email_broadcast(
+                update, sent_by, connections=options['connections'], rate=options['rate'],
+            )
+            elapsed = time.monotonic() - started
             self.stdout.write(
                 f'Update {update.pk}: sent to {delivery.recipient_count} subscribers '
-                f'({stats["sent"]} had already received it).'
+                f'({stats["sent"]} had already received it) in {elapsed:.1f}s '
+                f'({delivery.recipient_count / elapsed if elapsed else 0:.1f}/s).'
             )
             return
 
         if start_update_email_broadcast_async(update, sent_by):
             self.stdout.write(
-                f'Update {update.pk}: sending to {stats["pending"]} subscribers in the background '
+                f'Update {update.pk}: queued for {stats["pending"]} subscribers, sent by the run_jobs worker '
                 f'({stats["sent"]} already received it).'
             )
         else:
@@ -0,0 +1,77 @@
+"""
+Sync taxonomy (orders, families, genera, species) and species names from eBird.
+
+Only rows that differ are written (bulk, one transaction per table). Use --cache-dir to keep
+the fetched eBird payloads on disk; later runs read them from there unless --refresh.
+
+Examples:
+  ./manage.py sync_ebird_taxonomy --dry-run
+  ./manage.py sync_ebird_taxonomy --cache-dir /tmp/ebird-taxonomy
+  ./manage.py sync_ebird_taxonomy --skip-taxonomy --languages nl de fr
+"""
+
+from __future__ import annotations
+
+from django.core.management.base import BaseCommand, CommandError
+
+from jizz.models import Language
+from jizz.services.ebird_taxonomy_sync import TaxonomyPayloads, sync_species_names, sync_taxonomy
+
+
+class Command(BaseCommand):
+    help = 'Sync eBird taxonomy and species names, writing only changed rows.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report per-table changes without saving to the database',
+        )
+        parser.add_argument(
+            '--cache-dir',
+            type=str,
+            default=None,
+            help='Directory for fetched eBird taxonomy payloads (reused by later runs)',
+        )
+        parser.add_argument(
+            '--refresh',
+            action='store_true',
+            help='Fetch from eBird even when --cache-dir has a copy',
+        )
+        parser.add_argument(
+            '--skip-taxonomy',
+            action='store_true',
+            help='Only sync species names',
+        )
+        parser.add_argument(
+            '--skip-names',
+            action='store_true',
+            help='Only sync taxonomy and species',
+        )
+        parser.add_argument(
+            '--languages',
+            nargs='+',
+            default=None,
+            help='Language codes for species names (default: all languages)',
+        )
+
+    def handle(self, *args, **options):
+        payloads = TaxonomyPayloads(cache_dir=options['cache_dir'], refresh=options['refresh'])
+        dry_run = options['dry_run']
+        prefix = '[dry run] ' if dry_run else ''
+
+        if not options['skip_taxonomy']:
+            for table, changes in sync_taxonomy(payloads, dry_run=dry_run).items():
+                self.stdout.write(f'{prefix}{table}: {changes}')
+
+        if not options['skip_names']:
+            languages = None
+            if options['languages']:
+                languages = list(Language.objects.filter(code__in=options['languages']))
+                missing = set(options['languages']) - {language.code for language in languages}
+                if missing:
+                    raise CommandError(f'Unknown language(s): {", ".join(sorted(missing))}')
+            for code, changes in sync_species_names(payloads, languages, dry_run=dry_run).items():
+                self.stdout.write(f'{prefix}names {code}: {changes}')
+
+        self.stdout.write(self.style.SUCCESS(f'{prefix}eBird taxonomy sync done.'))
@@ -10,7 +10,10 @@ callback and use our HTTPS completion URL as the redirect_uri sent to Apple.
 from django.utils.deprecation import MiddlewareMixin
 
 from jizz.api_event_labels import resolve_api_event_label
-from jizz.usage_analytics import record_usage_event
+from jizz.models import RequestProfile
+from jizz.request_profiling import http_route, profile_request
+from jizz.usage_analytics import build_usage_event
+from jizz.usage_event_buffer import submit_usage_event
 
 _SERVER_RENDERED_PREFIXES = ('/data/', '/country/', '/staff/')
 
@@ -47,6 +50,26 @@ class AppVersionNoCacheMiddleware:
         return response
 
 
+class RequestProfilingMiddleware:
+    """Profile REST API calls: queries, DB and serializer time, response size (jizz.request_profiling)."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if request.method == 'OPTIONS' or not request.path.startswith('/api/'):
+            return self.get_response(request)
+
+        with profile_request(RequestProfile.KIND_HTTP, '', request.method) as profile:
+            response = self.get_response(request)
+            if profile is not None:
+                profile.route = http_route(request) or ''
+                profile.status_code = response.status_code
+                if not response.streaming:
+                    profile.response_bytes = len(response.content)
+        return response
+
+
 class UsageAnalyticsMiddleware(MiddlewareMixin):
     """Log server-rendered Django page views (SPA routes are tracked client-side)."""
 
@@ -70,12 +93,12 @@ class UsageAnalyticsMiddleware(MiddlewareMixin):
             return response
 
         try:
-            record_usage_event(
+            submit_usage_event(build_usage_event(
                 request,
                 path=path,
                 event_type='page_view',
                 platform='web',
-            )
+            ))
         except Exception:
             pass
 
@@ -100,7 +123,7 @@ class ApiUsageAnalyticsMiddleware(MiddlewareMixin):
             return response
 
         try:
-            record_usage_event(
+            submit_usage_event(build_usage_event(
                 request,
                 path=label,
                 event_type='api',
@@ -109,7 +132,7 @@ class ApiUsageAnalyticsMiddleware(MiddlewareMixin):
                     'method': request.method,
                     'path': request.path,
                 },
-            )
+            ))
         except Exception:
             pass
 
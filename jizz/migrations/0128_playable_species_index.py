@@ -0,0 +1,62 @@
+# Materialized question-selection pool per (country, statuses, rarity, tax filter, media type)
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jizz', '0127_pregenerated_questions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlayableSpeciesIndex',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'statuses',
+                    models.CharField(
+                        help_text='Comma-separated, sorted CountrySpecies.status values.',
+                        max_length=200,
+                    ),
+                ),
+                (
+                    'rarity',
+                    models.CharField(
+                        choices=[
+                            ('familiar', 'Familiar'),
+                            ('regular', 'Regular'),
+                            ('exceptional', 'Exceptional'),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ('tax_family', models.CharField(blank=True, default='', max_length=200)),
+                ('tax_order', models.CharField(blank=True, default='', max_length=200)),
+                ('media_type', models.CharField(max_length=10)),
+                ('entries', models.JSONField(blank=True, default=dict)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                (
+                    'country',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='playable_species_indexes',
+                        to='jizz.country',
+                    ),
+                ),
+            ],
+            options={
+                'verbose_name': 'playable species index',
+                'verbose_name_plural': 'playable species indexes',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='playablespeciesindex',
+            constraint=models.UniqueConstraint(
+                fields=('country', 'statuses', 'rarity', 'tax_family', 'tax_order', 'media_type'),
+                name='jizz_playablespeciesindex_unique_key',
+            ),
+        ),
+    ]
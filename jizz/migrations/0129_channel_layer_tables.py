@@ -0,0 +1,47 @@
+# Tables backing the PostgreSQL LISTEN/NOTIFY channel layer
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jizz', '0128_playable_species_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChannelLayerGroup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('group_name', models.CharField(max_length=100)),
+                ('channel', models.CharField(max_length=100)),
+                (
+                    'instance',
+                    models.CharField(
+                        db_index=True,
+                        help_text='Layer instance (worker process) that owns the channel.',
+                        max_length=32,
+                    ),
+                ),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='channellayergroup',
+            constraint=models.UniqueConstraint(fields=('group_name', 'channel'), name='jizz_channellayergroup_unique'),
+        ),
+        migrations.CreateModel(
+            name='ChannelLayerMessage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('instance', models.CharField(db_index=True, max_length=32)),
+                (
+                    'channels',
+                    models.JSONField(default=list, help_text='Local channel names on that instance.'),
+                ),
+                ('payload', models.JSONField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+            ],
+        ),
+    ]
@@ -0,0 +1,19 @@
+# UsageEvent.created_at is set when the event is built (buffered writer inserts later)
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jizz', '0129_channel_layer_tables'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='usageevent',
+            name='created_at',
+            field=models.DateTimeField(db_index=True, default=django.utils.timezone.now, editable=False),
+        ),
+    ]
@@ -0,0 +1,70 @@
+# Hourly/daily usage rollups, session sketches and per-IP daily counts
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jizz', '0130_usage_event_created_at_default'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UsageRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('period_start', models.DateTimeField()),
+                ('path', models.CharField(max_length=500)),
+                ('platform', models.CharField(max_length=20)),
+                ('device_type', models.CharField(max_length=20)),
+                ('event_type', models.CharField(max_length=20)),
+                ('country_code', models.CharField(blank=True, default='', max_length=2)),
+                ('events', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularity', 'period_start'], name='jizz_usager_granula_48a732_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UsageSessionSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('granularity', models.CharField(choices=[('hour', 'Hour'), ('day', 'Day')], max_length=4)),
+                ('period_start', models.DateTimeField()),
+                ('platform', models.CharField(max_length=20)),
+                ('device_type', models.CharField(max_length=20)),
+                ('event_type', models.CharField(max_length=20)),
+                ('country_code', models.CharField(blank=True, default='', max_length=2)),
+                ('sketch', models.BinaryField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['granularity', 'period_start'], name='jizz_usages_granula_b6bd36_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UsageIpRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('ip_address', models.GenericIPAddressField()),
+                ('platform', models.CharField(max_length=20)),
+                ('device_type', models.CharField(max_length=20)),
+                ('event_type', models.CharField(max_length=20)),
+                ('country_code', models.CharField(blank=True, default='', max_length=2)),
+                ('events', models.PositiveIntegerField(default=0)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['day'], name='jizz_usagei_day_f5292b_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='UsageRollupState',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('rolled_until', models.DateTimeField(blank=True, null=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
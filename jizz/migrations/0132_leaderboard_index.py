@@ -0,0 +1,76 @@
+# Leaderboard entries and rank table (see jizz.leaderboard), backfilled from PlayerScore
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BACKFILL_SQL = [
+    """
+    INSERT INTO jizz_leaderboardentry
+        (player_score_id, level, country_code, media, length, rarity, listed, score)
+    SELECT ps.id, g.level, COALESCE(g.country_id, ''), g.media, g.length, g.rarity,
+           (COALESCE(g.tax_order, '') = '' AND COALESCE(g.tax_family, '') = ''
+            AND g.game_type NOT IN ('pair_practice', 'species_practice')),
+           ps.score
+    FROM jizz_playerscore ps JOIN jizz_game g ON g.id = ps.game_id
+    """,
+    """
+    INSERT INTO jizz_leaderboardscorecount
+        (level, country_code, media, length, rarity, listed, score, count)
+    SELECT level, country_code, media, length, rarity, listed, score, COUNT(*)
+    FROM jizz_leaderboardentry
+    GROUP BY level, country_code, media, length, rarity, listed, score
+    """,
+]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jizz', '0131_usage_rollups'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardScoreCount',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('level', models.CharField(max_length=100)),
+                ('country_code', models.CharField(blank=True, default='', max_length=10)),
+                ('media', models.CharField(max_length=10)),
+                ('length', models.IntegerField()),
+                ('rarity', models.CharField(max_length=20)),
+                ('listed', models.BooleanField(default=True)),
+                ('score', models.IntegerField()),
+                ('count', models.IntegerField(default=0)),
+            ],
+            options={
+                'constraints': [
+                    models.UniqueConstraint(
+                        fields=('level', 'country_code', 'media', 'length', 'rarity', 'listed', 'score'),
+                        name='jizz_leaderboardscorecount_unique_key',
+                    ),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('player_score', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='leaderboard_entry', serialize=False, to='jizz.playerscore')),
+                ('level', models.CharField(max_length=100)),
+                ('country_code', models.CharField(blank=True, default='', max_length=10)),
+                ('media', models.CharField(max_length=10)),
+                ('length', models.IntegerField()),
+                ('rarity', models.CharField(max_length=20)),
+                ('listed', models.BooleanField(default=True)),
+                ('score', models.IntegerField(default=0)),
+            ],
+            options={
+                'verbose_name_plural': 'leaderboard entries',
+                'indexes': [
+                    models.Index(fields=['level', 'country_code', 'media', 'length', 'rarity', '-score', 'player_score'], name='jizz_leader_level_db2fff_idx'),
+                    models.Index(condition=models.Q(('listed', True)), fields=['-score', 'player_score'], name='jizz_leaderboard_listed_idx'),
+                ],
+            },
+        ),
+        migrations.RunSQL(BACKFILL_SQL, migrations.RunSQL.noop),
+    ]
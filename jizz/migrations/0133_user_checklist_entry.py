@@ -0,0 +1,37 @@
+# Materialized per-user checklist rows (fill with manage.py backfill_checklist_entries)
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jizz', '0132_leaderboard_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UserChecklistEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('times_encountered', models.PositiveIntegerField(default=0)),
+                ('times_identified', models.PositiveIntegerField(default=0)),
+                ('first_encountered_at', models.DateTimeField()),
+                ('last_encountered_at', models.DateTimeField()),
+                ('first_identified_at', models.DateTimeField(blank=True, null=True)),
+                ('last_identified_at', models.DateTimeField(blank=True, null=True)),
+                ('country', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checklist_entries', to='jizz.country')),
+                ('species', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checklist_entries', to='jizz.species')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='checklist_entries', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name_plural': 'user checklist entries',
+                'constraints': [
+                    models.UniqueConstraint(fields=('user', 'country', 'species'), name='jizz_userchecklistentry_unique_key'),
+                ],
+            },
+        ),
+    ]
@@ -0,0 +1,56 @@
+# Counter tables for quiz mistake stats (fill with manage.py rebuild_mistake_stats)
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ('jizz', '0133_user_checklist_entry'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SpeciesMistakeStat',
+            fields=[
+                ('species', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='mistake_stat', serialize=False, to='jizz.species')),
+                ('times_picked', models.IntegerField(default=0)),
+                ('picked_correct', models.IntegerField(default=0)),
+                ('picked_wrong', models.IntegerField(default=0)),
+                ('times_target', models.IntegerField(default=0)),
+                ('target_wrong', models.IntegerField(default=0)),
+            ],
+        ),
+        migrations.CreateModel(
+            name='ConfusionPairStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('wrong', models.IntegerField(default=0)),
+                ('picked', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jizz.species')),
+                ('target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jizz.species')),
+            ],
+            options={
+                'constraints': [
+                    models.UniqueConstraint(fields=('target', 'picked'), name='jizz_confusionpairstat_unique_key'),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name='UserMistakeStat',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('answers', models.IntegerField(default=0)),
+                ('picked', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jizz.species')),
+                ('target', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jizz.species')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='mistake_stats', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'constraints': [
+                    models.UniqueConstraint(fields=('user', 'target', 'picked'), name='jizz_usermistakestat_unique_key'),
+                ],
+            },
+        ),
+    ]
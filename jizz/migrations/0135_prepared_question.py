@@ -0,0 +1,26 @@
+# Look-ahead rounds for live games (jizz.question_prefetch)
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jizz', '0134_mistake_stat_counters'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PreparedQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('number', models.IntegerField(default=0)),
+                ('option_species_ids', models.JSONField(default=list)),
+                ('payload', models.JSONField(default=dict)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                ('game', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='prepared_questions', to='jizz.game')),
+                ('species', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='jizz.species')),
+            ],
+        ),
+    ]
@@ -0,0 +1,93 @@
+# Pregenerated question cards per (country, statuses, rarity, tax filter, media type, level)
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jizz', '0138_job'),
+        ('media', '0017_scrapecheckpoint'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='QuestionPool',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                (
+                    'statuses',
+                    models.CharField(
+                        help_text='Comma-separated, sorted CountrySpecies.status values.',
+                        max_length=200,
+                    ),
+                ),
+                (
+                    'rarity',
+                    models.CharField(
+                        choices=[
+                            ('familiar', 'Familiar'),
+                            ('regular', 'Regular'),
+                            ('exceptional', 'Exceptional'),
+                        ],
+                        max_length=20,
+                    ),
+                ),
+                ('tax_family', models.CharField(blank=True, default='', max_length=200)),
+                ('tax_order', models.CharField(blank=True, default='', max_length=200)),
+                ('media_type', models.CharField(max_length=10)),
+                ('level', models.CharField(max_length=20)),
+                ('last_requested', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                (
+                    'country',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='question_pools',
+                        to='jizz.country',
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='questionpool',
+            constraint=models.UniqueConstraint(
+                fields=('country', 'statuses', 'rarity', 'tax_family', 'tax_order', 'media_type', 'level'),
+                name='jizz_questionpool_unique_key',
+            ),
+        ),
+        migrations.CreateModel(
+            name='QuestionPoolCard',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('option_species_ids', models.JSONField(default=list)),
+                ('created', models.DateTimeField(auto_now_add=True)),
+                (
+                    'media',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to='media.media',
+                    ),
+                ),
+                (
+                    'pool',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='cards',
+                        to='jizz.questionpool',
+                    ),
+                ),
+                (
+                    'species',
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name='+',
+                        to='jizz.species',
+                    ),
+                ),
+            ],
+        ),
+    ]
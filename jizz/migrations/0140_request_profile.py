@@ -0,0 +1,33 @@
+# Sampled per-request query/latency profiles (jizz.request_profiling)
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jizz', '0139_question_pool'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RequestProfile',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('http', 'HTTP'), ('ws', 'WebSocket')], max_length=4)),
+                ('route', models.CharField(max_length=200)),
+                ('method', models.CharField(blank=True, default='', max_length=10)),
+                ('status_code', models.PositiveSmallIntegerField(blank=True, null=True)),
+                ('queries', models.PositiveIntegerField(default=0)),
+                ('db_ms', models.FloatField(default=0)),
+                ('serializer_ms', models.FloatField(default=0)),
+                ('response_bytes', models.PositiveIntegerField(default=0)),
+                ('duration_ms', models.FloatField(default=0)),
+                ('created', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['route', 'created'], name='jizz_reques_route_a9f4ac_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,44 @@
+# Shared cache tier (jizz.tiered_cache): UNLOGGED table with a GIN index for tag invalidation
+
+from django.db import migrations, models
+
+# PostgreSQL only; elsewhere the table stays a plain one and TieredCache uses its local tier.
+POSTGRES_SQL = [
+    ('ALTER TABLE jizz_sharedcacheentry SET UNLOGGED', 'ALTER TABLE jizz_sharedcacheentry SET LOGGED'),
+    (
+        'CREATE INDEX jizz_sharedcacheentry_tags_gin ON jizz_sharedcacheentry USING gin (tags)',
+        'DROP INDEX jizz_sharedcacheentry_tags_gin',
+    ),
+]
+
+
+def apply_postgres_sql(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for forward, _ in POSTGRES_SQL:
+            schema_editor.execute(forward)
+
+
+def revert_postgres_sql(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for _, backward in reversed(POSTGRES_SQL):
+            schema_editor.execute(backward)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jizz', '0140_request_profile'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SharedCacheEntry',
+            fields=[
+                ('key', models.CharField(max_length=255, primary_key=True, serialize=False)),
+                ('value', models.BinaryField()),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('tags', models.JSONField(default=list, help_text='Invalidation tags, e.g. "country:NL:checklist".')),
+            ],
+        ),
+        migrations.RunPython(apply_postgres_sql, revert_postgres_sql),
+    ]
@@ -0,0 +1,241 @@
+"""
+Batched Expo push delivery with push receipts.
+
+``send_push_messages`` posts messages to Expo in batches of ``EXPO_BATCH_SIZE`` over one
+pooled session, retrying throttled (429), failed (5xx) and dropped requests with
+exponential backoff. Tickets are stored as ``PushTicket`` rows; ``check_push_receipts``
+(``manage.py check_push_receipts``, run from cron) fetches their receipts later and
+disables every ``PushDevice`` Expo reports as ``DeviceNotRegistered``.
+
+Code that notifies many users wraps its loop in ``push_batch()``: ``send_push_to_user``
+then only queues messages and the whole batch is sent when the block exits normally (after
+the surrounding transaction commits); a block that raises sends nothing.
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from datetime import timedelta
+from typing import Any, Callable, Iterable
+
+import requests
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+from requests.adapters import HTTPAdapter
+
+from jizz.models import DeviceToken, PushDevice, PushTicket
+
+logger = logging.getLogger(__name__)
+
+EXPO_PUSH_URL = 'https://exp.host/--/api/v2/push/send'
+EXPO_RECEIPTS_URL = 'https://exp.host/--/api/v2/push/getReceipts'
+EXPO_BATCH_SIZE = 100
+EXPO_RECEIPTS_BATCH_SIZE = 1000
+# Expo keeps receipts for about a day and advises fetching them after ~15 minutes.
+RECEIPT_DELAY = timedelta(minutes=15)
+RECEIPT_EXPIRY = timedelta(hours=24)
+
+_RETRY_STATUSES = {429, 500, 502, 503, 504}
+_session: requests.Session | None = None
+_session_lock = threading.Lock()
+
+
+def _shared_session() -> requests.Session:
+    global _session
+    with _session_lock:
+        if _session is None:
+            session = requests.Session()
+            session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=8))
+            session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=8))
+            session.headers.update({'Accept': 'application/json', 'Accept-Encoding': 'gzip, deflate'})
+            _session = session
+        return _session
+
+
+def _chunks(items: list, size: int) -> Iterable[list]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+class ExpoPushClient:
+    """Expo push API calls with retries; does not raise on HTTP failures."""
+
+    def __init__(
+        self,
+        session: requests.Session | None = None,
+        max_retries: int = 3,
+        backoff: float = 0.5,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.session = session or _shared_session()
+        self.push_url = getattr(settings, 'EXPO_PUSH_URL', EXPO_PUSH_URL)
+        self.receipts_url = getattr(settings, 'EXPO_PUSH_RECEIPTS_URL', EXPO_RECEIPTS_URL)
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.sleep = sleep
+
+    def _headers(self) -> dict[str, str]:
+        token = getattr(settings, 'EXPO_ACCESS_TOKEN', '')
+        return {'Authorization': f'Bearer {token}'} if token else {}
+
+    def _post(self, url: str, payload: Any) -> dict | None:
+        for attempt in range(self.max_retries + 1):
+            delay = self.backoff * (2 ** attempt)
+            try:
+                resp = self.session.post(url, json=payload, headers=self._headers(), timeout=15)
+            except requests.RequestException as exc:
+                logger.warning('Expo request failed (attempt %s): %s', attempt + 1, exc)
+            else:
+                if resp.status_code == 200:
+                    try:
+                        return resp.json()
+                    except ValueError:
+                        logger.warning('Expo returned invalid JSON: %s', resp.text[:200])
+                        return None
+                if resp.status_code not in _RETRY_STATUSES:
+                    logger.warning('Expo request rejected: %s %s', resp.status_code, resp.text[:200])
+                    return None
+                retry_after = resp.headers.get('Retry-After', '')
+                if retry_after.isdigit():
+                    delay = max(delay, int(retry_after))
+                logger.warning('Expo request got %s (attempt %s)', resp.status_code, attempt + 1)
+            if attempt < self.max_retries:
+                self.sleep(delay)
+        return None
+
+    def send(self, messages: list[dict]) -> list[dict]:
+        """Tickets for one batch of at most ``EXPO_BATCH_SIZE`` messages, in message order."""
+        body = self._post(self.push_url, messages)
+        tickets = (body or {}).get('data')
+        if not isinstance(tickets, list) or len(tickets) != len(messages):
+            error = {'status': 'error', 'message': 'request failed', 'details': {'error': 'RequestFailed'}}
+            return [error for _ in messages]
+        return tickets
+
+    def receipts(self, ticket_ids: list[str]) -> dict[str, dict] | None:
+        """Receipts by ticket id (missing ids are not ready yet); None if the request failed."""
+        body = self._post(self.receipts_url, {'ids': ticket_ids})
+        if body is None:
+            return None
+        return body.get('data') or {}
+
+
+def push_enabled() -> bool:
+    return getattr(settings, 'SEND_PUSH_NOTIFICATIONS', False)
+
+
+def disable_push_tokens(tokens: Iterable[str]) -> int:
+    """Stop sending to tokens Expo reported as no longer registered."""
+    tokens = set(tokens)
+    if not tokens:
+        return 0
+    disabled = PushDevice.objects.filter(expo_push_token__in=tokens, enabled=True).update(enabled=False)
+    DeviceToken.objects.filter(token__in=tokens).delete()
+    logger.info('Disabled %s unregistered push device(s)', disabled)
+    return disabled
+
+
+def build_message(token: str, title: str, body: str, data: dict[str, Any] | None = None) -> dict:
+    return {'to': token.strip(), 'sound': 'default', 'title': title, 'body': body, 'data': data or {}}
+
+
+def send_push_messages(messages: list[dict], client: ExpoPushClient | None = None) -> list[dict]:
+    """
+    Send messages in Expo-sized batches and record their tickets. Returns one ticket per
+    message ([] when SEND_PUSH_NOTIFICATIONS is off).
+    """
+    messages = [message for message in messages if (message.get('to') or '').strip()]
+    if not messages:
+        return []
+    if not push_enabled():
+        logger.info('Push skipped (SEND_PUSH_NOTIFICATIONS=False): %s message(s)', len(messages))
+        return []
+    client = client or ExpoPushClient()
+    tickets, pending, unregistered = [], [], set()
+    for batch in _chunks(messages, EXPO_BATCH_SIZE):
+        batch_tickets = client.send(batch)
+        for message, ticket in zip(batch, batch_tickets):
+            if ticket.get('status') == 'ok' and ticket.get('id'):
+                pending.append(PushTicket(ticket_id=ticket['id'], expo_push_token=message['to']))
+            elif (ticket.get('details') or {}).get('error') == 'DeviceNotRegistered':
+                unregistered.add(message['to'])
+            else:
+                logger.warning('Expo push ticket error: %s', ticket.get('message', ticket))
+        tickets.extend(batch_tickets)
+    PushTicket.objects.bulk_create(pending, batch_size=1000, ignore_conflicts=True)
+    disable_push_tokens(unregistered)
+    return tickets
+
+
+def check_push_receipts(client: ExpoPushClient | None = None, now=None) -> dict[str, int]:
+    """
+    Fetch receipts of tickets older than ``RECEIPT_DELAY``, disable unregistered devices
+    and drop the checked tickets (and those Expo no longer knows after ``RECEIPT_EXPIRY``).
+    """
+    now = now or timezone.now()
+    client = client or ExpoPushClient()
+    counts = {'checked': 0, 'errors': 0, 'disabled': 0, 'pending': 0}
+    tickets = list(
+        PushTicket.objects.filter(created__lte=now - RECEIPT_DELAY)
+        .order_by('pk').values_list('pk', 'ticket_id', 'expo_push_token', 'created')
+    )
+    unregistered = set()
+    for batch in _chunks(tickets, EXPO_RECEIPTS_BATCH_SIZE):
+        receipts = client.receipts([ticket_id for _pk, ticket_id, _token, _created in batch])
+        if receipts is None:
+            counts['pending'] += len(batch)
+            continue
+        done = []
+        for pk, ticket_id, token, created in batch:
+            receipt = receipts.get(ticket_id)
+            if receipt is None:
+                if created > now - RECEIPT_EXPIRY:
+                    counts['pending'] += 1
+                    continue
+            elif receipt.get('status') == 'error':
+                counts['errors'] += 1
+                if (receipt.get('details') or {}).get('error') == 'DeviceNotRegistered':
+                    unregistered.add(token)
+                else:
+                    logger.warning('Expo push receipt error: %s', receipt.get('message', receipt))
+            done.append(pk)
+        counts['checked'] += len(done)
+        PushTicket.objects.filter(pk__in=done).delete()
+    counts['disabled'] = disable_push_tokens(unregistered)
+    return counts
+
+
+_active_batch: contextvars.ContextVar[list | None] = contextvars.ContextVar('push_batch', default=None)
+
+
+def queue_push(tokens: Iterable[str], title: str, body: str, data: dict[str, Any] | None = None) -> None:
+    """Send now, or add to the enclosing ``push_batch()``."""
+    messages = [build_message(token, title, body, data) for token in tokens if token and token.strip()]
+    batch = _active_batch.get()
+    if batch is not None:
+        batch.extend(messages)
+    else:
+        send_push_messages(messages)
+
+
+@contextmanager
+def push_batch():
+    """
+    Collect pushes queued inside the block and send them together once it exits normally
+    and the current transaction (if any) commits. Nothing is sent if the block raises.
+    """
+    if _active_batch.get() is not None:
+        yield  # nested: the outer batch sends
+        return
+    messages: list[dict] = []
+    token = _active_batch.set(messages)
+    try:
+        yield
+    finally:
+        _active_batch.reset(token)
+    if messages:
+        transaction.on_commit(lambda: send_push_messages(messages))
@@ -5,7 +5,7 @@ from random import randint, shuffle, random
 
 from django.db import models, transaction, connection
 from django.core.validators import MinValueValidator, MaxValueValidator
-from django.db.models import Count, Sum, Q
+from django.db.models import Count, Q
 from django.db.utils import OperationalError, ProgrammingError
 from django.db.models.signals import post_save
 from django.dispatch import receiver
@@ -85,6 +85,23 @@ class QuestionOption(models.Model):
         ordering = ['order']
 
 
+class PreparedQuestion(models.Model):
+    """
+    Look-ahead round for a lazily generated game: target, media index, ordered options and
+    the play payload, turned into a Question on advance. See ``jizz.question_prefetch``.
+    """
+
+    game = models.ForeignKey('jizz.Game', related_name='prepared_questions', on_delete=models.CASCADE)
+    species = models.ForeignKey('jizz.Species', related_name='+', on_delete=models.CASCADE)
+    number = models.IntegerField(default=0)
+    option_species_ids = models.JSONField(default=list)
+    payload = models.JSONField(default=dict)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.game_id} prepared species={self.species_id}'
+
+
 class TaxonomicOrder(models.Model):
     name_latin = models.CharField(max_length=200, unique=True)
     name_en = models.CharField(max_length=200)
@@ -192,21 +209,17 @@ class Species(models.Model):
     @property
     def filtered_media(self):
         """Media that are not rejected. Used as fallback when no approved media exist."""
-        return self.media.exclude(reviews__review_type='rejected')
+        return self.media.filter(rejected_reviews=0)
 
     def _eligible_media(self, media_type):
         """
         Media for game use: approved only, or if none approved then not rejected.
         Ordered by id so index (question.number) is stable.
         """
-        approved = self.media.filter(
-            type=media_type
-        ).filter(reviews__review_type='approved').distinct()
+        approved = self.media.filter(type=media_type, approved_reviews__gt=0)
         if approved.exists():
             return approved.order_by('id')
-        return self.media.filter(
-            type=media_type
-        ).exclude(reviews__review_type='rejected').order_by('id')
+        return self.media.filter(type=media_type, rejected_reviews=0).order_by('id')
 
     @property
     def images(self):
@@ -297,6 +310,18 @@ class SpeciesName(models.Model):
     name = models.CharField(max_length=200)
 
 
+class SpeciesCatalogChange(models.Model):
+    """
+    One row per change to a species as listed in the species catalog (jizz.species_catalog);
+    the newest id is the catalog version. species_id is no FK so deletions stay logged.
+    """
+    species_id = models.IntegerField(db_index=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.pk}: species {self.species_id}"
+
+
 def _taxonomy_tables_ready():
     try:
         return (
@@ -620,7 +645,19 @@ class Game(models.Model):
     def _add_question_body(game):
         """Create the next question row; caller must hold ``game`` locked in ``add_question``."""
         from jizz.game_question_selection import create_question_for_game
-
+        from jizz.question_pools import take_question_from_pool
+        from jizz.question_prefetch import prefetch_enabled, schedule_question_prefetch, take_prepared_question
+
+        if prefetch_enabled(game):
+            # Refill the look-ahead once this round is committed.
+            transaction.on_commit(lambda: schedule_question_prefetch(game.pk))
+            question = take_prepared_question(game)
+            if question is not None:
+                return question
+        # No prepared round yet (e.g. the first one): a pregenerated pool card is next best.
+        question = take_question_from_pool(game)
+        if question is not None:
+            return question
         return create_question_for_game(game)
 
     @property
@@ -749,37 +786,46 @@ class PlayerScore(models.Model):
 
     @classmethod
     def highscore_by_type(cls, level=None, country=None, media=None, length=None, rarity=None):
+        # Walks the leaderboard bucket index instead of sorting every matching score.
         qs = cls.objects.filter(
-            game__level=level,
-            game__country=country,
-            game__media=media,
-            game__length=length,
+            leaderboard_entry__level=level,
+            leaderboard_entry__country_code=getattr(country, 'pk', country) or '',
+            leaderboard_entry__media=media,
+            leaderboard_entry__length=length,
         )
         if rarity is not None:
-            qs = qs.filter(game__rarity=rarity)
-        return qs.order_by('-score').first()
+            qs = qs.filter(leaderboard_entry__rarity=rarity)
+        return qs.order_by('-leaderboard_entry__score', 'pk').first()
 
     @property
     def ranking(self):
-        scores = PlayerScore.objects.filter(
-            game__level=self.game.level,
-            game__country=self.game.country,
-            game__media=self.game.media,
-            game__length=self.game.length,
-            game__rarity=self.game.rarity,
-        ).order_by('-score').all()
-        return list(scores).index(self) + 1
+        from jizz.leaderboard import score_rank
+
+        return score_rank(self)
 
     @property
     def is_host(self):
         return self.game_id and self.game.host == self
 
+    def _current_answer(self):
+        """
+        Answer on the game's last question. Scoreboard batches set ``current_question_id``
+        and prefetch ``answers`` so this needs no queries.
+        """
+        if hasattr(self, 'current_question_id'):
+            question_id = self.current_question_id
+        else:
+            question = self.game_id and self.game.questions.last()
+            question_id = question.pk if question else None
+        if not question_id:
+            return None
+        if 'answers' in getattr(self, '_prefetched_objects_cache', {}):
+            return next((answer for answer in self.answers.all() if answer.question_id == question_id), None)
+        return self.answers.filter(question_id=question_id).first()
+
     @property
     def status(self):
-        question = self.game_id and self.game.questions.last()
-        if not question:
-            return 'waiting'
-        answer = self.answers.filter(question=question).first()
+        answer = self._current_answer()
         if answer:
             if answer.correct:
                 return 'correct'
@@ -790,10 +836,7 @@ class PlayerScore(models.Model):
     @property
     def last_answer(self):
         """Answer on the current (last) question, or None if still waiting."""
-        question = self.game_id and self.game.questions.last()
-        if not question:
-            return None
-        return self.answers.filter(question=question).first()
+        return self._current_answer()
 
     class Meta:
         unique_together = ('player', 'game')
@@ -824,7 +867,7 @@ class Answer(models.Model):
 
     def save(self, *args, **kwargs):
         if not self.id:
-            self.correct = self.answer == self.question.species
+            self.correct = self.answer_id == self.question.species_id
             if self.correct:
                 self.score = self.calculate_score()
         return super().save(*args, **kwargs)
@@ -835,11 +878,152 @@ class Answer(models.Model):
 
 @receiver(post_save, sender=Answer)
 def update_player_score(sender, instance, created, **kwargs):
-    if created:
-        instance.player_score.score = instance.player_score.answers.filter(
-            question__game=instance.question.game
-        ).aggregate(score=Sum('score'))['score']
-        instance.player_score.save()
+    # Atomic increment: concurrent answers of one player never read a stale total,
+    # and wrong answers (score 0) leave the PlayerScore and leaderboard untouched.
+    if not created or not instance.score or not instance.player_score_id:
+        return
+    from jizz.leaderboard import sync_leaderboard_entry
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'UPDATE {PlayerScore._meta.db_table} SET score = score + %s WHERE id = %s RETURNING score',
+            [instance.score, instance.player_score_id],
+        )
+        row = cursor.fetchone()
+    if row is not None:
+        instance.player_score.score = row[0]
+        sync_leaderboard_entry(instance.player_score)
+
+
+class LeaderboardEntry(models.Model):
+    """
+    Denormalized hiscore row per ``PlayerScore``: the game's leaderboard bucket (level,
+    country, media, length, rarity) and the current score. ``listed`` is False for
+    practice and taxonomy-filtered games, which are ranked but not shown on /api/scores/.
+    Kept current by ``jizz.signals``; see ``jizz.leaderboard``.
+    """
+
+    player_score = models.OneToOneField(
+        PlayerScore,
+        primary_key=True,
+        related_name='leaderboard_entry',
+        on_delete=models.CASCADE,
+    )
+    level = models.CharField(max_length=100)
+    country_code = models.CharField(max_length=10, blank=True, default='')
+    media = models.CharField(max_length=10)
+    length = models.IntegerField()
+    rarity = models.CharField(max_length=20)
+    listed = models.BooleanField(default=True)
+    score = models.IntegerField(default=0)
+
+    class Meta:
+        verbose_name_plural = 'leaderboard entries'
+        indexes = [
+            models.Index(fields=['level', 'country_code', 'media', 'length', 'rarity', '-score', 'player_score']),
+            models.Index(
+                fields=['-score', 'player_score'],
+                condition=models.Q(listed=True),
+                name='jizz_leaderboard_listed_idx',
+            ),
+        ]
+
+
+class LeaderboardScoreCount(models.Model):
+    """Rank table: number of entries per (bucket, listed, score); ranks sum the rows above a score."""
+
+    level = models.CharField(max_length=100)
+    country_code = models.CharField(max_length=10, blank=True, default='')
+    media = models.CharField(max_length=10)
+    length = models.IntegerField()
+    rarity = models.CharField(max_length=20)
+    listed = models.BooleanField(default=True)
+    score = models.IntegerField()
+    count = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('level', 'country_code', 'media', 'length', 'rarity', 'listed', 'score'),
+                name='jizz_leaderboardscorecount_unique_key',
+            ),
+        ]
+
+
+class UserChecklistEntry(models.Model):
+    """
+    Life-list row per (user, country, species): answers to questions about the species in
+    the user's games for that country. Updated per Answer insert by ``jizz.signals``;
+    see ``jizz.services.checklist_entries``.
+    """
+
+    user = models.ForeignKey('auth.User', related_name='checklist_entries', on_delete=models.CASCADE)
+    country = models.ForeignKey(Country, related_name='checklist_entries', on_delete=models.CASCADE)
+    species = models.ForeignKey(Species, related_name='checklist_entries', on_delete=models.CASCADE)
+    times_encountered = models.PositiveIntegerField(default=0)
+    times_identified = models.PositiveIntegerField(default=0)
+    first_encountered_at = models.DateTimeField()
+    last_encountered_at = models.DateTimeField()
+    first_identified_at = models.DateTimeField(null=True, blank=True)
+    last_identified_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        verbose_name_plural = 'user checklist entries'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('user', 'country', 'species'),
+                name='jizz_userchecklistentry_unique_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.user_id} {self.country_id} {self.species_id} ({self.times_identified}/{self.times_encountered})'
+
+
+class SpeciesMistakeStat(models.Model):
+    """
+    Answer counters per species, both as the picked answer and as the question target.
+    Maintained per Answer by ``jizz.signals``; see ``jizz.quiz_mistake_counters``.
+    """
+
+    species = models.OneToOneField(
+        Species,
+        primary_key=True,
+        related_name='mistake_stat',
+        on_delete=models.CASCADE,
+    )
+    times_picked = models.IntegerField(default=0)
+    picked_correct = models.IntegerField(default=0)
+    picked_wrong = models.IntegerField(default=0)
+    times_target = models.IntegerField(default=0)
+    target_wrong = models.IntegerField(default=0)
+
+
+class ConfusionPairStat(models.Model):
+    """Wrong answers per directed (question target, picked species) pair, all players."""
+
+    target = models.ForeignKey(Species, related_name='+', on_delete=models.CASCADE)
+    picked = models.ForeignKey(Species, related_name='+', on_delete=models.CASCADE)
+    wrong = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('target', 'picked'), name='jizz_confusionpairstat_unique_key'),
+        ]
+
+
+class UserMistakeStat(models.Model):
+    """Answers per (user, question target, picked species); picked == target are correct answers."""
+
+    user = models.ForeignKey('auth.User', related_name='mistake_stats', on_delete=models.CASCADE)
+    target = models.ForeignKey(Species, related_name='+', on_delete=models.CASCADE)
+    picked = models.ForeignKey(Species, related_name='+', on_delete=models.CASCADE)
+    answers = models.IntegerField(default=0)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=('user', 'target', 'picked'), name='jizz_usermistakestat_unique_key'),
+        ]
 
 
 class SpeciesImage(models.Model):
@@ -1050,6 +1234,45 @@ class CountrySpeciesFrequency(models.Model):
         ordering = ['country_species', 'reference_year', 'month']
 
 
+class PlayableSpeciesIndex(models.Model):
+    """
+    Materialized question-selection pool for one filter combination.
+
+    ``entries`` maps species id (str) to ``[eligible_media_ids, frequency, genus_id,
+    family_id, order_id, tax_ordering]``. Kept current by ``jizz.signals`` when Media,
+    MediaReview or CountrySpecies rows change; see ``jizz.playable_species_index``.
+    """
+
+    country = models.ForeignKey(
+        Country,
+        on_delete=models.CASCADE,
+        related_name='playable_species_indexes',
+    )
+    statuses = models.CharField(
+        max_length=200,
+        help_text='Comma-separated, sorted CountrySpecies.status values.',
+    )
+    rarity = models.CharField(max_length=20, choices=Game.RARIT_CHOICES)
+    tax_family = models.CharField(max_length=200, blank=True, default='')
+    tax_order = models.CharField(max_length=200, blank=True, default='')
+    media_type = models.CharField(max_length=10)
+    entries = models.JSONField(default=dict, blank=True)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'playable species index'
+        verbose_name_plural = 'playable species indexes'
+        constraints = [
+            models.UniqueConstraint(
+                fields=('country', 'statuses', 'rarity', 'tax_family', 'tax_order', 'media_type'),
+                name='jizz_playablespeciesindex_unique_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.country_id} {self.media_type} {self.rarity} [{self.statuses}] ({len(self.entries)})'
+
+
 class Feedback(models.Model):
     user = models.ForeignKey(
         'auth.User',
@@ -1615,6 +1838,17 @@ class PushDevice(models.Model):
         return f'{self.user_id} {self.platform} ({self.expo_push_token[:24]}…)'
 
 
+class PushTicket(models.Model):
+    """Expo push ticket awaiting its receipt (see jizz.mobile_push.dispatch)."""
+
+    ticket_id = models.CharField(max_length=100, unique=True)
+    expo_push_token = models.CharField(max_length=500)
+    created = models.DateTimeField(auto_now_add=True, db_index=True)
+
+    def __str__(self):
+        return self.ticket_id
+
+
 class UsageEvent(models.Model):
     """First-party product analytics (page views and feature usage)."""
 
@@ -1652,7 +1886,8 @@ class UsageEvent(models.Model):
     session_key = models.CharField(max_length=64, blank=True, default='')
     user_agent = models.TextField(blank=True, default='')
     metadata = models.JSONField(default=dict, blank=True)
-    created_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    # Set when the event is built, not when the buffered writer inserts it.
+    created_at = models.DateTimeField(default=now, editable=False, db_index=True)
 
     class Meta:
         ordering = ['-created_at']
@@ -1671,6 +1906,117 @@ class UsageEvent(models.Model):
         return meta.get('proxy') or meta.get('_request') or {}
 
 
+class UsageRollup(models.Model):
+    """Pre-aggregated ``UsageEvent`` counts per hour or day (see ``jizz.usage_rollups``)."""
+
+    GRANULARITY_HOUR = 'hour'
+    GRANULARITY_DAY = 'day'
+    GRANULARITY_CHOICES = [
+        (GRANULARITY_HOUR, 'Hour'),
+        (GRANULARITY_DAY, 'Day'),
+    ]
+
+    granularity = models.CharField(max_length=4, choices=GRANULARITY_CHOICES)
+    period_start = models.DateTimeField()
+    path = models.CharField(max_length=500)
+    platform = models.CharField(max_length=20)
+    device_type = models.CharField(max_length=20)
+    event_type = models.CharField(max_length=20)
+    country_code = models.CharField(max_length=2, blank=True, default='')
+    events = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['granularity', 'period_start']),
+        ]
+
+    def __str__(self):
+        return f'{self.granularity} {self.period_start:%Y-%m-%d %H:%M} {self.path}: {self.events}'
+
+
+class UsageSessionSketch(models.Model):
+    """HyperLogLog sketch of distinct session keys per period and filter dimensions."""
+
+    granularity = models.CharField(max_length=4, choices=UsageRollup.GRANULARITY_CHOICES)
+    period_start = models.DateTimeField()
+    platform = models.CharField(max_length=20)
+    device_type = models.CharField(max_length=20)
+    event_type = models.CharField(max_length=20)
+    country_code = models.CharField(max_length=2, blank=True, default='')
+    sketch = models.BinaryField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['granularity', 'period_start']),
+        ]
+
+
+class UsageIpRollup(models.Model):
+    """Daily event counts per client IP (GeoIP country map and top IPs)."""
+
+    day = models.DateField()
+    ip_address = models.GenericIPAddressField()
+    platform = models.CharField(max_length=20)
+    device_type = models.CharField(max_length=20)
+    event_type = models.CharField(max_length=20)
+    country_code = models.CharField(max_length=2, blank=True, default='')
+    events = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['day']),
+        ]
+
+
+class UsageRollupState(models.Model):
+    """Singleton: raw events before ``rolled_until`` are covered by rollups."""
+
+    rolled_until = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def save(self, *args, **kwargs):
+        self.pk = 1
+        super().save(*args, **kwargs)
+
+    @classmethod
+    def load(cls):
+        obj, _ = cls.objects.get_or_create(pk=1)
+        return obj
+
+    def __str__(self):
+        return f'Usage rollups until {self.rolled_until}'
+
+
+class RequestProfile(models.Model):
+    """Sampled cost of one API request or quiz WebSocket action (see ``jizz.request_profiling``)."""
+
+    KIND_HTTP = 'http'
+    KIND_WEBSOCKET = 'ws'
+    KIND_CHOICES = [
+        (KIND_HTTP, 'HTTP'),
+        (KIND_WEBSOCKET, 'WebSocket'),
+    ]
+
+    kind = models.CharField(max_length=4, choices=KIND_CHOICES)
+    route = models.CharField(max_length=200)
+    method = models.CharField(max_length=10, blank=True, default='')
+    status_code = models.PositiveSmallIntegerField(null=True, blank=True)
+    queries = models.PositiveIntegerField(default=0)
+    db_ms = models.FloatField(default=0)
+    serializer_ms = models.FloatField(default=0)
+    response_bytes = models.PositiveIntegerField(default=0)
+    duration_ms = models.FloatField(default=0)
+    created = models.DateTimeField(default=now, db_index=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['route', 'created']),
+        ]
+
+    def __str__(self):
+        return f'{self.route} {self.duration_ms:.0f}ms {self.queries}q'
+
+
 class Flock(models.Model):
     """Persistent club/group of birders that runs standardized challenges."""
 
@@ -1935,3 +2281,136 @@ class IpGeoCache(models.Model):
             'city': self.city,
         }
 
+
+
+class ChannelLayerGroup(models.Model):
+    """Group membership for ``jizz.channel_layers.PostgresChannelLayer`` (shared by all workers)."""
+
+    group_name = models.CharField(max_length=100)
+    channel = models.CharField(max_length=100)
+    instance = models.CharField(
+        max_length=32,
+        db_index=True,
+        help_text='Layer instance (worker process) that owns the channel.',
+    )
+    expires_at = models.DateTimeField(db_index=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['group_name', 'channel'], name='jizz_channellayergroup_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.group_name} → {self.channel}'
+
+
+class ChannelLayerMessage(models.Model):
+    """Undelivered channel layer message, claimed by the owning worker on NOTIFY."""
+
+    instance = models.CharField(max_length=32, db_index=True)
+    channels = models.JSONField(default=list, help_text='Local channel names on that instance.')
+    payload = models.JSONField()
+    expires_at = models.DateTimeField(db_index=True)
+
+    def __str__(self):
+        return f'{self.instance} ({len(self.channels)} channels)'
+
+
+class SharedCacheEntry(models.Model):
+    """Shared tier of ``jizz.tiered_cache.TieredCache`` (UNLOGGED table; rows are disposable)."""
+
+    key = models.CharField(max_length=255, primary_key=True)
+    value = models.BinaryField()
+    expires_at = models.DateTimeField(db_index=True)
+    tags = models.JSONField(default=list, help_text='Invalidation tags, e.g. "country:NL:checklist".')
+
+    def __str__(self):
+        return self.key
+
+
+class Job(models.Model):
+    """Background job, leased and run by ``manage.py run_jobs`` (see jizz.job_queue)."""
+
+    STATUS_QUEUED = 'queued'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_QUEUED, 'Queued'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    uuid = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    name = models.CharField(max_length=100, help_text='Registered job task name.')
+    queue = models.CharField(max_length=50, default='default')
+    payload = models.JSONField(default=dict, blank=True)
+    priority = models.SmallIntegerField(default=0, help_text='Higher runs first.')
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_QUEUED)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    max_attempts = models.PositiveSmallIntegerField(default=3)
+    run_after = models.DateTimeField(default=now)
+    leased_until = models.DateTimeField(null=True, blank=True)
+    worker = models.CharField(max_length=100, blank=True)
+    result = models.JSONField(null=True, blank=True)
+    error = models.TextField(blank=True)
+    created = models.DateTimeField(auto_now_add=True)
+    finished = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'queue', '-priority', 'run_after'], name='jizz_job_claim_idx'),
+        ]
+
+    def __str__(self):
+        return f'{self.name} #{self.pk} ({self.status})'
+
+
+class QuestionPool(models.Model):
+    """
+    Ready-made question cards for one playable-species filter combination and level,
+    topped up by a background job and consumed by new games and Club Mix snapshots.
+    See ``jizz.question_pools``.
+    """
+
+    country = models.ForeignKey(
+        Country,
+        on_delete=models.CASCADE,
+        related_name='question_pools',
+    )
+    statuses = models.CharField(
+        max_length=200,
+        help_text='Comma-separated, sorted CountrySpecies.status values.',
+    )
+    rarity = models.CharField(max_length=20, choices=Game.RARIT_CHOICES)
+    tax_family = models.CharField(max_length=200, blank=True, default='')
+    tax_order = models.CharField(max_length=200, blank=True, default='')
+    media_type = models.CharField(max_length=10)
+    level = models.CharField(max_length=20)
+    last_requested = models.DateTimeField(default=now, db_index=True)
+    created = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=('country', 'statuses', 'rarity', 'tax_family', 'tax_order', 'media_type', 'level'),
+                name='jizz_questionpool_unique_key',
+            ),
+        ]
+
+    def __str__(self):
+        return f'{self.country_id} {self.level} {self.rarity} {self.media_type}'
+
+
+class QuestionPoolCard(models.Model):
+    """One pregenerated round: target species, locked media and the shuffled option ids."""
+
+    pool = models.ForeignKey(QuestionPool, related_name='cards', on_delete=models.CASCADE)
+    species = models.ForeignKey('jizz.Species', related_name='+', on_delete=models.CASCADE)
+    media = models.ForeignKey('media.Media', related_name='+', on_delete=models.CASCADE)
+    option_species_ids = models.JSONField(default=list)
+    created = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f'{self.pool_id} species={self.species_id} media={self.media_id}'
@@ -43,8 +43,11 @@ def send_welcome_email(user, site_url=None):
 
 
 def send_push_to_user(user, title, body, data=None):
-    """Send push notification to all devices of the user. Uses Expo Push API if SEND_PUSH_NOTIFICATIONS True."""
-    from jizz.mobile_push.expo import send_expo_push
+    """
+    Send push notification to all devices of the user. Uses Expo Push API if SEND_PUSH_NOTIFICATIONS True.
+    Inside ``jizz.mobile_push.dispatch.push_batch()`` the messages are queued and sent in batches.
+    """
+    from jizz.mobile_push.dispatch import queue_push
     from jizz.models import DeviceToken, PushDevice
 
     data = data or {}
@@ -57,8 +60,7 @@ def send_push_to_user(user, title, body, data=None):
     tokens.update(DeviceToken.objects.filter(user=user).values_list('token', flat=True))
     if not tokens:
         return
-    for token in tokens:
-        send_expo_push(token, title, body, data=data)
+    queue_push(sorted(tokens), title, body, data=data)
 
 
 def send_daily_challenge_reminder_email(user, challenge, round_obj, hours_left):
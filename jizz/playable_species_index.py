@@ -0,0 +1,315 @@
+"""
+Materialized playable-species index for question generation.
+
+One ``PlayableSpeciesIndex`` row per (country, status set, rarity tier, tax filter,
+media type) stores every species that can appear in such a game, together with its
+eligible media ids (same rules as ``media.review_state``). Question creation reads
+this instead of re-running the CountrySpecies / Media / MediaReview joins per round.
+
+Rows are built on first use (or by ``manage.py rebuild_playable_species_index``) and
+patched one species at a time from ``jizz.signals``. Committed rows are mirrored in the
+Django cache keyed by the filter combination, so brand-new games need no DB read.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, NamedTuple
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import BooleanField, ExpressionWrapper, OuterRef, Subquery
+
+from jizz.models import CountrySpecies, Game, PlayableSpeciesIndex, Species
+from jizz.tiered_cache import invalidate_tags, species_media_tag
+from media.models import Media
+from media.review_state import APPROVED_Q, REJECTED_Q
+
+_INDEX_CACHE_TTL = 60 * 10
+
+
+class PlayableIndexKey(NamedTuple):
+    country_id: str
+    statuses: str
+    rarity: str
+    tax_family: str
+    tax_order: str
+    media_type: str
+
+    @classmethod
+    def build(
+        cls,
+        country_id: str,
+        statuses: Iterable[str],
+        rarity: str | None,
+        media_type: str,
+        tax_family: str | None = None,
+        tax_order: str | None = None,
+    ) -> PlayableIndexKey:
+        """Normalize filters; a family filter wins over an order filter (as in games)."""
+        return cls(
+            country_id=country_id,
+            statuses=','.join(sorted(set(statuses))),
+            rarity=rarity or Game.RARIT_REGULAR,
+            tax_family=tax_family or '',
+            tax_order='' if tax_family else (tax_order or ''),
+            media_type=media_type,
+        )
+
+    @property
+    def status_list(self) -> list[str]:
+        return self.statuses.split(',') if self.statuses else []
+
+    def filter_kwargs(self) -> dict:
+        return dict(self._asdict())
+
+
+class PlayableSpecies(NamedTuple):
+    """Index entry; attribute names mirror ``Species`` so taxonomy helpers accept either."""
+
+    id: int
+    media_ids: tuple[int, ...]
+    frequency: str | None
+    taxonomic_genus_id: int | None
+    taxonomic_family_id: int | None
+    taxonomic_order_id: int | None
+    tax_ordering: float | None
+
+    @property
+    def media_count(self) -> int:
+        return len(self.media_ids)
+
+
+def _cache_key(key: PlayableIndexKey) -> str:
+    return 'jizz:playable_species:' + ':'.join(key).replace(' ', '_')
+
+
+def rarity_allows(rarity: str | None, frequency: str | None) -> bool:
+    """Python twin of ``Game.country_species_rarity_q``."""
+    tier = rarity or Game.RARIT_REGULAR
+    freqs = Game.RARIT_FREQUENCY_TIERS.get(tier, Game.RARIT_FREQUENCY_TIERS[Game.RARIT_REGULAR])
+    if frequency in freqs:
+        return True
+    return tier in (Game.RARIT_REGULAR, Game.RARIT_EXCEPTIONAL) and not frequency
+
+
+def _annotate_review_flags(media_qs):
+    return media_qs.annotate(
+        has_approved=ExpressionWrapper(APPROVED_Q, output_field=BooleanField()),
+        has_rejected=ExpressionWrapper(REJECTED_Q, output_field=BooleanField()),
+    )
+
+
+def _eligible_media_ids(flags: list[tuple[int, bool, bool]]) -> list[int]:
+    """Approved media if any, else media without a rejection (``count_eligible_media``)."""
+    approved = sorted(media_id for media_id, has_approved, _ in flags if has_approved)
+    if approved:
+        return approved
+    return sorted(media_id for media_id, _, has_rejected in flags if not has_rejected)
+
+
+def _entry(media_ids, frequency, genus_id, family_id, order_id, tax_ordering) -> list:
+    return [list(media_ids), frequency or None, genus_id, family_id, order_id, tax_ordering]
+
+
+def _parse_entries(entries: dict) -> dict[int, PlayableSpecies]:
+    return {
+        int(sid): PlayableSpecies(int(sid), tuple(row[0]), *row[1:6])
+        for sid, row in entries.items()
+    }
+
+
+def build_index_entries(key: PlayableIndexKey) -> dict[str, list]:
+    """Compute a full index row in one query (media joined to the filtered checklist)."""
+    country_species = CountrySpecies.objects.filter(
+        country_id=key.country_id,
+        status__in=key.status_list,
+    ).filter(Game.country_species_rarity_q(key.rarity))
+
+    media_qs = Media.objects.filter(
+        species_id__in=country_species.values('species_id'),
+        type=key.media_type,
+        hide=False,
+    )
+    if key.tax_family:
+        media_qs = media_qs.filter(species__taxonomic_family__name_latin=key.tax_family)
+    elif key.tax_order:
+        media_qs = media_qs.filter(species__taxonomic_order__name_latin=key.tax_order)
+
+    rows = _annotate_review_flags(media_qs).annotate(
+        cs_frequency=Subquery(
+            country_species.filter(species_id=OuterRef('species_id')).values('frequency')[:1]
+        ),
+    ).values_list(
+        'id',
+        'species_id',
+        'has_approved',
+        'has_rejected',
+        'cs_frequency',
+        'species__taxonomic_genus_id',
+        'species__taxonomic_family_id',
+        'species__taxonomic_order_id',
+        'species__tax_ordering',
+    )
+
+    flags_by_species: dict[int, list[tuple[int, bool, bool]]] = {}
+    info_by_species: dict[int, tuple] = {}
+    for media_id, species_id, has_approved, has_rejected, *info in rows:
+        flags_by_species.setdefault(species_id, []).append((media_id, has_approved, has_rejected))
+        info_by_species[species_id] = tuple(info)
+
+    return {
+        str(species_id): _entry(_eligible_media_ids(flags), *info_by_species[species_id])
+        for species_id, flags in flags_by_species.items()
+    }
+
+
+def _store_index_row(key: PlayableIndexKey, entries: dict) -> None:
+    PlayableSpeciesIndex.objects.bulk_create(
+        [PlayableSpeciesIndex(entries=entries, **key.filter_kwargs())],
+        update_conflicts=True,
+        unique_fields=['country', 'statuses', 'rarity', 'tax_family', 'tax_order', 'media_type'],
+        update_fields=['entries', 'updated'],
+    )
+
+
+def _publish(key: PlayableIndexKey, index: dict[int, PlayableSpecies]) -> None:
+    # Only committed state may reach the shared cache (rolled-back builds would leak).
+    cache_key = _cache_key(key)
+    transaction.on_commit(lambda: cache.set(cache_key, index, _INDEX_CACHE_TTL))
+
+
+def forget_playable_species(key: PlayableIndexKey) -> None:
+    cache_key = _cache_key(key)
+    cache.delete(cache_key)
+    transaction.on_commit(lambda: cache.delete(cache_key))
+
+
+def get_playable_species(key: PlayableIndexKey) -> dict[int, PlayableSpecies]:
+    """Species id -> entry for one filter combination; built and stored on first use."""
+    if not key.country_id or not key.statuses:
+        return {}
+    cached = cache.get(_cache_key(key))
+    if cached is not None:
+        return cached
+
+    entries = (
+        PlayableSpeciesIndex.objects.filter(**key.filter_kwargs())
+        .values_list('entries', flat=True)
+        .first()
+    )
+    if entries is None:
+        entries = build_index_entries(key)
+        _store_index_row(key, entries)
+
+    index = _parse_entries(entries)
+    _publish(key, index)
+    return index
+
+
+def _row_key(row: PlayableSpeciesIndex) -> PlayableIndexKey:
+    return PlayableIndexKey(
+        row.country_id, row.statuses, row.rarity, row.tax_family, row.tax_order, row.media_type
+    )
+
+
+@transaction.atomic
+def refresh_playable_species(
+    species_id: int,
+    *,
+    country_id: str | None = None,
+) -> int:
+    """
+    Recompute one species in every index row that may contain it.
+
+    Pass ``country_id`` when a CountrySpecies row changed or was deleted (the species may
+    no longer be on that checklist). Returns the number of index rows rewritten.
+    """
+    rows_qs = PlayableSpeciesIndex.objects.select_for_update().order_by('pk')
+    if country_id:
+        rows_qs = rows_qs.filter(country_id=country_id)
+    else:
+        rows_qs = rows_qs.filter(
+            country_id__in=CountrySpecies.objects.filter(species_id=species_id).values('country_id')
+        )
+    rows = list(rows_qs)
+    if not rows:
+        return 0
+
+    species = (
+        Species.objects.select_related('taxonomic_family', 'taxonomic_order')
+        .filter(pk=species_id)
+        .first()
+    )
+    checklist = {
+        cs_country: (status, frequency)
+        for cs_country, status, frequency in CountrySpecies.objects.filter(
+            species_id=species_id,
+            country_id__in={row.country_id for row in rows},
+        ).values_list('country_id', 'status', 'frequency')
+    }
+    flags_by_type: dict[str, list[tuple[int, bool, bool]]] = {}
+    media_rows = _annotate_review_flags(
+        Media.objects.filter(
+            species_id=species_id,
+            hide=False,
+            type__in={row.media_type for row in rows},
+        )
+    ).values_list('id', 'type', 'has_approved', 'has_rejected')
+    for media_id, media_type, has_approved, has_rejected in media_rows:
+        flags_by_type.setdefault(media_type, []).append((media_id, has_approved, has_rejected))
+
+    sid = str(species_id)
+    rewritten = 0
+    for row in rows:
+        entry = None
+        status, frequency = checklist.get(row.country_id, (None, None))
+        flags = flags_by_type.get(row.media_type)
+        if (
+            species is not None
+            and flags
+            and status in row.statuses.split(',')
+            and rarity_allows(row.rarity, frequency)
+            and (not row.tax_family or species.tax_family == row.tax_family)
+            and (not row.tax_order or species.tax_order == row.tax_order)
+        ):
+            entry = _entry(
+                _eligible_media_ids(flags),
+                frequency,
+                species.taxonomic_genus_id,
+                species.taxonomic_family_id,
+                species.taxonomic_order_id,
+                species.tax_ordering,
+            )
+        if entry is None:
+            if row.entries.pop(sid, None) is None:
+                continue
+        elif row.entries.get(sid) == entry:
+            continue
+        else:
+            row.entries[sid] = entry
+        row.save(update_fields=['entries', 'updated'])
+        forget_playable_species(_row_key(row))
+        rewritten += 1
+    return rewritten
+
+
+def refresh_playable_species_many(species_ids: Iterable[int]) -> int:
+    """Refresh after bulk media updates (``QuerySet.update`` skips signals)."""
+    species_ids = set(species_ids)
+    invalidate_tags(*(species_media_tag(sid) for sid in species_ids))
+    return sum(refresh_playable_species(sid) for sid in species_ids)
+
+
+def rebuild_playable_species_index(country_id: str | None = None) -> int:
+    """Recompute every stored row (optionally one country) from scratch."""
+    rows = PlayableSpeciesIndex.objects.order_by('pk')
+    if country_id:
+        rows = rows.filter(country_id=country_id)
+    rebuilt = 0
+    for values in rows.values_list(*PlayableIndexKey._fields):
+        key = PlayableIndexKey(*values)
+        with transaction.atomic():
+            _store_index_row(key, build_index_entries(key))
+        forget_playable_species(key)
+        rebuilt += 1
+    return rebuilt
@@ -8,9 +8,10 @@ from collections import defaultdict
 
 from django.db.models import Prefetch
 
-from jizz.models import Game, Question, QuestionOption, SpeciesName
+from jizz.models import Game, Question, QuestionOption, Species, SpeciesName
 from jizz.serializers import QuestionPlaySerializer
-from media.models import Media, MediaReview
+from media.models import Media
+from media.review_state import eligible_media_list
 
 
 def rotate_media_list_for_play(items: list[Media], active_index: int) -> list[Media]:
@@ -28,27 +29,6 @@ def rotate_media_list_for_play(items: list[Media], active_index: int) -> list[Me
     return items[idx:] + items[:idx]
 
 
-def _eligible_media_list(media_rows: list[Media]) -> list[Media]:
-    """Same rules as Species._eligible_media, in Python after prefetch reviews."""
-    if not media_rows:
-        return []
-    approved = []
-    fallback = []
-    for m in media_rows:
-        reviews = list(m.reviews.all())
-        if not reviews:
-            fallback.append(m)
-            continue
-        latest = max(reviews, key=lambda r: r.id)
-        if latest.review_type == MediaReview.APPROVED:
-            approved.append(m)
-        elif latest.review_type != MediaReview.REJECTED:
-            fallback.append(m)
-    if approved:
-        return sorted(approved, key=lambda m: m.id)
-    return sorted(fallback, key=lambda m: m.id)
-
-
 def fetch_eligible_media_for_species(species_id: int, media_type: str) -> list[Media]:
     rows = list(
         Media.objects.filter(
@@ -56,10 +36,9 @@ def fetch_eligible_media_for_species(species_id: int, media_type: str) -> list[M
             type=media_type,
             hide=False,
         )
-        .prefetch_related('reviews')
         .order_by('id')
     )
-    return _eligible_media_list(rows)
+    return eligible_media_list(rows)
 
 
 def prefetch_eligible_media_by_species(
@@ -74,14 +53,13 @@ def prefetch_eligible_media_by_species(
             type=media_type,
             hide=False,
         )
-        .prefetch_related('reviews')
         .order_by('id')
     )
     by_species: dict[int, list[Media]] = defaultdict(list)
     for row in rows:
         by_species[row.species_id].append(row)
     return {
-        sid: _eligible_media_list(items)
+        sid: eligible_media_list(items)
         for sid, items in by_species.items()
     }
 
@@ -101,13 +79,20 @@ def load_question_for_play(question_id: int) -> Question:
     )
 
 
-def build_play_serializer_context(question: Question) -> dict:
+def build_play_serializer_context(
+    question: Question,
+    option_species_ids: list[int] | None = None,
+) -> dict:
+    """``option_species_ids`` replaces ``question.options`` for rounds without option rows."""
     game = question.game
     media_type = {'images': 'image', 'video': 'video', 'audio': 'audio'}.get(
         game.media, 'image'
     )
     species_ids = [question.species_id]
-    species_ids.extend(opt.species_id for opt in question.options.all())
+    if option_species_ids is None:
+        species_ids.extend(opt.species_id for opt in question.options.all())
+    else:
+        species_ids.extend(option_species_ids)
 
     locked_media = None
     if question.media_id:
@@ -152,6 +137,23 @@ def serialize_question_for_play(question: Question) -> dict:
     return QuestionPlaySerializer(question, context=ctx).data
 
 
+def serialize_planned_question_for_play(
+    game: Game,
+    species_id: int,
+    number: int,
+    option_species_ids: list[int],
+) -> dict:
+    """
+    Play payload for a round that has no Question row yet; ``id`` and ``sequence`` are
+    filled in when the round is created (see ``jizz.question_prefetch``).
+    """
+    question = Question(game=game, species_id=species_id, number=number)
+    ctx = build_play_serializer_context(question, option_species_ids=option_species_ids)
+    species_by_id = Species.objects.in_bulk(option_species_ids)
+    ctx['play_option_species'] = [species_by_id[sid] for sid in option_species_ids if sid in species_by_id]
+    return QuestionPlaySerializer(question, context=ctx).data
+
+
 def advance_question_media_after_exclusion(
     question: Question,
     excluded_media_id: int | None = None,
@@ -0,0 +1,183 @@
+"""
+Pregenerated question pools for instant game starts and Club Mix snapshots.
+
+A ``QuestionPool`` holds ready-made ``QuestionPoolCard`` rows (target species, locked
+media, shuffled option ids) for one playable-species filter combination plus game level.
+New standard games and Club Mix snapshots take cards with ``take_cards`` (``FOR UPDATE
+SKIP LOCKED``, so concurrent callers never share a card). That avoids running target and
+media selection on the request path. Taking cards that leaves a pool below half of
+``QUESTION_POOL_SIZE`` queues the ``replenish_question_pool`` job (``manage.py run_jobs``);
+``manage.py replenish_question_pools`` tops up every recently used pool from cron.
+
+Cards are checked against the playable species index when taken, so a card whose media
+was hidden or rejected after generation is dropped instead of played.
+"""
+
+from __future__ import annotations
+
+import random
+from datetime import timedelta
+from typing import Iterable
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+from jizz.game_question_selection import (
+    _create_question_with_options,
+    _next_sequence_and_question_count,
+    advanced_option_species,
+    beginner_option_species,
+    playable_index_key,
+)
+from jizz.models import Game, Job, Question, QuestionPool, QuestionPoolCard
+from jizz.playable_species_index import PlayableIndexKey, PlayableSpecies, get_playable_species
+
+# Touch ``QuestionPool.last_requested`` at most this often per pool.
+_REQUESTED_RESOLUTION = timedelta(minutes=10)
+
+
+def pool_size() -> int:
+    return int(getattr(settings, 'QUESTION_POOL_SIZE', 40))
+
+
+def pool_index_key(pool: QuestionPool) -> PlayableIndexKey:
+    return PlayableIndexKey(
+        pool.country_id, pool.statuses, pool.rarity, pool.tax_family, pool.tax_order, pool.media_type
+    )
+
+
+def get_pool(key: PlayableIndexKey, level: str) -> QuestionPool:
+    pool, created = QuestionPool.objects.get_or_create(level=level, **key.filter_kwargs())
+    if not created and pool.last_requested < timezone.now() - _REQUESTED_RESOLUTION:
+        pool.last_requested = timezone.now()
+        QuestionPool.objects.filter(pk=pool.pk).update(last_requested=pool.last_requested)
+    return pool
+
+
+def pool_for_game(game: Game) -> QuestionPool | None:
+    """The pool a game may draw its rounds from, or None when its rounds are personalised."""
+    if (
+        pool_size() <= 0
+        or game.game_type != Game.GAME_TYPE_STANDARD
+        or game.dificult_species
+        or game.questions_pregenerated
+        or not game.country_id
+    ):
+        return None
+    return get_pool(playable_index_key(game), game.level)
+
+
+def _option_species_ids(level: str, option_ids: list[int], answer: PlayableSpecies, playable) -> list[int]:
+    if level == 'advanced':
+        options = advanced_option_species(option_ids, answer, species_by_id=playable)
+    elif level == 'beginner':
+        options = beginner_option_species(option_ids, answer, species_by_id=playable)
+    else:
+        return []
+    ids = [opt.id for opt in options]
+    random.shuffle(ids)
+    return ids
+
+
+def build_cards(pool: QuestionPool, count: int, exclude_species_ids: Iterable[int] = ()) -> list[QuestionPoolCard]:
+    """Up to ``count`` unsaved cards for species not in ``exclude_species_ids``."""
+    playable = get_playable_species(pool_index_key(pool))
+    option_ids = sorted(playable)
+    exclude = set(exclude_species_ids)
+    fresh = [sid for sid in option_ids if sid not in exclude and playable[sid].media_ids]
+    cards = []
+    for sid in random.sample(fresh, min(count, len(fresh))):
+        entry = playable[sid]
+        cards.append(QuestionPoolCard(
+            pool=pool,
+            species_id=sid,
+            media_id=random.choice(entry.media_ids),
+            option_species_ids=_option_species_ids(pool.level, option_ids, entry, playable),
+        ))
+    return cards
+
+
+def replenish_pool(pool: QuestionPool) -> int:
+    """Top the pool up to ``QUESTION_POOL_SIZE`` cards of distinct species; returns cards added."""
+    have = list(pool.cards.values_list('species_id', flat=True))
+    need = pool_size() - len(have)
+    if need <= 0:
+        return 0
+    cards = build_cards(pool, need, exclude_species_ids=have)
+    QuestionPoolCard.objects.bulk_create(cards)
+    return len(cards)
+
+
+def schedule_replenish(pool: QuestionPool) -> None:
+    from jizz.job_queue import enqueue
+
+    already_queued = Job.objects.filter(
+        name='replenish_question_pool',
+        status__in=(Job.STATUS_QUEUED, Job.STATUS_RUNNING),
+        payload__pool_id=pool.pk,
+    ).exists()
+    if not already_queued:
+        enqueue('replenish_question_pool', {'pool_id': pool.pk})
+
+
+def take_cards(
+    pool: QuestionPool,
+    count: int,
+    exclude_species_ids: Iterable[int] = (),
+) -> list[QuestionPoolCard]:
+    """
+    Remove and return up to ``count`` cards of distinct species not in ``exclude_species_ids``.
+
+    Cards whose species or media is no longer playable are deleted as well and not returned.
+    """
+    playable = get_playable_species(pool_index_key(pool))
+    exclude = set(exclude_species_ids)
+    taken: list[QuestionPoolCard] = []
+    spent: list[int] = []
+    with transaction.atomic():
+        rows = (
+            pool.cards.select_for_update(skip_locked=True)
+            .exclude(species_id__in=exclude)
+            .order_by('pk')[:count * 2 + 5]
+        )
+        for card in rows:
+            if len(taken) >= count:
+                break
+            entry = playable.get(card.species_id)
+            if entry is None or card.media_id not in entry.media_ids:
+                spent.append(card.pk)
+            elif card.species_id not in exclude:
+                exclude.add(card.species_id)
+                taken.append(card)
+                spent.append(card.pk)
+        if spent:
+            QuestionPoolCard.objects.filter(pk__in=spent).delete()
+        if pool.cards.count() < pool_size() // 2:
+            transaction.on_commit(lambda: schedule_replenish(pool))
+    return taken
+
+
+def take_question_from_pool(game: Game) -> Question | None:
+    """
+    Create the game's next round from a pool card (caller holds the game lock); None when
+    the game cannot use pools or no card with an unused species is ready.
+    """
+    pool = pool_for_game(game)
+    if pool is None:
+        return None
+    used = set(game.questions.values_list('species_id', flat=True))
+    used.update(game.prepared_questions.values_list('species_id', flat=True))
+    cards = take_cards(pool, 1, exclude_species_ids=used)
+    if not cards:
+        return None
+    card = cards[0]
+    entry = get_playable_species(pool_index_key(pool))[card.species_id]
+    sequence, _ = _next_sequence_and_question_count(game)
+    return _create_question_with_options(
+        game,
+        card.species_id,
+        entry.media_ids.index(card.media_id),
+        sequence,
+        card.option_species_ids,
+    )
@@ -0,0 +1,156 @@
+"""
+Rolling question look-ahead for lazily generated games.
+
+While a round is played, ``prepare_questions`` keeps the next ``QUESTION_LOOKAHEAD``
+rounds of a standard or extreme game planned as ``PreparedQuestion`` rows (target, media
+index, options and the play payload). ``Game.add_question`` turns the oldest one into the
+next Question with two inserts and no species selection, and the quiz consumer broadcasts
+its stored payload. The payload's media ids are first compared with the target's eligible
+media; a round whose media was hidden, reviewed or added since is dropped and the round
+is generated on demand instead. Refills run on a small per-process thread pool once the advancing
+transaction commits; ``QUESTION_PREFETCH_BACKGROUND = False`` runs them inline (tests).
+
+Pregenerated games (flocks) and practice games, whose targets follow the latest answers,
+keep generating on demand.
+"""
+
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import Max
+
+from jizz.game_question_selection import PlannedQuestion, create_planned_question, plan_question_for_game
+from jizz.models import Game, PreparedQuestion, Question
+from jizz.question_play import fetch_eligible_media_for_species, serialize_planned_question_for_play
+
+logger = logging.getLogger(__name__)
+
+_ON_DEMAND_GAME_TYPES = frozenset((
+    Game.GAME_TYPE_FLOCK_CHALLENGE,
+    Game.GAME_TYPE_PAIR_PRACTICE,
+    Game.GAME_TYPE_SPECIES_PRACTICE,
+))
+
+_executor = ThreadPoolExecutor(max_workers=2, thread_name_prefix='question-prefetch')
+# game id -> another refill was requested while this one ran
+_in_flight: dict[int, bool] = {}
+_in_flight_lock = threading.Lock()
+
+
+def prefetch_enabled(game: Game) -> bool:
+    return (
+        settings.QUESTION_LOOKAHEAD > 0
+        and not game.questions_pregenerated
+        and game.game_type not in _ON_DEMAND_GAME_TYPES
+    )
+
+
+def prepare_questions(game_id: int) -> int:
+    """Top up the game's prepared rounds to ``QUESTION_LOOKAHEAD``; returns rows added."""
+    game = Game.objects.select_related('country').get(pk=game_id)
+    if not prefetch_enabled(game) or game.force_ended:
+        return 0
+    prepared = list(game.prepared_questions.order_by('pk').values_list('species_id', flat=True))
+    remaining = game.length - game.questions.count() - len(prepared)
+    wanted = min(settings.QUESTION_LOOKAHEAD - len(prepared), remaining)
+
+    # Plan without holding the game lock so a concurrent advance never waits on this.
+    planned = list(prepared)
+    rows = []
+    for _ in range(wanted):
+        try:
+            plan = plan_question_for_game(game, planned)
+        except ValueError:
+            break
+        options = list(plan.option_species_ids)
+        rows.append(PreparedQuestion(
+            game=game,
+            species_id=plan.species_id,
+            number=plan.number,
+            option_species_ids=options,
+            payload=serialize_planned_question_for_play(game, plan.species_id, plan.number, options),
+        ))
+        planned.append(plan.species_id)
+    if not rows:
+        return 0
+
+    with transaction.atomic():
+        Game.objects.select_for_update(of=('self',)).get(pk=game_id)
+        current = list(game.prepared_questions.order_by('pk').values_list('species_id', flat=True))
+        if current != prepared:
+            # Another refill or an advance got in between; the next refill starts over.
+            return 0
+        PreparedQuestion.objects.bulk_create(rows)
+    return len(rows)
+
+
+def _payload_media_current(game: Game, prepared: PreparedQuestion) -> bool:
+    """Whether the stored payload still lists exactly the target's eligible media."""
+    media_type = {'images': 'image', 'video': 'video', 'audio': 'audio'}.get(game.media, 'image')
+    field = {'image': 'images', 'video': 'videos', 'audio': 'sounds'}[media_type]
+    stored = {item['id'] for item in prepared.payload.get(field) or ()}
+    eligible = {media.id for media in fetch_eligible_media_for_species(prepared.species_id, media_type)}
+    return bool(eligible) and stored == eligible
+
+
+def take_prepared_question(game: Game) -> Question | None:
+    """
+    Create the next Question from the oldest prepared round (caller holds the game lock
+    in ``Game.add_question``). The returned question carries ``play_payload``.
+    """
+    prepared = game.prepared_questions.order_by('pk').first()
+    if prepared is None:
+        return None
+    if not _payload_media_current(game, prepared):
+        logger.info('Prepared round %s of game %s has stale media; generating it on demand', prepared.pk, game.pk)
+        prepared.delete()
+        return None
+    sequence = (game.questions.aggregate(max_seq=Max('sequence'))['max_seq'] or 0) + 1
+    question = create_planned_question(game, PlannedQuestion(
+        species_id=prepared.species_id,
+        number=prepared.number,
+        sequence=sequence,
+        option_species_ids=tuple(prepared.option_species_ids),
+    ))
+    prepared.delete()
+    question.play_payload = {**prepared.payload, 'id': question.pk, 'sequence': sequence, 'done': False}
+    return question
+
+
+def _prepare_logged(game_id: int) -> None:
+    try:
+        prepare_questions(game_id)
+    except Exception:
+        logger.exception('Preparing questions for game %s failed', game_id)
+
+
+def _prepare_in_background(game_id: int) -> None:
+    close_old_connections()
+    try:
+        while True:
+            _prepare_logged(game_id)
+            with _in_flight_lock:
+                if not _in_flight[game_id]:
+                    del _in_flight[game_id]
+                    return
+                _in_flight[game_id] = False
+    finally:
+        close_old_connections()
+
+
+def schedule_question_prefetch(game_id: int) -> None:
+    """Refill the game's look-ahead off the request path (at most one refill per game)."""
+    if not settings.QUESTION_PREFETCH_BACKGROUND:
+        _prepare_logged(game_id)
+        return
+    with _in_flight_lock:
+        if game_id in _in_flight:
+            _in_flight[game_id] = True
+            return
+        _in_flight[game_id] = False
+    _executor.submit(_prepare_in_background, game_id)
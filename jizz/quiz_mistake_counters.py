@@ -0,0 +1,166 @@
+"""
+Counter tables behind ``jizz.quiz_mistake_stats``.
+
+- ``SpeciesMistakeStat``: per species, picks (correct/wrong) and times it was the target
+  (and missed).
+- ``ConfusionPairStat``: wrong answers per directed (target, picked) pair.
+- ``UserMistakeStat``: answers per (user, target, picked) for trouble spots and
+  personalized question weighting.
+
+Counts are global, like the aggregates they replace: the country filter on the data
+pages is a checklist filter on species, not the country of the game.
+
+``apply_answer`` adds a new Answer to all three tables in one statement (from
+``jizz.signals``); deleting an answer subtracts it again and linking a guest player
+rebuilds that user's rows. ``manage.py rebuild_mistake_stats`` recomputes everything
+from ``Answer`` and ``manage.py check_mistake_stats`` reports (and with ``--fix``
+repairs) drift.
+"""
+
+from __future__ import annotations
+
+from django.db import connection, transaction
+
+from jizz.models import (
+    Answer,
+    ConfusionPairStat,
+    Player,
+    PlayerScore,
+    Question,
+    SpeciesMistakeStat,
+    UserMistakeStat,
+)
+
+_SPECIES = SpeciesMistakeStat._meta.db_table
+_PAIRS = ConfusionPairStat._meta.db_table
+_USERS = UserMistakeStat._meta.db_table
+
+# Rows (target, pick, correct, user_id, delta) for the answers matching ``{where}``.
+_ANSWER_SOURCE = f"""
+SELECT q.species_id AS target, an.answer_id AS pick, an.correct, p.user_id, 1 AS delta
+FROM {Answer._meta.db_table} an
+JOIN {Question._meta.db_table} q ON q.id = an.question_id
+LEFT JOIN {PlayerScore._meta.db_table} ps ON ps.id = an.player_score_id
+LEFT JOIN {Player._meta.db_table} p ON p.id = ps.player_id
+WHERE {{where}}
+"""
+
+_SPECIES_ROWS = """
+SELECT species_id, SUM(times_picked) AS times_picked, SUM(picked_correct) AS picked_correct,
+       SUM(picked_wrong) AS picked_wrong, SUM(times_target) AS times_target,
+       SUM(target_wrong) AS target_wrong
+FROM (
+    SELECT pick AS species_id, delta AS times_picked,
+           CASE WHEN correct THEN delta ELSE 0 END AS picked_correct,
+           CASE WHEN correct THEN 0 ELSE delta END AS picked_wrong,
+           0 AS times_target, 0 AS target_wrong
+    FROM a
+    UNION ALL
+    SELECT target, 0, 0, 0, delta, CASE WHEN correct THEN 0 ELSE delta END FROM a
+) x
+GROUP BY species_id
+"""
+_PAIR_ROWS = """
+SELECT target AS target_id, pick AS picked_id, SUM(delta) AS wrong
+FROM a WHERE NOT correct AND pick <> target
+GROUP BY target, pick
+"""
+_USER_ROWS = """
+SELECT user_id, target AS target_id, pick AS picked_id, SUM(delta) AS answers
+FROM a WHERE user_id IS NOT NULL
+GROUP BY user_id, target, pick
+"""
+
+_SPECIES_COLUMNS = ('times_picked', 'picked_correct', 'picked_wrong', 'times_target', 'target_wrong')
+_TABLES = (
+    # table, key columns, counter columns, rows from ``a``
+    (_SPECIES, ('species_id',), _SPECIES_COLUMNS, _SPECIES_ROWS),
+    (_PAIRS, ('target_id', 'picked_id'), ('wrong',), _PAIR_ROWS),
+    (_USERS, ('user_id', 'target_id', 'picked_id'), ('answers',), _USER_ROWS),
+)
+
+
+def _apply_sql(source: str) -> str:
+    """One statement adding ``source`` rows to every counter table."""
+    statements = []
+    for table, keys, counters, rows in _TABLES:
+        columns = ', '.join((*keys, *counters))
+        updates = ', '.join(f'{name} = {table}.{name} + EXCLUDED.{name}' for name in counters)
+        statements.append(
+            f'INSERT INTO {table} ({columns}) SELECT {columns} FROM ({rows}) r '
+            f'ON CONFLICT ({", ".join(keys)}) DO UPDATE SET {updates}'
+        )
+    species, pairs, users = statements
+    return f'WITH a AS ({source}), species AS ({species}), pairs AS ({pairs}) {users}'
+
+
+_APPLY_ANSWER_SQL = _apply_sql(_ANSWER_SOURCE.format(where='an.id = %s'))
+_UNDO_ANSWER_SQL = _apply_sql(
+    'SELECT %s::bigint AS target, %s::bigint AS pick, %s::boolean AS correct, '
+    '%s::integer AS user_id, -1 AS delta'
+)
+_REBUILD_SQL = _apply_sql(_ANSWER_SOURCE.format(where='TRUE'))
+
+
+def apply_answer(answer_id: int) -> None:
+    with connection.cursor() as cursor:
+        cursor.execute(_APPLY_ANSWER_SQL, [answer_id])
+
+
+def undo_answer(answer: Answer) -> None:
+    """Subtract a deleted answer (its question and player score still exist during cascades)."""
+    target = Question.objects.filter(pk=answer.question_id).values_list('species_id', flat=True).first()
+    if target is None:
+        return
+    user_id = (
+        PlayerScore.objects.filter(pk=answer.player_score_id).values_list('player__user_id', flat=True).first()
+        if answer.player_score_id
+        else None
+    )
+    with connection.cursor() as cursor:
+        cursor.execute(_UNDO_ANSWER_SQL, [target, answer.answer_id, answer.correct, user_id])
+
+
+@transaction.atomic
+def rebuild_user_mistake_stats(user_id: int) -> None:
+    UserMistakeStat.objects.filter(user_id=user_id).delete()
+    # Only the user table: the global counters already include these answers.
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'WITH a AS ({_ANSWER_SOURCE.format(where="p.user_id = %s")}) '
+            f'INSERT INTO {_USERS} (user_id, target_id, picked_id, answers) '
+            f'SELECT user_id, target_id, picked_id, answers FROM ({_USER_ROWS}) r',
+            [user_id],
+        )
+
+
+@transaction.atomic
+def rebuild_mistake_stats() -> dict[str, int]:
+    """Recompute all counter tables from ``Answer``; returns row counts."""
+    for model in (SpeciesMistakeStat, ConfusionPairStat, UserMistakeStat):
+        model.objects.all().delete()
+    with connection.cursor() as cursor:
+        cursor.execute(_REBUILD_SQL)
+    return {
+        'species': SpeciesMistakeStat.objects.count(),
+        'pairs': ConfusionPairStat.objects.count(),
+        'users': UserMistakeStat.objects.count(),
+    }
+
+
+def check_mistake_stats() -> dict[str, int]:
+    """Rows per table whose stored counters differ from a fresh aggregate over ``Answer``."""
+    source = _ANSWER_SOURCE.format(where='TRUE')
+    mismatches = {}
+    for label, (table, keys, counters, rows) in zip(('species', 'pairs', 'users'), _TABLES):
+        differs = ' OR '.join(
+            f'COALESCE(e.{name}, 0) <> COALESCE(s.{name}, 0)' for name in counters
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f'WITH a AS ({source}) '
+                f'SELECT COUNT(*) FROM ({rows}) e FULL JOIN {table} s USING ({", ".join(keys)}) '
+                f'WHERE {differs}'
+            )
+            mismatches[label] = cursor.fetchone()[0]
+    return mismatches
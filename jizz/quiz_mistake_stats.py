@@ -1,5 +1,8 @@
 """
 Aggregates for quiz mistake analytics (public data pages).
+
+Global and per-user counts are read from the counter tables maintained by
+``jizz.quiz_mistake_counters``; only guest (player-scoped) weights still scan ``Answer``.
 """
 
 from __future__ import annotations
@@ -9,11 +12,21 @@ from collections import defaultdict
 from io import StringIO
 from typing import Any
 
-from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery
+from django.db.models import Count, F, IntegerField, OuterRef, Q, Subquery, Sum
 from django.db.models.functions import Coalesce
 from django.http import HttpRequest, HttpResponse
 
-from jizz.models import Answer, Country, CountrySpecies, Question, QuestionOption, Species
+from jizz.models import (
+    Answer,
+    ConfusionPairStat,
+    Country,
+    CountrySpecies,
+    Question,
+    QuestionOption,
+    Species,
+    SpeciesMistakeStat,
+    UserMistakeStat,
+)
 
 # Include a species only when it was picked at least this many times (all countries).
 MIN_TIMES_SHOWN = 10
@@ -77,10 +90,6 @@ def _target_error_rate_pct(wrong: int, times_shown: int) -> float | None:
     return 100.0 * wrong / times_shown
 
 
-def _user_answers_qs(user_id: int):
-    return Answer.objects.filter(player_score__player__user_id=user_id)
-
-
 def get_species_mistake_rows(country_code: str | None = None) -> list[dict[str, Any]]:
     """
     Per species (only when the player explicitly picked the species):
@@ -96,49 +105,27 @@ def get_species_mistake_rows(country_code: str | None = None) -> list[dict[str,
     """
     cc = normalize_country_filter(country_code)
     min_picks = min_times_shown_for_filter(country_code)
-    answers = Answer.objects.all()
+    stats = SpeciesMistakeStat.objects.filter(times_picked__gte=min_picks)
     if cc:
         allowed = _allowed_species_ids_for_country(cc)
         if not allowed:
             return []
-        answers = answers.filter(answer_id__in=allowed)
-
-    times_shown = {
-        row["answer_id"]: row["c"]
-        for row in answers.values("answer_id").annotate(c=Count("id"))
-    }
-
-    picked_correct = {
-        row["answer_id"]: row["c"]
-        for row in answers.filter(correct=True).values("answer_id").annotate(c=Count("id"))
-    }
-    picked_wrong = {
-        row["answer_id"]: row["c"]
-        for row in answers.filter(correct=False).values("answer_id").annotate(c=Count("id"))
-    }
-
-    ids = set(times_shown) | set(picked_correct) | set(picked_wrong)
-    ids.discard(None)
-    if not ids:
-        return []
-
-    species_map = Species.objects.in_bulk(ids)
+        stats = stats.filter(species_id__in=allowed)
 
     rows: list[dict[str, Any]] = []
-    for sid in ids:
-        sp = species_map.get(sid)
-        if sp is None:
-            continue
-        ts = times_shown.get(sid, 0)
-        if ts < min_picks:
-            continue
-        cor = picked_correct.get(sid, 0)
-        wr = picked_wrong.get(sid, 0)
+    for sid, name, name_latin, ts, cor, wr in stats.values_list(
+        "species_id",
+        "species__name",
+        "species__name_latin",
+        "times_picked",
+        "picked_correct",
+        "picked_wrong",
+    ):
         rows.append(
             {
                 "species_id": sid,
-                "name": sp.name,
-                "name_latin": sp.name_latin,
+                "name": name,
+                "name_latin": name_latin,
                 "times_shown": ts,
                 "correctly_answered": cor,
                 "wrongly_answered": wr,
@@ -192,20 +179,14 @@ def get_top_mistake_target_species_ids(
     cc = normalize_country_filter(country_code)
     threshold = min_wrong if min_wrong is not None else min_times_shown_for_filter(country_code)
 
-    wrong_answers = Answer.objects.filter(correct=False)
+    stats = SpeciesMistakeStat.objects.filter(target_wrong__gte=max(threshold, 1))
     if cc:
         allowed = _allowed_species_ids_for_country(cc)
         if not allowed:
             return []
-        wrong_answers = wrong_answers.filter(question__species_id__in=allowed)
+        stats = stats.filter(species_id__in=allowed)
 
-    rows = list(
-        wrong_answers.values("question__species_id")
-        .annotate(wrongly_answered=Count("id"))
-        .filter(wrongly_answered__gte=threshold)
-        .order_by("-wrongly_answered")
-    )
-    return [row["question__species_id"] for row in rows[:limit]]
+    return list(stats.order_by("-target_wrong").values_list("species_id", flat=True)[:limit])
 
 
 def get_user_mistake_target_weights(
@@ -222,17 +203,22 @@ def get_user_mistake_target_weights(
     if not player_id and not user_id:
         return {}
 
-    wrong_answers = Answer.objects.filter(correct=False)
-    if user_id:
-        wrong_answers = wrong_answers.filter(player_score__player__user_id=user_id)
-    else:
-        wrong_answers = wrong_answers.filter(player_score__player_id=player_id)
-
     cc = normalize_country_filter(country_code)
+    allowed: frozenset[int] | None = None
     if cc:
         allowed = _allowed_species_ids_for_country(cc)
         if not allowed:
             return {}
+
+    if user_id:
+        stats = UserMistakeStat.objects.filter(user_id=user_id, answers__gt=0).exclude(picked_id=F("target_id"))
+        if allowed is not None:
+            stats = stats.filter(target_id__in=allowed)
+        rows = stats.values("target_id").annotate(wrongly_answered=Sum("answers"))
+        return {row["target_id"]: row["wrongly_answered"] for row in rows}
+
+    wrong_answers = Answer.objects.filter(correct=False, player_score__player_id=player_id)
+    if allowed is not None:
         wrong_answers = wrong_answers.filter(question__species_id__in=allowed)
 
     return {
@@ -258,21 +244,31 @@ def get_wrong_pick_weights_for_target(
     if not target_species_id:
         return {}
 
-    wrong_answers = Answer.objects.filter(
-        correct=False,
-        question__species_id=target_species_id,
-    ).exclude(answer_id=target_species_id)
-
-    if user_id:
-        wrong_answers = wrong_answers.filter(player_score__player__user_id=user_id)
-    elif player_id:
-        wrong_answers = wrong_answers.filter(player_score__player_id=player_id)
-
     cc = normalize_country_filter(country_code)
+    allowed: frozenset[int] | None = None
     if cc:
         allowed = _allowed_species_ids_for_country(cc)
         if not allowed:
             return {}
+
+    if user_id or not player_id:
+        if user_id:
+            stats = UserMistakeStat.objects.filter(user_id=user_id, target_id=target_species_id).values_list(
+                "picked_id", "answers"
+            )
+        else:
+            stats = ConfusionPairStat.objects.filter(target_id=target_species_id).values_list("picked_id", "wrong")
+        stats = stats.exclude(picked_id=target_species_id)
+        if allowed is not None:
+            stats = stats.filter(picked_id__in=allowed)
+        return {picked_id: count for picked_id, count in stats if count > 0}
+
+    wrong_answers = Answer.objects.filter(
+        correct=False,
+        question__species_id=target_species_id,
+        player_score__player_id=player_id,
+    ).exclude(answer_id=target_species_id)
+    if allowed is not None:
         wrong_answers = wrong_answers.filter(answer_id__in=allowed)
 
     return {
@@ -306,7 +302,7 @@ def get_user_trouble_spot_rows(
     country_code: str | None = None,
 ) -> tuple[list[dict[str, Any]], list[dict[str, Any]]]:
     """
-    Species mistake rows and confusion pair rows for one user in a single Answer scan.
+    Species mistake rows and confusion pair rows for one user from their UserMistakeStat rows.
     """
     if not user_id:
         return [], []
@@ -318,46 +314,39 @@ def get_user_trouble_spot_rows(
         if not allowed:
             return [], []
 
-    answers = _user_answers_qs(user_id).values_list(
-        'question__species_id',
-        'answer_id',
-        'correct',
+    stats = UserMistakeStat.objects.filter(user_id=user_id, answers__gt=0).values_list(
+        'target_id',
+        'picked_id',
+        'answers',
     )
     if allowed is not None:
-        answers = answers.filter(
-            question__species_id__in=allowed,
-            answer_id__in=allowed,
-        )
+        stats = stats.filter(target_id__in=allowed, picked_id__in=allowed)
 
     species_times: dict[int, int] = defaultdict(int)
     species_wrong: dict[int, int] = defaultdict(int)
     pair_map: dict[tuple[int, int], dict[str, Any]] = {}
 
-    for target_id, pick_id, correct in answers.iterator(chunk_size=2000):
-        if target_id is None:
+    for target_id, pick_id, count in stats:
+        species_times[target_id] += count
+        if pick_id == target_id:
             continue
-        species_times[target_id] += 1
-        if not correct:
-            species_wrong[target_id] += 1
-            if pick_id is not None and pick_id != target_id:
-                low_id, high_id = (
-                    (target_id, pick_id) if target_id < pick_id else (pick_id, target_id)
-                )
-                key = (low_id, high_id)
-                if key not in pair_map:
-                    pair_map[key] = {
-                        'low_id': low_id,
-                        'high_id': high_id,
-                        'total_wrong': 0,
-                        'when_low_was_target': 0,
-                        'when_high_was_target': 0,
-                    }
-                bucket = pair_map[key]
-                bucket['total_wrong'] += 1
-                if target_id == low_id:
-                    bucket['when_low_was_target'] += 1
-                else:
-                    bucket['when_high_was_target'] += 1
+        species_wrong[target_id] += count
+        low_id, high_id = (target_id, pick_id) if target_id < pick_id else (pick_id, target_id)
+        key = (low_id, high_id)
+        if key not in pair_map:
+            pair_map[key] = {
+                'low_id': low_id,
+                'high_id': high_id,
+                'total_wrong': 0,
+                'when_low_was_target': 0,
+                'when_high_was_target': 0,
+            }
+        bucket = pair_map[key]
+        bucket['total_wrong'] += count
+        if target_id == low_id:
+            bucket['when_low_was_target'] += count
+        else:
+            bucket['when_high_was_target'] += count
 
     species_ids = set(species_times) | set(species_wrong)
     species_map = Species.objects.in_bulk(species_ids) if species_ids else {}
@@ -570,25 +559,19 @@ def get_confusion_pair_rows(country_code: str | None = None) -> list[dict[str, A
     from all games worldwide, not only games in that country.
     """
     cc = normalize_country_filter(country_code)
-    pairs = Answer.objects.filter(correct=False).exclude(question__species_id=F("answer_id"))
+    pairs = ConfusionPairStat.objects.filter(wrong__gt=0).exclude(target_id=F("picked_id"))
     if cc:
         allowed = _allowed_species_ids_for_country(cc)
         if not allowed:
             return []
         pairs = pairs.filter(
-            question__species_id__in=allowed,
-            answer_id__in=allowed,
+            target_id__in=allowed,
+            picked_id__in=allowed,
         )
-    directed = list(
-        pairs.values("question__species_id", "answer_id").annotate(c=Count("id"))
-    )
 
     pair_map: dict[tuple[int, int], dict[str, Any]] = {}
 
-    for row in directed:
-        target_id = row["question__species_id"]
-        pick_id = row["answer_id"]
-        c = row["c"]
+    for target_id, pick_id, c in pairs.values_list("target_id", "picked_id", "wrong"):
         low_id, high_id = (target_id, pick_id) if target_id < pick_id else (pick_id, target_id)
         key = (low_id, high_id)
         if key not in pair_map:
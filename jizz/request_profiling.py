@@ -0,0 +1,354 @@
+"""
+Per-request profiles and query budgets for DRF views and quiz WebSocket actions.
+
+``RequestProfilingMiddleware`` (HTTP) and ``QuizConsumer.receive`` (WebSocket actions) run
+each request inside ``profile_request``. While a profile is current, a database execute
+wrapper (installed on every connection from ``JizzConfig.ready``) counts queries and their
+time, and the outermost ``Serializer.data`` / ``ListSerializer.data`` call adds to the
+serializer time. Routes are keyed ``"GET /api/flocks/<slug:slug>/"`` (method plus URL
+pattern) or ``"WS submit_answer"``.
+
+A share of finished profiles (``REQUEST_PROFILE_SAMPLE_RATE``) is written as
+``RequestProfile`` rows by a per-process background writer; ``request_profile_stats``
+turns them into per-route percentiles for ``/staff/request-profiles/api/``.
+
+``request_budgets.toml`` declares the most queries a route may run per request (and the
+p95 latency it should stay under). A route over its query budget is logged, and raises
+``QueryBudgetExceeded`` when ``REQUEST_BUDGETS_ENFORCE`` is on (tests), so an N+1 that
+only shows once a test creates more rows fails the suite.
+"""
+
+from __future__ import annotations
+
+import atexit
+import logging
+import os
+import queue
+import random
+import threading
+import time
+import tomllib
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from datetime import timedelta
+from functools import lru_cache
+from pathlib import Path
+from typing import Iterator
+
+from django.conf import settings
+from django.db import DatabaseError, close_old_connections
+from django.db.models import Aggregate, Count, FloatField, Max
+from django.utils import timezone
+
+from jizz.models import RequestProfile
+
+logger = logging.getLogger(__name__)
+
+PERCENTILES = (0.5, 0.95, 0.99)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A route ran more queries than ``request_budgets.toml`` allows."""
+
+
+@dataclass
+class Profile:
+    kind: str
+    route: str
+    method: str = ''
+    status_code: int | None = None
+    queries: int = 0
+    db_ms: float = 0.0
+    serializer_ms: float = 0.0
+    response_bytes: int = 0
+    duration_ms: float = 0.0
+    _serializer_depth: int = 0
+
+    def as_model(self) -> RequestProfile:
+        return RequestProfile(
+            kind=self.kind,
+            route=self.route[:200],
+            method=self.method,
+            status_code=self.status_code,
+            queries=self.queries,
+            db_ms=round(self.db_ms, 3),
+            serializer_ms=round(self.serializer_ms, 3),
+            response_bytes=self.response_bytes,
+            duration_ms=round(self.duration_ms, 3),
+        )
+
+
+_current: ContextVar[Profile | None] = ContextVar('request_profile', default=None)
+
+
+def current_profile() -> Profile | None:
+    return _current.get()
+
+
+def profiling_enabled() -> bool:
+    return getattr(settings, 'REQUEST_PROFILING', True)
+
+
+# Instrumentation
+
+
+def _record_query(execute, sql, params, many, context):
+    profile = _current.get()
+    if profile is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile.queries += 1
+        profile.db_ms += (time.perf_counter() - started) * 1000
+
+
+def install_query_wrapper(sender, connection, **kwargs):
+    """``connection_created`` receiver: count queries on every connection (all threads)."""
+    if _record_query not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_record_query)
+
+
+def _timed_data(prop: property) -> property:
+    getter = prop.fget
+
+    def data(self):
+        profile = _current.get()
+        if profile is None or profile._serializer_depth:
+            return getter(self)
+        profile._serializer_depth += 1
+        started = time.perf_counter()
+        try:
+            return getter(self)
+        finally:
+            profile._serializer_depth -= 1
+            profile.serializer_ms += (time.perf_counter() - started) * 1000
+
+    data._profiled = True
+    return property(data, doc=prop.__doc__)
+
+
+def install_serializer_timing() -> None:
+    from rest_framework.serializers import ListSerializer, Serializer
+
+    for cls in (Serializer, ListSerializer):
+        prop = cls.__dict__['data']
+        if not getattr(prop.fget, '_profiled', False):
+            cls.data = _timed_data(prop)
+
+
+# Budgets
+
+
+@dataclass(frozen=True)
+class Budget:
+    queries: int | None = None
+    p95_ms: float | None = None
+
+
+DEFAULT_BUDGETS_PATH = Path(__file__).with_name('request_budgets.toml')
+
+
+@lru_cache(maxsize=1)
+def load_budgets() -> dict[str, Budget]:
+    path = getattr(settings, 'REQUEST_BUDGETS_PATH', None) or DEFAULT_BUDGETS_PATH
+    try:
+        with open(path, 'rb') as budget_file:
+            data = tomllib.load(budget_file)
+    except FileNotFoundError:
+        logger.warning('Request budget file %s not found; no query budgets are checked', path)
+        return {}
+    return {
+        route: Budget(queries=entry.get('queries'), p95_ms=entry.get('p95_ms'))
+        for route, entry in data.get('routes', {}).items()
+    }
+
+
+def check_budget(profile: Profile) -> None:
+    budget = load_budgets().get(profile.route)
+    if budget is None or budget.queries is None or profile.queries <= budget.queries:
+        return
+    message = f'{profile.route} ran {profile.queries} queries (budget {budget.queries})'
+    if getattr(settings, 'REQUEST_BUDGETS_ENFORCE', False):
+        raise QueryBudgetExceeded(message)
+    logger.warning(message)
+
+
+# Profiling a request
+
+
+def http_route(request) -> str | None:
+    match = getattr(request, 'resolver_match', None)
+    if match is None:
+        return None
+    # re_path patterns are stored as regexes ("^api/species/$"); key them like path() routes.
+    return f"{request.method} /{match.route.lstrip('^').rstrip('$')}"
+
+
+@contextmanager
+def profile_request(kind: str, route: str, method: str = '') -> Iterator[Profile | None]:
+    """
+    Profile the block as one request of ``route``. ``route`` may still be set on the
+    yielded profile (HTTP routes are only known after URL resolution); a profile without
+    a route is discarded.
+    """
+    if not profiling_enabled() or _current.get() is not None:
+        yield None
+        return
+    profile = Profile(kind=kind, route=route, method=method)
+    token = _current.set(profile)
+    started = time.perf_counter()
+    try:
+        yield profile
+    finally:
+        profile.duration_ms = (time.perf_counter() - started) * 1000
+        _current.reset(token)
+    if profile.route:
+        finish_profile(profile)
+
+
+def finish_profile(profile: Profile) -> None:
+    rate = getattr(settings, 'REQUEST_PROFILE_SAMPLE_RATE', 0.1)
+    if rate > 0 and random.random() < rate:
+        writer = get_request_profile_writer()
+        writer.start()
+        writer.enqueue(profile.as_model())
+    check_budget(profile)
+
+
+# Storage
+
+
+class RequestProfileWriter:
+    """Bounded queue of unsaved ``RequestProfile`` rows, bulk-inserted by a daemon thread."""
+
+    def __init__(self, *, batch_size: int = 500, flush_seconds: float = 5.0, max_queue: int = 5000):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.dropped = 0
+        self._queue: queue.Queue[RequestProfile] = queue.Queue(maxsize=max_queue)
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid = os.getpid()
+
+    def enqueue(self, row: RequestProfile) -> None:
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self.dropped += 1
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='request-profile-writer', daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def _drain(self) -> list[RequestProfile]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.flush_seconds):
+            close_old_connections()
+            self.flush()
+        close_old_connections()
+
+    def flush(self) -> int:
+        """Write everything queued so far; rows of a failed insert are dropped."""
+        written = 0
+        while batch := self._drain():
+            try:
+                RequestProfile.objects.bulk_create(batch)
+            except DatabaseError:
+                logger.warning('Request profile insert failed; dropping %s rows', len(batch), exc_info=True)
+                self.dropped += len(batch)
+                continue
+            written += len(batch)
+        return written
+
+
+_writer: RequestProfileWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_request_profile_writer() -> RequestProfileWriter:
+    """Process-wide writer (rebuilt after fork)."""
+    global _writer
+    if _writer is None or _writer._pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer._pid != os.getpid():
+                _writer = RequestProfileWriter()
+                atexit.register(_writer.close)
+    return _writer
+
+
+def prune_request_profiles() -> int:
+    days = getattr(settings, 'REQUEST_PROFILE_RETENTION_DAYS', 14)
+    deleted, _ = RequestProfile.objects.filter(created__lt=timezone.now() - timedelta(days=days)).delete()
+    return deleted
+
+
+# Reporting
+
+
+class Percentile(Aggregate):
+    function = 'percentile_cont'
+    template = '%(function)s(%(fraction)s) WITHIN GROUP (ORDER BY %(expressions)s)'
+    output_field = FloatField()
+
+    def __init__(self, expression, fraction: float, **extra):
+        super().__init__(expression, fraction=float(fraction), **extra)
+
+
+def _percentile_fields(field: str, fractions=PERCENTILES) -> dict:
+    return {f'{field}_p{round(fraction * 100)}': Percentile(field, fraction) for fraction in fractions}
+
+
+def request_profile_stats(since, *, kind: str | None = None) -> list[dict]:
+    """Per-route sample count and percentiles of the profiles since ``since``, slowest p95 first."""
+    qs = RequestProfile.objects.filter(created__gte=since)
+    if kind:
+        qs = qs.filter(kind=kind)
+    rows = (
+        qs.values('kind', 'route')
+        .annotate(
+            samples=Count('id'),
+            queries_max=Max('queries'),
+            **_percentile_fields('duration_ms'),
+            **_percentile_fields('queries', (0.5, 0.95)),
+            **_percentile_fields('db_ms', (0.5, 0.95)),
+            **_percentile_fields('serializer_ms', (0.5, 0.95)),
+            **_percentile_fields('response_bytes', (0.5, 0.95)),
+        )
+        .order_by('-duration_ms_p95', 'route')
+    )
+    budgets = load_budgets()
+    stats = []
+    for row in rows:
+        budget = budgets.get(row['route'])
+        row = {key: round(value, 2) if isinstance(value, float) else value for key, value in row.items()}
+        row['budget'] = None
+        row['over_budget'] = False
+        if budget is not None:
+            row['budget'] = {'queries': budget.queries, 'p95_ms': budget.p95_ms}
+            row['over_budget'] = (
+                (budget.queries is not None and row['queries_max'] > budget.queries)
+                or (budget.p95_ms is not None and row['duration_ms_p95'] > budget.p95_ms)
+            )
+        stats.append(row)
+    return stats
@@ -0,0 +1,109 @@
+"""
+Multiplayer scoreboard (``update_players``) payloads and coalesced broadcasts.
+
+Every submitted answer used to rebuild and broadcast the whole scoreboard. Answers now
+only mark their game dirty with ``schedule_scoreboard_broadcast``: the first one starts a
+per-game tick and every answer arriving within ``SCOREBOARD_TICK`` seconds rides along
+with the same broadcast. Ticks are per process; with several workers each one still sends
+at most one scoreboard per game per tick.
+
+The payload (``build_scoreboard``) is a short summary per player built from a fixed number
+of queries; it replaced PlayerScoreSerializer, which added every player's full answer
+history and several queries per player to each broadcast.
+"""
+from __future__ import annotations
+
+import asyncio
+import logging
+
+from channels.db import database_sync_to_async
+
+from jizz.leaderboard import score_ranks
+from jizz.models import Answer, Game
+
+logger = logging.getLogger(__name__)
+
+SCOREBOARD_TICK = 0.25
+
+# game token -> pending tick task (this process)
+_pending_ticks: dict[str, asyncio.Task] = {}
+
+
+def _last_answer_payload(answer: dict) -> dict:
+    return {
+        'id': answer['id'],
+        'correct': answer['correct'],
+        'score': answer['score'],
+        'sequence': answer['question__sequence'],
+        'number': answer['question__number'],
+    }
+
+
+def build_scoreboard(game: Game) -> list[dict]:
+    """
+    Name, score, status, host flag, rank and last answer of every player, from five
+    queries whatever the number of players. The answer history is not part of the
+    broadcast; clients read it from the game (``GameDetailSerializer.scores``) on demand.
+    """
+    current_question_id = game.questions.order_by('pk').values_list('pk', flat=True).last()
+    scores = list(game.scores.select_related('player').order_by('-score', 'pk'))
+    answers: dict[int, dict] = {}
+    if current_question_id and scores:
+        rows = (
+            Answer.objects.filter(question_id=current_question_id)
+            .order_by('pk')
+            .values('id', 'player_score_id', 'correct', 'score', 'question__sequence', 'question__number')
+        )
+        for row in rows:
+            answers.setdefault(row['player_score_id'], row)
+    ranks = score_ranks(game, scores)
+
+    players = []
+    for score in scores:
+        answer = answers.get(score.pk)
+        if answer is None:
+            status = 'waiting'
+        else:
+            status = 'correct' if answer['correct'] else 'incorrect'
+        players.append({
+            'id': score.pk,
+            'name': score.player.name,
+            'language': score.player.language,
+            'score': score.score,
+            'status': status,
+            'is_host': game.host_id == score.player_id,
+            'ranking': ranks.get(score.pk),
+            'last_answer': _last_answer_payload(answer) if answer else None,
+        })
+    return players
+
+
+def scoreboard_payload(game_token: str) -> list[dict]:
+    return build_scoreboard(Game.objects.get(token=game_token))
+
+
+async def broadcast_scoreboard(channel_layer, game_token: str) -> None:
+    """Send the current scoreboard to the game's group right away."""
+    players = await database_sync_to_async(scoreboard_payload)(game_token)
+    await channel_layer.group_send(
+        f'quiz_{game_token}',
+        {'type': 'update_players', 'players': players},
+    )
+
+
+async def _tick(channel_layer, game_token: str) -> None:
+    try:
+        await asyncio.sleep(SCOREBOARD_TICK)
+    finally:
+        # Answers committed from here on schedule the next tick.
+        _pending_ticks.pop(game_token, None)
+    try:
+        await broadcast_scoreboard(channel_layer, game_token)
+    except Exception:
+        logger.exception('Scoreboard broadcast for game %s failed', game_token)
+
+
+def schedule_scoreboard_broadcast(channel_layer, game_token: str) -> None:
+    """Broadcast the scoreboard once after ``SCOREBOARD_TICK``, however many answers come in."""
+    if game_token not in _pending_ticks:
+        _pending_ticks[game_token] = asyncio.ensure_future(_tick(channel_layer, game_token))
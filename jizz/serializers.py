@@ -80,9 +80,9 @@ class MediaSerializer(serializers.ModelSerializer):
         if self.context.get('level') != 'thorough':
             return None
         return {
-            'approved': getattr(obj, '_approved_count', 0),
-            'rejected': getattr(obj, '_rejected_count', 0),
-            'dont_know': getattr(obj, '_not_sure_count', 0),
+            'approved': obj.approved_reviews,
+            'rejected': obj.rejected_reviews,
+            'dont_know': obj.not_sure_reviews,
         }
 
     class Meta:
@@ -118,28 +118,25 @@ class SpeciesListSerializer(serializers.ModelSerializer):
 
 
 class SpeciesReviewStatsSerializer(serializers.Serializer):
-    """Serializer for species with media review stats (annotated queryset)."""
-    id = serializers.IntegerField()
+    """Serializer for species media review stats (MediaReviewSummary with species)."""
+    id = serializers.IntegerField(source='species_id')
     name = serializers.SerializerMethodField()
-    total_media = serializers.IntegerField()
-    unreviewed = serializers.SerializerMethodField()
-    approved = serializers.IntegerField(source='approved_media')
-    rejected = serializers.IntegerField(source='rejected_media')
-    not_sure = serializers.IntegerField(source='not_sure_media')
+    total_media = serializers.IntegerField(source='total')
+    unreviewed = serializers.IntegerField()
+    approved = serializers.IntegerField()
+    rejected = serializers.IntegerField()
+    not_sure = serializers.IntegerField()
 
     def get_name(self, obj):
         request = self.context.get('request')
         language = request and request.query_params.get('language')
         if language:
             try:
-                sn = SpeciesName.objects.get(species=obj, language_id=language)
+                sn = SpeciesName.objects.get(species_id=obj.species_id, language_id=language)
                 return sn.name
             except SpeciesName.DoesNotExist:
                 pass
-        return obj.name
-
-    def get_unreviewed(self, obj):
-        return obj.total_media - obj.media_with_review
+        return obj.species.name
 
 
 class MediaForReviewSerializer(MediaSerializer):
@@ -149,9 +146,7 @@ class MediaForReviewSerializer(MediaSerializer):
     machine_human_agreement = serializers.SerializerMethodField()
 
     def get_review_type(self, obj):
-        reviews = list(obj.reviews.all())
-        review = max(reviews, key=lambda r: r.id) if reviews else None
-        return review.review_type if review else None
+        return obj.review_status
 
     def get_machine_prediction(self, obj):
         try:
@@ -392,9 +387,12 @@ class QuestionPlaySerializer(serializers.ModelSerializer):
         return self._media_list_for_play(obj)
 
     def get_options(self, obj):
-        opts = list(obj.options.all())
+        # Prepared rounds (jizz.question_prefetch) have no QuestionOption rows yet.
+        species = self.context.get('play_option_species')
+        if species is None:
+            species = [op.species for op in obj.options.all()]
         return QuestionOptionPlaySerializer(
-            [op.species for op in opts],
+            species,
             many=True,
             context=self.context,
         ).data
@@ -1191,6 +1189,17 @@ class GameSerializer(serializers.ModelSerializer):
         )
 
 
+class GameConfigSerializer(GameSerializer):
+    """GameSerializer without the highscore and scores (``jizz.game_state`` adds light ones)."""
+    current_highscore = None
+    scores = None
+
+    class Meta(GameSerializer.Meta):
+        fields = tuple(
+            name for name in GameSerializer.Meta.fields if name not in ('current_highscore', 'scores')
+        )
+
+
 class UserGameSerializer(serializers.ModelSerializer):
     """Serializer for games in user's games list, includes user's score and correct count"""
     country = CountrySerializer()
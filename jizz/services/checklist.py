@@ -1,8 +1,9 @@
 """
-Aggregate per-country species checklist from games the user has played.
+Per-country species checklist from games the user has played.
 
-v1: all games for the country (see ``_qualifying_game_ids``).
-Future: ``source=journey`` when Game is tagged with Birdr Journey.
+Reads the materialized ``UserChecklistEntry`` rows (see ``checklist_entries``) instead of
+aggregating the user's answers per request.
+v1: all games for the country. Future: ``source=journey`` when Game is tagged with Birdr Journey.
 """
 from __future__ import annotations
 
@@ -10,17 +11,16 @@ from dataclasses import dataclass
 from datetime import datetime
 from typing import Any
 
-from django.db.models import Count, F, Max, Q, QuerySet
+from django.db.models import Count, OuterRef, Q, QuerySet, Subquery
 from django.db.models.functions import Coalesce
 
 from jizz.models import (
-    Answer,
     Country,
     CountrySpecies,
     Player,
-    PlayerScore,
     Species,
     SpeciesName,
+    UserChecklistEntry,
     UserProfile,
 )
 from jizz.services.species_cover import species_cover_urls_bulk
@@ -78,47 +78,24 @@ def _country_species_qs(country: Country) -> QuerySet:
     )
 
 
-def _player_scores_for_user(user, country: Country) -> QuerySet:
-    player_ids = Player.objects.filter(user=user).values_list('id', flat=True)
-    return PlayerScore.objects.filter(
-        player_id__in=player_ids,
-        game__country=country,
-    )
-
-
-def _qualifying_game_ids(scores: QuerySet, source: str) -> list[int]:
+def _checklist_entries(user, country: Country, source: str) -> dict[int, UserChecklistEntry]:
+    """
+    The user's life-list rows for the country, by species id. A species is encountered
+    when it has a row (answered right or wrong) and identified once ``times_identified``
+    is positive; later wrong answers never remove it from identified.
+    """
     if source == 'journey':
         # No Game.journey FK yet — journey-only checklist comes later.
-        return []
-    return list(scores.values_list('game_id', flat=True).distinct())
-
-
-def _answered_answers_qs(game_ids: list[int], scores: QuerySet) -> QuerySet:
-    """Answers the user submitted (correct or wrong); unanswered questions are excluded."""
-    if not game_ids:
-        return Answer.objects.none()
-    return Answer.objects.filter(
-        player_score__in=scores,
-        question__game_id__in=game_ids,
-    )
+        return {}
+    return {
+        entry.species_id: entry
+        for entry in UserChecklistEntry.objects.filter(user=user, country=country)
+    }
 
 
-def _species_sets(game_ids: list[int], scores: QuerySet) -> tuple[set[int], set[int]]:
-    """
-    encountered: user answered a question targeting this species (right or wrong).
-    identified: user ever chose the correct species for such a question (any game);
-    later wrong answers on the same species do not remove it from identified.
-    """
-    if not game_ids:
-        return set(), set()
-
-    answers = _answered_answers_qs(game_ids, scores)
-    encountered = set(answers.values_list('question__species_id', flat=True).distinct())
-    identified = set(
-        answers.filter(answer_id=F('question__species_id')).values_list(
-            'question__species_id', flat=True
-        ).distinct()
-    )
+def _species_sets(entries: dict[int, UserChecklistEntry]) -> tuple[set[int], set[int]]:
+    encountered = set(entries)
+    identified = {sid for sid, entry in entries.items() if entry.times_identified}
     return encountered, identified
 
 
@@ -146,21 +123,12 @@ def _checklist_feedback_context(player: Player, question, user=None, request=Non
     return resolved.id, game.country_id, question.species_id
 
 
-def _user_identified_species(user_id: int, country_id: int, species_id: int) -> bool:
-    return Answer.objects.filter(
-        player_score__player__user_id=user_id,
-        question__game__country_id=country_id,
-        question__species_id=species_id,
-        answer_id=F('question__species_id'),
-    ).exists()
-
-
-def _user_encountered_species(user_id: int, country_id: int, species_id: int) -> bool:
-    return Answer.objects.filter(
-        player_score__player__user_id=user_id,
-        question__game__country_id=country_id,
-        question__species_id=species_id,
-    ).exists()
+def _checklist_entry(user_id: int, country_id: str, species_id: int) -> UserChecklistEntry | None:
+    return UserChecklistEntry.objects.filter(
+        user_id=user_id,
+        country_id=country_id,
+        species_id=species_id,
+    ).first()
 
 
 def compute_checklist_added(player: Player, question, correct: bool, user=None, request=None) -> bool:
@@ -174,8 +142,8 @@ def compute_checklist_added(player: Player, question, correct: bool, user=None,
     ctx = _checklist_feedback_context(player, question, user=user, request=request)
     if ctx is None:
         return False
-    user_id, country_id, species_id = ctx
-    return not _user_identified_species(user_id, country_id, species_id)
+    entry = _checklist_entry(*ctx)
+    return entry is None or not entry.times_identified
 
 
 def compute_checklist_missed(player: Player, question, correct: bool, user=None, request=None) -> bool:
@@ -189,10 +157,8 @@ def compute_checklist_missed(player: Player, question, correct: bool, user=None,
     ctx = _checklist_feedback_context(player, question, user=user, request=request)
     if ctx is None:
         return False
-    user_id, country_id, species_id = ctx
-    if _user_identified_species(user_id, country_id, species_id):
-        return False
-    return not _user_encountered_species(user_id, country_id, species_id)
+    # Any row means the species was already encountered (and maybe identified).
+    return _checklist_entry(*ctx) is None
 
 
 def _compute_totals(
@@ -266,49 +232,18 @@ def _filter_country_species(
     return cs_qs
 
 
-def _annotate_species_stats(cs_qs: QuerySet, game_ids: list[int], scores: QuerySet) -> QuerySet:
-    if not game_ids:
-        return cs_qs
-
-    answered_filter = Q(
-        species__questions__game_id__in=game_ids,
-        species__questions__answers__player_score__in=scores,
-    )
-    correct_filter = answered_filter & Q(
-        species__questions__answers__answer_id=F('species__questions__species_id'),
-    )
-    return cs_qs.annotate(
-        times_encountered=Count(
-            'species__questions__answers',
-            filter=answered_filter,
-            distinct=True,
-        ),
-        times_identified=Count(
-            'species__questions__answers',
-            filter=correct_filter,
-            distinct=True,
-        ),
-        last_encountered_at=Max(
-            'species__questions__answers__created',
-            filter=answered_filter,
-        ),
-        last_identified_at=Max(
-            'species__questions__answers__created',
-            filter=correct_filter,
-        ),
-    )
-
-
-def _sort_queryset(cs_qs: QuerySet, sort: str, game_ids: list[int]) -> QuerySet:
+def _sort_queryset(cs_qs: QuerySet, sort: str, user, country: Country, has_entries: bool) -> QuerySet:
     if sort in ('species', 'name'):
         return cs_qs.order_by('species_id')
     if sort == 'rarity':
         return cs_qs.order_by('-frequency', 'species_id')
-    if game_ids:
-        return cs_qs.order_by(
-            Coalesce('last_identified_at', 'last_encountered_at').desc(nulls_last=True),
-            'species_id',
-        )
+    if has_entries:
+        last_activity = UserChecklistEntry.objects.filter(
+            user=user,
+            country=country,
+            species_id=OuterRef('species_id'),
+        ).values(last_activity=Coalesce('last_identified_at', 'last_encountered_at'))[:1]
+        return cs_qs.order_by(Subquery(last_activity).desc(nulls_last=True), 'species_id')
     return cs_qs.order_by('species_id')
 
 
@@ -382,9 +317,8 @@ def build_checklist(user, params: ChecklistParams, request=None) -> dict[str, An
     if not country:
         return {'error': 'no_country'}
 
-    scores = _player_scores_for_user(user, country)
-    game_ids = _qualifying_game_ids(scores, params.source)
-    encountered, identified = _species_sets(game_ids, scores)
+    entries = _checklist_entries(user, country, params.source)
+    encountered, identified = _species_sets(entries)
     checklist_ids = set(_country_species_qs(country).values_list('species_id', flat=True))
     encountered &= checklist_ids
     identified &= checklist_ids
@@ -403,8 +337,7 @@ def build_checklist(user, params: ChecklistParams, request=None) -> dict[str, An
             )
 
     cs_qs = _filter_country_species(cs_qs, params.status, encountered, identified)
-    cs_qs = _annotate_species_stats(cs_qs, game_ids, scores)
-    cs_qs = _sort_queryset(cs_qs, params.sort, game_ids)
+    cs_qs = _sort_queryset(cs_qs, params.sort, user, country, bool(entries))
 
     page_size = max(1, min(params.page_size, 100))
     page = max(1, params.page)
@@ -420,6 +353,7 @@ def build_checklist(user, params: ChecklistParams, request=None) -> dict[str, An
     for row in page_rows:
         sp = row.species
         sid = sp.id
+        entry = entries.get(sid)
         species_payload.append({
             'id': sid,
             'code': sp.code,
@@ -430,10 +364,10 @@ def build_checklist(user, params: ChecklistParams, request=None) -> dict[str, An
             'tax_order': sp.tax_order,
             'status': _status_for_species(sid, encountered, identified),
             'frequency': row.frequency,
-            'times_encountered': getattr(row, 'times_encountered', 0) or 0,
-            'times_identified': getattr(row, 'times_identified', 0) or 0,
-            'last_encountered_at': _iso_datetime(getattr(row, 'last_encountered_at', None)),
-            'last_identified_at': _iso_datetime(getattr(row, 'last_identified_at', None)),
+            'times_encountered': entry.times_encountered if entry else 0,
+            'times_identified': entry.times_identified if entry else 0,
+            'last_encountered_at': _iso_datetime(entry.last_encountered_at if entry else None),
+            'last_identified_at': _iso_datetime(entry.last_identified_at if entry else None),
             'illustration_url': ill_map.get(sid),
         })
 
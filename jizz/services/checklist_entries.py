@@ -0,0 +1,106 @@
+"""
+Materialized per-user checklist (life list): ``UserChecklistEntry``.
+
+One row per (user, country, species) with encounter/identification counters and first/last
+timestamps, derived from the user's answers (``answer == question.species`` counts as
+identified). ``record_checklist_answer`` folds a new Answer into its row with a single
+upsert (``jizz.signals``); deleted answers and newly linked players recompute the affected
+rows from ``Answer``. ``manage.py backfill_checklist_entries`` rebuilds users in id order
+and can resume from the last user id it printed.
+"""
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.db import connection, transaction
+
+from jizz.models import Answer, Game, Player, PlayerScore, Question, UserChecklistEntry
+
+_ENTRY = UserChecklistEntry._meta.db_table
+_STAT_COLUMNS = (
+    'times_encountered',
+    'times_identified',
+    'first_encountered_at',
+    'last_encountered_at',
+    'first_identified_at',
+    'last_identified_at',
+)
+
+_AGGREGATE_SQL = f"""
+INSERT INTO {_ENTRY} (user_id, country_id, species_id, {', '.join(_STAT_COLUMNS)})
+SELECT p.user_id, g.country_id, q.species_id,
+       COUNT(*),
+       COUNT(*) FILTER (WHERE a.answer_id = q.species_id),
+       MIN(a.created),
+       MAX(a.created),
+       MIN(a.created) FILTER (WHERE a.answer_id = q.species_id),
+       MAX(a.created) FILTER (WHERE a.answer_id = q.species_id)
+FROM {Answer._meta.db_table} a
+JOIN {PlayerScore._meta.db_table} ps ON ps.id = a.player_score_id
+JOIN {Player._meta.db_table} p ON p.id = ps.player_id
+JOIN {Question._meta.db_table} q ON q.id = a.question_id
+JOIN {Game._meta.db_table} g ON g.id = q.game_id
+WHERE p.user_id IS NOT NULL AND g.country_id IS NOT NULL AND {{where}}
+GROUP BY p.user_id, g.country_id, q.species_id
+ON CONFLICT (user_id, country_id, species_id) DO UPDATE SET {{update}}
+"""
+
+_ADD = ', '.join([
+    f'times_encountered = {_ENTRY}.times_encountered + EXCLUDED.times_encountered',
+    f'times_identified = {_ENTRY}.times_identified + EXCLUDED.times_identified',
+    # LEAST/GREATEST skip NULLs, so unidentified answers keep the identified timestamps.
+    f'first_encountered_at = LEAST({_ENTRY}.first_encountered_at, EXCLUDED.first_encountered_at)',
+    f'last_encountered_at = GREATEST({_ENTRY}.last_encountered_at, EXCLUDED.last_encountered_at)',
+    f'first_identified_at = LEAST({_ENTRY}.first_identified_at, EXCLUDED.first_identified_at)',
+    f'last_identified_at = GREATEST({_ENTRY}.last_identified_at, EXCLUDED.last_identified_at)',
+])
+_REPLACE = ', '.join(f'{name} = EXCLUDED.{name}' for name in _STAT_COLUMNS)
+
+
+def record_checklist_answer(answer_id: int) -> None:
+    """Add one new answer to its (user, country, species) row (no-op for guests)."""
+    with connection.cursor() as cursor:
+        cursor.execute(_AGGREGATE_SQL.format(where='a.id = %s', update=_ADD), [answer_id])
+
+
+@transaction.atomic
+def refresh_checklist_entry(user_id: int, country_id: str, species_id: int) -> None:
+    """Recompute one row from ``Answer`` (after answers were deleted)."""
+    UserChecklistEntry.objects.filter(user_id=user_id, country_id=country_id, species_id=species_id).delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _AGGREGATE_SQL.format(
+                where='p.user_id = %s AND g.country_id = %s AND q.species_id = %s',
+                update=_REPLACE,
+            ),
+            [user_id, country_id, species_id],
+        )
+
+
+@transaction.atomic
+def rebuild_user_checklists(user_ids: Iterable[int]) -> int:
+    """Recompute every row of these users; returns the number of rows written."""
+    user_ids = list(user_ids)
+    if not user_ids:
+        return 0
+    UserChecklistEntry.objects.filter(user_id__in=user_ids).delete()
+    with connection.cursor() as cursor:
+        cursor.execute(
+            _AGGREGATE_SQL.format(where='p.user_id = ANY(%s)', update=_REPLACE),
+            [user_ids],
+        )
+        return cursor.rowcount
+
+
+def forget_checklist_answer(answer: Answer) -> None:
+    """Called after an Answer row was deleted; recompute its row if it counted for a user."""
+    row = (
+        PlayerScore.objects.filter(pk=answer.player_score_id, player__user__isnull=False)
+        .values_list('player__user_id', 'game__country_id')
+        .first()
+    )
+    if row is None or row[1] is None:
+        return
+    species_id = Question.objects.filter(pk=answer.question_id).values_list('species_id', flat=True).first()
+    if species_id is not None:
+        refresh_checklist_entry(row[0], row[1], species_id)
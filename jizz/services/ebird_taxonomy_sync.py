@@ -0,0 +1,206 @@
+"""
+Diff-based eBird taxonomy and species-name sync.
+
+The current rows of each table are loaded once, compared with the eBird payload by natural
+key (order/family/genus Latin name, species code, species + language) and only new or
+changed rows are written, with bulk_create / bulk_update in one transaction per table
+(names: per language). Every sync returns per-table counts; ``dry_run`` computes them
+without writing.
+
+``TaxonomyPayloads`` keeps fetched eBird responses on disk when given a directory, so
+reruns and tests work offline.
+"""
+
+from __future__ import annotations
+
+import json
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Callable, Iterable
+
+from django.db import transaction
+
+from jizz.models import Language, Species, SpeciesName, TaxonomicFamily, TaxonomicGenus, TaxonomicOrder
+from jizz.services.taxonomy_texts import EBIRD_LOCALE_EN, fetch_ebird_taxonomy
+from jizz.species_catalog import record_species_changes
+from jizz.taxonomy_parse import parse_genus_from_sci_name
+
+BATCH_SIZE = 1000
+
+
+@dataclass
+class TableChanges:
+    created: int = 0
+    updated: int = 0
+    unchanged: int = 0
+
+    def __str__(self):
+        return f'{self.created} created, {self.updated} updated, {self.unchanged} unchanged'
+
+
+class TaxonomyPayloads:
+    """eBird taxonomy rows per locale, read from ``cache_dir`` when a copy is there."""
+
+    def __init__(
+        self,
+        cache_dir: str | Path | None = None,
+        refresh: bool = False,
+        fetch: Callable[..., list[dict[str, Any]]] = fetch_ebird_taxonomy,
+    ):
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.refresh = refresh
+        self.fetch = fetch
+
+    def rows(self, locale: str) -> list[dict[str, Any]]:
+        path = self.cache_dir / f'ebird-taxonomy-{locale}.json' if self.cache_dir else None
+        if path is not None and path.exists() and not self.refresh:
+            return json.loads(path.read_text(encoding='utf-8'))
+        rows = self.fetch(locale=locale, categories='species')
+        if path is not None:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_text(json.dumps(rows, ensure_ascii=False), encoding='utf-8')
+        return rows
+
+
+def _sync_table(model, key_field: str, desired: dict[Any, dict[str, Any]], dry_run: bool):
+    """
+    Create/update ``model`` rows so that each key in ``desired`` has the given field values.
+
+    Returns (changes, key -> pk, pks of created and updated rows). In a dry run new rows
+    map to a ``('new', key)`` placeholder so FKs of child tables still compare unequal.
+    """
+    current: dict[Any, Any] = {}
+    for obj in model.objects.order_by('pk'):
+        current.setdefault(getattr(obj, key_field), obj)
+
+    to_create, to_update, fields = [], [], set()
+    for key, values in desired.items():
+        obj = current.get(key)
+        if obj is None:
+            to_create.append(model(**{key_field: key}, **values))
+            continue
+        changed = {field: value for field, value in values.items() if getattr(obj, field) != value}
+        if changed:
+            for field, value in changed.items():
+                setattr(obj, field, value)
+            fields.update(changed)
+            to_update.append(obj)
+
+    if not dry_run and (to_create or to_update):
+        with transaction.atomic():
+            model.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+            if to_update:
+                model.objects.bulk_update(to_update, sorted(fields), batch_size=BATCH_SIZE)
+
+    ids = {key: obj.pk for key, obj in current.items()}
+    for obj in to_create:
+        key = getattr(obj, key_field)
+        ids[key] = obj.pk if obj.pk is not None else ('new', key)
+    changes = TableChanges(
+        created=len(to_create),
+        updated=len(to_update),
+        unchanged=len(desired) - len(to_create) - len(to_update),
+    )
+    return changes, ids, [obj.pk for obj in to_create + to_update if obj.pk is not None]
+
+
+def sync_taxonomy(payloads: TaxonomyPayloads, dry_run: bool = False) -> dict[str, TableChanges]:
+    """Orders, families, genera and species (with Dutch species names) from eBird."""
+    rows = [row for row in payloads.rows(EBIRD_LOCALE_EN) if row.get('category') == 'species']
+    names_nl = {
+        row['speciesCode']: row['comName']
+        for row in payloads.rows('nl') if row.get('category') == 'species'
+    }
+
+    orders, families, genera, species = {}, {}, {}, {}
+    for row in rows:
+        orders[row['order']] = {'name_en': row['order'], 'name_nl': row['order']}
+        families[row['familySciName']] = {
+            'name_en': row['familyComName'],
+            'name_nl': row['familyComName'],
+            'order': row['order'],
+        }
+        genus_name = parse_genus_from_sci_name(row['sciName'])
+        if genus_name:
+            genera[genus_name] = {'name_en': genus_name, 'name_nl': genus_name, 'family': row['familySciName']}
+        species[row['speciesCode']] = {
+            'name': row['comName'],
+            'name_latin': row['sciName'],
+            'order': row['order'],
+            'family': row['familySciName'],
+            'genus': genus_name,
+            'tax_ordering': row.get('taxonOrder'),
+        }
+        if row['speciesCode'] in names_nl:
+            species[row['speciesCode']]['name_nl'] = names_nl[row['speciesCode']]
+
+    report = {}
+    report['order'], order_ids, order_changed = _sync_table(TaxonomicOrder, 'name_latin', orders, dry_run)
+    for values in families.values():
+        values['taxonomic_order_id'] = order_ids[values.pop('order')]
+    report['family'], family_ids, family_changed = _sync_table(TaxonomicFamily, 'name_latin', families, dry_run)
+    for values in genera.values():
+        values['taxonomic_family_id'] = family_ids[values.pop('family')]
+    report['genus'], genus_ids, _ = _sync_table(TaxonomicGenus, 'name_latin', genera, dry_run)
+    for values in species.values():
+        values['taxonomic_order_id'] = order_ids[values.pop('order')]
+        values['taxonomic_family_id'] = family_ids[values.pop('family')]
+        genus = values.pop('genus')
+        values['taxonomic_genus_id'] = genus_ids[genus] if genus else None
+    report['species'], _, species_changed = _sync_table(Species, 'code', species, dry_run)
+
+    if not dry_run:
+        # Bulk writes skip the signals that move the species catalog version on.
+        record_species_changes(species_changed)
+        record_species_changes(
+            Species.objects.filter(taxonomic_order_id__in=order_changed).values_list('pk', flat=True)
+        )
+        record_species_changes(
+            Species.objects.filter(taxonomic_family_id__in=family_changed).values_list('pk', flat=True)
+        )
+    return report
+
+
+def sync_species_names(
+    payloads: TaxonomyPayloads,
+    languages: Iterable[Language] | None = None,
+    dry_run: bool = False,
+) -> dict[str, TableChanges]:
+    """SpeciesName rows per language for the species we have (matched on eBird code)."""
+    species_ids: dict[str, int] = {}
+    for species_id, code in Species.objects.order_by('pk').values_list('pk', 'code'):
+        species_ids.setdefault(code, species_id)
+
+    report = {}
+    for language in (languages if languages is not None else Language.objects.all()):
+        desired = {}
+        for row in payloads.rows(language.code):
+            species_id = species_ids.get(row.get('speciesCode'))
+            if species_id is not None:
+                desired[species_id] = row['comName']
+
+        current: dict[int, SpeciesName] = {}
+        for name in SpeciesName.objects.filter(language=language).order_by('pk').only('pk', 'species_id', 'name'):
+            current.setdefault(name.species_id, name)
+
+        to_create, to_update = [], []
+        for species_id, value in desired.items():
+            name = current.get(species_id)
+            if name is None:
+                to_create.append(SpeciesName(language=language, species_id=species_id, name=value))
+            elif name.name != value:
+                name.name = value
+                to_update.append(name)
+
+        if not dry_run and (to_create or to_update):
+            with transaction.atomic():
+                SpeciesName.objects.bulk_create(to_create, batch_size=BATCH_SIZE)
+                SpeciesName.objects.bulk_update(to_update, ['name'], batch_size=BATCH_SIZE)
+            record_species_changes(name.species_id for name in to_create + to_update)
+
+        report[language.code] = TableChanges(
+            created=len(to_create),
+            updated=len(to_update),
+            unchanged=len(desired) - len(to_create) - len(to_update),
+        )
+    return report
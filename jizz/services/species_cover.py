@@ -62,15 +62,9 @@ def _stored_illustration_url(species: Species, request) -> str | None:
 
 def _first_eligible_image_url(species: Species, request) -> str | None:
     base = Media.objects.filter(species=species, type='image', hide=False)
-    approved = (
-        base.filter(reviews__review_type='approved')
-        .distinct()
-        .order_by('id')
-        .first()
-    )
-    media = approved
+    media = base.filter(approved_reviews__gt=0).order_by('id').first()
     if not media:
-        media = base.exclude(reviews__review_type='rejected').order_by('id').first()
+        media = base.filter(rejected_reviews=0).order_by('id').first()
     if not media or not media.url:
         return None
     return wikimedia_display_url(media.url)
@@ -106,9 +100,8 @@ def species_cover_urls_bulk(species_ids: list[int], request=None) -> dict[int, s
             species_id__in=missing,
             type='image',
             hide=False,
-            reviews__review_type='approved',
+            approved_reviews__gt=0,
         )
-        .distinct()
         .order_by('species_id', 'id')
     )
     for media in approved:
@@ -118,8 +111,7 @@ def species_cover_urls_bulk(species_ids: list[int], request=None) -> dict[int, s
     still_missing = [sid for sid in missing if sid not in urls]
     if still_missing:
         fallback = (
-            Media.objects.filter(species_id__in=still_missing, type='image', hide=False)
-            .exclude(reviews__review_type='rejected')
+            Media.objects.filter(species_id__in=still_missing, type='image', hide=False, rejected_reviews=0)
             .order_by('species_id', 'id')
         )
         for media in fallback:
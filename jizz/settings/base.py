@@ -28,13 +28,21 @@ MEDIA_FIRST_ASSERTION_DEFAULT_MODEL_VERSION = os.environ.get(
 MEDIA_HTTP_FETCH_USER_AGENT = os.environ.get('MEDIA_HTTP_FETCH_USER_AGENT', '')
 # Polite pacing for Wikimedia (429 if hammering full-resolution upload URLs).
 MEDIA_HTTP_FETCH_DELAY_SECONDS = float(os.environ.get('MEDIA_HTTP_FETCH_DELAY_SECONDS', '0.35'))
+# Requests per second per non-Wikimedia host for concurrent train/infer downloads.
+MEDIA_HTTP_FETCH_RATE_PER_HOST = float(os.environ.get('MEDIA_HTTP_FETCH_RATE_PER_HOST', '4'))
+# Downloaded images (LRU, capped) and feature vectors per features_version for train/infer.
+# Empty disables the cache.
+MEDIA_FIRST_ASSERTION_CACHE_DIR = os.environ.get(
+    'MEDIA_FIRST_ASSERTION_CACHE_DIR', str(BASE_DIR / 'var' / 'media_first_assertion_cache')
+)
+MEDIA_IMAGE_CACHE_MAX_BYTES = int(os.environ.get('MEDIA_IMAGE_CACHE_MAX_BYTES', str(5 * 1024 ** 3)))
 # Use Commons thumbnail URLs for ML fetches (smaller, less rate-limited than original files).
 # Desired width; actual fetch uses Wikimedia $wgThumbnailSteps (e.g. 500, 960), not arbitrary px.
 MEDIA_WIKIMEDIA_THUMB_WIDTH_PX = int(os.environ.get('MEDIA_WIKIMEDIA_THUMB_WIDTH_PX', '500'))
 # Width served to clients for Wikimedia images in game/API serializers (standard step).
 MEDIA_WIKIMEDIA_DISPLAY_WIDTH_PX = int(os.environ.get('MEDIA_WIKIMEDIA_DISPLAY_WIDTH_PX', '960'))
 
-# Optional YOLO bird detector (offline only; used by handcrafted_v2_yolo extractor).
+# Optional YOLO bird detector (offline only; used by handcrafted_v2_yolo2 extractor).
 # Provide an ONNX file path (e.g. yolov5n.onnx exported with 640x640 input).
 MEDIA_YOLO_ONNX_PATH = os.environ.get('MEDIA_YOLO_ONNX_PATH', '')
 # YOLO objectness*class score threshold for candidate boxes.
@@ -45,6 +53,11 @@ MEDIA_YOLO_NMS_IOU_THRESHOLD = float(os.environ.get('MEDIA_YOLO_NMS_IOU_THRESHOL
 MEDIA_YOLO_BIRD_CLASS_ID = int(os.environ.get('MEDIA_YOLO_BIRD_CLASS_ID', '14'))
 # If OpenCV DNN cannot import the ONNX (e.g. unsupported ops like Floor), try onnxruntime when installed.
 MEDIA_YOLO_PREFER_ONNXRUNTIME = os.environ.get('MEDIA_YOLO_PREFER_ONNXRUNTIME', '').lower() in ('1', 'true', 'yes')
+# Images per batched YOLO pass (export with a dynamic batch axis to run them in one call).
+MEDIA_YOLO_BATCH_SIZE = int(os.environ.get('MEDIA_YOLO_BATCH_SIZE', '16'))
+# onnxruntime threads per session (0 = onnxruntime default); lower them with --extract-workers > 1.
+MEDIA_YOLO_ORT_INTRA_OP_THREADS = int(os.environ.get('MEDIA_YOLO_ORT_INTRA_OP_THREADS', '0'))
+MEDIA_YOLO_ORT_INTER_OP_THREADS = int(os.environ.get('MEDIA_YOLO_ORT_INTER_OP_THREADS', '0'))
 
 
 # Quick-start development settings - unsuitable for production
@@ -102,6 +115,7 @@ SESSION_ENGINE = 'django.contrib.sessions.backends.db'
 SESSION_COOKIE_SAMESITE = 'Lax'
 
 MIDDLEWARE = [
+    'jizz.middleware.RequestProfilingMiddleware',
     'corsheaders.middleware.CorsMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
@@ -143,6 +157,35 @@ CHANNEL_LAYERS = {
     },
 }
 
+# Several Daphne workers (or hosts) need a shared layer: CHANNEL_LAYER_BACKEND=postgres
+# routes group messages through PostgreSQL LISTEN/NOTIFY (jizz.channel_layers).
+if os.environ.get('CHANNEL_LAYER_BACKEND', '').lower() == 'postgres':
+    CHANNEL_LAYERS = {
+        "default": {
+            "BACKEND": "jizz.channel_layers.PostgresChannelLayer",
+            "CONFIG": {
+                "capacity": int(os.environ.get('CHANNEL_LAYER_CAPACITY', '100')),
+                "group_expiry": int(os.environ.get('CHANNEL_LAYER_GROUP_EXPIRY', '86400')),
+            },
+        },
+    }
+
+
+# Shared by all workers (jizz.tiered_cache): a short-lived in-process LRU in front of an
+# UNLOGGED PostgreSQL table, with tag invalidation from jizz.signals. The table is read and
+# written on the 'cache' database alias; without PostgreSQL only the local tier is used.
+CACHES = {
+    'default': {
+        'BACKEND': 'jizz.tiered_cache.TieredCache',
+        'OPTIONS': {
+            'LOCAL_MAX_ENTRIES': int(os.environ.get('CACHE_LOCAL_MAX_ENTRIES', '2000')),
+            'LOCAL_TIMEOUT': float(os.environ.get('CACHE_LOCAL_TIMEOUT', '5')),
+            'CULL_EVERY': int(os.environ.get('CACHE_CULL_EVERY', '500')),
+            'DATABASE': 'cache',
+        },
+    },
+}
+
 
 DATABASES = {
     'default': {
@@ -150,6 +193,8 @@ DATABASES = {
         'NAME': BASE_DIR / 'db.sqlite3',
     }
 }
+# Own autocommit connection for the shared cache tier, outside the request's transaction.
+DATABASES['cache'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
 
 
 # Password validation
@@ -304,6 +349,54 @@ EBIRD_API_TOKEN = os.environ.get('EBIRD_API_TOKEN', '') or os.environ.get('EBIRD
 # eBird Status and Trends (for regional abundance CSV downloads); get key at https://ebird.org/st/request
 EBIRD_ST_ACCESS_KEY = os.environ.get('EBIRD_ST_ACCESS_KEY', '')
 
+# Usage analytics (jizz.usage_event_buffer): events are queued in-process and bulk inserted
+# by a background thread; batches go to the spool file while the database is slow or down.
+USAGE_EVENTS_BUFFERED = os.environ.get('USAGE_EVENTS_BUFFERED', '1') == '1'
+USAGE_EVENTS_BATCH_SIZE = int(os.environ.get('USAGE_EVENTS_BATCH_SIZE', '200'))
+USAGE_EVENTS_FLUSH_SECONDS = float(os.environ.get('USAGE_EVENTS_FLUSH_SECONDS', '2'))
+USAGE_EVENTS_MAX_QUEUE = int(os.environ.get('USAGE_EVENTS_MAX_QUEUE', '10000'))
+USAGE_EVENTS_SLOW_SECONDS = float(os.environ.get('USAGE_EVENTS_SLOW_SECONDS', '1'))
+USAGE_EVENTS_SPOOL_PATH = os.environ.get('USAGE_EVENTS_SPOOL_PATH', str(BASE_DIR / 'var' / 'usage_events.spool'))
+# Raw UsageEvent rows older than this are deleted by rollup_usage_events --prune (rollups are kept).
+USAGE_EVENTS_RETENTION_DAYS = int(os.environ.get('USAGE_EVENTS_RETENTION_DAYS', '90'))
+
+# Question look-ahead (jizz.question_prefetch): rounds of live standard/extreme games
+# prepared in the background while the current one is played.
+QUESTION_LOOKAHEAD = int(os.environ.get('QUESTION_LOOKAHEAD', '2'))
+QUESTION_PREFETCH_BACKGROUND = True
+# Pregenerated question cards per game filter bucket (jizz.question_pools); 0 disables.
+QUESTION_POOL_SIZE = int(os.environ.get('QUESTION_POOL_SIZE', '40'))
+# Pools not drawn from for this many days are emptied by replenish_question_pools.
+QUESTION_POOL_IDLE_DAYS = int(os.environ.get('QUESTION_POOL_IDLE_DAYS', '14'))
+
+# Background jobs (jizz.job_queue, run by `manage.py run_jobs`): at most this many jobs of a
+# queue run at once across all workers; queues not listed are unlimited.
+JOB_QUEUE_CONCURRENCY = {
+    'email': int(os.environ.get('JOB_QUEUE_EMAIL_CONCURRENCY', '1')),
+    'ai': int(os.environ.get('JOB_QUEUE_AI_CONCURRENCY', '2')),
+}
+
+# Update email broadcasts (jizz.update_emails): parallel sender threads, each with one
+# persistent SMTP connection, an overall send rate (emails/second, 0 = unlimited) and the
+# number of recipients per batch of recipient rows.
+UPDATE_EMAIL_CONNECTIONS = int(os.environ.get('UPDATE_EMAIL_CONNECTIONS', '4'))
+UPDATE_EMAIL_SEND_RATE = float(os.environ.get('UPDATE_EMAIL_SEND_RATE', '10'))
+UPDATE_EMAIL_BATCH_SIZE = int(os.environ.get('UPDATE_EMAIL_BATCH_SIZE', '200'))
+
+# Request profiles (jizz.request_profiling): share of API requests and quiz WebSocket actions
+# stored for /staff/request-profiles/api/, and how long they are kept (prune_request_profiles).
+REQUEST_PROFILING = os.environ.get('REQUEST_PROFILING', '1') == '1'
+REQUEST_PROFILE_SAMPLE_RATE = float(os.environ.get('REQUEST_PROFILE_SAMPLE_RATE', '0.1'))
+REQUEST_PROFILE_RETENTION_DAYS = int(os.environ.get('REQUEST_PROFILE_RETENTION_DAYS', '14'))
+
+# Species catalog deltas (jizz.species_catalog): change ids repeated before ?since= to catch
+# late commits, and days of change history kept by prune_species_catalog_changes (older
+# ?since= values get the full catalog).
+SPECIES_CATALOG_DELTA_OVERLAP = int(os.environ.get('SPECIES_CATALOG_DELTA_OVERLAP', '500'))
+SPECIES_CATALOG_CHANGE_RETENTION_DAYS = int(os.environ.get('SPECIES_CATALOG_CHANGE_RETENTION_DAYS', '30'))
+# Routes over their query budget in jizz/request_budgets.toml raise instead of logging a warning.
+REQUEST_BUDGETS_ENFORCE = False
+
 # Ensure errors are visible in the server process (runserver, gunicorn, etc.)
 LOGGING = {
     'version': 1,
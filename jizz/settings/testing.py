@@ -23,6 +23,7 @@ DATABASES = {
         'PORT': os.environ.get('POSTGRES_PORT', '5432'),
     }
 }
+DATABASES['cache'] = {**DATABASES['default'], 'TEST': {'MIRROR': 'default'}}
 
 # Email settings for MailCatcher (local development)
 EMAIL_BACKEND = 'django.core.mail.backends.smtp.EmailBackend'
@@ -35,6 +36,29 @@ EMAIL_USE_SSL = False
 DEFAULT_FROM_EMAIL = 'info@birdr.pro'
 
 
+# Write usage events inline so tests see them inside their transaction
+USAGE_EVENTS_BUFFERED = False
+
+# Refill question look-ahead inline after commit instead of on a background thread
+QUESTION_PREFETCH_BACKGROUND = False
+
+# Fail tests whose API calls run more queries than jizz/request_budgets.toml allows;
+# profiles are only stored by the tests that ask for them
+REQUEST_BUDGETS_ENFORCE = True
+REQUEST_PROFILE_SAMPLE_RATE = 0
+
+# Per-process cache in tests: query-count assertions would otherwise see shared-tier reads
+# (jizz/tests/test_tiered_cache.py covers the tiered backend)
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+
+# No send-rate limit for update broadcasts in tests
+UPDATE_EMAIL_SEND_RATE = 0
+
+# Tests that use the image/feature cache point it at a temporary directory
+MEDIA_FIRST_ASSERTION_CACHE_DIR = ''
+
 SOCIAL_AUTH_GOOGLE_OAUTH2_KEY = "key"
 SOCIAL_AUTH_GOOGLE_OAUTH2_SECRET = "secret"
 SOCIAL_AUTH_APPLE_ID_SECRET = 'your-actual-apple-secret'
@@ -1 +1,147 @@
 # Signal handlers for jizz models (Birdr Journey and related).
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+
+from jizz.leaderboard import forget_leaderboard_entry, resync_game_leaderboard, sync_leaderboard_entry
+from jizz.models import (
+    Answer,
+    CountrySpecies,
+    Game,
+    LeaderboardEntry,
+    Player,
+    PlayerScore,
+    Species,
+    SpeciesName,
+    TaxonomicFamily,
+    TaxonomicOrder,
+)
+from jizz.playable_species_index import refresh_playable_species
+from jizz.quiz_mistake_counters import apply_answer, rebuild_user_mistake_stats, undo_answer
+from jizz.services.checklist_entries import (
+    forget_checklist_answer,
+    rebuild_user_checklists,
+    record_checklist_answer,
+)
+from jizz.species_catalog import record_species_changes
+from jizz.tiered_cache import checklist_tag, invalidate_tags, species_media_tag
+from media.models import Media, MediaReview
+from media.review_state import refresh_media_review_state, refresh_review_summaries
+
+
+@receiver(post_save, sender=Media)
+@receiver(post_delete, sender=Media)
+def refresh_review_summary_for_media(sender, instance, **kwargs):
+    keys = {(instance.species_id, instance.type)}
+    loaded = getattr(instance, '_loaded_summary_key', None)
+    if loaded and loaded[0] is not None:
+        keys.add(loaded)
+    refresh_review_summaries(keys)
+    instance._loaded_summary_key = (instance.species_id, instance.type)
+
+
+@receiver(post_save, sender=Media)
+@receiver(post_delete, sender=Media)
+def refresh_playable_index_for_media(sender, instance, signal, created=False, **kwargs):
+    state = instance.playable_state()
+    loaded = getattr(instance, '_loaded_playable_state', None)
+    instance._loaded_playable_state = state
+    if signal is post_save and not created and loaded == state:
+        return  # nothing the index reads changed (e.g. a caption edit)
+    # Both species when the media moved: the old one must drop its media id.
+    species_ids = {state[0], loaded[0] if loaded else None} - {None}
+    for species_id in sorted(species_ids):
+        refresh_playable_species(species_id)
+    invalidate_tags(*(species_media_tag(species_id) for species_id in species_ids))
+
+
+@receiver(post_save, sender=MediaReview)
+@receiver(post_delete, sender=MediaReview)
+def refresh_review_state_for_review(sender, instance, **kwargs):
+    # Review columns first: the playable index reads them.
+    refreshed = refresh_media_review_state(instance.media_id)
+    if refreshed is None:
+        return
+    species_id, eligibility_changed = refreshed
+    if eligibility_changed:
+        refresh_playable_species(species_id)
+        invalidate_tags(species_media_tag(species_id))
+
+
+@receiver(post_save, sender=CountrySpecies)
+@receiver(post_delete, sender=CountrySpecies)
+def refresh_playable_index_for_country_species(sender, instance, **kwargs):
+    refresh_playable_species(instance.species_id, country_id=instance.country_id)
+    invalidate_tags(checklist_tag(instance.country_id))
+
+
+@receiver(post_save, sender=Species)
+@receiver(post_delete, sender=Species)
+def record_catalog_change_for_species(sender, instance, **kwargs):
+    record_species_changes([instance.pk])
+
+
+@receiver(post_save, sender=SpeciesName)
+@receiver(post_delete, sender=SpeciesName)
+@receiver(post_save, sender=CountrySpecies)
+@receiver(post_delete, sender=CountrySpecies)
+def record_catalog_change_for_species_row(sender, instance, **kwargs):
+    record_species_changes([instance.species_id])
+
+
+@receiver(post_save, sender=TaxonomicOrder)
+@receiver(pre_delete, sender=TaxonomicOrder)
+@receiver(post_save, sender=TaxonomicFamily)
+@receiver(pre_delete, sender=TaxonomicFamily)
+def record_catalog_change_for_taxon(sender, instance, **kwargs):
+    # pre_delete: the species are unlinked (SET_NULL) without signals of their own.
+    record_species_changes(instance.species.values_list('pk', flat=True))
+
+
+_LEADERBOARD_GAME_FIELDS = {'level', 'country', 'media', 'length', 'rarity', 'tax_order', 'tax_family', 'game_type'}
+
+
+@receiver(post_save, sender=PlayerScore)
+def sync_leaderboard_for_player_score(sender, instance, **kwargs):
+    sync_leaderboard_entry(instance)
+
+
+@receiver(post_delete, sender=LeaderboardEntry)
+def forget_deleted_leaderboard_entry(sender, instance, **kwargs):
+    forget_leaderboard_entry(instance)
+
+
+@receiver(post_save, sender=Game)
+def resync_leaderboard_for_game(sender, instance, created, update_fields=None, **kwargs):
+    if created or (update_fields is not None and not _LEADERBOARD_GAME_FIELDS & set(update_fields)):
+        return
+    resync_game_leaderboard(instance)
+
+
+@receiver(post_save, sender=Answer)
+def record_answer_in_checklist(sender, instance, created, **kwargs):
+    if created:
+        record_checklist_answer(instance.pk)
+
+
+@receiver(post_save, sender=Answer)
+def count_answer_in_mistake_stats(sender, instance, created, **kwargs):
+    if created:
+        apply_answer(instance.pk)
+
+
+@receiver(post_delete, sender=Answer)
+def forget_answer_in_checklist(sender, instance, **kwargs):
+    forget_checklist_answer(instance)
+
+
+@receiver(post_delete, sender=Answer)
+def uncount_answer_in_mistake_stats(sender, instance, **kwargs):
+    undo_answer(instance)
+
+
+@receiver(post_save, sender=Player)
+def rebuild_user_stats_for_linked_player(sender, instance, update_fields=None, **kwargs):
+    # Guest players linked to an account bring their earlier answers along.
+    if instance.user_id and update_fields is not None and 'user' in update_fields:
+        rebuild_user_checklists([instance.user_id])
+        rebuild_user_mistake_stats(instance.user_id)
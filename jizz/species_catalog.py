@@ -0,0 +1,151 @@
+"""
+Prebuilt, versioned species catalog served by ``SpeciesListView``.
+
+The catalog version is the id of the newest ``SpeciesCatalogChange`` row. Signal receivers
+log a row per species whenever a Species, SpeciesName, CountrySpecies or the taxonomic
+order/family of a species changes; bulk writers call ``record_species_changes`` themselves.
+
+For each (language, country, version) the full list is serialized once with two queries,
+hashed into an ETag and precompressed (gzip, plus brotli when the ``brotli`` package is
+installed); the blob lives in the cache until the version moves on. Clients that pass
+``since=<version>`` get only the species changed after that version plus the ids to drop.
+
+Ids are handed out at insert, not at commit, so a change with an id just below a version a
+client already has can still commit after it. A delta therefore also repeats the last
+``SPECIES_CATALOG_DELTA_OVERLAP`` ids before ``since``; clients apply it as an idempotent
+merge (upsert ``changed`` by id, drop ``removed``). ``prune_species_catalog_changes`` keeps
+``SPECIES_CATALOG_CHANGE_RETENTION_DAYS`` of history; a ``since`` older than the oldest
+kept row (or newer than the current version) gets ``full: true`` with the whole catalog in
+``changed``, which replaces the client's list.
+"""
+from __future__ import annotations
+
+import gzip
+import hashlib
+import json
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Iterable, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db.models import F, Max, Min
+from django.utils import timezone
+
+from jizz.models import Species, SpeciesCatalogChange, SpeciesName
+
+try:
+    import brotli
+except ImportError:  # optional
+    brotli = None
+
+_CATALOG_CACHE_TTL = 60 * 60 * 24
+
+
+@dataclass
+class CatalogBlob:
+    version: int
+    etag: str
+    body: bytes
+    gzip_body: bytes
+    brotli_body: Optional[bytes] = None
+
+
+def current_version() -> int:
+    return SpeciesCatalogChange.objects.aggregate(v=Max('id'))['v'] or 0
+
+
+def record_species_changes(species_ids: Iterable[int]) -> None:
+    """Move the catalog version on for these species (one row each)."""
+    rows = [SpeciesCatalogChange(species_id=species_id) for species_id in set(species_ids) if species_id]
+    if rows:
+        SpeciesCatalogChange.objects.bulk_create(rows)
+
+
+def catalog_rows(language: Optional[str], country: Optional[str], species_ids: Optional[Iterable[int]] = None) -> list[dict]:
+    """Catalog entries (the SpeciesListSerializer fields) from two queries."""
+    qs = Species.objects.all()
+    if country:
+        qs = qs.filter(countryspecies__country=country).distinct()
+    if species_ids is not None:
+        qs = qs.filter(pk__in=list(species_ids))
+    rows = list(
+        qs.order_by('pk').values(
+            'id', 'name', 'name_latin', 'name_nl',
+            tax_order_name=F('taxonomic_order__name_latin'),
+            tax_family_name=F('taxonomic_family__name_latin'),
+            tax_family_name_en=F('taxonomic_family__name_en'),
+        )
+    )
+    names = {}
+    if language:
+        names = dict(
+            SpeciesName.objects.filter(language_id=language, species_id__in=[row['id'] for row in rows])
+            .values_list('species_id', 'name')
+        )
+    return [
+        {
+            'name': row['name'],
+            'name_latin': row['name_latin'],
+            'name_nl': row['name_nl'],
+            'name_translated': names.get(row['id'], row['name']),
+            'id': row['id'],
+            'tax_family': row['tax_family_name'],
+            'tax_family_en': row['tax_family_name_en'],
+            'tax_order': row['tax_order_name'],
+        }
+        for row in rows
+    ]
+
+
+def _encode(data) -> bytes:
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def _cache_key(language: Optional[str], country: Optional[str], version: int) -> str:
+    return f'species_catalog:{language or ""}:{country or ""}:{version}'
+
+
+def build_catalog(language: Optional[str], country: Optional[str], version: int) -> CatalogBlob:
+    body = _encode(catalog_rows(language, country))
+    blob = CatalogBlob(
+        version=version,
+        etag='"%s"' % hashlib.sha256(body).hexdigest()[:32],
+        body=body,
+        gzip_body=gzip.compress(body, compresslevel=9, mtime=0),
+        brotli_body=brotli.compress(body) if brotli is not None else None,
+    )
+    cache.set(_cache_key(language, country, version), blob, _CATALOG_CACHE_TTL)
+    return blob
+
+
+def get_catalog(language: Optional[str], country: Optional[str]) -> CatalogBlob:
+    version = current_version()
+    blob = cache.get(_cache_key(language, country, version))
+    return blob if blob is not None else build_catalog(language, country, version)
+
+
+def catalog_delta(language: Optional[str], country: Optional[str], since: int) -> dict:
+    """Species changed after ``since`` (plus the overlap): entries to upsert and ids to remove."""
+    bounds = SpeciesCatalogChange.objects.aggregate(oldest=Min('id'), version=Max('id'))
+    version = bounds['version'] or 0
+    if since > version or (bounds['oldest'] is not None and since < bounds['oldest']):
+        return {'version': version, 'full': True, 'changed': catalog_rows(language, country), 'removed': []}
+    overlap = getattr(settings, 'SPECIES_CATALOG_DELTA_OVERLAP', 500)
+    changed = set(
+        SpeciesCatalogChange.objects.filter(id__gt=since - overlap, id__lte=version)
+        .values_list('species_id', flat=True)
+    )
+    rows = catalog_rows(language, country, changed) if changed else []
+    kept = {row['id'] for row in rows}
+    return {'version': version, 'full': False, 'changed': rows, 'removed': sorted(changed - kept)}
+
+
+def prune_species_catalog_changes() -> int:
+    """Delete change rows older than the retention; the newest row (the version) is kept."""
+    days = getattr(settings, 'SPECIES_CATALOG_CHANGE_RETENTION_DAYS', 30)
+    version = current_version()
+    deleted, _ = SpeciesCatalogChange.objects.filter(
+        created__lt=timezone.now() - timedelta(days=days), id__lt=version
+    ).delete()
+    return deleted
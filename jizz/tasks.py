@@ -0,0 +1,43 @@
+"""
+Background jobs of the jizz app (run by ``manage.py run_jobs``, see jizz.job_queue).
+"""
+from __future__ import annotations
+
+from datetime import timedelta
+
+from jizz.job_queue import job_task
+
+
+@job_task('update_email_broadcast', queue='email', lease=timedelta(hours=2))
+def update_email_broadcast(delivery_id: int) -> dict:
+    """Send (or resume) an update email broadcast; already-mailed subscribers are skipped."""
+    from jizz.models import UpdateEmailDelivery
+    from jizz.update_emails import send_update_email_broadcast
+
+    delivery = UpdateEmailDelivery.objects.select_related('update', 'sent_by').get(pk=delivery_id)
+    if delivery.status != UpdateEmailDelivery.STATUS_SENDING:
+        # Marked stale (or failed) while waiting in the queue or on an earlier attempt.
+        delivery.status = UpdateEmailDelivery.STATUS_SENDING
+        delivery.save(update_fields=['status'])
+    if send_update_email_broadcast(delivery.update, delivery.sent_by, delivery=delivery) is None:
+        delivery.status = UpdateEmailDelivery.STATUS_COMPLETED
+        delivery.save(update_fields=['status'])
+    return {'delivery_id': delivery.pk, 'recipient_count': delivery.recipient_count}
+
+
+@job_task('signup_test_push', queue='push', max_attempts=1)
+def signup_test_push(expo_push_token: str) -> dict:
+    from jizz.mobile_push.expo import send_expo_push
+    from jizz.mobile_push.services import SIGNUP_TEST_BODY, SIGNUP_TEST_TITLE
+
+    sent = send_expo_push(expo_push_token, SIGNUP_TEST_TITLE, SIGNUP_TEST_BODY, data={'type': 'signup_test'})
+    return {'sent': sent}
+
+
+@job_task('replenish_question_pool', queue='pools', max_attempts=1)
+def replenish_question_pool(pool_id: int) -> dict:
+    from jizz.models import QuestionPool
+    from jizz.question_pools import replenish_pool
+
+    pool = QuestionPool.objects.filter(pk=pool_id).first()
+    return {'pool_id': pool_id, 'added': replenish_pool(pool) if pool is not None else 0}
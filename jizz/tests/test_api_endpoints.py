@@ -125,7 +125,7 @@ class ApiSpeciesTestCase(TestCase):
     def test_species_list_returns_200(self):
         response = self.client.get('/api/species/')
         self.assertEqual(response.status_code, status.HTTP_200_OK)
-        self.assertIsInstance(response.data, list)
+        self.assertIsInstance(response.json(), list)
 
     def test_species_detail_returns_200(self):
         response = self.client.get(f'/api/species/{self.species.id}/')
@@ -0,0 +1,99 @@
+"""
+Synthetic benchmark dataset and the hot-path benchmark suite on a tiny dataset.
+"""
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Sum
+from django.test import TransactionTestCase
+
+from jizz.benchmarks.dataset import DatasetSize, generate_dataset
+from jizz.benchmarks.suite import BENCHMARKS, compare_reports, run_benchmarks
+from jizz.models import Answer, Game, LeaderboardEntry, Player, PlayerScore, Question, UsageEvent, UserChecklistEntry
+from media.models import Media, MediaReview
+
+_TINY = DatasetSize(
+    species=80,
+    countries=2,
+    checklist_species=60,
+    users=6,
+    players=12,
+    games=60,
+    questions_per_game=3,
+    media_per_species=2,
+    usage_events=300,
+    usage_days=2,
+)
+
+
+# Transactional: the quiz socket benchmark runs through database_sync_to_async.
+class BenchmarkSuiteTests(TransactionTestCase):
+    def setUp(self):
+        cache.clear()
+        self.counts = generate_dataset(_TINY)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_dataset_is_consistent(self):
+        self.assertEqual(self.counts['species'], 80)
+        self.assertEqual(Game.objects.filter(country__code__startswith='SYN').count(), 60)
+        self.assertEqual(Player.objects.filter(name__startswith='Synthetic player ').count(), 12)
+        self.assertEqual(UsageEvent.objects.count(), 300)
+        self.assertGreater(Media.objects.count(), 0)
+        self.assertGreater(MediaReview.objects.count(), 0)
+        self.assertFalse(MediaReview.objects.filter(review_type='rejected', media__hide=False).exists())
+
+        self.assertEqual(PlayerScore.objects.filter(game__multiplayer=False).count(), Game.objects.filter(multiplayer=False).count())
+        for question in Question.objects.select_related('game')[:50]:
+            self.assertTrue(question.game.country.countryspecies.filter(species_id=question.species_id).exists())
+            self.assertLessEqual(question.sequence, question.game.length)
+        answers = Answer.objects.select_related('question')
+        self.assertEqual(answers.count(), self.counts['answers'])
+        for answer in answers[:100]:
+            self.assertEqual(answer.correct, answer.answer_id == answer.question.species_id)
+            self.assertEqual(answer.score > 0, answer.correct)
+        for score in PlayerScore.objects.annotate(total=Sum('answers__score'))[:20]:
+            self.assertEqual(score.score, score.total or 0)
+
+        self.assertEqual(LeaderboardEntry.objects.count(), PlayerScore.objects.count())
+        self.assertTrue(UserChecklistEntry.objects.exists())
+        with self.assertRaises(ValueError):
+            generate_dataset(_TINY)
+
+    def test_refuses_databases_that_may_be_production(self):
+        with mock.patch.dict(connection.settings_dict, {'NAME': 'jizz'}), self.settings(DEBUG=False):
+            with self.assertRaisesMessage(ValueError, 'i-know-this-is-not-production'):
+                generate_dataset(_TINY)
+            with self.assertRaisesMessage(ValueError, 'already exists'):
+                generate_dataset(_TINY, allow_production=True)
+
+    def test_report_covers_every_benchmark(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            output = Path(tmp) / 'report.json'
+            call_command('run_benchmarks', repeat=2, output=str(output), stdout=StringIO())
+            report = json.loads(output.read_text())
+
+        self.assertEqual(set(report['results']), set(BENCHMARKS))
+        for result in report['results'].values():
+            self.assertGreater(result['queries'], 0)
+            self.assertGreater(result['peak_memory_kb'], 0)
+            self.assertLessEqual(result['min_ms'], result['median_ms'])
+        self.assertGreater(report['table_rows']['jizz_answer'], 0)
+        # Benchmark games and players are removed again.
+        self.assertFalse(Player.objects.filter(name__startswith='Benchmark player').exists())
+
+    def test_compare_flags_slower_and_chattier_paths(self):
+        report = run_benchmarks(['species_mistake_rows'], repeat=1)
+        result = report['results']['species_mistake_rows']
+        faster = {'results': {'species_mistake_rows': {**result, 'median_ms': result['median_ms'] / 10 - 2}}}
+        fewer = {'results': {'species_mistake_rows': {**result, 'queries': result['queries'] - 1}}}
+        self.assertEqual(compare_reports(report, report), [])
+        self.assertEqual(len(compare_reports(faster, report)), 1)
+        self.assertIn('queries', compare_reports(fewer, report)[0])
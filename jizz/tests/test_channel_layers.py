@@ -0,0 +1,111 @@
+"""
+PostgreSQL channel layer: cross-worker group fan-out, membership expiry, capacity limits.
+"""
+
+import asyncio
+from io import StringIO
+
+from asgiref.sync import async_to_sync
+from channels.exceptions import ChannelFull
+from django.core.management import call_command
+from django.test import SimpleTestCase
+
+from jizz.channel_layers import PostgresChannelLayer
+
+
+class PostgresChannelLayerTests(SimpleTestCase):
+    # The layer talks to the test database over its own autocommit connections.
+    databases = {'default'}
+
+    def setUp(self):
+        self.layers = []
+
+    def tearDown(self):
+        async def close_all():
+            await self.layers[0].flush()
+            for layer in self.layers:
+                await layer.close()
+
+        if self.layers:
+            async_to_sync(close_all)()
+
+    def _layer(self, **config):
+        layer = PostgresChannelLayer(poll_interval=0.1, **config)
+        self.layers.append(layer)
+        return layer
+
+    def test_group_send_reaches_channels_on_every_worker(self):
+        worker_a, worker_b, sender = self._layer(), self._layer(), self._layer()
+
+        async def scenario():
+            a1, a2 = await worker_a.new_channel(), await worker_a.new_channel()
+            b1 = await worker_b.new_channel()
+            for layer, channel in ((worker_a, a1), (worker_a, a2), (worker_b, b1)):
+                await layer.group_add('quiz_ABC', channel)
+            big = 'x' * 20000  # larger than a NOTIFY payload
+            await sender.group_send('quiz_ABC', {'type': 'update_players', 'players': [big]})
+            received = await asyncio.gather(
+                asyncio.wait_for(worker_a.receive(a1), 5),
+                asyncio.wait_for(worker_a.receive(a2), 5),
+                asyncio.wait_for(worker_b.receive(b1), 5),
+            )
+            await sender.send(b1, {'type': 'direct'})
+            direct = await asyncio.wait_for(worker_b.receive(b1), 5)
+            return received, direct
+
+        received, direct = async_to_sync(scenario)()
+        self.assertEqual([m['players'][0][:3] for m in received], ['xxx'] * 3)
+        self.assertEqual(direct, {'type': 'direct'})
+
+    def test_discarded_and_expired_members_receive_nothing(self):
+        worker = self._layer()
+        expiring = self._layer(group_expiry=0)
+
+        async def scenario():
+            kept, left = await worker.new_channel(), await worker.new_channel()
+            stale = await expiring.new_channel()
+            await worker.group_add('quiz_X', kept)
+            await worker.group_add('quiz_X', left)
+            await expiring.group_add('quiz_X', stale)
+            await worker.group_discard('quiz_X', left)
+            await worker.group_send('quiz_X', {'type': 'game_started'})
+            await asyncio.wait_for(worker.receive(kept), 5)
+            for layer, channel in ((worker, left), (expiring, stale)):
+                with self.assertRaises(asyncio.TimeoutError):
+                    await asyncio.wait_for(layer.receive(channel), 0.5)
+
+        async_to_sync(scenario)()
+
+    def test_capacity_limits(self):
+        worker = self._layer(capacity=2)
+        offline = self._layer(capacity=2)
+
+        async def scenario():
+            channel = await worker.new_channel()
+            await worker.send(channel, {'type': 'one'})
+            await worker.send(channel, {'type': 'two'})
+            with self.assertRaises(ChannelFull):
+                await worker.send(channel, {'type': 'three'})
+            self.assertEqual((await worker.receive(channel))['type'], 'one')
+
+            # A worker that is not claiming its messages: backlog is bounded in the table.
+            remote = f'specific.{offline.instance}!abc'
+            await worker.send(remote, {'type': 'a'})
+            await worker.send(remote, {'type': 'b'})
+            with self.assertRaises(ChannelFull):
+                await worker.send(remote, {'type': 'c'})
+
+        async_to_sync(scenario)()
+
+    def test_load_test_fans_one_game_out_over_worker_processes(self):
+        out = StringIO()
+        call_command(
+            'channel_layer_load_test',
+            workers=2,
+            players=3,
+            messages=5,
+            interval=0,
+            timeout=10,
+            stdout=out,
+        )
+        self.assertIn('Delivered 30/30 messages', out.getvalue())
@@ -0,0 +1,97 @@
+"""
+Materialized checklist rows: per-answer upsert, recompute on delete/link, backfill command.
+"""
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from jizz.models import Answer, Country, Game, Player, PlayerScore, Question, Species, UserChecklistEntry
+from jizz.services.checklist_entries import rebuild_user_checklists
+
+User = get_user_model()
+
+
+def _rows(user):
+    return sorted(
+        UserChecklistEntry.objects.filter(user=user).values_list(
+            'country_id', 'species_id', 'times_encountered', 'times_identified',
+            'first_encountered_at', 'last_encountered_at', 'first_identified_at', 'last_identified_at',
+        )
+    )
+
+
+class UserChecklistEntryTests(TestCase):
+    def setUp(self):
+        self.country = Country.objects.get_or_create(code='NL', defaults={'name': 'Netherlands'})[0]
+        self.user = User.objects.create_user(username='lifelist', password='x')
+        self.player = Player.objects.create(name='Lister', user=self.user)
+        self.robin = Species.objects.create(name='Robin', name_latin='Erithacus rubecula', code='eurrob1')
+        self.wren = Species.objects.create(name='Wren', name_latin='Troglodytes troglodytes', code='winwre4')
+
+    def _play(self, player, picks):
+        """One game; ``picks`` is a list of (question species, answered species)."""
+        game = Game.objects.create(country=self.country, level='advanced', length=len(picks), media='images')
+        score = PlayerScore.objects.create(player=player, game=game)
+        for sequence, (species, answer) in enumerate(picks, 1):
+            question = Question.objects.create(game=game, species=species, sequence=sequence, number=0)
+            Answer.objects.create(player_score=score, question=question, answer=answer)
+        return game
+
+    def test_answers_update_rows_incrementally(self):
+        self._play(self.player, [(self.robin, self.wren), (self.wren, self.wren)])
+        self._play(self.player, [(self.robin, self.robin)])
+        robin = UserChecklistEntry.objects.get(user=self.user, species=self.robin)
+        self.assertEqual((robin.times_encountered, robin.times_identified), (2, 1))
+        self.assertLess(robin.first_encountered_at, robin.first_identified_at)
+        self.assertEqual(robin.last_identified_at, robin.last_encountered_at)
+
+        incremental = _rows(self.user)
+        self.assertEqual(rebuild_user_checklists([self.user.pk]), 2)
+        self.assertEqual(_rows(self.user), incremental)
+
+    def test_answer_insert_is_one_extra_query(self):
+        game = Game.objects.create(country=self.country, level='advanced', length=1, media='images')
+        score = PlayerScore.objects.create(player=self.player, game=game)
+        question = Question.objects.create(game=game, species=self.robin, sequence=1, number=0)
+        with CaptureQueriesContext(connection) as ctx:
+            Answer.objects.create(player_score=score, question=question, answer=self.robin)
+        self.assertEqual(sum('jizz_userchecklistentry' in q['sql'] for q in ctx.captured_queries), 1)
+
+    def test_guest_answers_and_deleted_games(self):
+        guest = Player.objects.create(name='Guest')
+        self._play(guest, [(self.robin, self.robin)])
+        self.assertFalse(UserChecklistEntry.objects.exists())
+
+        game = self._play(self.player, [(self.robin, self.robin)])
+        self._play(self.player, [(self.robin, self.wren)])
+        game.delete()
+        robin = UserChecklistEntry.objects.get(user=self.user, species=self.robin)
+        self.assertEqual((robin.times_encountered, robin.times_identified), (1, 0))
+        self.assertIsNone(robin.first_identified_at)
+
+    def test_linking_guest_player_brings_answers(self):
+        guest = Player.objects.create(name='Guest')
+        self._play(guest, [(self.wren, self.wren)])
+        guest.user = self.user
+        guest.save(update_fields=['user'])
+        self.assertEqual(UserChecklistEntry.objects.get(user=self.user).times_identified, 1)
+
+    def test_backfill_command_resumes_after_user(self):
+        other = User.objects.create_user(username='second', password='x')
+        self._play(self.player, [(self.robin, self.robin)])
+        self._play(Player.objects.create(name='Other', user=other), [(self.wren, self.robin)])
+        UserChecklistEntry.objects.all().delete()
+
+        out = StringIO()
+        call_command('backfill_checklist_entries', '--after-user', str(self.user.pk), stdout=out)
+        self.assertFalse(UserChecklistEntry.objects.filter(user=self.user).exists())
+        self.assertEqual(UserChecklistEntry.objects.get(user=other).times_encountered, 1)
+
+        call_command('backfill_checklist_entries', '--batch-size', '1', stdout=out)
+        self.assertEqual(UserChecklistEntry.objects.count(), 2)
+        self.assertIn(f'Users up to id {other.pk} done', out.getvalue())
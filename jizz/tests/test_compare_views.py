@@ -1,12 +1,15 @@
 """
 Tests for compare app views: traits, comparisons, comparison request, scrape.
 """
+from datetime import timedelta
 from unittest.mock import patch, MagicMock
 from django.test import TestCase
+from django.utils import timezone
 from rest_framework.test import APIClient
 from rest_framework import status
 
-from jizz.models import Species
+from jizz.job_queue import claim_job, run_job, run_pending
+from jizz.models import Job, Species
 from compare.models import SpeciesTrait, SpeciesComparison, ComparisonRequest
 
 
@@ -204,9 +207,9 @@ class ComparisonRequestViewTestCase(TestCase):
         self.assertEqual(response.data['id'], comp.id)
         self.assertEqual(response.data['summary'], 'Existing.')
 
-    @patch('compare.views.ComparisonRequestView._generate_comparison')
-    def test_request_post_family_creates_new_comparison(self, mock_generate):
-        # Create comparison only when the view calls _generate_comparison (after existing check)
+    @patch('compare.tasks.generate_comparison')
+    def test_request_post_family_queues_job_that_creates_comparison(self, mock_generate):
+        # Create comparison only when the job calls generate_comparison (after existing check)
         def create_comparison(*args, **kwargs):
             return SpeciesComparison.objects.create(
                 comparison_type='family',
@@ -225,13 +228,22 @@ class ComparisonRequestViewTestCase(TestCase):
             },
             format='json',
         )
-        self.assertEqual(response.status_code, status.HTTP_201_CREATED)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
         self.assertEqual(response.data['comparison_type'], 'family')
-        self.assertEqual(response.data['family_1'], 'Turdidae')
-        mock_generate.assert_called_once()
+        self.assertEqual(response.data['status'], 'pending')
+        self.assertEqual(response['Location'], response.data['status_url'])
+        mock_generate.assert_not_called()
 
-    @patch('compare.views.ComparisonRequestView._generate_comparison')
-    def test_request_post_returns_500_when_generate_raises(self, mock_generate):
+        run_pending(queues=['ai'])
+        mock_generate.assert_called_once()
+        job_status = self.client.get(response.data['status_url']).json()
+        self.assertEqual(job_status['status'], 'done')
+        req = ComparisonRequest.objects.get(pk=response.data['id'])
+        self.assertEqual(req.status, 'completed')
+        self.assertEqual(job_status['result']['comparison_id'], req.comparison_id)
+
+    @patch('compare.tasks.generate_comparison')
+    def test_request_job_marks_request_failed_when_generate_raises(self, mock_generate):
         mock_generate.side_effect = ValueError('AI service unavailable')
         response = self.client.post(
             '/api/compare/request/',
@@ -242,13 +254,14 @@ class ComparisonRequestViewTestCase(TestCase):
             },
             format='json',
         )
-        self.assertEqual(response.status_code, status.HTTP_500_INTERNAL_SERVER_ERROR)
-        self.assertIn('error', response.data)
-        from compare.models import ComparisonRequest
-        req = ComparisonRequest.objects.filter(
-            comparison_type='family', family_1='Turdidae', family_2='Passeridae'
-        ).order_by('-requested_at').first()
-        self.assertIsNotNone(req)
+        self.assertEqual(response.status_code, status.HTTP_202_ACCEPTED)
+        job = Job.objects.get(uuid=response.data['job_id'])
+        for _ in range(job.max_attempts):
+            run_job(claim_job(now=timezone.now() + timedelta(hours=1)))
+        job_status = self.client.get(response.data['status_url']).json()
+        self.assertEqual(job_status['status'], 'failed')
+        self.assertIn('AI service unavailable', job_status['error'])
+        req = ComparisonRequest.objects.get(pk=response.data['id'])
         self.assertEqual(req.status, 'failed')
         self.assertIn('AI service unavailable', (req.error_message or ''))
 
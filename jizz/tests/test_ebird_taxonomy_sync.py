@@ -0,0 +1,105 @@
+"""
+Diff-based eBird taxonomy / names sync from payloads cached on disk (no network).
+"""
+import json
+import tempfile
+from pathlib import Path
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from jizz.models import Language, Species, SpeciesCatalogChange, SpeciesName, TaxonomicFamily, TaxonomicOrder
+from jizz.services.ebird_taxonomy_sync import TaxonomyPayloads, sync_species_names, sync_taxonomy
+
+
+def _row(code, sci, com, family='Turdidae', family_en='Thrushes and Allies', order='Passeriformes', taxon_order=1.0):
+    return {
+        'speciesCode': code, 'sciName': sci, 'comName': com, 'category': 'species',
+        'familySciName': family, 'familyComName': family_en, 'order': order, 'taxonOrder': taxon_order,
+    }
+
+
+class EbirdTaxonomySyncTests(TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.rows = {
+            'en_UK': [_row(f'thr{i}', f'Turdus species{i}', f'Thrush {i}', taxon_order=float(i)) for i in range(30)]
+            + [_row('rob1', 'Erithacus rubecula', 'Robin', family='Muscicapidae', family_en='Old World Flycatchers')],
+            'nl': [_row(f'thr{i}', f'Turdus species{i}', f'Lijster {i}') for i in range(30)],
+        }
+        self._write_payloads()
+
+    def _write_payloads(self):
+        for locale, rows in self.rows.items():
+            Path(self.tmp.name, f'ebird-taxonomy-{locale}.json').write_text(json.dumps(rows))
+
+    def _payloads(self):
+        def offline(**kwargs):
+            raise AssertionError(f'unexpected fetch {kwargs}')
+        return TaxonomyPayloads(cache_dir=self.tmp.name, fetch=offline)
+
+    def test_first_sync_then_noop(self):
+        with CaptureQueriesContext(connection) as ctx:
+            report = sync_taxonomy(self._payloads())
+        self.assertLess(len(ctx), 25)
+        self.assertEqual(
+            {table: (c.created, c.updated) for table, c in report.items()},
+            {'order': (1, 0), 'family': (2, 0), 'genus': (2, 0), 'species': (31, 0)},
+        )
+        robin = Species.objects.get(code='rob1')
+        self.assertEqual(robin.taxonomic_family.name_latin, 'Muscicapidae')
+        self.assertEqual(robin.taxonomic_genus.taxonomic_family_id, robin.taxonomic_family_id)
+        self.assertEqual(Species.objects.get(code='thr3').name_nl, 'Lijster 3')
+
+        version = SpeciesCatalogChange.objects.count()
+        with CaptureQueriesContext(connection) as ctx:
+            report = sync_taxonomy(self._payloads())
+        self.assertTrue(all(c.created == c.updated == 0 for c in report.values()))
+        self.assertFalse(any(q['sql'].startswith(('INSERT', 'UPDATE')) for q in ctx.captured_queries))
+        self.assertEqual(SpeciesCatalogChange.objects.count(), version)
+
+    def test_changes_and_dry_run(self):
+        sync_taxonomy(self._payloads())
+        self.rows['en_UK'][0]['comName'] = 'Renamed Thrush'
+        self.rows['en_UK'][-1].update(familySciName='Turdidae', familyComName='Thrushes and Allies')
+        self.rows['en_UK'].append(_row('new1', 'Novus avis', 'Newbird', family='Novidae', order='Noviformes'))
+        self._write_payloads()
+
+        report = sync_taxonomy(self._payloads(), dry_run=True)
+        self.assertEqual((report['species'].created, report['species'].updated), (1, 2))
+        self.assertEqual((report['order'].created, report['family'].created), (1, 1))
+        self.assertFalse(Species.objects.filter(code='new1').exists())
+
+        sync_taxonomy(self._payloads())
+        self.assertEqual(Species.objects.get(code='thr0').name, 'Renamed Thrush')
+        self.assertEqual(Species.objects.get(code='rob1').taxonomic_family, TaxonomicFamily.objects.get(name_latin='Turdidae'))
+        self.assertEqual(Species.objects.get(code='new1').taxonomic_order, TaxonomicOrder.objects.get(name_latin='Noviformes'))
+
+    def test_species_names(self):
+        sync_taxonomy(self._payloads())
+        nl = Language.objects.get_or_create(code='nl', defaults={'name': 'Dutch'})[0]
+        SpeciesName.objects.create(species=Species.objects.get(code='thr0'), language=nl, name='Oude naam')
+
+        with CaptureQueriesContext(connection) as ctx:
+            report = sync_species_names(self._payloads(), [nl])
+        self.assertLess(len(ctx), 10)
+        self.assertEqual((report['nl'].created, report['nl'].updated, report['nl'].unchanged), (29, 1, 0))
+        self.assertEqual(SpeciesName.objects.get(species__code='thr0', language=nl).name, 'Lijster 0')
+
+        report = sync_species_names(self._payloads(), [nl], dry_run=True)
+        self.assertEqual(report['nl'].unchanged, 30)
+
+    def test_payloads_are_cached_to_disk(self):
+        calls = []
+
+        def fetch(**kwargs):
+            calls.append(kwargs['locale'])
+            return self.rows['en_UK']
+
+        cache_dir = Path(self.tmp.name, 'fresh')
+        payloads = TaxonomyPayloads(cache_dir=cache_dir, fetch=fetch)
+        self.assertEqual(len(payloads.rows('en_UK')), 31)
+        self.assertEqual(len(TaxonomyPayloads(cache_dir=cache_dir, fetch=fetch).rows('en_UK')), 31)
+        self.assertEqual(calls, ['en_UK'])
@@ -0,0 +1,130 @@
+"""
+Light game state: fixed query count, compact answers, cached highscore and ETag responses.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from jizz.game_state import build_game_state, game_highscore
+from jizz.models import Answer, Country, Game, Player, PlayerScore, Question, Species
+
+
+class GameStateTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.country = Country.objects.get_or_create(code='NL', defaults={'name': 'Netherlands'})[0]
+        self.robin = Species.objects.create(name='Robin', name_latin='Erithacus rubecula', code='eurrob1')
+        self.wren = Species.objects.create(name='Wren', name_latin='Troglodytes troglodytes', code='winwre4')
+        self.host = Player.objects.create(name='Host')
+        self.game = self._game(self.host)
+
+    def tearDown(self):
+        cache.clear()
+
+    def _game(self, host):
+        return Game.objects.create(
+            country=self.country, level='advanced', length=3, media='images', multiplayer=True, host=host,
+        )
+
+    def _play(self, game, player_count, rounds=2):
+        questions = [
+            Question.objects.create(game=game, species=self.robin, sequence=i, number=0)
+            for i in range(1, rounds + 1)
+        ]
+        for i in range(player_count):
+            player = game.host if i == 0 else Player.objects.create(name=f'{game.pk}-{i}')
+            score = PlayerScore.objects.create(player=player, game=game)
+            for question in questions:
+                Answer.objects.create(player_score=score, question=question, answer=self.robin if i % 2 else self.wren)
+        return questions
+
+    def _state_queries(self, player_count):
+        game = self._game(Player.objects.create(name=f'Host {player_count}'))
+        self._play(game, player_count)
+        game = Game.objects.select_related('host', 'country').get(pk=game.pk)
+        cache.clear()
+        with CaptureQueriesContext(connection) as ctx:
+            state = build_game_state(game)
+        self.assertEqual(len(state['scores']), player_count)
+        return len(ctx)
+
+    def test_state_has_scoreboard_and_compact_answers(self):
+        self._play(self.game, 3)
+        state = build_game_state(Game.objects.select_related('host', 'country').get(pk=self.game.pk))
+
+        self.assertEqual(state['token'], str(self.game.token))
+        self.assertEqual(state['progress'], 2)
+        self.assertEqual(state['country']['code'], 'NL')
+        first = state['scores'][0]
+        self.assertEqual(set(first), {
+            'id', 'name', 'language', 'score', 'status', 'is_host', 'ranking', 'last_answer', 'answers',
+        })
+        self.assertEqual([a['sequence'] for a in first['answers']], [1, 2])
+        self.assertTrue(all(a['correct'] for a in first['answers']))
+        self.assertEqual(state['current_highscore']['score'], first['score'])
+
+    def test_query_count_does_not_grow_with_players_or_answers(self):
+        self.assertEqual(self._state_queries(2), self._state_queries(30))
+
+    def test_highscore_is_cached_until_a_score_can_beat_it(self):
+        self._play(self.game, 2)
+        best = game_highscore(self.game)
+        with self.assertNumQueries(0):
+            self.assertEqual(game_highscore(self.game), best)
+
+        other = self._game(Player.objects.create(name='Challenger'))
+        score = PlayerScore.objects.create(player=other.host, game=other)
+        score.score = best['score'] + 100
+        score.save()
+
+        self.assertEqual(game_highscore(self.game)['id'], score.pk)
+
+    def test_practice_games_have_no_highscore(self):
+        self.game.game_type = Game.GAME_TYPE_SPECIES_PRACTICE
+        self.assertIsNone(game_highscore(self.game))
+
+    def test_state_endpoint_answers_if_none_match(self):
+        self._play(self.game, 2)
+        url = f'/api/games/{self.game.token}/state/'
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        etag = response['ETag']
+        self.assertEqual(response.json()['token'], str(self.game.token))
+
+        unchanged = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(unchanged.status_code, 304)
+        self.assertEqual(unchanged.content, b'')
+
+        Question.objects.create(game=self.game, species=self.robin, sequence=3, number=0)
+        changed = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(changed.status_code, 200)
+        self.assertNotEqual(changed['ETag'], etag)
+
+    def test_highscore_and_history_resources(self):
+        self._play(self.game, 2)
+
+        highscore = self.client.get(f'/api/games/{self.game.token}/highscore/')
+        self.assertEqual(highscore.status_code, 200)
+        self.assertIn('max-age=60', highscore['Cache-Control'])
+        self.assertEqual(highscore.json()['current_highscore'], game_highscore(self.game))
+
+        history = self.client.get(f'/api/games/{self.game.token}/history/')
+        self.assertEqual(history.status_code, 200)
+        scores = history.json()['scores']
+        self.assertEqual(len(scores), 2)
+        self.assertEqual([a['sequence'] for a in scores[0]['answers']], [1, 2])
+        self.assertEqual(scores[0]['answers'][0]['species']['id'], self.robin.id)
+
+    def test_full_detail_keeps_scores_and_supports_etag(self):
+        self._play(self.game, 1)
+        url = f'/api/games/{self.game.token}/'
+
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.json()['scores'][0]['answers']), 2)
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
@@ -0,0 +1,121 @@
+"""
+Database job queue: leasing, priority, retries, expired leases, per-queue concurrency,
+the status endpoint and the update broadcast job.
+"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jizz.job_queue import JOB_TASKS, claim_job, enqueue, job_task, run_job, run_pending
+from jizz.models import Job, Update, UpdateEmailDelivery, UserProfile
+from jizz.update_emails import start_update_email_broadcast_async
+
+User = get_user_model()
+
+CALLS = []
+
+
+@job_task('test_record', queue='test')
+def _record(value):
+    CALLS.append(value)
+    return {'value': value}
+
+
+@job_task('test_flaky', queue='test', max_attempts=2)
+def _flaky():
+    raise RuntimeError('boom')
+
+
+@job_task('test_limited', queue='limited')
+def _limited():
+    return None
+
+
+class JobQueueTests(TestCase):
+    def setUp(self):
+        CALLS.clear()
+
+    def test_runs_by_priority_and_stores_result(self):
+        low = enqueue('test_record', {'value': 'low'})
+        enqueue('test_record', {'value': 'high'}, priority=5)
+        enqueue('test_record', {'value': 'later'}, run_after=timezone.now() + timedelta(hours=1))
+
+        self.assertEqual(run_pending(queues=['test']), 2)
+        self.assertEqual(CALLS, ['high', 'low'])
+        low.refresh_from_db()
+        self.assertEqual((low.status, low.result, low.attempts), (Job.STATUS_DONE, {'value': 'low'}, 1))
+
+    def test_failed_job_is_retried_with_backoff_then_fails(self):
+        job = enqueue('test_flaky')
+        run_job(claim_job(worker='w1'))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.STATUS_QUEUED)
+        self.assertGreater(job.run_after, timezone.now())
+        self.assertIn('RuntimeError: boom', job.error)
+
+        run_job(claim_job(worker='w1', now=job.run_after))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.STATUS_FAILED, 2))
+        self.assertIsNotNone(job.finished)
+
+    def test_expired_lease_is_reclaimed(self):
+        job = enqueue('test_record', {'value': 'x'})
+        self.assertEqual(claim_job(worker='dead').pk, job.pk)
+        self.assertIsNone(claim_job(worker='w2'))
+
+        later = timezone.now() + JOB_TASKS['test_record'].lease + timedelta(seconds=1)
+        reclaimed = claim_job(worker='w2', now=later)
+        self.assertEqual((reclaimed.pk, reclaimed.attempts), (job.pk, 2))
+        # The dead worker can no longer record an outcome.
+        job.worker = 'dead'
+        job.attempts = 1
+        run_job(job)
+        reclaimed.refresh_from_db()
+        self.assertEqual((reclaimed.status, reclaimed.worker), (Job.STATUS_RUNNING, 'w2'))
+
+    @override_settings(JOB_QUEUE_CONCURRENCY={'limited': 1})
+    def test_queue_concurrency(self):
+        first = enqueue('test_limited')
+        enqueue('test_limited')
+        other = enqueue('test_record', {'value': 'y'})
+
+        self.assertEqual(claim_job(worker='w1').pk, first.pk)
+        self.assertEqual(claim_job(worker='w2').pk, other.pk)  # 'limited' is full
+        self.assertIsNone(claim_job(worker='w3'))
+
+    def test_status_endpoint(self):
+        job = enqueue('test_record', {'value': 'z'})
+        client = APIClient()
+        url = f'/api/jobs/{job.uuid}/'
+        self.assertEqual(client.get(url).json()['status'], 'queued')
+        run_pending(queues=['test'])
+        data = client.get(url).json()
+        self.assertEqual((data['status'], data['result']), ('done', {'value': 'z'}))
+        self.assertEqual(client.get('/api/jobs/00000000-0000-0000-0000-000000000000/').status_code, 404)
+
+
+class UpdateBroadcastJobTests(TestCase):
+    def test_update_broadcast_is_sent_by_the_worker(self):
+        staff = User.objects.create_user(username='staff', email='staff@test.com', password='pass')
+        for i in range(3):
+            user = User.objects.create_user(username=f'u{i}', email=f'u{i}@test.com', password='pass')
+            UserProfile.objects.update_or_create(user=user, defaults={'receive_updates': True})
+        update = Update.objects.create(
+            title_en='News', body_en='{"delta":"","html":"<p>Hello</p>"}', user=staff,
+        )
+
+        with patch('jizz.update_emails.EmailMultiAlternatives.send') as send:
+            self.assertTrue(start_update_email_broadcast_async(update, staff))
+            self.assertFalse(start_update_email_broadcast_async(update, staff))  # in progress
+            send.assert_not_called()
+            self.assertEqual(run_pending(queues=['email']), 1)
+
+        delivery = UpdateEmailDelivery.objects.get(update=update, is_test=False)
+        self.assertEqual(delivery.status, UpdateEmailDelivery.STATUS_COMPLETED)
+        self.assertEqual(send.call_count, delivery.recipient_count)
+        self.assertGreater(delivery.recipient_count, 0)
+
@@ -0,0 +1,135 @@
+"""
+Leaderboard index: incremental entries/rank table, ranks, hiscores pages and the top cache.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from jizz.leaderboard import TOP_SCORES_CACHED, rebuild_leaderboard, score_rank
+from jizz.models import Country, Game, LeaderboardEntry, LeaderboardScoreCount, Player, PlayerScore
+
+
+def _counts():
+    return sorted(
+        LeaderboardScoreCount.objects.filter(count__gt=0)
+        .values_list('level', 'country_code', 'length', 'listed', 'score', 'count')
+    )
+
+
+class LeaderboardIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.get_or_create(code='NL', defaults={'name': 'Netherlands'})[0]
+
+    def _game(self, **kwargs):
+        return Game.objects.create(
+            **{'country': self.country, 'level': 'advanced', 'length': 10, 'media': 'images', **kwargs}
+        )
+
+    def _score(self, game, score, name='P'):
+        return PlayerScore.objects.create(player=Player.objects.create(name=name), game=game, score=score)
+
+    def test_entries_follow_score_changes_and_deletes(self):
+        game = self._game()
+        ps = self._score(game, 100)
+        other = self._score(game, 300)
+        self.assertEqual(LeaderboardEntry.objects.get(pk=ps.pk).score, 100)
+
+        ps.score = 300
+        ps.save()
+        self.assertEqual(_counts(), [('advanced', 'NL', 10, True, 300, 2)])
+        self.assertEqual(score_rank(ps), 1)  # tie: lower id first
+        self.assertEqual(score_rank(other), 2)
+
+        ps.delete()
+        self.assertEqual(_counts(), [('advanced', 'NL', 10, True, 300, 1)])
+        self.assertEqual(PlayerScore.objects.get(pk=other.pk).ranking, 1)
+
+    def test_score_update_syncs_in_one_query(self):
+        ps = self._score(self._game(), 10)
+        ps.score = 50
+        with CaptureQueriesContext(connection) as ctx:
+            ps.save()
+        self.assertEqual(len(ctx), 2)  # UPDATE playerscore + leaderboard sync
+
+    def test_rank_matches_sorted_bucket(self):
+        game = self._game()
+        scores = [self._score(game, value) for value in (500, 200, 900, 200, 50)]
+        self._score(self._game(length=20), 1000)  # other bucket
+        expected = sorted(scores, key=lambda ps: (-ps.score, ps.pk))
+        self.assertEqual([score_rank(ps) for ps in expected], [1, 2, 3, 4, 5])
+        self.assertEqual(game.current_highscore.pk, scores[2].pk)
+
+    def test_practice_games_ranked_but_not_listed(self):
+        practice = self._game(game_type=Game.GAME_TYPE_SPECIES_PRACTICE)
+        hidden = self._score(practice, 800)
+        shown = self._score(self._game(), 400)
+        self.assertEqual(score_rank(hidden), 1)
+        self.assertEqual(score_rank(shown), 2)
+
+        response = APIClient().get('/api/scores/?game__level=advanced&game__length=10')
+        self.assertEqual([row['id'] for row in response.data['results']], [shown.pk])
+        self.assertEqual(response.data['count'], 1)
+
+    def test_game_bucket_change_moves_entries(self):
+        game = self._game()
+        ps = self._score(game, 70)
+        game.length = 20
+        game.save()
+        self.assertEqual(LeaderboardEntry.objects.get(pk=ps.pk).length, 20)
+        self.assertEqual(_counts(), [('advanced', 'NL', 20, True, 70, 1)])
+
+    def test_rebuild_matches_incremental_state(self):
+        game = self._game()
+        for value in (10, 20, 20):
+            self._score(game, value)
+        self._score(self._game(tax_family='Anatidae'), 20)
+        incremental = _counts()
+        self.assertEqual(rebuild_leaderboard(), 4)
+        self.assertEqual(_counts(), incremental)
+
+
+class HiscoresListTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.game = Game.objects.create(level='advanced', length=10, media='images')
+        self.scores = [
+            PlayerScore.objects.create(player=Player.objects.create(name=f'P{i}'), game=self.game, score=i * 10)
+            for i in range(TOP_SCORES_CACHED + 5)
+        ]
+
+    def test_second_page_continues_ranking(self):
+        response = self.client.get('/api/scores/?game__level=advanced&page=2')
+        self.assertEqual(response.data['count'], TOP_SCORES_CACHED + 5)
+        self.assertEqual([row['ranking'] for row in response.data['results']], [101, 102, 103, 104, 105])
+        self.assertEqual(response.data['results'][-1]['score'], 0)
+
+    def test_cached_top_list_sees_new_high_score(self):
+        self.client.get('/api/scores/?game__level=advanced')
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get('/api/scores/?game__level=advanced')
+        self.assertFalse(any('ORDER BY' in q['sql'] for q in ctx.captured_queries))
+
+        low = self.scores[0]
+        low.score = 5000
+        low.save()
+        first = self.client.get('/api/scores/?game__level=advanced').data['results'][0]
+        self.assertEqual((first['id'], first['ranking']), (low.pk, 1))
+
+    def test_ordering_parameter_uses_the_score_index(self):
+        response = self.client.get('/api/scores/?game__level=advanced&ordering=score')
+        rows = response.data['results']
+        self.assertEqual([row['score'] for row in rows[:3]], [0, 10, 20])
+        self.assertEqual(rows[0]['ranking'], TOP_SCORES_CACHED + 5)
+
+        unknown = self.client.get('/api/scores/?game__level=advanced&ordering=player__name')
+        self.assertEqual(unknown.data['results'][0]['ranking'], 1)
+        self.assertEqual(unknown.data['results'][0]['score'], (TOP_SCORES_CACHED + 4) * 10)
+
+    def test_invalid_length_is_rejected(self):
+        response = self.client.get('/api/scores/?game__length=ten')
+        self.assertEqual(response.status_code, 400)
@@ -21,7 +21,7 @@ class SendPushToUserTestCase(TestCase):
             notifications.send_push_to_user(user, 'Title', 'Body')
             mock_post.assert_not_called()
 
-    @patch('jizz.mobile_push.expo.send_expo_push')
+    @patch('jizz.mobile_push.dispatch.send_push_messages')
     def test_tokens_exist_but_send_disabled_does_not_post(self, mock_send):
         user = User.objects.create_user(username='u', email='u@test.com', password='pass')
         DeviceToken.objects.create(user=user, token='ExponentPushToken[xxx]', platform='ios')
@@ -29,11 +29,12 @@ class SendPushToUserTestCase(TestCase):
             notifications.send_push_to_user(user, 'Title', 'Body')
         mock_send.assert_called_once()
 
-    @patch('jizz.mobile_push.expo.send_expo_push', return_value=True)
+    @patch('jizz.mobile_push.dispatch.send_push_messages')
     def test_tokens_and_send_enabled_posts_to_expo(self, mock_send):
         user = User.objects.create_user(username='u', email='u@test.com', password='pass')
         DeviceToken.objects.create(user=user, token='ExponentPushToken[yyy]', platform='android')
         notifications.send_push_to_user(user, 'Hi', 'Message', data={'key': 'value'})
-        mock_send.assert_called_once_with(
-            'ExponentPushToken[yyy]', 'Hi', 'Message', data={'key': 'value'}
-        )
+        mock_send.assert_called_once_with([{
+            'to': 'ExponentPushToken[yyy]', 'sound': 'default', 'title': 'Hi', 'body': 'Message',
+            'data': {'key': 'value'},
+        }])
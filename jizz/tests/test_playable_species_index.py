@@ -0,0 +1,156 @@
+"""
+Materialized playable species index: build, incremental refresh, and query-free question picks.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from jizz.game_question_selection import (
+    candidate_species_ids,
+    create_question_for_game,
+    playable_index_key,
+    playable_species_for_game,
+)
+from jizz.models import Country, CountrySpecies, Game, PlayableSpeciesIndex, Player, Species
+from jizz.playable_species_index import rebuild_playable_species_index
+from media.models import Media, MediaReview
+
+
+class PlayableSpeciesIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.get_or_create(code='PI', defaults={'name': 'Playland'})[0]
+        self.player = Player.objects.create(name='Indexer', language='en')
+        self.species = []
+        for i in range(6):
+            sp = Species.objects.create(name=f'Index Bird {i}', name_latin=f'Index b{i}', code=f'IB{i:03d}')
+            CountrySpecies.objects.create(
+                country=self.country,
+                species=sp,
+                status='native',
+                frequency='common',
+            )
+            Media.objects.create(species=sp, type='image', url=f'https://example.com/ib{i}.jpg', source='test')
+            self.species.append(sp)
+
+    def tearDown(self):
+        cache.clear()
+
+    def _game(self, **kwargs):
+        defaults = {
+            'country': self.country,
+            'level': 'advanced',
+            'length': 10,
+            'media': 'images',
+            'host': self.player,
+            'rarity': 'regular',
+        }
+        defaults.update(kwargs)
+        return Game.objects.create(**defaults)
+
+    def _stored_entries(self, game):
+        key = playable_index_key(game)
+        return PlayableSpeciesIndex.objects.get(**key.filter_kwargs()).entries
+
+    def test_index_built_once_and_shared_by_games_with_same_filters(self):
+        first = self._game()
+        self.assertEqual(set(candidate_species_ids(first)), {sp.id for sp in self.species})
+        second = self._game(level='beginner')
+        candidate_species_ids(second)
+        self.assertEqual(PlayableSpeciesIndex.objects.count(), 1)
+
+    def test_rarity_status_and_hidden_media_respected(self):
+        rare = Species.objects.create(name='Rare one', name_latin='Rare o', code='RAREO')
+        CountrySpecies.objects.create(country=self.country, species=rare, status='native', frequency='rare')
+        Media.objects.create(species=rare, type='image', url='https://example.com/rare.jpg', source='test')
+        escaped = Species.objects.create(name='Escape', name_latin='Escap e', code='ESCA')
+        CountrySpecies.objects.create(country=self.country, species=escaped, status='introduced')
+        Media.objects.create(species=escaped, type='image', url='https://example.com/esc.jpg', source='test')
+        hidden = Species.objects.create(name='Hidden', name_latin='Hidd en', code='HIDN')
+        CountrySpecies.objects.create(country=self.country, species=hidden, status='native')
+        Media.objects.create(species=hidden, type='image', url='https://example.com/h.jpg', source='test', hide=True)
+
+        familiar_ids = set(candidate_species_ids(self._game(rarity='familiar')))
+        self.assertNotIn(rare.id, familiar_ids)
+        self.assertNotIn(escaped.id, familiar_ids)
+        self.assertNotIn(hidden.id, familiar_ids)
+        self.assertIn(rare.id, candidate_species_ids(self._game(rarity='regular')))
+        self.assertIn(escaped.id, candidate_species_ids(self._game(include_escapes=True)))
+
+    def test_media_insert_and_review_refresh_existing_rows(self):
+        game = self._game()
+        candidate_species_ids(game)
+        sp = self.species[0]
+        extra = Media.objects.create(species=sp, type='image', url='https://example.com/extra.jpg', source='test')
+        self.assertEqual(len(self._stored_entries(game)[str(sp.id)][0]), 2)
+
+        MediaReview.objects.create(media=extra, player=self.player, review_type=MediaReview.APPROVED)
+        self.assertEqual(self._stored_entries(game)[str(sp.id)][0], [extra.id])
+
+        newcomer = Species.objects.create(name='Newcomer', name_latin='Newc omer', code='NEWC')
+        CountrySpecies.objects.create(country=self.country, species=newcomer, status='native')
+        self.assertNotIn(str(newcomer.id), self._stored_entries(game))
+        Media.objects.create(species=newcomer, type='image', url='https://example.com/new.jpg', source='test')
+        self.assertIn(newcomer.id, candidate_species_ids(game))
+
+    def test_rejection_and_checklist_removal_drop_species(self):
+        game = self._game()
+        candidate_species_ids(game)
+        sp1, sp2 = self.species[1], self.species[2]
+        MediaReview.objects.create(media=sp1.media.get(), player=self.player, review_type=MediaReview.REJECTED)
+        CountrySpecies.objects.filter(country=self.country, species=sp2).get().delete()
+        entries = self._stored_entries(game)
+        self.assertNotIn(str(sp1.id), entries)
+        self.assertNotIn(str(sp2.id), entries)
+
+    def test_media_moved_to_another_species_leaves_the_old_entry(self):
+        game = self._game()
+        candidate_species_ids(game)
+        source, target = self.species[0], self.species[1]
+        media = Media.objects.get(species=source)
+        media.species = target
+        media.save()
+        entries = self._stored_entries(game)
+        self.assertNotIn(str(source.id), entries)
+        self.assertIn(media.id, entries[str(target.id)][0])
+
+    def test_saves_that_do_not_touch_eligibility_skip_the_refresh(self):
+        game = self._game()
+        candidate_species_ids(game)
+        media = Media.objects.get(species=self.species[0])
+        media.contributor = 'Someone else'
+        with CaptureQueriesContext(connection) as ctx:
+            media.save()
+        self.assertFalse([q for q in ctx.captured_queries if 'jizz_playablespeciesindex' in q['sql']])
+
+        second = Player.objects.create(name='Second reviewer', language='en')
+        MediaReview.objects.create(media=media, player=self.player, review_type=MediaReview.NOT_SURE)
+        with CaptureQueriesContext(connection) as ctx:
+            MediaReview.objects.create(media=media, player=second, review_type=MediaReview.NOT_SURE)
+        self.assertFalse([q for q in ctx.captured_queries if 'jizz_playablespeciesindex' in q['sql']])
+
+    def test_rebuild_matches_incremental_state(self):
+        game = self._game()
+        candidate_species_ids(game)
+        incremental = self._stored_entries(game)
+        Media.objects.filter(species=self.species[3]).update(hide=True)
+        self.assertEqual(rebuild_playable_species_index(self.country.code), 1)
+        rebuilt = self._stored_entries(game)
+        self.assertNotIn(str(self.species[3].id), rebuilt)
+        incremental.pop(str(self.species[3].id))
+        self.assertEqual(rebuilt, incremental)
+
+    def test_new_game_question_needs_no_eligibility_queries_when_index_warm(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            playable_species_for_game(self._game())
+        game = self._game()
+        with CaptureQueriesContext(connection) as ctx:
+            question = create_question_for_game(game)
+        self.assertEqual(question.options.count(), 6)
+        sql = ' '.join(q['sql'] for q in ctx.captured_queries)
+        for table in ('media_media', 'media_mediareview', 'jizz_countryspecies', 'jizz_playablespeciesindex'):
+            self.assertNotIn(table, sql)
+        # next-sequence aggregate + question insert + option insert
+        self.assertLessEqual(len(ctx), 3)
@@ -0,0 +1,158 @@
+"""
+Batched Expo push delivery against a local HTTP stand-in for the Expo API: batching,
+retries, ticket storage and receipt handling.
+"""
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from jizz import notifications
+from jizz.mobile_push.dispatch import (
+    RECEIPT_DELAY,
+    ExpoPushClient,
+    build_message,
+    check_push_receipts,
+    push_batch,
+    send_push_messages,
+)
+from jizz.models import DeviceToken, PushDevice, PushTicket
+
+User = get_user_model()
+
+
+class _ExpoHandler(BaseHTTPRequestHandler):
+    requests = []
+    fail_next = 0
+    unregistered = set()
+    receipts = {}
+
+    def do_POST(self):
+        payload = json.loads(self.rfile.read(int(self.headers['Content-Length'])))
+        self.requests.append((self.path, payload))
+        if _ExpoHandler.fail_next:
+            _ExpoHandler.fail_next -= 1
+            self.send_response(503)
+            self.end_headers()
+            return
+        if self.path == '/send':
+            data = []
+            for message in payload:
+                if message['to'] in self.unregistered:
+                    data.append({'status': 'error', 'message': 'gone', 'details': {'error': 'DeviceNotRegistered'}})
+                else:
+                    data.append({'status': 'ok', 'id': f'ticket-{message["to"]}'})
+        else:
+            data = {ticket_id: self.receipts[ticket_id] for ticket_id in payload['ids'] if ticket_id in self.receipts}
+        body = json.dumps({'data': data}).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class PushDispatchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _ExpoHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        base_url = f'http://127.0.0.1:{cls.server.server_port}'
+        cls.settings_override = override_settings(
+            SEND_PUSH_NOTIFICATIONS=True,
+            EXPO_PUSH_URL=f'{base_url}/send',
+            EXPO_PUSH_RECEIPTS_URL=f'{base_url}/receipts',
+        )
+        cls.settings_override.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        _ExpoHandler.requests = []
+        _ExpoHandler.fail_next = 0
+        _ExpoHandler.unregistered = set()
+        _ExpoHandler.receipts = {}
+        self.client = ExpoPushClient(sleep=lambda seconds: None)
+
+    def _sends(self):
+        return [payload for path, payload in _ExpoHandler.requests if path == '/send']
+
+    def test_messages_are_sent_in_batches_of_100(self):
+        messages = [build_message(f'ExponentPushToken[{i}]', 'Hi', 'Body') for i in range(250)]
+        tickets = send_push_messages(messages, client=self.client)
+        self.assertEqual([len(batch) for batch in self._sends()], [100, 100, 50])
+        self.assertEqual(len(tickets), 250)
+        self.assertEqual(PushTicket.objects.count(), 250)
+
+    def test_retries_after_server_error(self):
+        _ExpoHandler.fail_next = 1
+        tickets = send_push_messages([build_message('ExponentPushToken[a]', 'Hi', 'Body')], client=self.client)
+        self.assertEqual(len(self._sends()), 2)
+        self.assertEqual(tickets[0]['status'], 'ok')
+
+    def test_unregistered_ticket_disables_device(self):
+        user = User.objects.create_user(username='u', email='u@test.com', password='pass')
+        PushDevice.objects.create(user=user, expo_push_token='ExponentPushToken[gone]', platform='ios')
+        DeviceToken.objects.create(user=user, token='ExponentPushToken[gone]', platform='ios')
+        _ExpoHandler.unregistered = {'ExponentPushToken[gone]'}
+
+        send_push_messages([build_message('ExponentPushToken[gone]', 'Hi', 'Body')], client=self.client)
+        self.assertFalse(PushDevice.objects.get().enabled)
+        self.assertFalse(DeviceToken.objects.exists())
+        self.assertFalse(PushTicket.objects.exists())
+
+    def test_receipts_disable_devices_and_clear_tickets(self):
+        user = User.objects.create_user(username='u', email='u@test.com', password='pass')
+        for name in ('ok', 'gone', 'later'):
+            PushDevice.objects.create(user=user, expo_push_token=f'ExponentPushToken[{name}]', platform='ios')
+            PushTicket.objects.create(ticket_id=f'ticket-{name}', expo_push_token=f'ExponentPushToken[{name}]')
+        _ExpoHandler.receipts = {
+            'ticket-ok': {'status': 'ok'},
+            'ticket-gone': {'status': 'error', 'details': {'error': 'DeviceNotRegistered'}},
+        }
+
+        self.assertEqual(check_push_receipts(client=self.client)['checked'], 0)  # too recent
+
+        counts = check_push_receipts(client=self.client, now=timezone.now() + RECEIPT_DELAY + timedelta(minutes=1))
+        self.assertEqual(counts, {'checked': 2, 'errors': 1, 'disabled': 1, 'pending': 1})
+        self.assertEqual(list(PushTicket.objects.values_list('ticket_id', flat=True)), ['ticket-later'])
+        self.assertEqual(
+            set(PushDevice.objects.filter(enabled=False).values_list('expo_push_token', flat=True)),
+            {'ExponentPushToken[gone]'},
+        )
+
+    def test_push_batch_sends_queued_pushes_together(self):
+        users = [User.objects.create_user(username=f'u{i}', email=f'u{i}@test.com', password='pass') for i in range(5)]
+        for user in users:
+            PushDevice.objects.create(user=user, expo_push_token=f'ExponentPushToken[{user.username}]', platform='ios')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            with push_batch():
+                for user in users:
+                    notifications.send_push_to_user(user, 'Hi', 'Body')
+                self.assertEqual(self._sends(), [])
+        self.assertEqual([len(batch) for batch in self._sends()], [5])
+
+    def test_push_batch_sends_nothing_when_the_block_raises(self):
+        user = User.objects.create_user(username='failing', email='failing@test.com', password='pass')
+        PushDevice.objects.create(user=user, expo_push_token='ExponentPushToken[failing]', platform='ios')
+
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            with self.assertRaises(RuntimeError):
+                with push_batch():
+                    notifications.send_push_to_user(user, 'Hi', 'Body')
+                    raise RuntimeError('rolled back')
+        self.assertEqual(callbacks, [])
+        self.assertEqual(self._sends(), [])
@@ -0,0 +1,128 @@
+"""
+Pregenerated question pools: replenishing, taking cards for games and Club Mix snapshots.
+"""
+
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from jizz.flock_challenge import CLUB_MIX_SLOTS, _scratch_game, generate_club_mix_snapshot
+from jizz.game_question_selection import playable_index_key
+from jizz.job_queue import run_pending
+from jizz.models import Country, CountrySpecies, Game, Job, Player, QuestionOption, QuestionPool, Species
+from jizz.playable_species_index import rebuild_playable_species_index
+from jizz.question_pools import get_pool, pool_index_key, replenish_pool, take_cards
+from media.models import Media
+
+
+@override_settings(QUESTION_POOL_SIZE=8)
+class QuestionPoolTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.get_or_create(code='QP', defaults={'name': 'Poolland'})[0]
+        self.player = Player.objects.create(name='Pooler', language='en')
+        self.species = []
+        for i in range(30):
+            sp = Species.objects.create(name=f'Pool Bird {i}', name_latin=f'Pool b{i}', code=f'PB{i:03d}')
+            CountrySpecies.objects.create(
+                country=self.country,
+                species=sp,
+                status='native',
+                frequency='rare' if i >= 20 else 'common',
+            )
+            Media.objects.create(species=sp, type='image', url=f'https://example.com/pb{i}.jpg', source='test')
+            self.species.append(sp)
+
+    def tearDown(self):
+        cache.clear()
+
+    def _game(self, **kwargs):
+        return Game.objects.create(**{
+            'country': self.country, 'level': 'advanced', 'length': 10, 'media': 'images',
+            'host': self.player, 'rarity': 'regular', **kwargs,
+        })
+
+    def _pool(self, **kwargs):
+        return get_pool(playable_index_key(self._game(**kwargs)), kwargs.get('level', 'advanced'))
+
+    def test_replenish_fills_pool_with_distinct_playable_species(self):
+        pool = self._pool()
+        self.assertEqual(replenish_pool(pool), 8)
+        self.assertEqual(replenish_pool(pool), 0)
+        cards = list(pool.cards.all())
+        self.assertEqual(len({card.species_id for card in cards}), 8)
+        for card in cards:
+            self.assertIn(card.species_id, card.option_species_ids)
+            self.assertEqual(Media.objects.get(pk=card.media_id).species_id, card.species_id)
+
+    def test_pools_are_shared_per_filter_and_level(self):
+        first = self._pool()
+        self.assertEqual(self._pool(), first)
+        self.assertNotEqual(self._pool(level='beginner'), first)
+        self.assertNotEqual(self._pool(rarity='familiar'), first)
+        self.assertEqual(QuestionPool.objects.count(), 3)
+
+    def test_take_cards_skips_excluded_and_drops_stale(self):
+        pool = self._pool()
+        replenish_pool(pool)
+        cards = list(pool.cards.order_by('pk'))
+        excluded = cards[0].species_id
+        Media.objects.filter(pk=cards[1].media_id).update(hide=True)
+        rebuild_playable_species_index(self.country.code)
+
+        taken = take_cards(pool, 3, exclude_species_ids=[excluded])
+        self.assertEqual([card.pk for card in taken], [card.pk for card in cards[2:5]])
+        remaining = set(pool.cards.values_list('pk', flat=True))
+        self.assertIn(cards[0].pk, remaining)
+        self.assertNotIn(cards[1].pk, remaining)
+        self.assertTrue(remaining.isdisjoint(card.pk for card in taken))
+
+    def test_new_game_takes_first_round_from_pool(self):
+        game = self._game()
+        pool = get_pool(playable_index_key(game), game.level)
+        replenish_pool(pool)
+        card = pool.cards.order_by('pk').first()
+
+        question = game.add_question()
+        self.assertEqual(question.species_id, card.species_id)
+        self.assertEqual(question.number, 0)  # index of the card's media for the species
+        options = QuestionOption.objects.filter(question=question).values_list('species_id', flat=True)
+        self.assertEqual(list(options), card.option_species_ids)
+        self.assertFalse(pool.cards.filter(pk=card.pk).exists())
+
+    def test_personalised_games_do_not_use_pools(self):
+        pool = self._pool()
+        replenish_pool(pool)
+        self._game(dificult_species=True).add_question()
+        self.assertEqual(pool.cards.count(), 8)
+
+    def test_drained_pool_is_refilled_by_job(self):
+        pool = self._pool()
+        replenish_pool(pool)
+        with self.captureOnCommitCallbacks(execute=True):
+            take_cards(pool, 5)
+        self.assertEqual(pool.cards.count(), 3)
+        self.assertEqual(Job.objects.filter(name='replenish_question_pool', status=Job.STATUS_QUEUED).count(), 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            take_cards(pool, 1)
+        self.assertEqual(Job.objects.filter(name='replenish_question_pool').count(), 1)
+
+        self.assertEqual(run_pending(queues=['pools']), 1)
+        self.assertEqual(pool.cards.count(), 8)
+
+    def test_club_mix_snapshot_uses_pool_cards(self):
+        call_command('replenish_question_pools', country=self.country.code, club_mix=True, stdout=StringIO())
+        level, rarity, media, count = CLUB_MIX_SLOTS[1]
+        scratch = _scratch_game(country=self.country, level=level, rarity=rarity, media=media, host=self.player)
+        pool = get_pool(playable_index_key(scratch), level)
+        pooled = {(card.species_id, card.media_id) for card in pool.cards.all()}
+        self.assertEqual(pool_index_key(pool), playable_index_key(scratch))
+
+        snapshot = generate_club_mix_snapshot(country=self.country, host=self.player)
+        slot = [item for item in snapshot if item.level == level and item.rarity == rarity]
+        self.assertEqual(len(slot), count)
+        self.assertTrue(pooled & {(item.species_id, item.media_id) for item in slot})
+        self.assertEqual(len({item.species_id for item in snapshot}), len(snapshot))
+        self.assertEqual([item.sequence for item in snapshot], list(range(1, len(snapshot) + 1)))
@@ -0,0 +1,87 @@
+"""
+Question look-ahead: prepared rounds, advancing from them and the stored play payload.
+"""
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from jizz.models import Country, CountrySpecies, Game, Player, PreparedQuestion, QuestionOption, Species
+from jizz.question_play import load_question_for_play, serialize_question_for_play
+from jizz.question_prefetch import prepare_questions
+from media.models import Media
+
+
+class QuestionPrefetchTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.get_or_create(code='NL', defaults={'name': 'Netherlands'})[0]
+        self.player = Player.objects.create(name='Ahead', language='en')
+        for i in range(12):
+            species = Species.objects.create(name=f'Ahead Bird {i}', name_latin=f'Ahead latin {i}', code=f'AB{i:03d}')
+            CountrySpecies.objects.create(country=self.country, species=species, status='native', frequency='abundant')
+            Media.objects.create(species=species, type='image', url=f'https://example.com/ab{i}.jpg', source='test')
+
+    def tearDown(self):
+        cache.clear()
+
+    def _game(self, **kwargs):
+        return Game.objects.create(**{
+            'country': self.country, 'level': 'advanced', 'length': 10, 'media': 'images',
+            'host': self.player, 'rarity': 'regular', **kwargs,
+        })
+
+    def test_advance_uses_prepared_round_and_payload(self):
+        game = self._game()
+        first = game.add_question()
+        self.assertEqual(prepare_questions(game.pk), 2)
+        prepared = list(game.prepared_questions.order_by('pk'))
+        self.assertNotIn(first.species_id, [row.species_id for row in prepared])
+
+        first.answers.create(player_score=game.scores.create(player=self.player), answer=first.species)
+        with CaptureQueriesContext(connection) as ctx:
+            second = game.add_question()
+        # lock + host-answer check + done flags + take prepared row + media check + inserts; no selection
+        self.assertLessEqual(len(ctx), 12)
+        self.assertFalse(any('jizz_countryspecies' in q['sql'] for q in ctx.captured_queries))
+        self.assertEqual((second.species_id, second.sequence), (prepared[0].species_id, 2))
+        options = QuestionOption.objects.filter(question=second).values_list('species_id', flat=True)
+        self.assertEqual(list(options), prepared[0].option_species_ids)
+        self.assertEqual(game.prepared_questions.count(), 1)
+
+        fresh = serialize_question_for_play(load_question_for_play(second.pk))
+        self.assertEqual(second.play_payload, fresh)
+
+    def test_prepared_round_with_hidden_media_is_generated_on_demand(self):
+        game = self._game()
+        first = game.add_question()
+        prepare_questions(game.pk)
+        stale = game.prepared_questions.order_by('pk').first()
+        media = Media.objects.get(species_id=stale.species_id)
+        media.hide = True
+        media.save()
+
+        first.answers.create(player_score=game.scores.create(player=self.player), answer=first.species)
+        second = game.add_question()
+
+        self.assertNotEqual(second.species_id, stale.species_id)
+        self.assertIsNone(getattr(second, 'play_payload', None))
+        self.assertFalse(PreparedQuestion.objects.filter(pk=stale.pk).exists())
+
+    def test_look_ahead_stops_at_game_length(self):
+        game = self._game(length=2)
+        game.add_question()
+        self.assertEqual(prepare_questions(game.pk), 1)
+        self.assertEqual(prepare_questions(game.pk), 0)
+
+    @override_settings(QUESTION_LOOKAHEAD=0)
+    def test_disabled_look_ahead(self):
+        game = self._game()
+        game.add_question()
+        self.assertEqual(prepare_questions(game.pk), 0)
+        self.assertFalse(PreparedQuestion.objects.exists())
+
+    def test_practice_games_are_not_prepared(self):
+        game = self._game(game_type=Game.GAME_TYPE_PAIR_PRACTICE)
+        self.assertEqual(prepare_questions(game.pk), 0)
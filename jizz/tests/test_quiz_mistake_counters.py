@@ -0,0 +1,110 @@
+"""
+Quiz mistake counter tables: per-answer upsert, undo on delete, rebuild and drift check.
+"""
+
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from jizz.models import (
+    Answer,
+    ConfusionPairStat,
+    Country,
+    Game,
+    Player,
+    PlayerScore,
+    Question,
+    Species,
+    SpeciesMistakeStat,
+    UserMistakeStat,
+)
+from jizz.quiz_mistake_counters import check_mistake_stats, rebuild_mistake_stats
+from jizz.quiz_mistake_stats import get_user_trouble_spot_rows, get_wrong_pick_weights_for_target
+
+User = get_user_model()
+
+
+def _state():
+    return (
+        sorted(SpeciesMistakeStat.objects.values_list(
+            'species_id', 'times_picked', 'picked_correct', 'picked_wrong', 'times_target', 'target_wrong',
+        )),
+        sorted(ConfusionPairStat.objects.filter(wrong__gt=0).values_list('target_id', 'picked_id', 'wrong')),
+        sorted(UserMistakeStat.objects.filter(answers__gt=0).values_list('user_id', 'target_id', 'picked_id', 'answers')),
+    )
+
+
+class MistakeCounterTests(TestCase):
+    def setUp(self):
+        self.country = Country.objects.get_or_create(code='NL', defaults={'name': 'Netherlands'})[0]
+        self.user = User.objects.create_user(username='mistaken', password='x')
+        self.player = Player.objects.create(name='Mistaken', user=self.user)
+        self.robin = Species.objects.create(name='Robin', name_latin='Erithacus rubecula', code='eurrob1')
+        self.wren = Species.objects.create(name='Wren', name_latin='Troglodytes troglodytes', code='winwre4')
+
+    def _play(self, player, picks):
+        """One game; ``picks`` is a list of (question species, answered species)."""
+        game = Game.objects.create(country=self.country, level='advanced', length=len(picks), media='images')
+        score = PlayerScore.objects.create(player=player, game=game)
+        for sequence, (species, answer) in enumerate(picks, 1):
+            question = Question.objects.create(game=game, species=species, sequence=sequence, number=0)
+            Answer.objects.create(player_score=score, question=question, answer=answer)
+        return game
+
+    def test_answers_update_counters_incrementally(self):
+        self._play(self.player, [(self.robin, self.wren), (self.robin, self.wren), (self.wren, self.wren)])
+        self._play(Player.objects.create(name='Guest'), [(self.robin, self.robin)])
+
+        robin = SpeciesMistakeStat.objects.get(pk=self.robin.pk)
+        wren = SpeciesMistakeStat.objects.get(pk=self.wren.pk)
+        self.assertEqual((robin.times_picked, robin.times_target, robin.target_wrong), (1, 3, 2))
+        self.assertEqual((wren.times_picked, wren.picked_correct, wren.picked_wrong), (3, 1, 2))
+        self.assertEqual(get_wrong_pick_weights_for_target(self.robin.pk), {self.wren.pk: 2})
+
+        species_rows, pair_rows = get_user_trouble_spot_rows(self.user.pk)
+        self.assertEqual([(row['species_id'], row['wrongly_answered']) for row in species_rows], [(self.robin.pk, 2)])
+        self.assertEqual(pair_rows[0]['total_wrong'], 2)
+
+        incremental = _state()
+        rebuild_mistake_stats()
+        self.assertEqual(_state(), incremental)
+
+    def test_answer_insert_is_one_extra_query(self):
+        game = Game.objects.create(country=self.country, level='advanced', length=1, media='images')
+        score = PlayerScore.objects.create(player=self.player, game=game)
+        question = Question.objects.create(game=game, species=self.robin, sequence=1, number=0)
+        with CaptureQueriesContext(connection) as ctx:
+            Answer.objects.create(player_score=score, question=question, answer=self.wren)
+        self.assertEqual(sum('jizz_confusionpairstat' in q['sql'] for q in ctx.captured_queries), 1)
+
+    def test_deleted_game_and_linked_player(self):
+        game = self._play(self.player, [(self.robin, self.wren)])
+        guest = Player.objects.create(name='Guest')
+        self._play(guest, [(self.wren, self.robin)])
+        game.delete()
+        self.assertEqual(ConfusionPairStat.objects.get(target=self.robin).wrong, 0)
+        self.assertFalse(UserMistakeStat.objects.filter(answers__gt=0).exists())
+
+        guest.user = self.user
+        guest.save(update_fields=['user'])
+        self.assertEqual(
+            list(UserMistakeStat.objects.values_list('target_id', 'picked_id', 'answers')),
+            [(self.wren.pk, self.robin.pk, 1)],
+        )
+        self.assertEqual(check_mistake_stats(), {'species': 0, 'pairs': 0, 'users': 0})
+
+    def test_check_command_reports_and_fixes_drift(self):
+        self._play(self.player, [(self.robin, self.wren)])
+        SpeciesMistakeStat.objects.filter(pk=self.wren.pk).update(picked_wrong=5)
+
+        out = StringIO()
+        call_command('check_mistake_stats', stdout=out)
+        self.assertIn('species: 1 mismatched rows', out.getvalue())
+
+        call_command('check_mistake_stats', '--fix', stdout=out)
+        self.assertEqual(SpeciesMistakeStat.objects.get(pk=self.wren.pk).picked_wrong, 1)
+        self.assertEqual(check_mistake_stats(), {'species': 0, 'pairs': 0, 'users': 0})
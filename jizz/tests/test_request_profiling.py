@@ -0,0 +1,146 @@
+"""
+Request profiles: middleware/WebSocket instrumentation, query budgets and the staff stats endpoint.
+"""
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import RequestFactory, TestCase, override_settings
+from django.urls import resolve
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jizz.models import RequestProfile, Species
+from jizz.request_profiling import (
+    Profile,
+    QueryBudgetExceeded,
+    RequestProfileWriter,
+    check_budget,
+    http_route,
+    load_budgets,
+    profile_request,
+)
+
+
+def _budget_file(text):
+    path = Path(tempfile.mkdtemp()) / 'budgets.toml'
+    path.write_text(text)
+    return path
+
+
+class RequestProfilingTests(TestCase):
+    def setUp(self):
+        self.client = APIClient()
+        self.writer = RequestProfileWriter()
+        patcher = mock.patch('jizz.request_profiling.get_request_profile_writer', return_value=self.writer)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(load_budgets.cache_clear)
+        for i in range(3):
+            Species.objects.create(name=f'Bird {i}', name_latin=f'Avis {i}', code=f'bird{i}')
+
+    def test_http_route_strips_regex_anchors(self):
+        request = RequestFactory().get('/api/species/')
+        request.resolver_match = resolve('/api/species/')
+        self.assertEqual(http_route(request), 'GET /api/species/')
+
+    @override_settings(REQUEST_PROFILE_SAMPLE_RATE=1)
+    def test_api_request_is_profiled(self):
+        with mock.patch.object(self.writer, 'start'):
+            response = self.client.get('/api/species/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.writer.flush(), 1)
+
+        profile = RequestProfile.objects.get()
+        self.assertEqual(profile.kind, RequestProfile.KIND_HTTP)
+        self.assertEqual(profile.route, 'GET /api/species/')
+        self.assertEqual(profile.method, 'GET')
+        self.assertEqual(profile.status_code, 200)
+        self.assertGreater(profile.queries, 0)
+        self.assertGreater(profile.serializer_ms + profile.db_ms, 0)
+        self.assertEqual(profile.response_bytes, len(response.content))
+
+    @override_settings(REQUEST_PROFILE_SAMPLE_RATE=0)
+    def test_unsampled_requests_are_not_stored(self):
+        self.client.get('/api/species/')
+        self.assertEqual(self.writer.flush(), 0)
+
+    def test_nested_profiles_only_count_once(self):
+        with profile_request(RequestProfile.KIND_WEBSOCKET, 'WS outer') as outer:
+            with profile_request(RequestProfile.KIND_WEBSOCKET, 'WS inner') as inner:
+                Species.objects.count()
+        self.assertIsNone(inner)
+        self.assertEqual(outer.queries, 1)
+
+    def test_route_over_query_budget_raises(self):
+        path = _budget_file('[routes."GET /api/species/"]\nqueries = 0\n')
+        with override_settings(REQUEST_BUDGETS_PATH=path):
+            load_budgets.cache_clear()
+            with self.assertRaises(QueryBudgetExceeded):
+                self.client.get('/api/species/')
+
+    def test_route_over_query_budget_only_warns_when_not_enforced(self):
+        path = _budget_file('[routes."WS submit_answer"]\nqueries = 2\n')
+        with override_settings(REQUEST_BUDGETS_PATH=path, REQUEST_BUDGETS_ENFORCE=False):
+            load_budgets.cache_clear()
+            with self.assertLogs('jizz.request_profiling', 'WARNING'):
+                check_budget(Profile(kind=RequestProfile.KIND_WEBSOCKET, route='WS submit_answer', queries=3))
+
+    def test_default_budget_file_is_loaded(self):
+        load_budgets.cache_clear()
+        self.assertIn('GET /api/species/', load_budgets())
+
+    def test_missing_budget_file_warns(self):
+        with override_settings(REQUEST_BUDGETS_PATH=Path(tempfile.mkdtemp()) / 'missing.toml'):
+            load_budgets.cache_clear()
+            with self.assertLogs('jizz.request_profiling', 'WARNING'):
+                self.assertEqual(load_budgets(), {})
+
+    def test_species_list_stays_within_budget_as_species_grow(self):
+        budget = load_budgets()['GET /api/species/']
+        for i in range(3, 60):
+            Species.objects.create(name=f'Bird {i}', name_latin=f'Avis {i}', code=f'bird{i}')
+        with profile_request(RequestProfile.KIND_HTTP, '') as profile:
+            self.client.get('/api/species/', {'language': 'nl'})
+        self.assertLessEqual(profile.queries, budget.queries)
+
+
+class StaffRequestProfilesTests(TestCase):
+    url = '/staff/request-profiles/api/'
+
+    def setUp(self):
+        now = timezone.now()
+        rows = [
+            RequestProfile(kind='http', route='GET /api/species/', method='GET', status_code=200,
+                           queries=3, duration_ms=float(ms), response_bytes=1000)
+            for ms in range(10, 110, 10)
+        ]
+        rows.append(RequestProfile(kind='ws', route='WS submit_answer', queries=50, duration_ms=20))
+        rows.append(RequestProfile(kind='http', route='GET /api/scores/', queries=1, duration_ms=5,
+                                   created=now - timedelta(days=3)))
+        RequestProfile.objects.bulk_create(rows)
+
+    def test_requires_staff(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 302)
+
+    def test_per_route_percentiles_and_budgets(self):
+        user = User.objects.create_user('staffer', password='x', is_staff=True)
+        self.client.force_login(user)
+        response = self.client.get(self.url, {'hours': 24})
+        self.assertEqual(response.status_code, 200)
+        routes = {row['route']: row for row in response.json()['routes']}
+        self.assertEqual(set(routes), {'GET /api/species/', 'WS submit_answer'})
+
+        species = routes['GET /api/species/']
+        self.assertEqual(species['samples'], 10)
+        self.assertEqual(species['duration_ms_p50'], 55.0)
+        self.assertEqual(species['duration_ms_p95'], 95.5)
+        self.assertEqual(species['response_bytes_p95'], 1000.0)
+        self.assertFalse(species['over_budget'])
+        self.assertTrue(routes['WS submit_answer']['over_budget'])
+
+        response = self.client.get(self.url, {'kind': 'ws'})
+        self.assertEqual([row['route'] for row in response.json()['routes']], ['WS submit_answer'])
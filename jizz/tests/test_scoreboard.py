@@ -0,0 +1,101 @@
+"""
+Multiplayer scoreboard: atomic score increments, batched payload and coalesced broadcasts.
+"""
+
+import asyncio
+from unittest.mock import AsyncMock, patch
+
+from asgiref.sync import async_to_sync
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+
+from jizz import scoreboard
+from jizz.models import Answer, Country, Game, Player, PlayerScore, Question, Species
+
+
+class ScoreIncrementTests(TestCase):
+    def setUp(self):
+        self.country = Country.objects.get_or_create(code='NL', defaults={'name': 'Netherlands'})[0]
+        self.game = Game.objects.create(country=self.country, level='advanced', length=3, media='images', multiplayer=True)
+        self.robin = Species.objects.create(name='Robin', name_latin='Erithacus rubecula', code='eurrob1')
+        self.wren = Species.objects.create(name='Wren', name_latin='Troglodytes troglodytes', code='winwre4')
+
+    def _question(self, sequence):
+        return Question.objects.create(game=self.game, species=self.robin, sequence=sequence, number=0)
+
+    def test_answers_increment_score(self):
+        score = PlayerScore.objects.create(player=Player.objects.create(name='P'), game=self.game)
+        first = Answer.objects.create(player_score=score, question=self._question(1), answer=self.robin)
+        second = Answer.objects.create(player_score=score, question=self._question(2), answer=self.robin)
+        score.refresh_from_db()
+        self.assertEqual(score.score, first.score + second.score)
+        self.assertEqual(score.leaderboard_entry.score, score.score)
+
+    def test_wrong_answer_leaves_score_alone(self):
+        score = PlayerScore.objects.create(player=Player.objects.create(name='P'), game=self.game, score=40)
+        with CaptureQueriesContext(connection) as ctx:
+            Answer.objects.create(player_score=score, question=self._question(1), answer=self.wren)
+        self.assertFalse(any('jizz_playerscore' in q['sql'] and q['sql'].startswith('UPDATE') for q in ctx.captured_queries))
+        score.refresh_from_db()
+        self.assertEqual(score.score, 40)
+
+    def test_scoreboard_payload(self):
+        question = self._question(1)
+        host = Player.objects.create(name='Host')
+        self.game.host = host
+        self.game.save()
+        for i, player in enumerate([host] + [Player.objects.create(name=f'P{i}') for i in range(3)]):
+            score = PlayerScore.objects.create(player=player, game=self.game)
+            if i % 2:
+                Answer.objects.create(player_score=score, question=question, answer=self.robin if i == 1 else self.wren)
+        players = scoreboard.build_scoreboard(self.game)
+        self.assertEqual([p['status'] for p in players], ['correct', 'waiting', 'waiting', 'incorrect'])
+        self.assertEqual([p['ranking'] for p in players], [1, 2, 3, 4])
+        self.assertEqual(
+            [p['ranking'] for p in players],
+            [PlayerScore.objects.get(pk=p['id']).ranking for p in players],
+        )
+        self.assertEqual([p['name'] for p in players if p['is_host']], ['Host'])
+        self.assertEqual(players[0]['last_answer']['sequence'], 1)
+        self.assertTrue(players[0]['last_answer']['correct'])
+        self.assertIsNone(players[1]['last_answer'])
+        self.assertNotIn('answers', players[0])
+
+    def _scoreboard_queries(self, player_count):
+        game = Game.objects.create(country=self.country, level='advanced', length=3, media='images', multiplayer=True)
+        questions = [Question.objects.create(game=game, species=self.robin, sequence=i, number=0) for i in (1, 2)]
+        for i in range(player_count):
+            score = PlayerScore.objects.create(player=Player.objects.create(name=f'S{player_count}-{i}'), game=game)
+            for question in questions[:1 + i % 2]:
+                Answer.objects.create(player_score=score, question=question, answer=self.robin if i % 3 else self.wren)
+        with CaptureQueriesContext(connection) as ctx:
+            players = scoreboard.scoreboard_payload(game.token)
+        self.assertEqual(len(players), player_count)
+        return len(ctx)
+
+    def test_query_count_does_not_grow_with_players(self):
+        self.assertEqual(self._scoreboard_queries(2), self._scoreboard_queries(50))
+
+
+class CoalescedBroadcastTests(TestCase):
+    def test_burst_of_answers_sends_one_scoreboard(self):
+        layer = AsyncMock()
+
+        async def burst():
+            for _ in range(30):
+                scoreboard.schedule_scoreboard_broadcast(layer, 'abc')
+            await asyncio.sleep(0.05)
+            scoreboard.schedule_scoreboard_broadcast(layer, 'other')
+            await asyncio.sleep(0.1)
+            scoreboard.schedule_scoreboard_broadcast(layer, 'abc')  # after the tick
+            await asyncio.sleep(0.1)
+
+        with patch.object(scoreboard, 'SCOREBOARD_TICK', 0.03), \
+                patch.object(scoreboard, 'scoreboard_payload', return_value=[{'name': 'P'}]):
+            async_to_sync(burst)()
+
+        groups = [call.args[0] for call in layer.group_send.call_args_list]
+        self.assertEqual(groups, ['quiz_abc', 'quiz_other', 'quiz_abc'])
+        self.assertEqual(layer.group_send.call_args.args[1], {'type': 'update_players', 'players': [{'name': 'P'}]})
+        self.assertEqual(scoreboard._pending_ticks, {})
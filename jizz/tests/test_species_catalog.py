@@ -0,0 +1,129 @@
+"""
+Species catalog behind /api/species/: prebuilt blob, ETag/304, gzip, version deltas and pruning.
+"""
+import gzip
+import json
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jizz.models import Country, CountrySpecies, Language, Species, SpeciesCatalogChange, SpeciesName
+from jizz.species_catalog import current_version, prune_species_catalog_changes, record_species_changes
+from jizz.tests.taxonomy_helpers import make_taxonomic_family, make_taxonomic_order
+
+
+class SpeciesCatalogTests(TestCase):
+    url = '/api/species/'
+
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.country = Country.objects.get_or_create(code='NL', defaults={'name': 'Netherlands'})[0]
+        self.language = Language.objects.get_or_create(code='nl', defaults={'name': 'Dutch'})[0]
+        order = make_taxonomic_order('Passeriformes')
+        self.family = make_taxonomic_family('Turdidae', name_en='Thrushes', taxonomic_order=order)
+        self.species = []
+        for i in range(5):
+            species = Species.objects.create(
+                name=f'Thrush {i}', name_latin=f'Turdus {i}', code=f'thr{i}',
+                taxonomic_order=order, taxonomic_family=self.family,
+            )
+            SpeciesName.objects.create(species=species, language=self.language, name=f'Lijster {i}')
+            CountrySpecies.objects.create(country=self.country, species=species, status='native')
+            self.species.append(species)
+        Species.objects.create(name='Elsewhere', name_latin='Alibi', code='alibi')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_full_catalog_matches_serializer_fields_in_few_queries(self):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(self.url, {'language': 'nl', 'countryspecies__country': 'NL'})
+        self.assertLessEqual(len(ctx), 4)  # country check, version, species, names
+        data = response.json()
+        self.assertEqual(len(data), 5)
+        self.assertEqual(data[0], {
+            'name': 'Thrush 0', 'name_latin': 'Turdus 0', 'name_nl': None, 'name_translated': 'Lijster 0',
+            'id': self.species[0].pk, 'tax_family': 'Turdidae', 'tax_family_en': 'Thrushes',
+            'tax_order': 'Passeriformes',
+        })
+        self.assertEqual(len(self.client.get(self.url).json()), 6)
+
+        with CaptureQueriesContext(connection) as ctx:
+            self.client.get(self.url, {'language': 'nl', 'countryspecies__country': 'NL'})
+        self.assertEqual(len(ctx), 2)  # served from the prebuilt blob
+
+    def test_conditional_get_and_gzip(self):
+        response = self.client.get(self.url, HTTP_ACCEPT_ENCODING='gzip, deflate')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(len(json.loads(gzip.decompress(response.content))), 6)
+        etag = response['ETag']
+        self.assertTrue(etag.startswith('W/"'))
+
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.species[0].save()  # new version, same content
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        self.species[0].name = 'Song thrush'
+        self.species[0].save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    @override_settings(SPECIES_CATALOG_DELTA_OVERLAP=0)
+    def test_delta_since_version(self):
+        version = int(self.client.get(self.url, {'countryspecies__country': 'NL'})['X-Catalog-Version'])
+        name = SpeciesName.objects.get(species=self.species[1])
+        name.name = 'Zanglijster'
+        name.save()
+        CountrySpecies.objects.filter(species=self.species[2]).delete()
+        self.family.name_en = 'True thrushes'
+        self.family.save()
+
+        delta = self.client.get(self.url, {'language': 'nl', 'countryspecies__country': 'NL', 'since': version}).json()
+        self.assertEqual(delta['removed'], [self.species[2].pk])
+        changed = {row['id']: row for row in delta['changed']}
+        self.assertEqual(set(changed), {self.species[i].pk for i in (0, 1, 3, 4)})
+        self.assertEqual(changed[self.species[1].pk]['name_translated'], 'Zanglijster')
+        self.assertEqual(changed[self.species[0].pk]['tax_family_en'], 'True thrushes')
+
+        self.assertFalse(delta['full'])
+
+        empty = self.client.get(self.url, {'countryspecies__country': 'NL', 'since': delta['version']}).json()
+        self.assertEqual((empty['changed'], empty['removed']), ([], []))
+
+    def test_delta_repeats_changes_that_commit_after_a_newer_version(self):
+        record_species_changes([self.species[1].pk])
+        late = SpeciesCatalogChange.objects.latest('id')
+        record_species_changes([self.species[2].pk])
+        late.delete()  # still uncommitted while the client reads the version
+        version = int(self.client.get(self.url, {'countryspecies__country': 'NL'})['X-Catalog-Version'])
+        SpeciesCatalogChange.objects.create(id=late.id, species_id=self.species[1].pk)
+
+        delta = self.client.get(self.url, {'countryspecies__country': 'NL', 'since': version}).json()
+        self.assertFalse(delta['full'])
+        self.assertIn(self.species[1].pk, {row['id'] for row in delta['changed']})
+
+    def test_pruned_history_and_unknown_versions_get_the_full_catalog(self):
+        old_version = current_version()
+        record_species_changes([self.species[0].pk])
+        newest = SpeciesCatalogChange.objects.latest('id').id
+        SpeciesCatalogChange.objects.update(created=timezone.now() - timedelta(days=31))
+        total = SpeciesCatalogChange.objects.count()
+
+        self.assertEqual(prune_species_catalog_changes(), total - 1)
+        self.assertEqual(current_version(), newest)  # the newest row is kept
+
+        for since in (old_version, current_version() + 10):
+            delta = self.client.get(self.url, {'countryspecies__country': 'NL', 'since': since}).json()
+            self.assertTrue(delta['full'])
+            self.assertEqual(len(delta['changed']), 5)
+            self.assertEqual(delta['removed'], [])
+        current = self.client.get(self.url, {'countryspecies__country': 'NL', 'since': current_version()}).json()
+        self.assertFalse(current['full'])
+
+    def test_invalid_parameters(self):
+        self.assertEqual(self.client.get(self.url, {'countryspecies__country': 'XX'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'since': 'yesterday'}).status_code, 400)
@@ -0,0 +1,173 @@
+"""
+Tiered cache backend: local/shared tiers, expiry, tag invalidation from signals and the staff stats endpoint.
+"""
+import time
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache, caches
+from django.db import connections, transaction
+from django.test import TestCase, override_settings
+from rest_framework.test import APIClient
+
+from jizz.models import Country, CountrySpecies, SharedCacheEntry, Species
+from jizz.tiered_cache import TieredCache, checklist_tag, invalidate_tags, set_tagged, species_media_tag
+from media.models import Media
+
+TIERED_CACHES = {
+    'default': {
+        'BACKEND': 'jizz.tiered_cache.TieredCache',
+        'LOCATION': 'tiered-cache-tests',
+        'OPTIONS': {'LOCAL_TIMEOUT': 60},
+    },
+}
+
+
+@override_settings(CACHES=TIERED_CACHES)
+class TieredCacheTests(TestCase):
+    databases = {'default', 'cache'}
+
+    def setUp(self):
+        cache.clear()
+        self.assertIsInstance(caches['default'], TieredCache)
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_set_is_shared_and_survives_local_eviction(self):
+        cache.set('game:1', [3, 1, 2], 60)
+        self.assertTrue(SharedCacheEntry.objects.using('cache').filter(key__endswith='game:1').exists())
+
+        cache.local.clear()
+        self.assertEqual(cache.get('game:1'), [3, 1, 2])
+        stats = cache.stats.snapshot()
+        self.assertGreaterEqual(stats['shared_hits'], 1)
+
+        with self.assertNumQueries(0):
+            self.assertEqual(cache.get('game:1'), [3, 1, 2])
+
+    def test_expired_and_missing_keys_are_misses(self):
+        cache.set('short', 'value', 60)
+        SharedCacheEntry.objects.using('cache').filter(key__endswith='short').update(expires_at='2000-01-01T00:00:00Z')
+        cache.local.clear()
+        self.assertIsNone(cache.get('short'))
+        self.assertEqual(cache.get('absent', 'fallback'), 'fallback')
+
+    def test_add_keeps_live_value_and_replaces_expired_one(self):
+        self.assertTrue(cache.add('slot', 'first', 60))
+        self.assertFalse(cache.add('slot', 'second', 60))
+        self.assertEqual(cache.get('slot'), 'first')
+
+        SharedCacheEntry.objects.using('cache').filter(key__endswith='slot').update(expires_at='2000-01-01T00:00:00Z')
+        cache.local.clear()
+        self.assertTrue(cache.add('slot', 'third', 60))
+        self.assertEqual(cache.get('slot'), 'third')
+
+    def test_get_many_and_delete_many(self):
+        cache.set_many({'a': 1, 'b': 2, 'c': 3}, 60)
+        cache.local.clear()
+        cache.get('a')
+        self.assertEqual(cache.get_many(['a', 'b', 'c', 'd']), {'a': 1, 'b': 2, 'c': 3})
+
+        cache.delete_many(['a', 'b'])
+        self.assertEqual(cache.get_many(['a', 'b', 'c']), {'c': 3})
+
+    def test_zero_timeout_deletes(self):
+        cache.set('gone', 'value', 60)
+        cache.set('gone', 'other', 0)
+        self.assertIsNone(cache.get('gone'))
+        self.assertFalse(SharedCacheEntry.objects.using('cache').filter(key__endswith='gone').exists())
+
+    def test_invalidate_tags_drops_tagged_entries_in_both_tiers(self):
+        set_tagged('targets:1', [1, 2], 60, [checklist_tag('NL'), species_media_tag(1)])
+        set_tagged('targets:2', [5], 60, [checklist_tag('BE'), species_media_tag(5)])
+        cache.set('untagged', 'kept', 60)
+        invalidated = cache.stats.snapshot()['invalidated']
+
+        invalidate_tags(checklist_tag('NL'))
+
+        self.assertIsNone(cache.get('targets:1'))
+        self.assertEqual(cache.get('targets:2'), [5])
+        self.assertEqual(cache.get('untagged'), 'kept')
+
+        invalidate_tags(species_media_tag(5))
+        self.assertIsNone(cache.get('targets:2'))
+        self.assertEqual(cache.stats.snapshot()['invalidated'] - invalidated, 2)
+
+    def test_local_tier_is_bounded(self):
+        cache.local.max_entries = 3
+        self.addCleanup(setattr, cache.local, 'max_entries', 2000)
+        for i in range(5):
+            cache.set(f'k{i}', i, 60)
+        self.assertEqual(len(cache.local), 3)
+        self.assertEqual(cache.get('k0'), 0)
+
+    def test_local_entries_expire_after_local_timeout(self):
+        cache.local_timeout = 0.01
+        self.addCleanup(setattr, cache, 'local_timeout', 60)
+        cache.set('fresh', 'value', 60)
+        SharedCacheEntry.objects.using('cache').filter(key__endswith='fresh').delete()
+        time.sleep(0.02)
+        self.assertIsNone(cache.get('fresh'))
+
+    def test_shared_tier_errors_leave_the_callers_transaction_usable(self):
+        errors = cache.stats.snapshot()['errors']
+        with transaction.atomic():
+            Country.objects.get_or_create(code='TX', defaults={'name': 'Texland'})
+            self.assertIsNone(cache._execute('SELECT missing_column FROM jizz_sharedcacheentry', [], fetch='one'))
+            self.assertTrue(Country.objects.filter(code='TX').exists())
+        self.assertEqual(cache.stats.snapshot()['errors'], errors + 1)
+
+    def test_shared_tier_does_not_query_the_default_connection(self):
+        with self.assertNumQueries(0, using='default'):
+            cache.set('elsewhere', 1, 60)
+            cache.local.clear()
+            self.assertEqual(cache.get('elsewhere'), 1)
+
+    def test_without_postgres_only_the_local_tier_is_used(self):
+        backend = TieredCache('tiered-cache-local-only', {'OPTIONS': {'DATABASE': 'cache'}})
+        with mock.patch.object(type(connections['cache']), 'vendor', 'sqlite'), self.assertNumQueries(0, using='cache'):
+            self.assertFalse(backend.shared)
+            self.assertTrue(backend.add('local', 1, 60))
+            self.assertFalse(backend.add('local', 2, 60))
+            self.assertEqual(backend.get('local'), 1)
+
+
+@override_settings(CACHES=TIERED_CACHES)
+class TieredCacheInvalidationSignalTests(TestCase):
+    databases = {'default', 'cache'}
+
+    def setUp(self):
+        cache.clear()
+        self.country = Country.objects.get_or_create(code='TC', defaults={'name': 'Tagland'})[0]
+        self.species = Species.objects.create(name='Tag Bird', name_latin='Tagus avis', code='TAGB01')
+
+    def tearDown(self):
+        cache.clear()
+
+    def test_checklist_change_invalidates_country_entries(self):
+        set_tagged('targets:country', [self.species.id], 60, [checklist_tag(self.country.code)])
+        CountrySpecies.objects.create(country=self.country, species=self.species, status='native')
+        self.assertIsNone(cache.get('targets:country'))
+
+    def test_media_change_invalidates_species_entries(self):
+        set_tagged('targets:media', [self.species.id], 60, [species_media_tag(self.species.id)])
+        Media.objects.create(species=self.species, type='image', url='https://example.com/tag.jpg', source='test')
+        self.assertIsNone(cache.get('targets:media'))
+
+    def test_staff_endpoint_reports_counters(self):
+        cache.set('counted', 1, 60)
+        cache.get('counted')
+        cache.get('not-there')
+        staff = User.objects.create_user('cachestaff', password='pw', is_staff=True)
+        client = APIClient()
+        client.force_login(staff)
+
+        response = client.get('/staff/cache/api/')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['backend'], 'jizz.tiered_cache.TieredCache')
+        self.assertGreaterEqual(data['process']['local_hits'], 1)
+        self.assertGreaterEqual(data['process']['misses'], 1)
+        self.assertGreaterEqual(data['shared']['entries'], 1)
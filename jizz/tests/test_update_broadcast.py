@@ -0,0 +1,164 @@
+"""
+Update email broadcast engine against a local SMTP sink: pooled connections, per-language
+rendering, batched recipient rows and resuming.
+"""
+import socketserver
+import threading
+from email import message_from_bytes
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+
+from jizz.models import Update, UpdateEmailRecipient, UserProfile
+from jizz.update_emails import (
+    PreparedUpdateEmail,
+    _render_update_email,
+    get_update_email_stats,
+    send_update_email_broadcast,
+)
+
+
+class _SmtpSink(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _SmtpHandler)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.messages = []
+        self.reject = set()
+
+
+class _SmtpHandler(socketserver.StreamRequestHandler):
+    def reply(self, line):
+        self.wfile.write(line.encode() + b'\r\n')
+
+    def handle(self):
+        sink = self.server
+        with sink.lock:
+            sink.connections += 1
+        self.reply('220 sink ready')
+        recipients = []
+        while line := self.rfile.readline():
+            command = line.decode().strip()
+            verb = command[:4].upper()
+            if verb in ('EHLO', 'HELO'):
+                self.reply('250 sink')
+            elif verb == 'MAIL':
+                recipients = []
+                self.reply('250 OK')
+            elif verb == 'RCPT':
+                address = command.split(':', 1)[1].strip(' <>')
+                if address in sink.reject:
+                    self.reply('550 no such user')
+                else:
+                    recipients.append(address)
+                    self.reply('250 OK')
+            elif verb == 'DATA':
+                self.reply('354 go ahead')
+                data = b''
+                while (chunk := self.rfile.readline()) != b'.\r\n':
+                    data += chunk
+                with sink.lock:
+                    sink.messages.append((recipients, message_from_bytes(data)))
+                self.reply('250 queued')
+            elif verb == 'QUIT':
+                self.reply('221 bye')
+                return
+            else:
+                self.reply('250 OK')
+
+
+class UpdateBroadcastEngineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.sink = _SmtpSink()
+        threading.Thread(target=cls.sink.serve_forever, daemon=True).start()
+        cls.smtp_settings = override_settings(
+            EMAIL_BACKEND='django.core.mail.backends.smtp.EmailBackend',
+            EMAIL_HOST='127.0.0.1',
+            EMAIL_PORT=cls.sink.server_address[1],
+            EMAIL_USE_TLS=False,
+            EMAIL_USE_SSL=False,
+            UPDATE_EMAIL_BATCH_SIZE=10,
+        )
+        cls.smtp_settings.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.smtp_settings.disable()
+        cls.sink.shutdown()
+        cls.sink.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.sink.connections = 0
+        self.sink.messages = []
+        self.sink.reject = set()
+        self.author = User.objects.create_user('author', password='x', email='author@example.com')
+        self.update = Update.objects.create(
+            title_en='New feature',
+            title_nl='Nieuwe functie',
+            body_en='{"delta":"","html":"<p>Hello world</p>"}',
+            body_nl='{"delta":"","html":"<p>Hallo wereld</p>"}',
+            user=self.author,
+        )
+
+    def _subscribers(self, count, start=0):
+        for i in range(start, start + count):
+            user = User.objects.create(username=f'user{i}', email=f'user{i}@example.com', first_name=f'Ann {i}')
+            UserProfile.objects.create(user=user, receive_updates=True, language='nl' if i % 2 else 'en')
+
+    def test_pooled_connections_and_personalised_content(self):
+        self._subscribers(25)
+        delivery = send_update_email_broadcast(self.update, self.author, connections=3)
+
+        self.assertEqual(delivery.recipient_count, 25)
+        self.assertEqual(len(self.sink.messages), 25)
+        self.assertLessEqual(self.sink.connections, 3)
+        recipients = {r.email: r for r in UpdateEmailRecipient.objects.filter(delivery=delivery)}
+        self.assertEqual(len(recipients), 25)
+
+        for (to,), message in self.sink.messages:
+            html = message.get_payload()[1].get_payload(decode=True).decode()
+            number = int(to.removeprefix('user').split('@')[0])
+            self.assertIn(f'Ann {number},', html)
+            self.assertIn(f'/api/updates/email-open/{recipients[to].tracking_token}/', html)
+            self.assertIn('Hallo wereld' if number % 2 else 'Hello world', html)
+
+    def test_prepared_email_matches_per_user_render(self):
+        user = User.objects.create_user('amp', password='x', email='a&b@example.com', first_name='Tom & <Jerry>')
+        token = '00000000-0000-0000-0000-000000000001'
+        for language in ('en', 'nl'):
+            self.assertEqual(
+                PreparedUpdateEmail.render(self.update, language).for_user(user, token),
+                _render_update_email(self.update, user=user, language=language, tracking_token=token),
+            )
+
+    def test_queries_do_not_grow_per_recipient(self):
+        self._subscribers(10)
+        with CaptureQueriesContext(connection) as small:
+            send_update_email_broadcast(self.update, self.author, connections=2)
+        other = Update.objects.create(title_en='Other', body_en='{"delta":"","html":"<p>x</p>"}', user=self.author)
+        self._subscribers(30, start=10)
+        with CaptureQueriesContext(connection) as large:
+            send_update_email_broadcast(other, self.author, connections=2)
+        # Only the per-batch writes (10 recipients per batch here) grow.
+        self.assertLessEqual(len(large) - len(small), 2 * 3)
+
+    def test_rejected_recipients_stay_pending_for_resume(self):
+        self._subscribers(6)
+        self.sink.reject = {'user2@example.com', 'user5@example.com'}
+        send_update_email_broadcast(self.update, self.author, connections=2)
+        self.assertEqual(get_update_email_stats(self.update)['pending'], 2)
+
+        self.sink.reject = set()
+        self.sink.messages = []
+        delivery = send_update_email_broadcast(self.update, self.author, connections=2)
+        self.assertEqual(delivery.recipient_count, 2)
+        self.assertEqual(sorted(to for (to,), _ in self.sink.messages), ['user2@example.com', 'user5@example.com'])
+        self.assertEqual(get_update_email_stats(self.update)['pending'], 0)
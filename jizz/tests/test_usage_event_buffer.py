@@ -0,0 +1,184 @@
+"""
+Buffered usage-event writer: batching, bounded queue, spool fallback, request path.
+"""
+
+import shutil
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.db import IntegrityError, OperationalError, connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from jizz.models import UsageEvent
+from jizz.usage_event_buffer import UsageEventWriter
+
+
+def _event(path='/data/', **kwargs):
+    return UsageEvent(event_type='page_view', path=path, ip_address='203.0.113.7', **kwargs)
+
+
+def _failing_bulk_create(fail):
+    """bulk_create that raises ``fail(events)`` (an exception or None) before inserting."""
+    real = UsageEvent.objects.bulk_create
+
+    def bulk_create(events, *args, **kwargs):
+        error = fail(list(events))
+        if error is not None:
+            raise error
+        return real(events, *args, **kwargs)
+
+    return mock.patch.object(UsageEvent.objects, 'bulk_create', side_effect=bulk_create)
+
+
+class UsageEventWriterTests(TestCase):
+    def setUp(self):
+        self.tmp = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.tmp, ignore_errors=True)
+        self.spool = self.tmp / 'usage.spool'
+
+    def test_flush_writes_batches_with_bulk_create(self):
+        writer = UsageEventWriter(batch_size=3, spool_path=self.spool)
+        for i in range(7):
+            writer.enqueue(_event(f'/data/{i}'))
+        with CaptureQueriesContext(connection) as ctx:
+            self.assertEqual(writer.flush(), 7)
+        self.assertEqual(len(ctx), 3)
+        self.assertEqual(UsageEvent.objects.count(), 7)
+        self.assertEqual(writer.stats()['written'], 7)
+
+    def test_full_queue_drops_and_counts(self):
+        writer = UsageEventWriter(max_queue=2)
+        self.assertTrue(writer.enqueue(_event()))
+        self.assertTrue(writer.enqueue(_event()))
+        self.assertFalse(writer.enqueue(_event()))
+        self.assertEqual(writer.stats(), {
+            'queued': 2, 'dropped': 1, 'written': 0, 'spooled': 0, 'replayed': 0, 'pending': 2,
+        })
+
+    def test_failed_insert_spools_then_replays_with_original_timestamps(self):
+        writer = UsageEventWriter(spool_path=self.spool, backoff_seconds=60)
+        old = timezone.now() - timedelta(hours=3)
+        writer.enqueue(_event('/data/old', created_at=old, metadata={'proxy': {'remote_addr': 'x'}}))
+        with mock.patch.object(UsageEvent.objects, 'bulk_create', side_effect=OperationalError('db down')):
+            writer.flush()
+        # Still backing off: later batches go straight to the spool file.
+        writer.enqueue(_event('/data/new'))
+        writer.flush()
+        self.assertEqual(writer.stats()['spooled'], 2)
+        self.assertEqual(len(self.spool.read_text().splitlines()), 2)
+        self.assertFalse(UsageEvent.objects.exists())
+
+        self.assertEqual(writer.replay_spool(), 2)
+        self.assertFalse(self.spool.exists())
+        replayed = UsageEvent.objects.get(path='/data/old')
+        self.assertEqual(replayed.created_at, old)
+        self.assertEqual(replayed.metadata, {'proxy': {'remote_addr': 'x'}})
+
+    def test_constraint_violation_drops_batch_without_spooling(self):
+        writer = UsageEventWriter(spool_path=self.spool)
+        writer.enqueue(_event('/data/bad'))
+        with _failing_bulk_create(lambda events: IntegrityError('bad row')):
+            writer.flush()
+        writer.enqueue(_event('/data/good'))
+        writer.flush()
+        self.assertEqual(writer.stats()['dropped'], 1)
+        self.assertEqual(writer.stats()['spooled'], 0)
+        self.assertFalse(self.spool.exists())
+        self.assertEqual(list(UsageEvent.objects.values_list('path', flat=True)), ['/data/good'])
+
+    def test_events_of_deleted_users_are_written_without_user(self):
+        user = User.objects.create_user('gone')
+        user_id = user.pk
+        user.delete()
+        writer = UsageEventWriter(spool_path=self.spool)
+        writer.enqueue(_event('/data/a', user_id=user_id))
+        with _failing_bulk_create(
+            lambda events: IntegrityError('fk') if any(e.user_id == user_id for e in events) else None
+        ):
+            writer.flush()
+        self.assertIsNone(UsageEvent.objects.get(path='/data/a').user_id)
+        self.assertEqual(writer.stats()['written'], 1)
+
+    def _spooled(self, writer, paths):
+        with mock.patch.object(UsageEvent.objects, 'bulk_create', side_effect=OperationalError('db down')):
+            for path in paths:
+                writer.enqueue(_event(path))
+            writer.flush()
+        writer._spool_until = 0
+
+    def test_replay_rejects_bad_chunk_and_continues(self):
+        writer = UsageEventWriter(batch_size=2, spool_path=self.spool)
+        self._spooled(writer, ['/data/1', '/data/2', '/data/bad', '/data/4', '/data/5'])
+        with self.spool.open('a') as spool:
+            spool.write('not json\n')
+
+        with _failing_bulk_create(
+            lambda events: IntegrityError('bad row') if any(e.path == '/data/bad' for e in events) else None
+        ):
+            self.assertEqual(writer.replay_spool(), 3)
+
+        self.assertEqual(
+            sorted(UsageEvent.objects.values_list('path', flat=True)), ['/data/1', '/data/2', '/data/5'],
+        )
+        rejected = (self.tmp / 'usage.spool.rejected').read_text().splitlines()
+        self.assertEqual(len(rejected), 3)
+        self.assertIn('not json', rejected)
+        self.assertFalse(self.spool.exists())
+        self.assertFalse((self.tmp / 'usage.spool.replay').exists())
+
+    def test_replay_keeps_unwritten_chunks_when_database_fails(self):
+        writer = UsageEventWriter(batch_size=2, spool_path=self.spool)
+        self._spooled(writer, [f'/data/{i}' for i in range(5)])
+        calls = []
+
+        def second_call_fails(events):
+            calls.append(events)
+            return OperationalError('db down') if len(calls) == 2 else None
+
+        with _failing_bulk_create(second_call_fails):
+            self.assertEqual(writer.replay_spool(), 2)
+        replaying = self.tmp / 'usage.spool.replay'
+        self.assertEqual(len(replaying.read_text().splitlines()), 3)
+
+        # Batches spooled meanwhile are replayed after the leftovers.
+        self._spooled(writer, ['/data/late'])
+        self.assertEqual(writer.replay_spool(), 4)
+        self.assertEqual(UsageEvent.objects.count(), 6)
+        self.assertFalse(replaying.exists())
+        self.assertFalse(self.spool.exists())
+
+    def test_slow_insert_switches_to_spool(self):
+        writer = UsageEventWriter(spool_path=self.spool, slow_seconds=-1)
+        writer.enqueue(_event())
+        writer.flush()
+        writer.enqueue(_event())
+        writer.flush()
+        self.assertEqual(writer.stats()['written'], 1)
+        self.assertEqual(writer.stats()['spooled'], 1)
+
+    def test_close_flushes_pending_events(self):
+        writer = UsageEventWriter(flush_seconds=0.05)
+        writer.enqueue(_event())
+        writer.close()
+        self.assertEqual(UsageEvent.objects.count(), 1)
+
+
+class BufferedMiddlewareTests(TestCase):
+    @override_settings(USAGE_EVENTS_BUFFERED=True)
+    def test_api_request_queues_instead_of_inserting(self):
+        writer = UsageEventWriter()
+        with mock.patch('jizz.usage_event_buffer.get_usage_event_writer', return_value=writer), \
+                mock.patch.object(writer, 'start'):
+            with CaptureQueriesContext(connection) as ctx:
+                response = APIClient().get('/api/updates/', REMOTE_ADDR='198.51.100.4')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('jizz_usageevent', ' '.join(q['sql'] for q in ctx.captured_queries))
+        self.assertEqual(writer.stats()['pending'], 1)
+        writer.flush()
+        self.assertEqual(UsageEvent.objects.get().path, 'Updates viewed')
@@ -0,0 +1,119 @@
+"""
+Usage rollups: HyperLogLog sketches, hourly/daily aggregation, dashboard parity, pruning.
+"""
+
+from datetime import date, datetime, timedelta
+from unittest.mock import patch
+
+from django.test import TestCase
+from django.utils import timezone
+
+from jizz.hyperloglog import HyperLogLog
+from jizz.models import UsageEvent, UsageIpRollup, UsageRollup, UsageRollupState
+from jizz.usage_analytics import usage_stats_payload, usage_top_ips
+from jizz.usage_rollups import prune_usage_events, update_usage_rollups
+
+_GEO = {
+    '84.85.68.210': {'country_code': 'NL', 'country_name': 'Netherlands', 'city': ''},
+    '139.178.131.76': {'country_code': 'US', 'country_name': 'United States', 'city': ''},
+}
+
+
+class HyperLogLogTests(TestCase):
+    def test_estimate_merge_and_roundtrip(self):
+        small = HyperLogLog().update(['a', 'b', 'c', 'a'])
+        self.assertEqual(small.count(), 3)
+
+        left = HyperLogLog().update(f's{i}' for i in range(6000))
+        right = HyperLogLog().update(f's{i}' for i in range(4000, 10000))
+        merged = HyperLogLog.from_bytes(left.to_bytes()).merge(right)
+        self.assertAlmostEqual(merged.count(), 10000, delta=500)
+        self.assertEqual(HyperLogLog.from_bytes(b'').count(), 0)
+
+
+@patch('jizz.ip_geo.mmdb_available', return_value=True)
+@patch('jizz.ip_geo.lookup_ip_locations', return_value=_GEO)
+class UsageRollupTests(TestCase):
+    def setUp(self):
+        self.now = timezone.make_aware(datetime(2026, 5, 3, 14, 30))
+
+    def _event(self, when, *, path='/start', platform='web', device_type='desktop',
+               event_type='page_view', session_key='s1', ip_address='84.85.68.210'):
+        return UsageEvent.objects.create(
+            path=path,
+            platform=platform,
+            device_type=device_type,
+            event_type=event_type,
+            country_code='NL',
+            session_key=session_key,
+            ip_address=ip_address,
+            created_at=when,
+        )
+
+    def _seed(self):
+        def day(d, h, m=0):
+            return timezone.make_aware(datetime(2026, 5, d, h, m))
+
+        self._event(day(1, 9), session_key='s1')
+        self._event(day(1, 9, 40), session_key='s1', path='/journey')
+        self._event(day(1, 23, 59), session_key='s2', device_type='mobile')
+        self._event(day(2, 0, 5), session_key='s2', platform='ios', ip_address='139.178.131.76')
+        self._event(day(2, 12), session_key='s3', event_type='api', path='Updates viewed')
+        self._event(day(3, 10), session_key='s4')
+        self._event(day(3, 14, 10), session_key='s1')  # open hour: raw only
+
+    def _payload(self, **kwargs):
+        payload = usage_stats_payload(date(2026, 5, 1), date(2026, 5, 3), **kwargs)
+        payload.pop('map_style')
+        return payload
+
+    def test_rollup_payload_matches_raw_payload(self, *_mocks):
+        self._seed()
+        raw_payload = self._payload()
+        raw_filtered = self._payload(platform='web', device_type='desktop')
+
+        result = update_usage_rollups(now=self.now)
+        self.assertEqual(result['days'], 2)
+        self.assertEqual(UsageRollupState.load().rolled_until, timezone.make_aware(datetime(2026, 5, 3, 14)))
+        self.assertTrue(UsageRollup.objects.filter(granularity='day').exists())
+        self.assertTrue(UsageIpRollup.objects.exists())
+
+        self.assertEqual(self._payload(), raw_payload)
+        self.assertEqual(self._payload(platform='web', device_type='desktop'), raw_filtered)
+        self.assertEqual(raw_payload['total_events'], 7)
+        self.assertEqual(raw_payload['unique_sessions'], 4)
+        self.assertEqual(raw_payload['country_map'], {'NL': 6, 'US': 1})
+
+    def test_closed_periods_no_longer_need_raw_rows(self, *_mocks):
+        self._seed()
+        before = self._payload()
+        update_usage_rollups(now=self.now)
+        top_ips = usage_top_ips(date(2026, 5, 1), date(2026, 5, 3))
+        UsageEvent.objects.filter(created_at__lt=timezone.make_aware(datetime(2026, 5, 3))).delete()
+        self.assertEqual(self._payload(), before)
+        self.assertEqual(usage_top_ips(date(2026, 5, 1), date(2026, 5, 3)), top_ips)
+
+    def test_incremental_run_picks_up_new_hours_and_late_writes(self, *_mocks):
+        self._seed()
+        update_usage_rollups(now=self.now)
+        # Late buffered write inside the lookback window, plus a new event in the next hour.
+        self._event(timezone.make_aware(datetime(2026, 5, 3, 13, 50)), session_key='late')
+        self._event(timezone.make_aware(datetime(2026, 5, 3, 15, 5)), session_key='s9')
+        # 13:00 was already rolled up, so the late event shows up after the next run.
+        self.assertEqual(self._payload()['total_events'], 8)
+        update_usage_rollups(now=self.now + timedelta(hours=2))
+        payload = self._payload()
+        self.assertEqual(payload['total_events'], 9)
+        self.assertEqual(payload['unique_sessions'], 6)
+        self.assertEqual(payload['series'][-1], {'period': '2026-05-03', 'events': 4})
+
+    def test_prune_keeps_rollups_and_open_day(self, *_mocks):
+        self._seed()
+        before = self._payload()
+        self.assertEqual(prune_usage_events(1, now=self.now)['events'], 0)  # nothing rolled yet
+        update_usage_rollups(now=self.now)
+        pruned = prune_usage_events(1, now=self.now)
+        # Everything before May 2 is outside retention and rolled up.
+        self.assertEqual(pruned['events'], 3)
+        self.assertEqual(UsageEvent.objects.count(), 4)
+        self.assertEqual(self._payload(), before)
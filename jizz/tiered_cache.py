@@ -0,0 +1,383 @@
+"""
+Two-tier cache backend: an in-process LRU in front of a shared PostgreSQL table.
+
+``CACHES['default']`` uses ``TieredCache``, so every Daphne/gunicorn worker (and host)
+shares the playable-species index, species catalog blobs, leaderboard tops and per-game
+target lists instead of keeping its own LocMem copy that is lost on restart.
+
+- The shared tier is ``SharedCacheEntry``, an UNLOGGED table (no WAL; emptied after a
+  crash, which is fine for a cache). Values are pickled. Its statements run on their own
+  autocommit connection (the ``cache`` alias in ``DATABASES``, a second connection to the
+  default database), so they never take row locks inside, or abort, the caller's
+  transaction; a failing statement is logged and counted, and reads as a miss.
+- The shared tier needs PostgreSQL (``ON CONFLICT``, ``jsonb``, ``now()``). On any other
+  database, or without the alias, the backend runs with the local tier only.
+- The local tier is one LRU per process (shared by its threads). Local entries live at
+  most ``LOCAL_TIMEOUT`` seconds, which bounds how long another process can serve a value
+  that was deleted or invalidated elsewhere.
+- ``set_tagged`` stores tags with an entry; ``invalidate_tags`` deletes every entry with
+  one of the tags in all tiers (now and again after commit, like the other cache
+  forgetters). Tag helpers: ``checklist_tag`` (a country's CountrySpecies changed) and
+  ``species_media_tag`` (media or reviews of a species changed), wired in ``jizz.signals``.
+- ``cache_stats`` returns this process's hit/miss counters and the shared table size for
+  ``/staff/cache/api/``.
+
+With another backend (tests use LocMemCache) ``set_tagged`` is a plain ``set`` and
+``invalidate_tags`` does nothing; entries then only expire.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Iterable
+
+from django.core.cache import cache
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.conf import settings
+from django.db import DatabaseError, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+# ``jizz.models.SharedCacheEntry``; not imported so the backend loads before the app registry.
+_TABLE = 'jizz_sharedcacheentry'
+# Rows stored without expiry (timeout=None) still get one, far away.
+_FOREVER_SECONDS = 10 * 365 * 24 * 3600
+
+_GET_SQL = f'SELECT value, extract(epoch FROM expires_at) FROM {_TABLE} WHERE key = %s AND expires_at > now()'
+_GET_MANY_SQL = (
+    f'SELECT key, value, extract(epoch FROM expires_at) FROM {_TABLE} '
+    'WHERE key = ANY(%s) AND expires_at > now()'
+)
+_SET_SQL = f"""
+INSERT INTO {_TABLE} (key, value, expires_at, tags)
+VALUES (%s, %s, to_timestamp(%s), %s::jsonb)
+ON CONFLICT (key) DO UPDATE
+SET value = EXCLUDED.value, expires_at = EXCLUDED.expires_at, tags = EXCLUDED.tags
+"""
+_ADD_SQL = _SET_SQL + f' WHERE {_TABLE}.expires_at <= now() RETURNING key'
+
+
+def checklist_tag(country_id: str) -> str:
+    return f'country:{country_id}:checklist'
+
+
+def species_media_tag(species_id: int) -> str:
+    return f'species:{species_id}:media'
+
+
+class CacheStats:
+    """Per-process counters of one TieredCache location."""
+
+    FIELDS = ('local_hits', 'shared_hits', 'misses', 'sets', 'deletes', 'invalidations', 'invalidated', 'errors')
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+
+    def incr(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            self._counts[field] += amount
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            counts = dict(self._counts)
+        lookups = counts['local_hits'] + counts['shared_hits'] + counts['misses']
+        counts['hit_ratio'] = round((counts['local_hits'] + counts['shared_hits']) / lookups, 4) if lookups else None
+        return counts
+
+
+class _LocalTier:
+    """Thread-safe LRU of ``key -> (value, expires_monotonic, tags)``."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[Any, float, frozenset]] = OrderedDict()
+
+    def get(self, key: str):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[1] <= time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, value, ttl: float, tags: Iterable[str] = ()) -> None:
+        if ttl <= 0 or self.max_entries <= 0:
+            self.pop(key)
+            return
+        with self._lock:
+            self._entries[key] = (value, time.monotonic() + ttl, frozenset(tags))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: str) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def drop_tags(self, tags: set[str]) -> None:
+        with self._lock:
+            for key in [key for key, entry in self._entries.items() if entry[2] & tags]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# One local tier and one set of counters per cache location, shared by the per-thread
+# backend instances Django creates (as LocMemCache does).
+_local_tiers: dict[str, _LocalTier] = {}
+_stats: dict[str, CacheStats] = {}
+_shared_enabled: dict[str, bool] = {}
+_registry_lock = threading.Lock()
+
+
+class TieredCache(BaseCache):
+    """
+    Django cache backend. OPTIONS: ``DATABASE`` (alias of the shared tier's connection,
+    default ``cache``; must not be an alias requests open transactions on),
+    ``LOCAL_MAX_ENTRIES`` (default 2000; 0 disables the local tier), ``LOCAL_TIMEOUT``
+    (seconds, default 5) and ``CULL_EVERY`` (delete expired rows after this many writes per
+    process, default 500).
+    """
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get('OPTIONS') or {}
+        self.location = location or 'default'
+        self.alias = options.get('DATABASE', 'cache')
+        self.local_timeout = float(options.get('LOCAL_TIMEOUT', 5))
+        self.cull_every = int(options.get('CULL_EVERY', 500))
+        with _registry_lock:
+            if self.location not in _local_tiers:
+                _local_tiers[self.location] = _LocalTier(int(options.get('LOCAL_MAX_ENTRIES', 2000)))
+                _stats[self.location] = CacheStats()
+        self.local = _local_tiers[self.location]
+        self.stats = _stats[self.location]
+        self._writes = 0
+
+    # Shared tier
+
+    @property
+    def shared(self) -> bool:
+        """Whether the shared tier is available (a PostgreSQL ``DATABASE`` alias)."""
+        enabled = _shared_enabled.get(self.location)
+        if enabled is None:
+            enabled = self.alias in settings.DATABASES and connections[self.alias].vendor == 'postgresql'
+            if not enabled:
+                logger.warning(
+                    'Cache %r: database alias %r is missing or not PostgreSQL; using the local tier only',
+                    self.location,
+                    self.alias,
+                )
+            _shared_enabled[self.location] = enabled
+        return enabled
+
+    def _execute(self, sql: str, params, *, fetch: str | None = None):
+        """Run one statement on the shared tier's connection; a database error is a cache miss."""
+        if not self.shared:
+            return None
+        try:
+            with connections[self.alias].cursor() as cursor:
+                cursor.execute(sql, params)
+                if fetch == 'one':
+                    return cursor.fetchone()
+                if fetch == 'all':
+                    return cursor.fetchall()
+                return cursor.rowcount
+        except DatabaseError:
+            self.stats.incr('errors')
+            logger.warning('Shared cache statement failed', exc_info=True)
+            return None
+
+    def _local_ttl(self, expires_epoch: float | None) -> float:
+        if expires_epoch is None:
+            return self.local_timeout
+        return min(self.local_timeout, float(expires_epoch) - time.time())
+
+    def _store(self, sql: str, key: str, value, timeout, tags: Iterable[str]):
+        expires = self.get_backend_timeout(timeout)
+        if expires is None:
+            expires = time.time() + _FOREVER_SECONDS
+        tag_list = sorted(set(tags))
+        if expires <= time.time():
+            self.delete_key(key)
+            return None
+        result = self._execute(
+            sql,
+            [key, pickle.dumps(value, pickle.HIGHEST_PROTOCOL), expires, json.dumps(tag_list)],
+            fetch='one' if 'RETURNING' in sql else None,
+        )
+        self.stats.incr('sets')
+        self._maybe_cull()
+        return result, expires, tag_list
+
+    def _maybe_cull(self) -> None:
+        self._writes += 1
+        if self.cull_every and self._writes % self.cull_every == 0:
+            self._execute(f'DELETE FROM {_TABLE} WHERE expires_at <= now()', [])
+
+    # BaseCache API
+
+    def get(self, key, default=None, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        entry = self.local.get(key)
+        if entry is not None:
+            self.stats.incr('local_hits')
+            return entry[0]
+        row = self._execute(_GET_SQL, [key], fetch='one')
+        if not row:
+            self.stats.incr('misses')
+            return default
+        value = pickle.loads(bytes(row[0]))
+        self.local.set(key, value, self._local_ttl(row[1]))
+        self.stats.incr('shared_hits')
+        return value
+
+    def get_many(self, keys, version=None):
+        found = {}
+        missing = {}
+        for key in keys:
+            full_key = self.make_and_validate_key(key, version=version)
+            entry = self.local.get(full_key)
+            if entry is not None:
+                found[key] = entry[0]
+            else:
+                missing[full_key] = key
+        self.stats.incr('local_hits', len(found))
+        if missing:
+            for full_key, value, expires in self._execute(_GET_MANY_SQL, [list(missing)], fetch='all') or ():
+                found[missing[full_key]] = pickle.loads(bytes(value))
+                self.local.set(full_key, found[missing[full_key]], self._local_ttl(expires))
+                self.stats.incr('shared_hits')
+            self.stats.incr('misses', sum(1 for key in missing.values() if key not in found))
+        return found
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, tags: Iterable[str] = ()):
+        key = self.make_and_validate_key(key, version=version)
+        stored = self._store(_SET_SQL, key, value, timeout, tags)
+        if stored is not None:
+            _, expires, tag_list = stored
+            self.local.set(key, value, self._local_ttl(expires), tag_list)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None, tags: Iterable[str] = ()):
+        key = self.make_and_validate_key(key, version=version)
+        if not self.shared:
+            if self.local.get(key) is not None:
+                return False
+            self.set(key, value, timeout, tags=tags)
+            return True
+        row = self._execute(_GET_SQL, [key], fetch='one')
+        if row:
+            return False
+        stored = self._store(_ADD_SQL, key, value, timeout, tags)
+        if stored is None or not stored[0]:
+            return False
+        self.local.set(key, value, self._local_ttl(stored[1]), stored[2])
+        return True
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self.make_and_validate_key(key, version=version)
+        expires = self.get_backend_timeout(timeout)
+        if expires is None:
+            expires = time.time() + _FOREVER_SECONDS
+        self.local.pop(key)
+        updated = self._execute(
+            f'UPDATE {_TABLE} SET expires_at = to_timestamp(%s) WHERE key = %s AND expires_at > now()',
+            [expires, key],
+        )
+        return bool(updated)
+
+    def delete(self, key, version=None):
+        return self.delete_key(self.make_and_validate_key(key, version=version))
+
+    def delete_key(self, key: str) -> bool:
+        self.local.pop(key)
+        self.stats.incr('deletes')
+        return bool(self._execute(f'DELETE FROM {_TABLE} WHERE key = %s', [key]))
+
+    def delete_many(self, keys, version=None):
+        full_keys = [self.make_and_validate_key(key, version=version) for key in keys]
+        if not full_keys:
+            return
+        for key in full_keys:
+            self.local.pop(key)
+        self.stats.incr('deletes', len(full_keys))
+        self._execute(f'DELETE FROM {_TABLE} WHERE key = ANY(%s)', [full_keys])
+
+    def has_key(self, key, version=None):
+        sentinel = object()
+        return self.get(key, sentinel, version=version) is not sentinel
+
+    def clear(self):
+        self.local.clear()
+        self._execute(f'DELETE FROM {_TABLE}', [])
+
+    # Tags
+
+    def invalidate_tags(self, tags: Iterable[str]) -> int:
+        tag_set = set(tags)
+        if not tag_set:
+            return 0
+        self.local.drop_tags(tag_set)
+        deleted = self._execute(f'DELETE FROM {_TABLE} WHERE tags ?| %s', [sorted(tag_set)]) or 0
+        self.stats.incr('invalidations')
+        self.stats.incr('invalidated', deleted)
+        return deleted
+
+    def shared_size(self) -> dict:
+        row = self._execute(
+            f'SELECT count(*), coalesce(sum(octet_length(value)), 0), count(*) FILTER (WHERE expires_at <= now()) '
+            f'FROM {_TABLE}',
+            [],
+            fetch='one',
+        ) or (0, 0, 0)
+        return {'entries': row[0], 'bytes': int(row[1]), 'expired': row[2]}
+
+
+def set_tagged(key: str, value, timeout, tags: Iterable[str]) -> None:
+    """``cache.set`` that ``invalidate_tags`` can drop."""
+    if isinstance(_default_backend(), TieredCache):
+        cache.set(key, value, timeout, tags=tags)
+    else:
+        cache.set(key, value, timeout)
+
+
+def invalidate_tags(*tags: str) -> None:
+    """Drop entries with any of ``tags`` now and again after commit (rolled-back reads may refill)."""
+    backend = _default_backend()
+    if not isinstance(backend, TieredCache) or not tags:
+        return
+    backend.invalidate_tags(tags)
+    transaction.on_commit(lambda: _default_backend().invalidate_tags(tags))
+
+
+def cache_stats() -> dict:
+    backend = _default_backend()
+    if not isinstance(backend, TieredCache):
+        return {'backend': f'{type(backend).__module__}.{type(backend).__name__}'}
+    return {
+        'backend': 'jizz.tiered_cache.TieredCache',
+        'process': backend.stats.snapshot(),
+        'local_entries': len(backend.local),
+        'shared': {'enabled': backend.shared, **backend.shared_size()},
+    }
+
+
+def _default_backend() -> BaseCache:
+    from django.core.cache import caches
+
+    return caches['default']
@@ -3,20 +3,28 @@ from __future__ import annotations
 import json
 import logging
 import re
+import smtplib
 import threading
+import time
 import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import timedelta
 from html import unescape
+from itertools import islice
+from types import SimpleNamespace
 
 from django.conf import settings
-from django.core.mail import EmailMultiAlternatives
-from django.db import connection
+from django.core.mail import EmailMultiAlternatives, get_connection
 from django.db.models import QuerySet
 from django.template.loader import render_to_string
 from django.utils import timezone
+from django.utils.html import escape
 import html2text
 
+from jizz.job_queue import enqueue
 from jizz.models import MailSettings, Update, UpdateEmailDelivery, UpdateEmailRecipient, UserProfile
+from media.scrapers.rate_limit import TokenBucket
 
 logger = logging.getLogger(__name__)
 
@@ -255,8 +263,98 @@ def send_test_update_email(update: Update, user) -> bool:
         return False
 
 
-def send_update_email_broadcast(update: Update, sent_by, *, delivery: UpdateEmailDelivery | None = None) -> UpdateEmailDelivery | None:
-    """Send to subscribers who have not received this update yet. Safe to call again to resume."""
+@dataclass
+class PreparedUpdateEmail:
+    """
+    An update email rendered once for one language, with markers where the recipient's
+    name, address and tracking token go; ``for_user`` fills them in.
+    """
+
+    subject: str
+    text: str
+    html: str
+    markers: dict[str, str]
+
+    @classmethod
+    def render(cls, update: Update, language: str) -> PreparedUpdateEmail:
+        markers = {key: f'x{uuid.uuid4().hex}' for key in ('name', 'email', 'token')}
+        stand_in = SimpleNamespace(first_name=markers['name'], username=markers['name'], email=markers['email'])
+        subject, text, html = _render_update_email(
+            update, user=stand_in, language=language, tracking_token=markers['token'],
+        )
+        return cls(subject, text, html, markers)
+
+    def for_user(self, user, tracking_token) -> tuple[str, str, str]:
+        name = user_display_name(user)
+        html, text = self.html, self.text
+        for key, value in (('name', name), ('email', user.email), ('token', str(tracking_token))):
+            html = html.replace(self.markers[key], escape(value))
+            text = text.replace(self.markers[key], value)
+        return self.subject, text, html
+
+
+def _chunks(iterable, size: int):
+    iterator = iter(iterable)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+class _SmtpPool:
+    """One persistent mail connection per sender thread, reopened after a failure."""
+
+    def __init__(self):
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open = []
+
+    def connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = get_connection(fail_silently=False)
+            connection.open()
+            self._local.connection = connection
+            with self._lock:
+                self._open.append(connection)
+        return connection
+
+    def discard(self):
+        connection = getattr(self._local, 'connection', None)
+        self._local.connection = None
+        if connection is not None:
+            with self._lock:
+                self._open.remove(connection)
+            try:
+                connection.close()
+            except Exception:
+                pass
+
+    def close(self):
+        with self._lock:
+            connections, self._open = self._open, []
+        for connection in connections:
+            try:
+                connection.close()
+            except Exception:
+                logger.warning('Closing mail connection failed', exc_info=True)
+
+
+def send_update_email_broadcast(
+    update: Update,
+    sent_by,
+    *,
+    delivery: UpdateEmailDelivery | None = None,
+    connections: int | None = None,
+    rate: float | None = None,
+) -> UpdateEmailDelivery | None:
+    """
+    Send to subscribers who have not received this update yet. Safe to call again to resume.
+
+    Each language variant is rendered once; ``connections`` sender threads (default
+    UPDATE_EMAIL_CONNECTIONS) each keep one SMTP connection open, together sending at most
+    ``rate`` emails per second (default UPDATE_EMAIL_SEND_RATE, 0 = unlimited). Recipient
+    rows are written per batch of UPDATE_EMAIL_BATCH_SIZE, so a resumed broadcast repeats at
+    most the batch that was in flight.
+    """
     pending = get_pending_subscribers(update)
     pending_count = pending.count()
     if pending_count == 0:
@@ -271,18 +369,64 @@ def send_update_email_broadcast(update: Update, sent_by, *, delivery: UpdateEmai
             status=UpdateEmailDelivery.STATUS_SENDING,
         )
 
+    connections = connections or getattr(settings, 'UPDATE_EMAIL_CONNECTIONS', 4)
+    rate = rate if rate is not None else getattr(settings, 'UPDATE_EMAIL_SEND_RATE', 0)
+    batch_size = getattr(settings, 'UPDATE_EMAIL_BATCH_SIZE', 200)
+    from_email = getattr(settings, 'DEFAULT_FROM_EMAIL', 'info@birdr.pro')
+    bucket = TokenBucket(rate, burst=connections) if rate else None
+    prepared: dict[str, PreparedUpdateEmail] = {}
+    pool = _SmtpPool()
+
+    def send(item) -> bool:
+        user, language, tracking_token = item
+        if bucket is not None:
+            bucket.acquire()
+        subject, text_content, html_content = prepared[language].for_user(user, tracking_token)
+        try:
+            msg = EmailMultiAlternatives(
+                subject=subject,
+                body=text_content,
+                from_email=from_email,
+                to=[user.email],
+                connection=pool.connection(),
+            )
+            msg.attach_alternative(html_content, 'text/html')
+            msg.send()
+            return True
+        except smtplib.SMTPRecipientsRefused:
+            logger.warning('Update email refused for user %s', user.pk)
+            return False
+        except Exception:
+            logger.exception('Update email failed for user %s', user.pk)
+            pool.discard()
+            return False
+
     sent = 0
     attempted = 0
+    started = time.monotonic()
     try:
-        for profile in pending.iterator():
-            try:
-                if send_update_email_to_user(update, profile.user, delivery=delivery):
-                    sent += 1
-                attempted += 1
-            except Exception:
-                logger.exception('Update email failed for user %s', profile.user_id)
-                attempted += 1
-        delivery.recipient_count = attempted
+        with ThreadPoolExecutor(max_workers=connections, thread_name_prefix='update-email') as executor:
+            for batch in _chunks(pending.iterator(chunk_size=batch_size), batch_size):
+                items = []
+                for profile in batch:
+                    language = 'nl' if (profile.language or 'en').lower().startswith('nl') else 'en'
+                    if language not in prepared:
+                        prepared[language] = PreparedUpdateEmail.render(update, language)
+                    items.append((profile.user, language, uuid.uuid4()))
+                results = list(executor.map(send, items))
+                UpdateEmailRecipient.objects.bulk_create(
+                    [
+                        UpdateEmailRecipient(
+                            delivery=delivery, user=user, email=user.email, tracking_token=tracking_token,
+                        )
+                        for (user, _language, tracking_token), ok in zip(items, results) if ok
+                    ],
+                    ignore_conflicts=True,
+                )
+                sent += sum(results)
+                attempted += len(items)
+                delivery.recipient_count = attempted
+                delivery.save(update_fields=['recipient_count'])
         delivery.status = UpdateEmailDelivery.STATUS_COMPLETED
         delivery.save(update_fields=['recipient_count', 'status'])
     except Exception:
@@ -291,12 +435,19 @@ def send_update_email_broadcast(update: Update, sent_by, *, delivery: UpdateEmai
         delivery.status = UpdateEmailDelivery.STATUS_FAILED
         delivery.save(update_fields=['recipient_count', 'status'])
         raise
+    finally:
+        pool.close()
 
+    elapsed = time.monotonic() - started
+    logger.info(
+        'Update %s broadcast: %s/%s sent in %.1fs (%.1f/s)',
+        update.pk, sent, attempted, elapsed, sent / elapsed if elapsed else 0.0,
+    )
     return delivery
 
 
 def start_update_email_broadcast_async(update: Update, sent_by) -> bool:
-    """Start a background thread so admin HTTP requests do not time out."""
+    """Queue the broadcast as a background job so admin HTTP requests do not time out."""
     if is_broadcast_in_progress(update):
         return False
 
@@ -311,16 +462,7 @@ def start_update_email_broadcast_async(update: Update, sent_by) -> bool:
         recipient_count=0,
         status=UpdateEmailDelivery.STATUS_SENDING,
     )
-
-    def _run():
-        try:
-            send_update_email_broadcast(update, sent_by, delivery=delivery)
-        except Exception:
-            logger.exception('Background update email broadcast failed for update %s', update.pk)
-        finally:
-            connection.close()
-
-    threading.Thread(target=_run, daemon=True).start()
+    enqueue('update_email_broadcast', {'delivery_id': delivery.pk})
     return True
 
 
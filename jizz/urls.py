@@ -9,14 +9,14 @@ from rest_framework_simplejwt import views as jwt_views
 from jizz.jwt_views import EmailOrUsernameTokenObtainPairView
 
 from jizz.views import CountryDetailView, CountryViewSet, SpeciesListView, SpeciesDetailView, SpeciesCoverView, GameListView, \
-    GameDetailView, GameDetailWithAnswersByPlayerTokenView, QuestionDetailView, QuestionMediaReadyView, QuestionNextMediaView, PlayerCreateView, PlayerView, PlayerLinkView, AnswerView, AnswerDetail, \
+    GameDetailView, GameStateView, GameHighscoreView, GameHistoryView, GameDetailWithAnswersByPlayerTokenView, QuestionDetailView, QuestionMediaReadyView, QuestionNextMediaView, PlayerCreateView, PlayerView, PlayerLinkView, AnswerView, AnswerDetail, \
     PlayerScoreListView, \
     PlayerStatsView, FeedbackListView, QuestionView, \
     ReactionView, \
     FamilyListView, OrderListView, LanguageListView, RegisterView, ProfileView, \
     PasswordResetRequestView, PasswordResetConfirmView, OAuthCompleteView, UserGamesView, UserGameDetailView, \
     MediaListView, MediaReviewSpeciesListView, ReviewMediaView, FirstAssertionReviewView, FlagMediaView, SpeciesReviewStatsView, GoogleLoginView, AppleLoginView, \
-    PageListView, PageDetailView
+    PageListView, PageDetailView, JobStatusView
 from jizz.data_views import (
     data_country_challenge_leaderboard_api_view,
     data_country_challenge_leaderboard_view,
@@ -34,6 +34,8 @@ from jizz.update_views import (
 )
 from jizz.analytics_views import (
     UsageEventCreateView,
+    staff_cache_api_view,
+    staff_request_profiles_api_view,
     staff_usage_api_view,
     staff_usage_view,
 )
@@ -246,6 +248,8 @@ urlpatterns = [
     path('staff/quiz-mistakes/pairs/', staff_quiz_mistakes_redirect, {'subpath': 'pairs'}, name='quiz-mistake-pairs'),
     path('staff/usage/', staff_usage_view, name='staff-usage'),
     path('staff/usage/api/', staff_usage_api_view, name='staff-usage-api'),
+    path('staff/request-profiles/api/', staff_request_profiles_api_view, name='staff-request-profiles-api'),
+    path('staff/cache/api/', staff_cache_api_view, name='staff-cache-api'),
     re_path(r"^country/(?P<pk>\w+)/$", CountryDetailView.as_view(), name="country-detail"),
     re_path(r"^country/(?P<pk>\w+)/species$", CountryDetailView.as_view(), name="country-detail"),
 
@@ -286,6 +290,9 @@ urlpatterns = [
         name="game-detail-with-answers",
     ),
     re_path(r"^api/games/(?P<token>[\w-]+)/$", GameDetailView.as_view(), name="game-detail"),
+    re_path(r"^api/games/(?P<token>[\w-]+)/state/$", GameStateView.as_view(), name="game-state"),
+    re_path(r"^api/games/(?P<token>[\w-]+)/highscore/$", GameHighscoreView.as_view(), name="game-highscore"),
+    re_path(r"^api/games/(?P<token>[\w-]+)/history/$", GameHistoryView.as_view(), name="game-history"),
     re_path(r"^api/species/$", SpeciesListView.as_view(), name="species-list"),
 
     re_path(r"^api/families/$", FamilyListView.as_view(), name="family-list"),
@@ -312,6 +319,7 @@ urlpatterns = [
 
     re_path(r"^api/feedback/$", FeedbackListView.as_view(), name="feedback"),
     path('api/app-version/', AppVersionView.as_view(), name='app-version'),
+    path('api/jobs/<uuid:job_id>/', JobStatusView.as_view(), name='job-status'),
     path('api/practice/trouble-spots/', TroubleSpotsView.as_view(), name='practice-trouble-spots'),
     path(
         'api/practice/confusion-pair/start/',
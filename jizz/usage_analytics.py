@@ -5,7 +5,6 @@ from datetime import date, datetime, timedelta
 from typing import Any
 
 from django.db.models import Count
-from django.db.models.functions import TruncDay
 from django.utils import timezone
 
 from jizz.api_event_labels import resolve_websocket_event_label
@@ -103,7 +102,7 @@ def normalize_path(value: str | None) -> str:
     return path[:500]
 
 
-def record_usage_event(
+def build_usage_event(
     request,
     *,
     path: str,
@@ -113,13 +112,14 @@ def record_usage_event(
     country_code: str | None = None,
     metadata: dict | None = None,
 ) -> UsageEvent:
+    """Unsaved event for a request (see ``jizz.usage_event_buffer`` for batched writes)."""
     user_agent = (request.META.get('HTTP_USER_AGENT') or '')[:2000]
     device_type = parse_device_type(user_agent)
     user = request.user if getattr(request, 'user', None) and request.user.is_authenticated else None
     merged_metadata = dict(metadata or {})
     merged_metadata['proxy'] = request_debug_meta(request)
 
-    return UsageEvent.objects.create(
+    return UsageEvent(
         event_type=normalize_event_type(event_type),
         path=normalize_path(path) if event_type in ('page_view', 'feature') else path[:500],
         platform=normalize_platform(platform or infer_platform_from_request(request)),
@@ -133,6 +133,12 @@ def record_usage_event(
     )
 
 
+def record_usage_event(request, **kwargs) -> UsageEvent:
+    event = build_usage_event(request, **kwargs)
+    event.save()
+    return event
+
+
 def _scope_header(scope, name: str) -> str:
     wanted = name.lower().encode('latin1')
     for key, value in scope.get('headers') or []:
@@ -159,7 +165,7 @@ def scope_debug_meta(scope) -> dict[str, str]:
     }
 
 
-def record_websocket_usage_event(
+def build_websocket_usage_event(
     scope,
     *,
     action: str,
@@ -176,7 +182,7 @@ def record_websocket_usage_event(
 
     ws_metadata = {'action': action, **(metadata or {}), 'proxy': scope_debug_meta(scope)}
 
-    return UsageEvent.objects.create(
+    return UsageEvent(
         event_type='websocket',
         path=label[:500],
         platform=normalize_platform(infer_platform_from_user_agent(user_agent)),
@@ -190,6 +196,13 @@ def record_websocket_usage_event(
     )
 
 
+def record_websocket_usage_event(scope, **kwargs) -> UsageEvent | None:
+    event = build_websocket_usage_event(scope, **kwargs)
+    if event is not None:
+        event.save()
+    return event
+
+
 def default_date_range() -> tuple[date, date]:
     end = timezone.localdate()
     return end - timedelta(days=29), end
@@ -224,46 +237,74 @@ def _filtered_queryset(
 ):
     start_dt = timezone.make_aware(datetime.combine(start, datetime.min.time()))
     end_dt = timezone.make_aware(datetime.combine(end, datetime.max.time()))
-    qs = UsageEvent.objects.filter(created_at__gte=start_dt, created_at__lte=end_dt)
+    qs = UsageEvent.objects.filter(created_at__gte=start_dt, created_at__lte=end_dt).filter(
+        **usage_dimension_filters(
+            platform=platform,
+            device_type=device_type,
+            country_code=country_code,
+            event_type=event_type,
+        )
+    )
+    if ip_address:
+        qs = qs.filter(ip_address=ip_address.strip())
+    return qs
 
+
+def usage_dimension_filters(
+    *,
+    platform: str | None = None,
+    device_type: str | None = None,
+    country_code: str | None = None,
+    event_type: str | None = None,
+) -> dict[str, str]:
+    """Valid dashboard filters as lookups shared by raw events and rollup tables."""
+    filters = {}
     if platform in _PLATFORM_CHOICES:
-        qs = qs.filter(platform=platform)
+        filters['platform'] = platform
     if device_type in _DEVICE_CHOICES:
-        qs = qs.filter(device_type=device_type)
+        filters['device_type'] = device_type
     if country_code and _COUNTRY_RE.match(country_code.upper()):
-        qs = qs.filter(country_code=country_code.upper())
+        filters['country_code'] = country_code.upper()
     if event_type in _EVENT_TYPE_CHOICES:
-        qs = qs.filter(event_type=event_type)
-    if ip_address:
-        qs = qs.filter(ip_address=ip_address.strip())
-    return qs
+        filters['event_type'] = event_type
+    return filters
 
 
 def usage_by_ip_country(qs, *, limit: int = 50, max_api_lookups: int = 60) -> list[dict[str, Any]]:
     """Aggregate events by GeoIP country code (same lookup path as Top IP addresses)."""
+    ip_counts = {
+        str(row['ip_address']).strip(): row['events']
+        for row in qs.exclude(ip_address__isnull=True)
+        .values('ip_address')
+        .annotate(events=Count('id'))
+    }
+    return usage_by_ip_country_counts(ip_counts, limit=limit, max_api_lookups=max_api_lookups)
+
+
+def usage_by_ip_country_counts(
+    ip_counts: dict[str, int],
+    *,
+    limit: int = 50,
+    max_api_lookups: int = 60,
+) -> list[dict[str, Any]]:
+    """``usage_by_ip_country`` for precomputed events-per-IP (rollups + recent raw rows)."""
     from collections import Counter
 
     from jizz.ip_geo import lookup_ip_locations, mmdb_available
 
     counter: Counter[str] = Counter()
-    ip_rows = list(
-        qs.exclude(ip_address__isnull=True)
-        .values('ip_address')
-        .annotate(events=Count('id'))
-        .order_by('-events')
-    )
+    ip_rows = sorted(ip_counts.items(), key=lambda item: -item[1])
     live_cap = None if mmdb_available() else max_api_lookups
     locations = lookup_ip_locations(
-        [str(row['ip_address']).strip() for row in ip_rows],
+        [str(ip).strip() for ip, _events in ip_rows],
         max_live_lookups=live_cap,
     )
 
-    for row in ip_rows:
-        ip = str(row['ip_address']).strip()
-        location = locations.get(ip, {})
+    for ip, events in ip_rows:
+        location = locations.get(str(ip).strip(), {})
         code = (location.get('country_code') or '').upper()
         if code:
-            counter[code] += row['events']
+            counter[code] += events
 
     return [
         {'country_code': code, 'events': count}
@@ -271,6 +312,14 @@ def usage_by_ip_country(qs, *, limit: int = 50, max_api_lookups: int = 60) -> li
     ]
 
 
+def _ranked(counter, key: str) -> list[dict[str, Any]]:
+    """Counter -> rows ordered like ``.order_by('-events', key)``."""
+    return [
+        {key: value, 'events': events}
+        for value, events in sorted(counter.items(), key=lambda item: (-item[1], item[0]))
+    ]
+
+
 def usage_stats_payload(
     start: date,
     end: date,
@@ -281,54 +330,31 @@ def usage_stats_payload(
     event_type: str | None = None,
     ip_address: str | None = None,
 ) -> dict[str, Any]:
+    from jizz.usage_rollups import collect_ip_counts, collect_usage_totals
+
     start, end = normalize_range(start, end)
-    qs = _filtered_queryset(
-        start,
-        end,
+    filters = usage_dimension_filters(
         platform=platform,
         device_type=device_type,
         country_code=country_code,
         event_type=event_type,
-        ip_address=ip_address,
     )
+    ip_address = (ip_address or '').strip() or None
+    # Closed periods come from rollup tables; only events after the last rollup are scanned.
+    totals = collect_usage_totals(start, end, filters, ip_address=ip_address)
 
-    daily = (
-        qs.annotate(day=TruncDay('created_at'))
-        .values('day')
-        .annotate(events=Count('id'))
-        .order_by('day')
-    )
     series = [
-        {'period': row['day'].date().isoformat(), 'events': row['events']}
-        for row in daily
+        {'period': day.isoformat(), 'events': events}
+        for day, events in sorted(totals.series.items())
     ]
-
-    top_paths = list(
-        qs.values('path')
-        .annotate(events=Count('id'))
-        .order_by('-events', 'path')[:20]
+    top_paths = _ranked(totals.paths, 'path')[:20]
+    by_platform = _ranked(totals.platforms, 'platform')
+    by_device = _ranked(totals.devices, 'device_type')
+    by_event_type = _ranked(totals.event_types, 'event_type')
+    by_country = usage_by_ip_country_counts(
+        collect_ip_counts(start, end, filters, ip_address=ip_address)
     )
 
-    by_platform = list(
-        qs.values('platform')
-        .annotate(events=Count('id'))
-        .order_by('-events', 'platform')
-    )
-    by_device = list(
-        qs.values('device_type')
-        .annotate(events=Count('id'))
-        .order_by('-events', 'device_type')
-    )
-    by_event_type = list(
-        qs.values('event_type')
-        .annotate(events=Count('id'))
-        .order_by('-events', 'event_type')
-    )
-    by_country = usage_by_ip_country(qs)
-
-    session_qs = qs.exclude(session_key='').values('session_key').distinct()
-    unique_sessions = session_qs.count()
-
     country_map = {row['country_code']: row['events'] for row in by_country}
 
     from jizz.games_played_stats import games_played_map_style
@@ -340,8 +366,8 @@ def usage_stats_payload(
         'device_type': device_type or '',
         'country_code': (country_code or '').upper(),
         'event_type': event_type or '',
-        'total_events': qs.count(),
-        'unique_sessions': unique_sessions,
+        'total_events': totals.total_events,
+        'unique_sessions': totals.unique_sessions,
         'series': series,
         'top_paths': top_paths,
         'by_platform': by_platform,
@@ -353,13 +379,34 @@ def usage_stats_payload(
     }
 
 
-def usage_top_ips(qs, *, limit: int = 15) -> list[dict[str, Any]]:
+def usage_top_ips(
+    start: date,
+    end: date,
+    *,
+    platform: str | None = None,
+    device_type: str | None = None,
+    country_code: str | None = None,
+    event_type: str | None = None,
+    ip_address: str | None = None,
+    limit: int = 15,
+) -> list[dict[str, Any]]:
     from jizz.ip_geo import enrich_ip_rows
+    from jizz.usage_rollups import collect_ip_counts
 
-    rows = list(
-        qs.exclude(ip_address__isnull=True)
-        .values('ip_address')
-        .annotate(events=Count('id'))
-        .order_by('-events', 'ip_address')[:limit]
+    start, end = normalize_range(start, end)
+    ip_counts = collect_ip_counts(
+        start,
+        end,
+        usage_dimension_filters(
+            platform=platform,
+            device_type=device_type,
+            country_code=country_code,
+            event_type=event_type,
+        ),
+        ip_address=(ip_address or '').strip() or None,
     )
+    rows = [
+        {'ip_address': ip, 'events': events}
+        for ip, events in sorted(ip_counts.items(), key=lambda item: (-item[1], str(item[0])))[:limit]
+    ]
     return enrich_ip_rows(rows)
@@ -0,0 +1,356 @@
+"""
+Buffered, off-request ingestion of ``UsageEvent`` rows.
+
+Middleware and the quiz consumer build events and hand them to a per-process
+``UsageEventWriter``: a bounded queue drained by a background thread that writes with
+``bulk_create`` once ``USAGE_EVENTS_BATCH_SIZE`` events are waiting or
+``USAGE_EVENTS_FLUSH_SECONDS`` have passed. A full queue drops events (counted, never
+blocks a request). When a bulk insert fails or takes longer than
+``USAGE_EVENTS_SLOW_SECONDS`` the writer appends batches to a JSON-lines spool file for
+a while instead, and replays the spool once the database is healthy again (or via
+``manage.py replay_usage_event_spool``). Pending events are flushed at interpreter exit.
+
+A batch that violates a constraint is retried once without the ids of deleted users and
+otherwise dropped (live) or moved to ``<spool>.rejected`` (replay), so one bad row never
+stops the writer or the replay.
+
+With ``USAGE_EVENTS_BUFFERED = False`` (tests) events are saved immediately.
+"""
+
+from __future__ import annotations
+
+import atexit
+import json
+import logging
+import os
+import queue
+import threading
+import time
+from pathlib import Path
+
+from channels.db import database_sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DatabaseError, IntegrityError, close_old_connections, transaction
+from django.utils.dateparse import parse_datetime
+
+from jizz.models import UsageEvent
+
+logger = logging.getLogger(__name__)
+
+_SPOOL_FIELDS = (
+    'event_type',
+    'path',
+    'platform',
+    'device_type',
+    'country_code',
+    'ip_address',
+    'user_id',
+    'session_key',
+    'user_agent',
+    'metadata',
+    'created_at',
+)
+
+
+def _encode(event: UsageEvent) -> str:
+    data = {name: getattr(event, name) for name in _SPOOL_FIELDS}
+    data['created_at'] = event.created_at.isoformat()  # DjangoJSONEncoder drops microseconds
+    return json.dumps(data, cls=DjangoJSONEncoder)
+
+
+def _decode(line: str) -> UsageEvent:
+    data = json.loads(line)
+    data['created_at'] = parse_datetime(data['created_at'])
+    return UsageEvent(**data)
+
+
+def _clear_deleted_users(events: list[UsageEvent]) -> bool:
+    """Unset ``user_id`` on events whose user no longer exists; True when any changed."""
+    user_ids = {event.user_id for event in events if event.user_id is not None}
+    if not user_ids:
+        return False
+    existing = set(get_user_model().objects.filter(pk__in=user_ids).values_list('pk', flat=True))
+    changed = False
+    for event in events:
+        if event.user_id is not None and event.user_id not in existing:
+            event.user_id = None
+            changed = True
+    return changed
+
+
+class UsageEventWriter:
+    def __init__(
+        self,
+        *,
+        batch_size: int = 200,
+        flush_seconds: float = 2.0,
+        max_queue: int = 10000,
+        slow_seconds: float = 1.0,
+        backoff_seconds: float = 60.0,
+        spool_path: str | Path | None = None,
+    ):
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.slow_seconds = slow_seconds
+        self.backoff_seconds = backoff_seconds
+        self.spool_path = Path(spool_path) if spool_path else None
+        self.counters = {'queued': 0, 'dropped': 0, 'written': 0, 'spooled': 0, 'replayed': 0}
+        self._queue: queue.Queue[UsageEvent] = queue.Queue(maxsize=max_queue)
+        self._spool_until = 0.0
+        self._write_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+        self._pid = os.getpid()
+
+    # Producer side (request / consumer threads)
+
+    def enqueue(self, event: UsageEvent) -> bool:
+        """Queue without blocking; returns False (and counts a drop) when the queue is full."""
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self.counters['dropped'] += 1
+            if self.counters['dropped'] % 1000 == 1:
+                logger.warning('Usage event queue full; %s events dropped so far', self.counters['dropped'])
+            return False
+        self.counters['queued'] += 1
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='usage-event-writer', daemon=True)
+        self._thread.start()
+
+    def close(self, timeout: float = 10.0) -> None:
+        """Stop the writer thread and flush whatever is still queued."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+        self.flush()
+
+    def stats(self) -> dict[str, int]:
+        return {**self.counters, 'pending': self._queue.qsize()}
+
+    # Writer side
+
+    def _next_batch(self) -> list[UsageEvent]:
+        try:
+            batch = [self._queue.get(timeout=self.flush_seconds)]
+        except queue.Empty:
+            return []
+        deadline = time.monotonic() + self.flush_seconds
+        while len(batch) < self.batch_size and not self._stop.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _drain(self) -> list[UsageEvent]:
+        batch = []
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            batch = self._next_batch()
+            if batch:
+                # Long-lived thread: drop connections the server closed meanwhile.
+                close_old_connections()
+                self.write(batch)
+        close_old_connections()
+
+    def flush(self) -> int:
+        """Write everything queued so far from the calling thread; returns events handled."""
+        handled = 0
+        while batch := self._drain():
+            self.write(batch)
+            handled += len(batch)
+        return handled
+
+    def write(self, batch: list[UsageEvent]) -> None:
+        with self._write_lock:
+            if time.monotonic() < self._spool_until:
+                self._spool(batch)
+                return
+            started = time.monotonic()
+            try:
+                self._insert(batch)
+            except IntegrityError:
+                # A bad row, not an outage: drop the batch and keep writing.
+                logger.warning('Dropping %s usage events that violate a constraint', len(batch), exc_info=True)
+                self.counters['dropped'] += len(batch)
+                return
+            except DatabaseError:
+                logger.warning('Usage event insert failed; spooling %s events', len(batch), exc_info=True)
+                self._spool(batch)
+                self._spool_until = time.monotonic() + self.backoff_seconds
+                return
+            self.counters['written'] += len(batch)
+            elapsed = time.monotonic() - started
+            if elapsed > self.slow_seconds:
+                logger.warning('Usage event insert took %.2fs; spooling for %ss', elapsed, self.backoff_seconds)
+                self._spool_until = time.monotonic() + self.backoff_seconds
+            elif self.spool_path is not None and (self.spool_path.exists() or self._replay_path.exists()):
+                self._replay_locked()
+
+    def _insert(self, events: list[UsageEvent], *, atomic: bool = False) -> None:
+        """``bulk_create``; on an IntegrityError once more without the ids of deleted users."""
+        try:
+            self._bulk_create(events, atomic=atomic)
+        except IntegrityError:
+            if not _clear_deleted_users(events):
+                raise
+            self._bulk_create(events, atomic=atomic)
+
+    @staticmethod
+    def _bulk_create(events: list[UsageEvent], *, atomic: bool) -> None:
+        if not atomic:
+            UsageEvent.objects.bulk_create(events)
+            return
+        # Own transaction (savepoint when nested): deferred FK checks fail here, per chunk.
+        with transaction.atomic():
+            UsageEvent.objects.bulk_create(events)
+
+    # Spool file
+
+    def _spool(self, batch: list[UsageEvent]) -> None:
+        if self.spool_path is None:
+            self.counters['dropped'] += len(batch)
+            return
+        try:
+            self.spool_path.parent.mkdir(parents=True, exist_ok=True)
+            with self.spool_path.open('a', encoding='utf-8') as spool:
+                spool.write(''.join(_encode(event) + '\n' for event in batch))
+        except OSError:
+            logger.exception('Could not spool %s usage events to %s', len(batch), self.spool_path)
+            self.counters['dropped'] += len(batch)
+            return
+        self.counters['spooled'] += len(batch)
+
+    @property
+    def _replay_path(self) -> Path:
+        return self.spool_path.with_name(self.spool_path.name + '.replay')
+
+    @property
+    def _rejected_path(self) -> Path:
+        return self.spool_path.with_name(self.spool_path.name + '.rejected')
+
+    def replay_spool(self) -> int:
+        """Insert spooled events in ``batch_size`` chunks; returns how many were written."""
+        with self._write_lock:
+            return self._replay_locked()
+
+    def _replay_locked(self) -> int:
+        """
+        Replay ``<spool>.replay`` chunk by chunk, trimming the file after each one, then
+        move the spool aside and replay that too. Chunks that violate a constraint go to
+        ``<spool>.rejected``; any other database error stops here and keeps the rest.
+        """
+        if self.spool_path is None:
+            return 0
+        replaying = self._replay_path
+        replayed = 0
+        while True:
+            if not replaying.exists():
+                if not self.spool_path.exists():
+                    return replayed
+                # Move aside so new spooled batches don't interleave with the replay.
+                os.replace(self.spool_path, replaying)
+            with replaying.open(encoding='utf-8') as spool:
+                lines = [line if line.endswith('\n') else line + '\n' for line in spool if line.strip()]
+            while lines:
+                chunk, lines = lines[:self.batch_size], lines[self.batch_size:]
+                events, unreadable = [], []
+                for line in chunk:
+                    try:
+                        events.append(_decode(line))
+                    except (ValueError, TypeError):
+                        unreadable.append(line)
+                if unreadable:
+                    logger.warning('Rejecting %s unreadable spooled usage events', len(unreadable))
+                    self._reject(unreadable)
+                try:
+                    self._insert(events, atomic=True)
+                except IntegrityError:
+                    logger.warning('Rejecting %s spooled usage events', len(events), exc_info=True)
+                    self._reject([_encode(event) + '\n' for event in events])
+                except DatabaseError:
+                    logger.warning(
+                        'Replaying spooled usage events failed; %s left', len(chunk) + len(lines), exc_info=True
+                    )
+                    self._trim(replaying, chunk + lines)
+                    return replayed
+                else:
+                    replayed += len(events)
+                    self.counters['replayed'] += len(events)
+                self._trim(replaying, lines)
+            replaying.unlink(missing_ok=True)
+
+    @staticmethod
+    def _trim(path: Path, lines: list[str]) -> None:
+        """Rewrite ``path`` with the lines still to replay (atomically)."""
+        pending = path.with_name(path.name + '.tmp')
+        pending.write_text(''.join(lines), encoding='utf-8')
+        os.replace(pending, path)
+
+    def _reject(self, lines: list[str]) -> None:
+        self.counters['dropped'] += len(lines)
+        try:
+            with self._rejected_path.open('a', encoding='utf-8') as rejected:
+                rejected.write(''.join(lines))
+        except OSError:
+            logger.exception('Could not write %s rejected usage events to %s', len(lines), self._rejected_path)
+
+
+_writer: UsageEventWriter | None = None
+_writer_lock = threading.Lock()
+
+
+def get_usage_event_writer() -> UsageEventWriter:
+    """Process-wide writer, built from settings (rebuilt after fork)."""
+    global _writer
+    if _writer is None or _writer._pid != os.getpid():
+        with _writer_lock:
+            if _writer is None or _writer._pid != os.getpid():
+                _writer = UsageEventWriter(
+                    batch_size=settings.USAGE_EVENTS_BATCH_SIZE,
+                    flush_seconds=settings.USAGE_EVENTS_FLUSH_SECONDS,
+                    max_queue=settings.USAGE_EVENTS_MAX_QUEUE,
+                    slow_seconds=settings.USAGE_EVENTS_SLOW_SECONDS,
+                    spool_path=settings.USAGE_EVENTS_SPOOL_PATH or None,
+                )
+                atexit.register(_writer.close)
+    return _writer
+
+
+def submit_usage_event(event: UsageEvent | None) -> None:
+    """Queue an unsaved event for the background writer (or save it when unbuffered)."""
+    if event is None:
+        return
+    if not settings.USAGE_EVENTS_BUFFERED:
+        event.save()
+        return
+    writer = get_usage_event_writer()
+    writer.start()
+    writer.enqueue(event)
+
+
+async def asubmit_usage_event(event: UsageEvent | None) -> None:
+    """``submit_usage_event`` for async consumers (queueing never touches the DB)."""
+    if event is not None and not settings.USAGE_EVENTS_BUFFERED:
+        await database_sync_to_async(event.save)()
+        return
+    submit_usage_event(event)
@@ -0,0 +1,296 @@
+"""
+Hourly/daily rollups of ``UsageEvent`` for the staff usage dashboard.
+
+``manage.py rollup_usage_events`` (cron, e.g. every 10 minutes) aggregates every closed
+hour into ``UsageRollup`` rows per (path, platform, device_type, event_type,
+country_code) plus a HyperLogLog ``UsageSessionSketch`` per filter combination; once a
+day is closed its hours are folded into daily rows and per-IP ``UsageIpRollup`` counts.
+``UsageRollupState.rolled_until`` marks how far rollups reach.
+
+``collect_usage_totals`` answers dashboard queries from daily rollups for closed days,
+hourly rollups for the closed hours of the current day and raw events only after
+``rolled_until``. With ``--prune`` the command deletes raw events older than
+``USAGE_EVENTS_RETENTION_DAYS`` (never beyond fully rolled days) and hourly rollups
+older than ``HOURLY_ROLLUP_RETENTION_DAYS``.
+"""
+
+from __future__ import annotations
+
+from collections import Counter
+from dataclasses import dataclass, field
+from datetime import date, datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Count, Sum
+from django.db.models.functions import TruncDay
+from django.utils import timezone
+
+from jizz.hyperloglog import HyperLogLog
+from jizz.models import UsageEvent, UsageIpRollup, UsageRollup, UsageRollupState, UsageSessionSketch
+
+DIMENSIONS = ('platform', 'device_type', 'event_type', 'country_code')
+ROLLUP_DIMENSIONS = ('path', *DIMENSIONS)
+HOURLY_ROLLUP_RETENTION_DAYS = 14
+_PRUNE_BATCH = 10000
+
+HOUR = UsageRollup.GRANULARITY_HOUR
+DAY = UsageRollup.GRANULARITY_DAY
+
+
+def day_start(day: date) -> datetime:
+    return timezone.make_aware(datetime.combine(day, time.min))
+
+
+def _hour_floor(value: datetime) -> datetime:
+    return timezone.localtime(value).replace(minute=0, second=0, microsecond=0)
+
+
+def rolled_until() -> datetime | None:
+    return UsageRollupState.objects.filter(pk=1).values_list('rolled_until', flat=True).first()
+
+
+def _raw(start: datetime, end: datetime):
+    return UsageEvent.objects.filter(created_at__gte=start, created_at__lt=end)
+
+
+def _session_sketches(raw) -> dict[tuple, HyperLogLog]:
+    sketches: dict[tuple, HyperLogLog] = {}
+    for *dims, session_key in (
+        raw.exclude(session_key='').values_list(*DIMENSIONS, 'session_key').distinct().order_by()
+    ):
+        sketches.setdefault(tuple(dims), HyperLogLog()).add(session_key)
+    return sketches
+
+
+def _replace_period(granularity: str, period_start: datetime, counts, sketches) -> None:
+    UsageRollup.objects.filter(granularity=granularity, period_start=period_start).delete()
+    UsageSessionSketch.objects.filter(granularity=granularity, period_start=period_start).delete()
+    UsageRollup.objects.bulk_create([
+        UsageRollup(
+            granularity=granularity,
+            period_start=period_start,
+            events=row['n'],
+            **{name: row[name] for name in ROLLUP_DIMENSIONS},
+        )
+        for row in counts
+    ])
+    UsageSessionSketch.objects.bulk_create([
+        UsageSessionSketch(
+            granularity=granularity,
+            period_start=period_start,
+            sketch=sketch.to_bytes(),
+            **dict(zip(DIMENSIONS, dims)),
+        )
+        for dims, sketch in sketches.items()
+    ])
+
+
+@transaction.atomic
+def rollup_hour(hour_start: datetime) -> None:
+    raw = _raw(hour_start, hour_start + timedelta(hours=1))
+    counts = raw.values(*ROLLUP_DIMENSIONS).annotate(n=Count('id')).order_by()
+    _replace_period(HOUR, hour_start, counts, _session_sketches(raw))
+
+
+@transaction.atomic
+def rollup_day(day: date) -> None:
+    """Fold a closed day's hourly rows into daily rows; per-IP counts come from raw events."""
+    start, end = day_start(day), day_start(day + timedelta(days=1))
+    hourly = UsageRollup.objects.filter(granularity=HOUR, period_start__gte=start, period_start__lt=end)
+    counts = hourly.values(*ROLLUP_DIMENSIONS).annotate(n=Sum('events')).order_by()
+
+    sketches: dict[tuple, HyperLogLog] = {}
+    for *dims, data in UsageSessionSketch.objects.filter(
+        granularity=HOUR, period_start__gte=start, period_start__lt=end
+    ).values_list(*DIMENSIONS, 'sketch'):
+        sketches.setdefault(tuple(dims), HyperLogLog()).merge(HyperLogLog.from_bytes(data))
+    _replace_period(DAY, start, counts, sketches)
+
+    UsageIpRollup.objects.filter(day=day).delete()
+    UsageIpRollup.objects.bulk_create([
+        UsageIpRollup(day=day, **row)
+        for row in _raw(start, end)
+        .exclude(ip_address__isnull=True)
+        .values('ip_address', *DIMENSIONS)
+        .annotate(events=Count('id'))
+        .order_by()
+    ])
+
+
+def raw_retention_cutoff(retention_days: int, now: datetime | None = None) -> datetime:
+    return day_start(timezone.localdate(now or timezone.now()) - timedelta(days=retention_days))
+
+
+def update_usage_rollups(
+    *,
+    now: datetime | None = None,
+    since: date | None = None,
+    lookback_hours: int = 2,
+    retention_days: int | None = None,
+) -> dict[str, int]:
+    """
+    Roll up every closed hour since the last run (re-doing ``lookback_hours`` for late
+    buffered writes, or everything from ``since``) and close finished days.
+    """
+    target = _hour_floor(now or timezone.now())
+    state = UsageRollupState.load()
+    if since is not None:
+        begin = day_start(since)
+    elif state.rolled_until is not None:
+        begin = state.rolled_until - timedelta(hours=lookback_hours)
+    else:
+        first = UsageEvent.objects.order_by('created_at').values_list('created_at', flat=True).first()
+        begin = first or target
+    if retention_days is not None:
+        # Older raw events may already be pruned; recomputing would wipe good rollups.
+        begin = max(begin, raw_retention_cutoff(retention_days, now))
+
+    hour = _hour_floor(begin)
+    touched_days: set[date] = set()
+    hours = 0
+    while hour < target:
+        rollup_hour(hour)
+        touched_days.add(hour.date())
+        hour += timedelta(hours=1)
+        hours += 1
+
+    closed_days = sorted(day for day in touched_days if day_start(day + timedelta(days=1)) <= target)
+    for day in closed_days:
+        rollup_day(day)
+
+    state.rolled_until = target
+    state.save()
+    return {'hours': hours, 'days': len(closed_days)}
+
+
+def _delete_in_batches(qs) -> int:
+    deleted = 0
+    while True:
+        ids = list(qs.values_list('pk', flat=True)[:_PRUNE_BATCH])
+        if not ids:
+            return deleted
+        deleted += qs.model.objects.filter(pk__in=ids).delete()[0]
+
+
+def prune_usage_events(retention_days: int, *, now: datetime | None = None) -> dict[str, int]:
+    """Delete raw events (only inside fully rolled days) and old hourly rollups."""
+    watermark = rolled_until()
+    if watermark is None:
+        return {'events': 0, 'hourly_rollups': 0}
+    cutoff = min(raw_retention_cutoff(retention_days, now), day_start(timezone.localtime(watermark).date()))
+    events = _delete_in_batches(UsageEvent.objects.filter(created_at__lt=cutoff))
+
+    hourly_cutoff = min(raw_retention_cutoff(HOURLY_ROLLUP_RETENTION_DAYS, now), cutoff)
+    hourly = UsageRollup.objects.filter(granularity=HOUR, period_start__lt=hourly_cutoff).delete()[0]
+    UsageSessionSketch.objects.filter(granularity=HOUR, period_start__lt=hourly_cutoff).delete()
+    return {'events': events, 'hourly_rollups': hourly}
+
+
+@dataclass
+class UsageTotals:
+    series: Counter = field(default_factory=Counter)
+    paths: Counter = field(default_factory=Counter)
+    platforms: Counter = field(default_factory=Counter)
+    devices: Counter = field(default_factory=Counter)
+    event_types: Counter = field(default_factory=Counter)
+    unique_sessions: int = 0
+
+    @property
+    def total_events(self) -> int:
+        return sum(self.series.values())
+
+    def add(self, qs, measure, period_field: str) -> None:
+        for day, events in (
+            qs.annotate(day=TruncDay(period_field)).values('day').annotate(n=measure)
+            .order_by().values_list('day', 'n')
+        ):
+            self.series[timezone.localtime(day).date()] += events
+        for name, counter in (
+            ('path', self.paths),
+            ('platform', self.platforms),
+            ('device_type', self.devices),
+            ('event_type', self.event_types),
+        ):
+            for value, events in qs.values(name).annotate(n=measure).order_by().values_list(name, 'n'):
+                counter[value] += events
+
+
+@dataclass
+class _Segments:
+    """[start, day_cut): daily rollups; [day_cut, rolled_end): hourly; [rolled_end, end): raw."""
+
+    start: datetime
+    day_cut: datetime
+    rolled_end: datetime
+    end: datetime
+
+
+def _segments(start: date, end: date, *, use_rollups: bool) -> _Segments:
+    start_dt, end_dt = day_start(start), day_start(end + timedelta(days=1))
+    watermark = rolled_until() if use_rollups else None
+    rolled_end = max(start_dt, min(watermark, end_dt)) if watermark else start_dt
+    day_cut = max(start_dt, day_start(timezone.localtime(rolled_end).date()))
+    return _Segments(start_dt, day_cut, rolled_end, end_dt)
+
+
+def collect_usage_totals(
+    start: date,
+    end: date,
+    filters: dict,
+    *,
+    ip_address: str | None = None,
+) -> UsageTotals:
+    """Dashboard aggregates for [start, end]; an IP filter forces raw events only."""
+    seg = _segments(start, end, use_rollups=not ip_address)
+    totals = UsageTotals()
+    raw = UsageEvent.objects.filter(created_at__gte=seg.rolled_end, created_at__lt=seg.end, **filters)
+    if ip_address:
+        raw = raw.filter(ip_address=ip_address)
+
+    sketch = HyperLogLog()
+    for granularity, lo, hi in ((DAY, seg.start, seg.day_cut), (HOUR, seg.day_cut, seg.rolled_end)):
+        if lo >= hi:
+            continue
+        window = {'granularity': granularity, 'period_start__gte': lo, 'period_start__lt': hi, **filters}
+        totals.add(UsageRollup.objects.filter(**window), Sum('events'), 'period_start')
+        for data in UsageSessionSketch.objects.filter(**window).values_list('sketch', flat=True):
+            sketch.merge(HyperLogLog.from_bytes(data))
+    totals.add(raw, Count('id'), 'created_at')
+
+    sessions = raw.exclude(session_key='').values_list('session_key', flat=True).distinct().order_by()
+    if seg.rolled_end > seg.start:
+        totals.unique_sessions = sketch.update(sessions).count()
+    else:
+        totals.unique_sessions = sessions.count()
+    return totals
+
+
+def collect_ip_counts(
+    start: date,
+    end: date,
+    filters: dict,
+    *,
+    ip_address: str | None = None,
+) -> Counter:
+    """Events per client IP: daily IP rollups for closed days, raw events after that."""
+    seg = _segments(start, end, use_rollups=not ip_address)
+    counts: Counter = Counter()
+    if seg.day_cut > seg.start:
+        rows = UsageIpRollup.objects.filter(
+            day__gte=timezone.localtime(seg.start).date(),
+            day__lt=timezone.localtime(seg.day_cut).date(),
+            **filters,
+        ).values_list('ip_address').annotate(n=Sum('events')).order_by()
+        for ip, events in rows:
+            counts[ip] += events
+    raw = UsageEvent.objects.filter(
+        created_at__gte=seg.day_cut,
+        created_at__lt=seg.end,
+        ip_address__isnull=False,
+        **filters,
+    )
+    if ip_address:
+        raw = raw.filter(ip_address=ip_address)
+    for row in raw.values('ip_address').annotate(events=Count('id')).order_by():
+        counts[row['ip_address']] += row['events']
+    return counts
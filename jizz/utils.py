@@ -3,11 +3,12 @@ import re
 
 import requests
 from django.conf import settings
+from django.db import transaction
 
-from jizz.models import Species, Country, CountrySpecies, SpeciesImage, SpeciesSound, SpeciesVideo, Language, \
-    SpeciesName, TaxonomicOrder, TaxonomicFamily, TaxonomicGenus
-from jizz.services.taxonomy_texts import fetch_ebird_taxonomy, EBIRD_LOCALE_EN
-from jizz.taxonomy_parse import parse_genus_from_sci_name
+from jizz.models import Species, Country, CountrySpecies, SpeciesImage, SpeciesSound, SpeciesVideo, Language
+from jizz.playable_species_index import rebuild_playable_species_index
+from jizz.services.ebird_taxonomy_sync import TaxonomyPayloads, sync_species_names, sync_taxonomy
+from jizz.species_catalog import record_species_changes
 
 SERVER_NAME = 'api.ebird.org'
 API_VERSION = 'v2'
@@ -124,80 +125,20 @@ def download_ebird_regional_zip(url):
     return r.text
 
 
-def sync_species():
-    results = fetch_ebird_taxonomy(locale=EBIRD_LOCALE_EN, categories='species')
-    for row in results:
-        if row['category'] != 'species':
-            continue
-        order, _ = TaxonomicOrder.objects.update_or_create(
-            name_latin=row['order'],
-            defaults={'name_en': row['order'], 'name_nl': row['order']},
-        )
-        family, _ = TaxonomicFamily.objects.update_or_create(
-            name_latin=row['familySciName'],
-            defaults={
-                'name_en': row['familyComName'],
-                'name_nl': row['familyComName'],
-                'taxonomic_order': order,
-            },
-        )
-        genus = None
-        genus_name = parse_genus_from_sci_name(row['sciName'])
-        if genus_name:
-            genus, _ = TaxonomicGenus.objects.update_or_create(
-                name_latin=genus_name,
-                defaults={
-                    'name_en': genus_name,
-                    'name_nl': genus_name,
-                    'taxonomic_family': family,
-                },
-            )
-        tax_ordering = row.get('taxonOrder')
-        Species.objects.update_or_create(
-            code=row['speciesCode'],
-            defaults={
-                'name': row['comName'],
-                'name_latin': row['sciName'],
-                'taxonomic_order': order,
-                'taxonomic_family': family,
-                'taxonomic_genus': genus,
-                'tax_ordering': tax_ordering,
-            },
-        )
-
-    results_nl = fetch_ebird_taxonomy(locale='nl', categories='species')
-    for row in results_nl:
-        if row['category'] != 'species':
-            continue
-        Species.objects.update_or_create(
-            code=row['speciesCode'],
-            defaults={
-                'name_nl': row['comName'],
-            },
-        )
+def sync_species(payloads=None, dry_run=False):
+    report = sync_taxonomy(payloads or TaxonomyPayloads(), dry_run=dry_run)
+    for table, changes in report.items():
+        print(f'{table}: {changes}')
     print("Done syncing species")
+    return report
 
 
-def sync_names():
-
-    for lang in Language.objects.all():
-        print(f'getting names for {lang.name}')
-        data = requests.get(
-            f'https://{SERVER_NAME}/{API_VERSION}/ref/taxonomy/ebird?locale={lang.code}&fmt=json',
-            headers={'x-ebirdapitoken': settings.EBIRD_API_TOKEN}
-        )
-        results = data.json()
-        for row in results:
-            species = Species.objects.filter(code=row['speciesCode']).first()
-            if species:
-                SpeciesName.objects.update_or_create(
-                    language=lang,
-                    species=species,
-                    defaults={
-                        'name': row['comName'],
-                    }
-                )
+def sync_names(payloads=None, dry_run=False):
+    report = sync_species_names(payloads or TaxonomyPayloads(), dry_run=dry_run)
+    for code, changes in report.items():
+        print(f'names {code}: {changes}')
     print("Done syncing names")
+    return report
 
 
 def sync_languages():
@@ -224,11 +165,16 @@ def sync_regions(country, code):
     print('Got data')
     codes = data.json()
 
-    print('Going loopy')
-    ids = Species.objects.filter(code__in=codes).values_list('id', flat=True)
+    existing = set(CountrySpecies.objects.filter(country=country).values_list('species_id', flat=True))
+    ids = [id for id in Species.objects.filter(code__in=codes).values_list('id', flat=True) if id not in existing]
     specs = [CountrySpecies(country_id=country.code, species_id=id) for id in ids]
     print('Got some work to do ', len(specs))
-    CountrySpecies.objects.bulk_create(specs, ignore_conflicts=True)
+    if not specs:
+        return 0
+    CountrySpecies.objects.bulk_create(specs, batch_size=1000, ignore_conflicts=True)
+    rebuild_playable_species_index(country.code)
+    record_species_changes(ids)
+    return len(specs)
 
 
 def sync_country(code='ZNZ'):
@@ -245,12 +191,20 @@ def sync_country(code='ZNZ'):
 
 def sync_world():
     country = Country.objects.get(code='world')
-    for spec in Species.objects.all():
-        CountrySpecies.objects.update_or_create(
-            country=country,
-            species=spec,
-            defaults={'status': 'native'}
-        )
+    current = {cs.species_id: cs for cs in CountrySpecies.objects.filter(country=country).only('pk', 'species_id', 'status')}
+    to_create = [
+        CountrySpecies(country=country, species_id=id, status='native')
+        for id in Species.objects.values_list('id', flat=True) if id not in current
+    ]
+    to_update = [cs for cs in current.values() if cs.status != 'native']
+    for cs in to_update:
+        cs.status = 'native'
+    with transaction.atomic():
+        CountrySpecies.objects.bulk_create(to_create, batch_size=1000)
+        CountrySpecies.objects.bulk_update(to_update, ['status'], batch_size=1000)
+    if to_create or to_update:
+        rebuild_playable_species_index(country.code)
+        record_species_changes(cs.species_id for cs in to_create + to_update)
 
 
 def get_media(id=1, media='photo'):
@@ -1,9 +1,7 @@
 from django.contrib.auth import get_user_model
 from django.db import transaction
-from django.db.models import Case, When, Value, Prefetch, F, Q
+from django.db.models import Case, When, Value, Prefetch, F
 from django.db.models.aggregates import Count
-from django.db.models.functions import RowNumber
-from django.db.models.expressions import Window
 from django.http import Http404, HttpResponse
 from django.views.generic import DetailView
 from django_filters.rest_framework import DjangoFilterBackend
@@ -33,7 +31,7 @@ import logging
 logger = logging.getLogger(__name__)
 from social_django.views import complete as social_complete
 from rest_framework import status
-from rest_framework.exceptions import NotFound, APIException
+from rest_framework.exceptions import NotFound, APIException, ValidationError
 from rest_framework import generics
 from django.shortcuts import get_object_or_404
 from .models import Game, Language, Page
@@ -69,8 +67,13 @@ from jizz.models import (
     DailyChallengeInvite,
     DailyChallengeRound,
     DeviceToken,
+    Job,
 )
-from media.models import Media, MediaReview, FlagMedia
+from jizz.game_state import build_game_state, game_highscore, game_history, payload_etag
+from jizz.job_queue import job_status_payload
+from jizz.leaderboard import LIST_FILTER_PARAMS, RankedScores
+from jizz.species_catalog import catalog_delta, get_catalog
+from media.models import Media, MediaReview, MediaReviewSummary, FlagMedia
 from jizz.serializers import (
     AnswerSerializer,
     CountrySerializer,
@@ -159,7 +162,42 @@ class CountryViewSet(viewsets.ModelViewSet):
     )
 
 
+def _accepted_encodings(request):
+    header = request.META.get('HTTP_ACCEPT_ENCODING', '')
+    return {part.split(';')[0].strip().lower() for part in header.split(',')}
+
+
+def _catalog_response(request, blob):
+    """Serve a prebuilt catalog blob: 304 on a matching ETag, else the precompressed body."""
+    body, encoding = blob.body, None
+    encodings = _accepted_encodings(request)
+    if blob.brotli_body is not None and 'br' in encodings:
+        body, encoding = blob.brotli_body, 'br'
+    elif 'gzip' in encodings:
+        body, encoding = blob.gzip_body, 'gzip'
+    etag = f'W/{blob.etag}' if encoding else blob.etag
+
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    client_tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    if blob.etag in client_tags or '*' in client_tags:
+        response = HttpResponse(status=304)
+    else:
+        response = HttpResponse(body, content_type='application/json')
+        if encoding:
+            response['Content-Encoding'] = encoding
+    response['ETag'] = etag
+    response['X-Catalog-Version'] = str(blob.version)
+    response['Vary'] = 'Accept-Encoding'
+    return response
+
+
 class SpeciesListView(ListAPIView):
+    """
+    All species for the combobox, served from the prebuilt catalog in jizz.species_catalog
+    (conditional GET, precompressed). ``?since=<version>`` returns only the changes since
+    the X-Catalog-Version a client already has (merge them by id), or ``full: true`` with
+    every species when that version is no longer covered.
+    """
     serializer_class = SpeciesListSerializer
     queryset = Species.objects.all()
     filter_backends = [DjangoFilterBackend]
@@ -168,6 +206,21 @@ class SpeciesListView(ListAPIView):
     authentication_classes = []  # No authentication required for public species data
     pagination_class = None  # Disable pagination - we need all species for the combobox
 
+    def list(self, request, *args, **kwargs):
+        language = request.query_params.get('language') or None
+        country = request.query_params.get('countryspecies__country') or None
+        if country and not Country.objects.filter(pk=country).exists():
+            raise ValidationError({'countryspecies__country': 'Select a valid choice.'})
+        since = request.query_params.get('since')
+        if since is not None:
+            try:
+                since = int(since)
+            except ValueError:
+                raise ValidationError({'since': 'Expected a catalog version.'})
+            delta = catalog_delta(language, country, since)
+            return Response(delta, headers={'X-Catalog-Version': str(delta['version'])})
+        return _catalog_response(request, get_catalog(language, country))
+
 
 class SpeciesDetailView(RetrieveAPIView):
     serializer_class = SpeciesDetailSerializer
@@ -378,39 +431,20 @@ class MediaListView(ListAPIView):
                 pass
 
         if level == 'thorough':
-            # All media (including reviewed) with review counts annotated
-            queryset = queryset.annotate(
-                _approved_count=Count('reviews', filter=Q(reviews__review_type='approved')),
-                _rejected_count=Count('reviews', filter=Q(reviews__review_type='rejected')),
-                _not_sure_count=Count('reviews', filter=Q(reviews__review_type='not_sure')),
-            )
+            # All media (including reviewed); review counts are columns on Media
             return queryset.order_by('species__id', '-created')
         else:
             # fast or full: only unreviewed media
-            reviewed_media_ids = MediaReview.objects.values_list('media_id', flat=True).distinct()
-            queryset = queryset.exclude(id__in=reviewed_media_ids)
+            queryset = queryset.filter(review_status__isnull=True)
 
             if level == 'fast':
-                # Restrict to species that have < 10 approved media (and at least one unreviewed)
-                unreviewed_species_ids = list(
-                    queryset.values_list('species_id', flat=True).distinct()
+                # Restrict to species that have < 10 approved media
+                queryset = queryset.filter(
+                    species_id__in=MediaReviewSummary.objects.filter(
+                        media_type=media_type,
+                        approved__lt=10,
+                    ).values('species_id')
                 )
-                if not unreviewed_species_ids:
-                    return Media.objects.none().order_by('species__id', '-created')
-                species_under_10 = list(
-                    Species.objects.filter(id__in=unreviewed_species_ids)
-                    .filter(media__type=media_type)
-                    .annotate(
-                        approved_count=Count(
-                            'media',
-                            filter=Q(media__type=media_type, media__reviews__review_type='approved'),
-                            distinct=True,
-                        ),
-                    )
-                    .filter(approved_count__lt=10)
-                    .values_list('id', flat=True)
-                )
-                queryset = queryset.filter(species_id__in=species_under_10)
             # full: no extra filter
 
         return queryset.order_by('species__id', '-created')
@@ -452,58 +486,36 @@ class SpeciesReviewStatsView(APIView):
         media_type = request.query_params.get('type', 'image')
 
         qs = (
-            Species.objects
-            .filter(media__type=media_type)
-            .distinct()
-            .annotate(
-                total_media=Count('media', filter=Q(media__type=media_type), distinct=True),
-                media_with_review=Count(
-                    'media',
-                    filter=Q(media__type=media_type, media__reviews__id__isnull=False),
-                    distinct=True,
-                ),
-                approved_media=Count(
-                    'media',
-                    filter=Q(media__type=media_type, media__reviews__review_type='approved'),
-                    distinct=True,
-                ),
-                rejected_media=Count(
-                    'media',
-                    filter=Q(media__type=media_type, media__reviews__review_type='rejected'),
-                    distinct=True,
-                ),
-                not_sure_media=Count(
-                    'media',
-                    filter=Q(media__type=media_type, media__reviews__review_type='not_sure'),
-                    distinct=True,
-                ),
-            )
-            .filter(total_media__gt=0)
-            .order_by('id')
+            MediaReviewSummary.objects
+            .filter(media_type=media_type, total__gt=0)
+            .select_related('species')
+            .order_by('species_id')
         )
         if country_code:
             qs = qs.filter(
-                countryspecies__country__code=country_code.upper(),
-                countryspecies__status__in=['native', 'endemic', 'rare'],
-            ).distinct()
-
-        species_list = list(qs)
-        total_species = len(species_list)
-        not_reviewed = sum(1 for s in species_list if s.media_with_review == 0)
-        fully_reviewed = sum(1 for s in species_list if s.media_with_review >= s.total_media)
+                species_id__in=CountrySpecies.objects.filter(
+                    country__code=country_code.upper(),
+                    status__in=['native', 'endemic', 'rare'],
+                ).values('species_id'),
+            )
+
+        summaries = list(qs)
+        total_species = len(summaries)
+        not_reviewed = sum(1 for s in summaries if s.reviewed == 0)
+        fully_reviewed = sum(1 for s in summaries if s.reviewed >= s.total)
         # reviewed = at least 10 approved, or fully reviewed
         reviewed = sum(
-            1 for s in species_list
-            if s.approved_media >= 10 or s.media_with_review >= s.total_media
+            1 for s in summaries
+            if s.approved >= 10 or s.reviewed >= s.total
         )
         # partly_reviewed = has some reviews but < 10 approved and not fully reviewed
         partly_reviewed = sum(
-            1 for s in species_list
-            if 0 < s.media_with_review < s.total_media and s.approved_media < 10
+            1 for s in summaries
+            if 0 < s.reviewed < s.total and s.approved < 10
         )
 
         serializer = SpeciesReviewStatsSerializer(
-            species_list,
+            summaries,
             many=True,
             context={'request': request},
         )
@@ -535,61 +547,36 @@ class MediaReviewSpeciesListView(APIView):
         species_id_param = request.query_params.get('species')
 
         qs = (
-            Species.objects
-            .filter(media__type=media_type)
-            .distinct()
-            .annotate(
-                total_media=Count('media', filter=Q(media__type=media_type), distinct=True),
-                media_with_review=Count(
-                    'media',
-                    filter=Q(media__type=media_type, media__reviews__id__isnull=False),
-                    distinct=True,
-                ),
-                approved_media=Count(
-                    'media',
-                    filter=Q(media__type=media_type, media__reviews__review_type='approved'),
-                    distinct=True,
-                ),
-                rejected_media=Count(
-                    'media',
-                    filter=Q(media__type=media_type, media__reviews__review_type='rejected'),
-                    distinct=True,
-                ),
-                not_sure_media=Count(
-                    'media',
-                    filter=Q(media__type=media_type, media__reviews__review_type='not_sure'),
-                    distinct=True,
-                ),
-            )
-            .filter(total_media__gt=0)
-            .order_by('id')
+            MediaReviewSummary.objects
+            .filter(media_type=media_type, total__gt=0)
+            .select_related('species')
+            .order_by('species_id')
         )
         if country_code:
             country_species_ids = CountrySpecies.objects.exclude(
                 status__in=['introduced', 'extirpated', 'uncertain', 'unknown']
             ).filter(country__code=country_code.upper()).values_list('species_id', flat=True)
-            qs = qs.filter(id__in=country_species_ids)
+            qs = qs.filter(species_id__in=country_species_ids)
         if species_id_param:
             try:
-                qs = qs.filter(id=int(species_id_param))
+                qs = qs.filter(species_id=int(species_id_param))
             except (ValueError, TypeError):
                 pass
 
         if level == 'fast':
-            qs = qs.filter(approved_media__lt=10, media_with_review__lt=F('total_media'))
+            qs = qs.filter(approved__lt=10, reviewed__lt=F('total'))
         elif level == 'full':
-            qs = qs.filter(media_with_review__lt=F('total_media'))
+            qs = qs.filter(reviewed__lt=F('total'))
 
         paginator = self.pagination_class()
         page = paginator.paginate_queryset(qs, request, view=self)
         if page is None:
             return paginator.get_paginated_response([])
 
-        species_ids = [s.id for s in page]
+        species_ids = [s.species_id for s in page]
         media_qs = (
             Media.objects
             .filter(species_id__in=species_ids, type=media_type, hide=False)
-            .prefetch_related('reviews')
             .select_related('first_assertion_prediction')
             .order_by('species_id', '-created')
         )
@@ -599,16 +586,14 @@ class MediaReviewSpeciesListView(APIView):
 
         results = []
         for s in page:
-            media_list = media_by_species.get(s.id, [])
-            unreviewed = s.total_media - s.media_with_review
             results.append({
-                'species': s,
-                'total_media': s.total_media,
-                'unreviewed': unreviewed,
-                'approved': s.approved_media,
-                'rejected': s.rejected_media,
-                'not_sure': s.not_sure_media,
-                'media': media_list,
+                'species': s.species,
+                'total_media': s.total,
+                'unreviewed': s.unreviewed,
+                'approved': s.approved,
+                'rejected': s.rejected,
+                'not_sure': s.not_sure,
+                'media': media_by_species.get(s.species_id, []),
             })
         serializer = SpeciesWithMediaReviewSerializer(
             results, many=True, context={'request': request}
@@ -627,11 +612,51 @@ class GameListView(ListCreateAPIView, GetPlayerMixin):
         serializer.save(host=player)
 
 
+def _etag_response(request, payload, *, max_age=0):
+    """JSON ``payload`` with its ETag; 304 without a body when the client already has it."""
+    etag = payload_etag(payload)
+    if_none_match = request.META.get('HTTP_IF_NONE_MATCH', '')
+    client_tags = {tag.strip().removeprefix('W/') for tag in if_none_match.split(',')}
+    if etag in client_tags or '*' in client_tags:
+        response = Response(status=status.HTTP_304_NOT_MODIFIED)
+    else:
+        response = Response(payload)
+    response['ETag'] = etag
+    response['Cache-Control'] = f'private, max-age={max_age}' if max_age else 'no-cache'
+    return response
+
+
 class GameDetailView(RetrieveAPIView):
+    """Full game (``GameSerializer``); clients that only need the state use ``GameStateView``."""
     serializer_class = GameSerializer
-    queryset = Game.objects.all()
+    queryset = Game.objects.select_related('host', 'country')
     lookup_field = "token"
 
+    def retrieve(self, request, *args, **kwargs):
+        return _etag_response(request, self.get_serializer(self.get_object()).data)
+
+
+class GameStateView(GameDetailView):
+    """Config, progress, highscore and scoreboard from a fixed number of queries (jizz.game_state)."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return _etag_response(request, build_game_state(self.get_object(), request=request))
+
+
+class GameHighscoreView(GameDetailView):
+    """Best score in the game's leaderboard bucket; cached server-side and for a minute by clients."""
+
+    def retrieve(self, request, *args, **kwargs):
+        payload = {'current_highscore': game_highscore(self.get_object())}
+        return _etag_response(request, payload, max_age=60)
+
+
+class GameHistoryView(GameDetailView):
+    """Every player's score with full answer details (``GameSerializer.scores``)."""
+
+    def retrieve(self, request, *args, **kwargs):
+        return _etag_response(request, {'scores': game_history(self.get_object(), request=request)})
+
 
 class NoSpeciesForGame(APIException):
     status_code = 422
@@ -811,31 +836,33 @@ class PlayerScorePagination(PageNumberPagination):
 
 
 class PlayerScoreListView(ListAPIView):
+    """
+    Hiscores for any combination of game level/country/media/length/rarity, best first.
+
+    Served from the leaderboard index (``jizz.leaderboard``): the total comes from the
+    rank table and ``ranking`` is the position in the best-first list, so no request
+    sorts the whole score table. ``?ordering=`` accepts the indexed ``score`` (lowest
+    first) and ``-score`` (the default) only.
+    """
     serializer_class = PlayerScoreListSerializer
     pagination_class = PlayerScorePagination
-
-    filterset_fields = ["game__media", "game__length", "game__level", "game__country", "game__rarity"]
-    filter_backends = [DjangoFilterBackend, OrderingFilter]
-
-    ordering = ["-score"]
+    filter_backends = [OrderingFilter]
+    ordering_fields = RankedScores.ordering_fields
+    ordering = ['-score']
 
     def get_queryset(self):
-        return (
-            PlayerScore.objects
-            .filter(Q(game__tax_order='') | Q(game__tax_order__isnull=True))
-            .filter(Q(game__tax_family='') | Q(game__tax_family__isnull=True))
-            .exclude(game__game_type__in=[
-                Game.GAME_TYPE_PAIR_PRACTICE,
-                Game.GAME_TYPE_SPECIES_PRACTICE,
-            ])
-            .select_related("player", "game", "game__country")
-            .annotate(
-                score_rank=Window(
-                    expression=RowNumber(),
-                    order_by=F("score").desc(),
-                )
-            )
-        )
+        filters = {}
+        for param, field in LIST_FILTER_PARAMS.items():
+            value = self.request.query_params.get(param)
+            if not value:
+                continue
+            if field == 'length':
+                try:
+                    value = int(value)
+                except ValueError:
+                    raise ValidationError({param: ['Enter a whole number.']})
+            filters[field] = value
+        return RankedScores(filters)
 
 
 class FeedbackListView(ListCreateAPIView):
@@ -1832,3 +1859,14 @@ class PasswordResetConfirmView(APIView):
                 }, status=status.HTTP_400_BAD_REQUEST)
         
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+
+
+class JobStatusView(APIView):
+    """GET /api/jobs/<uuid>/ — status (and result) of a background job; poll until done or failed."""
+
+    permission_classes = [AllowAny]
+    authentication_classes = []
+
+    def get(self, request, job_id):
+        job = get_object_or_404(Job, uuid=job_id)
+        return Response(job_status_payload(job))
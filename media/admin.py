@@ -1,7 +1,10 @@
 from django.contrib import admin
 from django.core.exceptions import ObjectDoesNotExist
 from django.utils.html import format_html
+
+from jizz.playable_species_index import refresh_playable_species_many
 from .models import Media, FlagMedia, MediaReview, MediaPrediction
+from .review_state import refresh_review_summaries
 
 
 class VisibilityFilter(admin.SimpleListFilter):
@@ -29,13 +32,19 @@ class HideableAdminMixin:
     actions = ['mark_hidden', 'mark_visible']
 
     def mark_hidden(self, request, queryset):
+        summary_keys = set(queryset.values_list('species_id', 'type'))
         updated = queryset.update(hide=True)
+        refresh_playable_species_many(species_id for species_id, _ in summary_keys)
+        refresh_review_summaries(summary_keys)
         self.message_user(request, f"{updated} item(s) marked as hidden.")
 
     mark_hidden.short_description = 'Hide selected items'
 
     def mark_visible(self, request, queryset):
+        summary_keys = set(queryset.values_list('species_id', 'type'))
         updated = queryset.update(hide=False)
+        refresh_playable_species_many(species_id for species_id, _ in summary_keys)
+        refresh_review_summaries(summary_keys)
         self.message_user(request, f"{updated} item(s) marked as visible.")
 
     mark_visible.short_description = 'Show selected items'
@@ -0,0 +1,228 @@
+"""On-disk caches for first-assertion training and inference.
+
+Two stores share one directory (MEDIA_FIRST_ASSERTION_CACHE_DIR) and one SQLite index:
+
+- ``ImageCache``: downloaded image bytes, content-addressed (``images/ab/<sha256>``) so the
+  same file behind several URLs is kept once. Bounded by MEDIA_IMAGE_CACHE_MAX_BYTES with
+  least-recently-used eviction.
+- ``FeatureStore``: feature vectors per ``features_version`` in an append-only float64
+  matrix (``features/<version>.f64``) that is read through ``np.memmap``. Rows are keyed
+  by media id and only returned while the media URL is unchanged.
+
+With a warm feature store, retraining a classifier on the same features version does no
+network or image decoding work at all. SQLite and atomic renames keep both stores safe
+to share between the download threads and several processes.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import sqlite3
+import tempfile
+import time
+from contextlib import closing, contextmanager
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+
+import numpy as np
+from django.conf import settings
+
+from media.first_assertion import DEFAULT_FEATURES_VERSION
+from media.first_assertion.features import feature_dim
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS image_urls (url TEXT PRIMARY KEY, digest TEXT NOT NULL, size INTEGER);
+CREATE INDEX IF NOT EXISTS image_urls_digest ON image_urls (digest);
+CREATE TABLE IF NOT EXISTS image_blobs (digest TEXT PRIMARY KEY, nbytes INTEGER NOT NULL, accessed REAL NOT NULL);
+CREATE INDEX IF NOT EXISTS image_blobs_accessed ON image_blobs (accessed);
+CREATE TABLE IF NOT EXISTS feature_rows (
+    features_version TEXT NOT NULL,
+    media_id INTEGER NOT NULL,
+    url TEXT NOT NULL,
+    row INTEGER NOT NULL,
+    PRIMARY KEY (features_version, media_id)
+);
+"""
+
+
+class _Index:
+    def __init__(self, root: Path):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.path = self.root / 'index.sqlite3'
+        with self.connect() as db:
+            db.executescript(_SCHEMA)
+
+    @contextmanager
+    def connect(self) -> Iterator[sqlite3.Connection]:
+        # A connection per use: callers are download threads and separate processes.
+        with closing(sqlite3.connect(self.path, timeout=60, isolation_level=None)) as db:
+            db.execute('PRAGMA journal_mode=WAL')
+            yield db
+
+    @contextmanager
+    def transaction(self) -> Iterator[sqlite3.Connection]:
+        with self.connect() as db:
+            db.execute('BEGIN IMMEDIATE')
+            try:
+                yield db
+            except BaseException:
+                db.execute('ROLLBACK')
+                raise
+            db.execute('COMMIT')
+
+
+class ImageCache:
+    """Downloaded image bytes by URL, stored once per content hash, LRU-evicted past ``max_bytes``."""
+
+    def __init__(self, root: Path, max_bytes: Optional[int] = None, *, index: Optional[_Index] = None):
+        self.index = index or _Index(root)
+        self.dir = self.index.root / 'images'
+        if max_bytes is None:
+            max_bytes = int(getattr(settings, 'MEDIA_IMAGE_CACHE_MAX_BYTES', 5 * 1024 ** 3))
+        self.max_bytes = max_bytes
+
+    def _blob_path(self, digest: str) -> Path:
+        return self.dir / digest[:2] / digest
+
+    def get(self, url: str) -> Optional[tuple[bytes, Optional[int]]]:
+        with self.index.connect() as db:
+            row = db.execute('SELECT digest, size FROM image_urls WHERE url = ?', (url,)).fetchone()
+            if row is None:
+                return None
+            digest, size = row
+            try:
+                data = self._blob_path(digest).read_bytes()
+            except FileNotFoundError:
+                db.execute('DELETE FROM image_urls WHERE url = ?', (url,))
+                return None
+            db.execute('UPDATE image_blobs SET accessed = ? WHERE digest = ?', (time.time(), digest))
+        return data, size
+
+    def put(self, url: str, data: bytes, size: Optional[int] = None) -> str:
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(digest)
+        if not path.exists():
+            path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp = tempfile.mkstemp(dir=path.parent)
+            with os.fdopen(fd, 'wb') as fh:
+                fh.write(data)
+            os.replace(tmp, path)
+        with self.index.transaction() as db:
+            db.execute(
+                'INSERT INTO image_blobs (digest, nbytes, accessed) VALUES (?, ?, ?) '
+                'ON CONFLICT (digest) DO UPDATE SET accessed = excluded.accessed',
+                (digest, len(data), time.time()),
+            )
+            db.execute(
+                'INSERT OR REPLACE INTO image_urls (url, digest, size) VALUES (?, ?, ?)', (url, digest, size),
+            )
+            self._evict(db, keep=digest)
+        return digest
+
+    def _evict(self, db: sqlite3.Connection, keep: str) -> None:
+        (total,) = db.execute('SELECT COALESCE(SUM(nbytes), 0) FROM image_blobs').fetchone()
+        if total <= self.max_bytes:
+            return
+        for digest, nbytes in db.execute(
+            'SELECT digest, nbytes FROM image_blobs WHERE digest != ? ORDER BY accessed', (keep,),
+        ).fetchall():
+            db.execute('DELETE FROM image_urls WHERE digest = ?', (digest,))
+            db.execute('DELETE FROM image_blobs WHERE digest = ?', (digest,))
+            self._blob_path(digest).unlink(missing_ok=True)
+            total -= nbytes
+            if total <= self.max_bytes:
+                break
+
+    def total_bytes(self) -> int:
+        with self.index.connect() as db:
+            return db.execute('SELECT COALESCE(SUM(nbytes), 0) FROM image_blobs').fetchone()[0]
+
+
+class FeatureStore:
+    """Feature vectors of one ``features_version`` in a memory-mapped, append-only matrix."""
+
+    def __init__(self, root: Path, features_version: str, dim: int, *, index: Optional[_Index] = None):
+        self.index = index or _Index(root)
+        self.features_version = features_version
+        self.dim = dim
+        self.path = self.index.root / 'features' / f'{features_version}.f64'
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._matrix: Optional[np.memmap] = None
+
+    def _rows_on_disk(self) -> int:
+        try:
+            return self.path.stat().st_size // (8 * self.dim)
+        except FileNotFoundError:
+            return 0
+
+    def _view(self, needed_rows: int) -> np.memmap:
+        if self._matrix is None or self._matrix.shape[0] < needed_rows:
+            self._matrix = np.memmap(self.path, dtype=np.float64, mode='r', shape=(self._rows_on_disk(), self.dim))
+        return self._matrix
+
+    def get_many(self, items: Iterable[tuple[int, str]]) -> dict[int, np.ndarray]:
+        """Cached vectors for ``(media_id, url)`` pairs whose URL still matches."""
+        wanted = dict(items)
+        if not wanted:
+            return {}
+        rows: dict[int, int] = {}
+        ids = list(wanted)
+        with self.index.connect() as db:
+            for start in range(0, len(ids), 500):
+                chunk = ids[start:start + 500]
+                for media_id, url, row in db.execute(
+                    f'SELECT media_id, url, row FROM feature_rows WHERE features_version = ? '
+                    f'AND media_id IN ({",".join("?" * len(chunk))})',
+                    [self.features_version, *chunk],
+                ):
+                    if url == wanted[media_id]:
+                        rows[media_id] = row
+        if not rows:
+            return {}
+        matrix = self._view(max(rows.values()) + 1)
+        return {media_id: np.array(matrix[row]) for media_id, row in rows.items() if row < matrix.shape[0]}
+
+    def put_many(self, entries: Iterable[tuple[int, str, np.ndarray]]) -> None:
+        entries = [(media_id, url, np.asarray(vec, dtype=np.float64)) for media_id, url, vec in entries]
+        entries = [entry for entry in entries if entry[2].shape == (self.dim,)]
+        if not entries:
+            return
+        with self.index.transaction() as db:
+            # The index write lock also serialises appends to the matrix file.
+            first_row = self._rows_on_disk()
+            with open(self.path, 'ab') as fh:
+                fh.truncate(first_row * 8 * self.dim)  # drop a partial row from an interrupted write
+                fh.write(np.vstack([vec for _id, _url, vec in entries]).tobytes())
+            db.executemany(
+                'INSERT OR REPLACE INTO feature_rows (features_version, media_id, url, row) VALUES (?, ?, ?, ?)',
+                [
+                    (self.features_version, media_id, url, first_row + i)
+                    for i, (media_id, url, _vec) in enumerate(entries)
+                ],
+            )
+
+    def __len__(self) -> int:
+        with self.index.connect() as db:
+            return db.execute(
+                'SELECT COUNT(*) FROM feature_rows WHERE features_version = ?', (self.features_version,),
+            ).fetchone()[0]
+
+
+class FeatureCache:
+    """The image cache and the feature store of one ``features_version``."""
+
+    def __init__(self, root: Path, features_version: str, dim: int, *, max_image_bytes: Optional[int] = None):
+        index = _Index(root)
+        self.images = ImageCache(root, max_image_bytes, index=index)
+        self.features = FeatureStore(root, features_version, dim, index=index)
+
+
+def default_feature_cache(features_version: str) -> Optional[FeatureCache]:
+    """The cache under MEDIA_FIRST_ASSERTION_CACHE_DIR, or None when that setting is empty."""
+    root = getattr(settings, 'MEDIA_FIRST_ASSERTION_CACHE_DIR', None)
+    if not root:
+        return None
+    features_version = (features_version or DEFAULT_FEATURES_VERSION).strip()
+    return FeatureCache(Path(root), features_version, feature_dim(features_version))
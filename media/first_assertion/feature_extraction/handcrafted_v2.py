@@ -46,7 +46,7 @@ from media.first_assertion.feature_extraction.base import (
     ensure_1d_float64,
 )
 from media.first_assertion.feature_extraction.url_features import ext_flag, parse_url_signals, token_flag
-from media.first_assertion.feature_extraction.yolo import yolo_bird_features
+from media.first_assertion.feature_extraction.yolo import YoloBirdResult, yolo_bird_features, yolo_bird_features_batch
 
 
 def _to_working_rgb_and_gray(
@@ -355,9 +355,12 @@ class HandcraftedV2YoloExtractor(HandcraftedV2Extractor):
 
     YOLO runs offline during train/infer only; if no ONNX model is configured,
     YOLO features are zeros (vector stays stable).
+
+    ``handcrafted_v2_yolo2``: NMS reads the boxes as xyxy (``handcrafted_v2_yolo`` passed
+    them to NMS as xywh), so box counts and areas differ from the old version.
     """
 
-    features_version = 'handcrafted_v2_yolo'
+    features_version = 'handcrafted_v2_yolo2'
 
     def feature_names(self) -> list[str]:
         base = super().feature_names()
@@ -371,7 +374,18 @@ class HandcraftedV2YoloExtractor(HandcraftedV2Extractor):
         base_vec = super().extract(inp)
         # We need RGB bytes again; re-decode cheaply from the already handled bytes.
         rgb_u8, _gray_u8, _ow, _oh, _has_alpha = _to_working_rgb_and_gray(inp.image_bytes)
-        y = yolo_bird_features(rgb_u8)
+        return self._with_yolo(base_vec, yolo_bird_features(rgb_u8))
+
+    def extract_many(self, inputs: list[ExtractorInput]) -> list[np.ndarray]:
+        """``extract`` for several images, with one batched YOLO pass for all of them."""
+        base_vecs = []
+        images = []
+        for inp in inputs:
+            base_vecs.append(super().extract(inp))
+            images.append(_to_working_rgb_and_gray(inp.image_bytes)[0])
+        return [self._with_yolo(vec, y) for vec, y in zip(base_vecs, yolo_bird_features_batch(images))]
+
+    @staticmethod
+    def _with_yolo(base_vec: np.ndarray, y: YoloBirdResult) -> np.ndarray:
         extra = np.array([y.bird_max_conf, float(y.bird_num_boxes), y.bird_max_area_ratio], dtype=np.float64)
         return ensure_1d_float64(np.concatenate([base_vec, extra]))
-
@@ -52,94 +52,95 @@ def _resolve_onnx_path() -> Optional[Path]:
     return p if p.is_file() else None
 
 
-def _nms_xyxy_cv2(
-    boxes_xyxy: np.ndarray,
-    scores: np.ndarray,
-    *,
-    conf_thr: float,
-    iou_thr: float,
-) -> Tuple[np.ndarray, np.ndarray]:
-    import cv2  # type: ignore
-
-    b = boxes_xyxy.astype(np.float32)
-    idxs = cv2.dnn.NMSBoxes(
-        b.tolist(),
-        scores.astype(float).tolist(),
-        score_threshold=conf_thr,
-        nms_threshold=iou_thr,
-    )
-    if idxs is None or len(idxs) == 0:
-        return b[:0], scores[:0]
-    idxs = np.array(idxs).reshape(-1).astype(int)
-    return b[idxs], scores[idxs]
-
-
-def _postprocess_yolov5_style(
+def _letterbox_batch(images_rgb: list[np.ndarray], new_size: int = 640) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Letterbox N RGB images into one NCHW float32 blob (BGR channel order, scaled to [0, 1],
+    as cv2.dnn.blobFromImage with swapRB=False). Returns (blob, scales[N], pads[N, 2] as x, y).
+    """
+    n = len(images_rgb)
+    padded = np.empty((n, new_size, new_size, 3), dtype=np.uint8)
+    scales = np.empty(n, dtype=np.float32)
+    pads = np.empty((n, 2), dtype=np.float32)
+    for i, rgb_u8 in enumerate(images_rgb):
+        padded[i], scales[i], pads[i, 0], pads[i, 1] = _letterbox(np.ascontiguousarray(rgb_u8[:, :, ::-1]), new_size)
+    blob = padded.transpose(0, 3, 1, 2).astype(np.float32)
+    blob *= np.float32(1.0 / 255.0)
+    return blob, scales, pads
+
+
+def _nms_batched(boxes_xyxy: np.ndarray, scores: np.ndarray, groups: np.ndarray, iou_thr: float) -> np.ndarray:
+    """
+    Greedy NMS over boxes of several images at once; ``groups`` (image index per box) offsets
+    the boxes so boxes of different images never overlap. Returns kept indices.
+    """
+    span = float(boxes_xyxy.max() - boxes_xyxy.min()) + 1.0
+    b = boxes_xyxy + (groups.astype(np.float32) * span)[:, None]
+    areas = np.maximum(0.0, b[:, 2] - b[:, 0]) * np.maximum(0.0, b[:, 3] - b[:, 1])
+    order = np.argsort(-scores, kind='stable')
+    keep = []
+    while order.size:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+        w = np.maximum(0.0, np.minimum(b[i, 2], b[rest, 2]) - np.maximum(b[i, 0], b[rest, 0]))
+        h = np.maximum(0.0, np.minimum(b[i, 3], b[rest, 3]) - np.maximum(b[i, 1], b[rest, 1]))
+        inter = w * h
+        union = areas[i] + areas[rest] - inter
+        iou = np.divide(inter, union, out=np.zeros_like(inter), where=union > 0)
+        order = rest[iou <= iou_thr]
+    return np.asarray(keep, dtype=np.int64)
+
+
+def _postprocess_yolov5_batch(
     det: np.ndarray,
     *,
     conf_thr: float,
     iou_thr: float,
     bird_id: int,
-    rgb_u8: np.ndarray,
-    scale: float,
-    pad_x: int,
-    pad_y: int,
-) -> YoloBirdResult:
-    import cv2  # type: ignore
-
-    if det.ndim == 3:
-        det = det[0]
-    if det.ndim != 2 or det.shape[1] < 6:
-        return YoloBirdResult(bird_max_conf=0.0, bird_num_boxes=0, bird_max_area_ratio=0.0)
-
-    obj = det[:, 4]
-    cls = det[:, 5:]
-    if bird_id < 0 or bird_id >= cls.shape[1]:
-        return YoloBirdResult(bird_max_conf=0.0, bird_num_boxes=0, bird_max_area_ratio=0.0)
-
-    conf = obj * cls[:, bird_id]
-    keep = conf >= conf_thr
-    if not np.any(keep):
-        return YoloBirdResult(
-            bird_max_conf=float(np.max(conf) if conf.size else 0.0),
-            bird_num_boxes=0,
-            bird_max_area_ratio=0.0,
-        )
+    image_sizes: np.ndarray,
+    scales: np.ndarray,
+    pads: np.ndarray,
+) -> list[YoloBirdResult]:
+    """
+    Bird summaries from YOLOv5 output ``det[N, boxes, 5 + classes]`` (cx, cy, w, h, obj, cls...).
 
-    boxes = det[keep, :4].copy()
-    scores = conf[keep].copy()
-
-    x, y, w, h = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
-    x1 = x - w / 2.0
-    y1 = y - h / 2.0
-    x2 = x + w / 2.0
-    y2 = y + h / 2.0
-    b = np.stack([x1, y1, x2, y2], axis=1).astype(np.float32)
-
-    b, scores = _nms_xyxy_cv2(b, scores, conf_thr=conf_thr, iou_thr=iou_thr)
-    if scores.size == 0:
-        return YoloBirdResult(
-            bird_max_conf=float(np.max(conf) if conf.size else 0.0),
-            bird_num_boxes=0,
-            bird_max_area_ratio=0.0,
+    ``image_sizes[N, 2]`` are the (H, W) of the images the boxes are mapped back to.
+    """
+    n = len(image_sizes)
+    det = np.asarray(det, dtype=np.float32)
+    if det.ndim == 2:
+        det = det[None]
+    if det.ndim != 3 or det.shape[0] != n or det.shape[2] < 6 or not 0 <= bird_id < det.shape[2] - 5:
+        return [YoloBirdResult(bird_max_conf=0.0, bird_num_boxes=0, bird_max_area_ratio=0.0)] * n
+
+    conf = det[:, :, 4] * det[:, :, 5 + bird_id]
+    max_conf = conf.max(axis=1) if conf.shape[1] else np.zeros(n, dtype=np.float32)
+    num_boxes = np.zeros(n, dtype=np.int64)
+    max_area_ratio = np.zeros(n, dtype=np.float64)
+
+    img_idx, box_idx = np.nonzero(conf >= conf_thr)
+    if img_idx.size:
+        xywh = det[img_idx, box_idx, :4]
+        boxes = np.concatenate([xywh[:, :2] - xywh[:, 2:] / 2.0, xywh[:, :2] + xywh[:, 2:] / 2.0], axis=1)
+        keep = _nms_batched(boxes, conf[img_idx, box_idx], img_idx, iou_thr)
+        boxes, img_idx = boxes[keep], img_idx[keep]
+
+        # Undo the letterbox and clip to each image.
+        boxes = (boxes - np.tile(pads[img_idx], 2)) / np.maximum(scales[img_idx], 1e-9)[:, None]
+        hw = np.asarray(image_sizes, dtype=np.float64)[img_idx]
+        boxes = np.clip(boxes, 0.0, np.stack([hw[:, 1], hw[:, 0], hw[:, 1], hw[:, 0]], axis=1))
+        areas = np.maximum(0.0, boxes[:, 2] - boxes[:, 0]) * np.maximum(0.0, boxes[:, 3] - boxes[:, 1])
+        num_boxes = np.bincount(img_idx, minlength=n)
+        np.maximum.at(max_area_ratio, img_idx, areas / np.maximum(hw[:, 0] * hw[:, 1], 1.0))
+
+    return [
+        YoloBirdResult(
+            bird_max_conf=float(max_conf[i]),
+            bird_num_boxes=int(num_boxes[i]),
+            bird_max_area_ratio=float(max_area_ratio[i]),
         )
-
-    H, W = rgb_u8.shape[:2]
-    b[:, [0, 2]] = (b[:, [0, 2]] - pad_x) / max(scale, 1e-9)
-    b[:, [1, 3]] = (b[:, [1, 3]] - pad_y) / max(scale, 1e-9)
-    b[:, 0] = np.clip(b[:, 0], 0, W)
-    b[:, 2] = np.clip(b[:, 2], 0, W)
-    b[:, 1] = np.clip(b[:, 1], 0, H)
-    b[:, 3] = np.clip(b[:, 3], 0, H)
-
-    areas = np.maximum(0.0, b[:, 2] - b[:, 0]) * np.maximum(0.0, b[:, 3] - b[:, 1])
-    img_area = float(max(H * W, 1))
-    area_ratio = float(np.max(areas) / img_area) if areas.size else 0.0
-    return YoloBirdResult(
-        bird_max_conf=float(np.max(scores) if scores.size else 0.0),
-        bird_num_boxes=int(scores.size),
-        bird_max_area_ratio=area_ratio,
-    )
+        for i in range(n)
+    ]
 
 
 class _YoloRunner:
@@ -148,6 +149,7 @@ class _YoloRunner:
         self._backend: Backend = 'none'
         self._cv_net: Optional[object] = None
         self._ort_session: Optional[object] = None
+        self._ort_batch: Optional[int] = None
 
     def configure(self) -> None:
         p = _resolve_onnx_path()
@@ -156,12 +158,14 @@ class _YoloRunner:
             self._backend = 'none'
             self._cv_net = None
             self._ort_session = None
+            self._ort_batch = None
             return
         if self._path == p and self._backend != 'none':
             return
         self._path = p
         self._cv_net = None
         self._ort_session = None
+        self._ort_batch = None
         self._backend = 'none'
 
         prefer_ort = bool(getattr(settings, 'MEDIA_YOLO_PREFER_ONNXRUNTIME', False))
@@ -207,72 +211,78 @@ class _YoloRunner:
         try:
             import onnxruntime as ort  # type: ignore
 
-            sess = ort.InferenceSession(str(self._path), providers=['CPUExecutionProvider'])
+            options = ort.SessionOptions()
+            options.intra_op_num_threads = int(getattr(settings, 'MEDIA_YOLO_ORT_INTRA_OP_THREADS', 0) or 0)
+            options.inter_op_num_threads = int(getattr(settings, 'MEDIA_YOLO_ORT_INTER_OP_THREADS', 0) or 0)
+            options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+            sess = ort.InferenceSession(str(self._path), sess_options=options, providers=['CPUExecutionProvider'])
             inp = sess.get_inputs()[0]
-            dummy = np.zeros(tuple(inp.shape), dtype=np.float32)
+            # Exports either fix the batch size (usually 1) or leave it symbolic.
+            fixed_batch = inp.shape[0] if isinstance(inp.shape[0], int) else None
+            dummy = np.zeros((fixed_batch or 1, 3, 640, 640), dtype=np.float32)
             sess.run(None, {inp.name: dummy})
             self._ort_session = sess
+            self._ort_batch = fixed_batch
             return True
         except Exception as exc:
             logger.warning('onnxruntime could not run YOLO ONNX (%s): %s', self._path, exc)
             self._ort_session = None
             return False
 
+    def _forward(self, blob: np.ndarray) -> np.ndarray:
+        """Run the NCHW blob through the active backend; returns det[N, boxes, 5 + classes]."""
+        outs = []
+        if self._backend == 'opencv':
+            # OpenCV DNN rarely handles a dynamic batch dimension: one image per forward.
+            for i in range(blob.shape[0]):
+                self._cv_net.setInput(blob[i:i + 1])
+                out = np.asarray(self._cv_net.forward())
+                outs.append(out.reshape(1, -1, out.shape[-1]))
+            return np.concatenate(outs)
+
+        sess = self._ort_session
+        name = sess.get_inputs()[0].name
+        step = self._ort_batch or blob.shape[0]
+        for start in range(0, blob.shape[0], step):
+            chunk = blob[start:start + step]
+            n = chunk.shape[0]
+            if n < step:
+                chunk = np.concatenate([chunk, np.zeros((step - n,) + chunk.shape[1:], dtype=chunk.dtype)])
+            outs.append(np.asarray(sess.run(None, {name: chunk})[0])[:n])
+        return np.concatenate(outs)
+
     def run(self, rgb_u8: np.ndarray) -> YoloBirdResult:
+        return self.run_batch([rgb_u8])[0]
+
+    def run_batch(self, images_rgb: list[np.ndarray]) -> list[YoloBirdResult]:
         self.configure()
-        if self._backend == 'none' or self._path is None:
-            return YoloBirdResult(bird_max_conf=0.0, bird_num_boxes=0, bird_max_area_ratio=0.0)
-
-        import cv2  # type: ignore
-
-        img_bgr = rgb_u8[:, :, ::-1]
-        inp, scale, pad_x, pad_y = _letterbox(img_bgr, new_size=640)
-        conf_thr = float(getattr(settings, 'MEDIA_YOLO_CONF_THRESHOLD', 0.25))
-        iou_thr = float(getattr(settings, 'MEDIA_YOLO_NMS_IOU_THRESHOLD', 0.45))
-        bird_id = int(getattr(settings, 'MEDIA_YOLO_BIRD_CLASS_ID', 14))
-
-        if self._backend == 'opencv' and self._cv_net is not None:
-            try:
-                blob = cv2.dnn.blobFromImage(inp, scalefactor=1.0 / 255.0, size=(640, 640), swapRB=False, crop=False)
-                self._cv_net.setInput(blob)
-                out = self._cv_net.forward()
-                return _postprocess_yolov5_style(
-                    np.asarray(out),
-                    conf_thr=conf_thr,
-                    iou_thr=iou_thr,
-                    bird_id=bird_id,
-                    rgb_u8=rgb_u8,
-                    scale=scale,
-                    pad_x=pad_x,
-                    pad_y=pad_y,
-                )
-            except Exception as exc:
-                logger.warning('OpenCV YOLO forward failed; trying onnxruntime fallback: %s', exc)
-                self._cv_net = None
-                if self._try_onnxruntime():
-                    self._backend = 'onnxruntime'
-                    return self.run(rgb_u8)
+        empty = YoloBirdResult(bird_max_conf=0.0, bird_num_boxes=0, bird_max_area_ratio=0.0)
+        if not images_rgb or self._backend == 'none' or self._path is None:
+            return [empty] * len(images_rgb)
+
+        blob, scales, pads = _letterbox_batch(images_rgb, new_size=640)
+        try:
+            det = self._forward(blob)
+        except Exception as exc:
+            if self._backend != 'opencv':
+                raise
+            logger.warning('OpenCV YOLO forward failed; trying onnxruntime fallback: %s', exc)
+            self._cv_net = None
+            if not self._try_onnxruntime():
                 self._backend = 'none'
-                return YoloBirdResult(bird_max_conf=0.0, bird_num_boxes=0, bird_max_area_ratio=0.0)
-
-        if self._backend == 'onnxruntime' and self._ort_session is not None:
-            sess = self._ort_session
-            inp_meta = sess.get_inputs()[0]
-            name = inp_meta.name
-            blob = cv2.dnn.blobFromImage(inp, scalefactor=1.0 / 255.0, size=(640, 640), swapRB=False, crop=False)
-            out = sess.run(None, {name: blob})[0]
-            return _postprocess_yolov5_style(
-                np.asarray(out),
-                conf_thr=conf_thr,
-                iou_thr=iou_thr,
-                bird_id=bird_id,
-                rgb_u8=rgb_u8,
-                scale=scale,
-                pad_x=pad_x,
-                pad_y=pad_y,
-            )
-
-        return YoloBirdResult(bird_max_conf=0.0, bird_num_boxes=0, bird_max_area_ratio=0.0)
+                return [empty] * len(images_rgb)
+            self._backend = 'onnxruntime'
+            det = self._forward(blob)
+
+        return _postprocess_yolov5_batch(
+            det,
+            conf_thr=float(getattr(settings, 'MEDIA_YOLO_CONF_THRESHOLD', 0.25)),
+            iou_thr=float(getattr(settings, 'MEDIA_YOLO_NMS_IOU_THRESHOLD', 0.45)),
+            bird_id=int(getattr(settings, 'MEDIA_YOLO_BIRD_CLASS_ID', 14)),
+            image_sizes=np.array([img.shape[:2] for img in images_rgb]),
+            scales=scales,
+            pads=pads,
+        )
 
 
 _RUNNER = _YoloRunner()
@@ -286,3 +296,11 @@ def yolo_bird_features(rgb_u8: np.ndarray) -> YoloBirdResult:
     If no model is configured/available, returns zeros (keeps vector stable).
     """
     return _RUNNER.run(rgb_u8)
+
+
+def yolo_bird_features_batch(images_rgb: list[np.ndarray]) -> list[YoloBirdResult]:
+    """
+    ``yolo_bird_features`` for N images: one letterboxed NCHW blob, one onnxruntime call per
+    batch (chunked when the export fixes the batch size) and vectorized post-processing.
+    """
+    return _RUNNER.run_batch(images_rgb)
@@ -30,7 +30,12 @@ REQUEST_TIMEOUT = 20
 _EXTRACTORS: dict[str, FeatureExtractor] = {
     'handcrafted_v1': HandcraftedV1Extractor(),
     'handcrafted_v2': HandcraftedV2Extractor(),
-    'handcrafted_v2_yolo': HandcraftedV2YoloExtractor(),
+    'handcrafted_v2_yolo2': HandcraftedV2YoloExtractor(),
+}
+# Versions whose vectors can no longer be produced: cached features and models trained on
+# them are stale.
+_RETIRED_VERSIONS = {
+    'handcrafted_v2_yolo': 'handcrafted_v2_yolo2',
 }
 
 _DEFAULT_BROWSER_UA = (
@@ -61,9 +66,16 @@ def _browser_like_headers(url: str) -> dict:
     }
 
 
-def download_image(url: str) -> tuple[bytes, int | None]:
+def download_image(url: str, *, rate_limiter=None) -> tuple[bytes, int | None]:
+    """
+    Fetch image bytes (Wikimedia via a thumbnail URL). ``rate_limiter.acquire(url)`` paces
+    concurrent callers per host; without one, Wikimedia fetches sleep
+    MEDIA_HTTP_FETCH_DELAY_SECONDS first.
+    """
     wikimedia = _is_wikimedia_upload(url)
-    if wikimedia:
+    if rate_limiter is not None:
+        rate_limiter.acquire(url)
+    elif wikimedia:
         delay = float(getattr(settings, 'MEDIA_HTTP_FETCH_DELAY_SECONDS', 0.35) or 0)
         if delay > 0:
             time.sleep(delay)
@@ -141,6 +153,10 @@ def download_image(url: str) -> tuple[bytes, int | None]:
 
 def get_feature_extractor(features_version: str | None = None) -> FeatureExtractor:
     fv = (features_version or DEFAULT_FEATURES_VERSION).strip()
+    if fv in _RETIRED_VERSIONS:
+        raise ValueError(
+            f'features_version {fv} is retired; retrain the model with {_RETIRED_VERSIONS[fv]}'
+        )
     if fv not in _EXTRACTORS:
         raise ValueError(f'Unsupported features_version: {fv}')
     return _EXTRACTORS[fv]
@@ -153,7 +169,7 @@ def ensure_feature_extractor_dependencies(features_version: str | None = None) -
     (Without this, missing deps would manifest as thousands of per-media skips.)
     """
     fv = (features_version or DEFAULT_FEATURES_VERSION).strip()
-    if fv in ('handcrafted_v2', 'handcrafted_v2_yolo'):
+    if fv in ('handcrafted_v2', 'handcrafted_v2_yolo2'):
         try:
             import cv2  # noqa: F401
         except ModuleNotFoundError as exc:
@@ -161,7 +177,7 @@ def ensure_feature_extractor_dependencies(features_version: str | None = None) -
                 "handcrafted_v2 requires OpenCV. Install with "
                 "`pip install opencv-python-headless` (or `pip install -r requirements.txt`)."
             ) from exc
-    if fv == 'handcrafted_v2_yolo':
+    if fv == 'handcrafted_v2_yolo2':
         from pathlib import Path
 
         from django.conf import settings
@@ -169,14 +185,14 @@ def ensure_feature_extractor_dependencies(features_version: str | None = None) -
         p = (getattr(settings, 'MEDIA_YOLO_ONNX_PATH', '') or '').strip()
         if not p or not Path(p).is_file():
             raise ModuleNotFoundError(
-                "handcrafted_v2_yolo requires an ONNX YOLO model file. Set MEDIA_YOLO_ONNX_PATH "
+                "handcrafted_v2_yolo2 requires an ONNX YOLO model file. Set MEDIA_YOLO_ONNX_PATH "
                 "to a local .onnx path (offline)."
             )
         try:
             import onnxruntime  # noqa: F401
         except ModuleNotFoundError as exc:
             raise ModuleNotFoundError(
-                "handcrafted_v2_yolo needs `onnxruntime` as a fallback when OpenCV DNN cannot run your ONNX "
+                "handcrafted_v2_yolo2 needs `onnxruntime` as a fallback when OpenCV DNN cannot run your ONNX "
                 "(common with newer exports). Install with `pip install onnxruntime` "
                 "(or `pip install -r requirements.txt`)."
             ) from exc
@@ -202,6 +218,31 @@ def extract_feature_vector_from_bytes(
     return extractor.extract(inp)
 
 
+def extract_feature_vectors_from_bytes(
+    items: list[tuple[bytes, str | None, int | None]],
+    *,
+    features_version: str | None = None,
+) -> list[np.ndarray | Exception]:
+    """
+    Feature vectors for ``(data, url, file_size_bytes)`` items, batched when the extractor
+    has ``extract_many`` (YOLO). A failing item is returned as its exception.
+    """
+    extractor = get_feature_extractor(features_version)
+    inputs = [ExtractorInput(image_bytes=data, url=url, file_size_bytes=size) for data, url, size in items]
+    if len(inputs) > 1 and hasattr(extractor, 'extract_many'):
+        try:
+            return extractor.extract_many(inputs)
+        except Exception:
+            pass  # one bad image: redo per image so only that one fails
+    results: list[np.ndarray | Exception] = []
+    for inp in inputs:
+        try:
+            results.append(extractor.extract(inp))
+        except Exception as exc:
+            results.append(exc)
+    return results
+
+
 def extract_feature_vector_from_url(
     url: str,
     *,
@@ -1,19 +1,14 @@
 """Training labels from human MediaReview, aligned with Media.effective_review_status."""
 
-from django.db.models import Exists, OuterRef
-
 from media.models import Media, MediaReview
 
 
 def queryset_labeled_image_media():
     """Image media with at least one review and a fetchable URL."""
-    has_review = Exists(MediaReview.objects.filter(media_id=OuterRef('pk')))
     return (
-        Media.objects.filter(type='image', hide=False)
-        .filter(has_review)
+        Media.objects.filter(type='image', hide=False, review_status__isnull=False)
         .exclude(url__isnull=True)
         .exclude(url='')
-        .prefetch_related('reviews')
     )
 
 
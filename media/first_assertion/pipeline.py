@@ -0,0 +1,197 @@
+"""Concurrent URL -> feature vector stage for first-assertion training and inference.
+
+Downloads run on a bounded thread pool, paced per host with a shared token bucket
+(Wikimedia at 1 / MEDIA_HTTP_FETCH_DELAY_SECONDS, other hosts at MEDIA_HTTP_FETCH_RATE_PER_HOST).
+Feature extraction runs on a process pool (``extract_workers``) so the OpenCV/NumPy work of
+``handcrafted_v2`` / YOLO uses every core; with ``extract_workers=0`` it runs on the
+download threads. At most ``window`` images are in flight, so memory stays bounded.
+Extractors with ``extract_many`` (YOLO) get the downloaded images in batches of up to
+MEDIA_YOLO_BATCH_SIZE on the process pool.
+
+With a ``FeatureCache`` (media.first_assertion.cache), stored vectors are returned without
+downloading, downloaded bytes are reused across runs, and new vectors are stored.
+"""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, Future, ProcessPoolExecutor, ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+from urllib.parse import urlparse
+
+import numpy as np
+from django.conf import settings
+
+from media.first_assertion.cache import FeatureCache, ImageCache
+from media.first_assertion.features import (
+    download_image,
+    extract_feature_vector_from_bytes,
+    extract_feature_vectors_from_bytes,
+    get_feature_extractor,
+)
+from media.scrapers.rate_limit import TokenBucket
+from media.wikimedia_urls import is_wikimedia_upload
+
+
+class HostRateLimiter:
+    """One token bucket per host, shared by all download threads."""
+
+    def __init__(self, rate: Optional[float] = None, wikimedia_rate: Optional[float] = None):
+        self.rate = rate if rate is not None else float(getattr(settings, 'MEDIA_HTTP_FETCH_RATE_PER_HOST', 4.0))
+        if wikimedia_rate is None:
+            delay = float(getattr(settings, 'MEDIA_HTTP_FETCH_DELAY_SECONDS', 0.35) or 0)
+            wikimedia_rate = 1.0 / delay if delay > 0 else 0.0
+        self.wikimedia_rate = wikimedia_rate
+        self._buckets: dict[str, TokenBucket | None] = {}
+        self._lock = threading.Lock()
+
+    def acquire(self, url: str) -> None:
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            if host not in self._buckets:
+                rate = self.wikimedia_rate if is_wikimedia_upload(url) else self.rate
+                self._buckets[host] = TokenBucket(rate) if rate > 0 else None
+            bucket = self._buckets[host]
+        if bucket is not None:
+            bucket.acquire()
+
+
+@dataclass
+class FeatureResult:
+    media_id: int
+    vector: Optional[np.ndarray] = None
+    error: Optional[BaseException] = None
+
+
+def _extract_batch(batch: list[tuple[bytes, Optional[int], str]], features_version: str) -> list:
+    # Top-level so it can run in a worker process; YOLO features run as one batched pass.
+    return extract_feature_vectors_from_bytes(
+        [(data, url, size) for data, size, url in batch], features_version=features_version,
+    )
+
+
+def _fetch(url: str, limiter: HostRateLimiter, images: Optional[ImageCache]) -> tuple[bytes, Optional[int]]:
+    cached = images.get(url) if images is not None else None
+    if cached is not None:
+        return cached
+    data, size = download_image(url, rate_limiter=limiter)
+    if images is not None:
+        images.put(url, data, size)
+    return data, size
+
+
+def _fetch_and_extract(
+    url: str, features_version: str, limiter: HostRateLimiter, images: Optional[ImageCache],
+) -> np.ndarray:
+    data, size = _fetch(url, limiter, images)
+    return extract_feature_vector_from_bytes(data, features_version=features_version, url=url, file_size_bytes=size)
+
+
+def iter_feature_vectors(
+    items: Iterable[tuple[int, str]],
+    *,
+    features_version: str,
+    download_workers: int = 8,
+    extract_workers: int = 0,
+    window: Optional[int] = None,
+    limiter: Optional[HostRateLimiter] = None,
+    cache: Optional[FeatureCache] = None,
+) -> Iterator[FeatureResult]:
+    """
+    Yield a FeatureResult per ``(media_id, url)`` as soon as it is ready (not in input order).
+    Failed downloads/extractions are yielded with ``error`` set.
+    """
+    download_workers = max(1, download_workers)
+    window = window or 4 * (download_workers + max(0, extract_workers))
+    batch_size = 1
+    if extract_workers > 0 and hasattr(get_feature_extractor(features_version), 'extract_many'):
+        batch_size = max(1, int(getattr(settings, 'MEDIA_YOLO_BATCH_SIZE', 16)))
+        window = max(window, 2 * batch_size)
+    limiter = limiter or HostRateLimiter()
+    images = cache.images if cache is not None else None
+    source = iter(items)
+    pending: deque[tuple[int, str]] = deque()
+    # future -> (stage, [(media_id, url), ...])
+    in_flight: dict[Future, tuple[str, list[tuple[int, str]]]] = {}
+    downloaded: list[tuple[int, str, bytes, Optional[int]]] = []
+    to_store: list[tuple[int, str, np.ndarray]] = []
+
+    def store(flush: bool = False) -> None:
+        if cache is not None and to_store and (flush or len(to_store) >= 256):
+            cache.features.put_many(to_store)
+            to_store.clear()
+
+    def images_in_flight() -> int:
+        return len(downloaded) + sum(len(entries) for _stage, entries in in_flight.values())
+
+    def submit_extraction() -> None:
+        batch = downloaded[:batch_size]
+        del downloaded[:batch_size]
+        future = extracts.submit(_extract_batch, [(data, size, url) for _id, url, data, size in batch], features_version)
+        in_flight[future] = ('batch', [(media_id, url) for media_id, url, _data, _size in batch])
+
+    def vector_ready(media_id: int, url: str, vector: np.ndarray) -> FeatureResult:
+        to_store.append((media_id, url, vector))
+        store()
+        return FeatureResult(media_id, vector=vector)
+
+    downloads = ThreadPoolExecutor(max_workers=download_workers, thread_name_prefix='media-download')
+    extracts = ProcessPoolExecutor(max_workers=extract_workers) if extract_workers > 0 else None
+    try:
+        exhausted = False
+        while True:
+            if not pending and not exhausted:
+                chunk = [item for _i, item in zip(range(window), source)]
+                exhausted = len(chunk) < window
+                hits = cache.features.get_many(chunk) if cache is not None and chunk else {}
+                for media_id, vector in hits.items():
+                    yield FeatureResult(media_id, vector=vector)
+                pending.extend(item for item in chunk if item[0] not in hits)
+            while pending and images_in_flight() < window:
+                media_id, url = pending.popleft()
+                if extracts is None:
+                    future = downloads.submit(_fetch_and_extract, url, features_version, limiter, images)
+                    in_flight[future] = ('features', [(media_id, url)])
+                else:
+                    future = downloads.submit(_fetch, url, limiter, images)
+                    in_flight[future] = ('download', [(media_id, url)])
+            # Full batches go out at once; a partial one when the process pool would idle.
+            while len(downloaded) >= batch_size or (
+                downloaded and not any(stage == 'batch' for stage, _entries in in_flight.values())
+            ):
+                submit_extraction()
+            if not in_flight:
+                if exhausted and not pending:
+                    return
+                continue
+            done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+            for future in done:
+                stage, entries = in_flight.pop(future)
+                try:
+                    result = future.result()
+                except Exception as exc:
+                    for media_id, _url in entries:
+                        yield FeatureResult(media_id, error=exc)
+                    continue
+                if stage == 'download':
+                    (media_id, url), = entries
+                    data, size = result
+                    downloaded.append((media_id, url, data, size))
+                elif stage == 'batch':
+                    for (media_id, url), vector in zip(entries, result):
+                        if isinstance(vector, Exception):
+                            yield FeatureResult(media_id, error=vector)
+                        else:
+                            yield vector_ready(media_id, url, vector)
+                else:
+                    (media_id, url), = entries
+                    yield vector_ready(media_id, url, result)
+    finally:
+        for future in in_flight:
+            future.cancel()
+        downloads.shutdown(wait=True, cancel_futures=True)
+        if extracts is not None:
+            extracts.shutdown(wait=True, cancel_futures=True)
+        store(flush=True)
@@ -1,7 +1,7 @@
 """Load artifact and produce approve/reject + confidence."""
 
 from pathlib import Path
-from typing import Any, Dict, Tuple
+from typing import Any, Dict, List, Tuple
 
 import joblib
 import numpy as np
@@ -17,10 +17,17 @@ def predict_for_features(bundle: Dict[str, Any], feature_vector: np.ndarray) ->
     """
     Returns (predicted_review_type for MediaPrediction, confidence in [0,1]).
     """
+    return predict_for_feature_matrix(bundle, feature_vector.reshape(1, -1))[0]
+
+
+def predict_for_feature_matrix(bundle: Dict[str, Any], X: np.ndarray) -> List[Tuple[str, float]]:
+    """(predicted_review_type, confidence) per row of X, in one vectorized pipeline call."""
     pipe = bundle['pipeline']
-    x = feature_vector.reshape(1, -1)
-    proba = pipe.predict_proba(x)[0]
-    pred = int(pipe.predict(x)[0])
-    confidence = float(np.max(proba))
-    pred_type = MediaPrediction.APPROVED if pred == 1 else MediaPrediction.REJECTED
-    return pred_type, confidence
+    proba = pipe.predict_proba(X)
+    # Same as pipe.predict: the class with the highest probability.
+    preds = pipe.classes_[np.argmax(proba, axis=1)]
+    confidences = np.max(proba, axis=1)
+    return [
+        (MediaPrediction.APPROVED if int(pred) == 1 else MediaPrediction.REJECTED, float(confidence))
+        for pred, confidence in zip(preds, confidences)
+    ]
@@ -3,14 +3,17 @@
 from __future__ import annotations
 
 import logging
+import time
 from pathlib import Path
 from typing import Any, Optional, Tuple
 
+import numpy as np
 from django.conf import settings
 from django.db.models import QuerySet
 
-from media.first_assertion.features import extract_feature_vector_from_url
-from media.first_assertion.predict import load_bundle, predict_for_features
+from media.first_assertion.cache import default_feature_cache
+from media.first_assertion.pipeline import iter_feature_vectors
+from media.first_assertion.predict import load_bundle, predict_for_feature_matrix
 from media.models import MediaPrediction
 
 logger = logging.getLogger(__name__)
@@ -29,6 +32,24 @@ def resolve_artifact_path(
     return Path(settings.MEDIA_FIRST_ASSERTION_ARTIFACTS_DIR) / f'model-{safe}.joblib'
 
 
+def _write_predictions(rows: list[tuple[int, str, float]], model_version: str, features_version: str) -> None:
+    MediaPrediction.objects.bulk_create(
+        [
+            MediaPrediction(
+                media_id=media_id,
+                predicted_review_type=pred_type,
+                confidence=confidence,
+                model_version=model_version,
+                features_version=features_version,
+            )
+            for media_id, pred_type, confidence in rows
+        ],
+        update_conflicts=True,
+        unique_fields=['media'],
+        update_fields=['predicted_review_type', 'confidence', 'model_version', 'features_version', 'updated'],
+    )
+
+
 def infer_media_queryset(
     qs: QuerySet,
     *,
@@ -40,10 +61,22 @@ def infer_media_queryset(
     confidence_threshold: Optional[float] = None,
     progress_every: int = 0,
     stats: Optional[dict[str, Any]] = None,
+    download_workers: int = 1,
+    extract_workers: int = 0,
+    batch_size: int = 256,
+    resume: bool = False,
+    use_cache: bool = True,
 ) -> Tuple[int, int, str]:
     """
     For each Media row in qs, download URL, extract features, upsert MediaPrediction.
 
+    Downloads (``download_workers`` threads, paced per host) and feature extraction
+    (``extract_workers`` processes; 0 = on the download threads) are pipelined; every
+    ``batch_size`` feature rows are classified in one call and upserted in bulk.
+    With ``resume``, media already predicted by this model and features version are
+    skipped, so an interrupted ``--all`` run continues where it stopped. ``use_cache`` reads
+    and fills the on-disk image/feature cache (MEDIA_FIRST_ASSERTION_CACHE_DIR).
+
     Returns (n_ok, n_skip, resolved_model_version).
     """
     path = resolve_artifact_path(artifact_path=artifact_path, model_version=model_version)
@@ -66,32 +99,65 @@ def infer_media_queryset(
     if not requested_features_version:
         requested_features_version = bundle_features_version
 
+    if resume:
+        done = MediaPrediction.objects.filter(
+            model_version=resolved_version, features_version=requested_features_version,
+        ).values('media_id')
+        qs = qs.exclude(pk__in=done)
+
     n_ok = 0
     n_skip = 0
-    for i, media in enumerate(qs.order_by('id').iterator(chunk_size=50), start=1):
-        try:
-            vec = extract_feature_vector_from_url(media.url, features_version=requested_features_version)
-        except Exception as exc:
-            logger.warning('Skip media %s: %s', media.id, exc)
-            n_skip += 1
-            continue
-        pred_type, confidence = predict_for_features(bundle, vec)
-        if confidence_threshold is not None and confidence < confidence_threshold and stats is not None:
-            stats['below_threshold'] = int(stats.get('below_threshold', 0)) + 1
-
+    processed = 0
+    started = time.monotonic()
+    batch_ids: list[int] = []
+    batch_vectors: list[np.ndarray] = []
+
+    def flush() -> None:
+        nonlocal n_ok
+        if not batch_ids:
+            return
+        predictions = predict_for_feature_matrix(bundle, np.vstack(batch_vectors))
+        if confidence_threshold is not None and stats is not None:
+            below = sum(1 for _pred_type, confidence in predictions if confidence < confidence_threshold)
+            stats['below_threshold'] = int(stats.get('below_threshold', 0)) + below
         if not dry_run:
-            MediaPrediction.objects.update_or_create(
-                media=media,
-                defaults={
-                    'predicted_review_type': pred_type,
-                    'confidence': confidence,
-                    'model_version': resolved_version,
-                    'features_version': requested_features_version,
-                },
+            _write_predictions(
+                [(media_id, pred_type, confidence) for media_id, (pred_type, confidence) in zip(batch_ids, predictions)],
+                resolved_version,
+                requested_features_version,
             )
-        n_ok += 1
-
-        if progress_every and i % progress_every == 0:
-            logger.info('Inference progress: %s processed (ok=%s, skipped=%s)', i, n_ok, n_skip)
+        n_ok += len(batch_ids)
+        batch_ids.clear()
+        batch_vectors.clear()
+
+    items = qs.order_by('id').values_list('id', 'url').iterator(chunk_size=500)
+    for result in iter_feature_vectors(
+        items,
+        features_version=requested_features_version,
+        download_workers=download_workers,
+        extract_workers=extract_workers,
+        cache=default_feature_cache(requested_features_version) if use_cache else None,
+    ):
+        processed += 1
+        if result.error is not None:
+            logger.warning('Skip media %s: %s', result.media_id, result.error)
+            n_skip += 1
+        else:
+            batch_ids.append(result.media_id)
+            batch_vectors.append(result.vector)
+            if len(batch_ids) >= batch_size:
+                flush()
+
+        if progress_every and processed % progress_every == 0:
+            elapsed = time.monotonic() - started
+            logger.info(
+                'Inference progress: %s processed (ok=%s, skipped=%s, %.1f images/s)',
+                processed, n_ok + len(batch_ids), n_skip, processed / elapsed if elapsed else 0.0,
+            )
+    flush()
 
+    if stats is not None:
+        elapsed = time.monotonic() - started
+        stats['elapsed_seconds'] = elapsed
+        stats['images_per_second'] = processed / elapsed if elapsed else 0.0
     return n_ok, n_skip, resolved_version
@@ -5,6 +5,8 @@ Examples:
   python manage.py infer_media_first_assertions --model-version first_assertion_v1 --only-missing
   python manage.py infer_media_first_assertions --model-version first_assertion_v1 --only-unreviewed --limit 500
   python manage.py infer_media_first_assertions --artifact-path /path/to/model.joblib --media-id 123
+  python manage.py infer_media_first_assertions --model-version first_assertion_v1 --all --resume \
+      --download-workers 16 --extract-workers 4
 """
 from django.core.management.base import BaseCommand, CommandError
 from django.db.models import Exists, OuterRef
@@ -60,7 +62,7 @@ class Command(BaseCommand):
             '--features-version',
             type=str,
             default=None,
-            choices=['handcrafted_v1', 'handcrafted_v2', 'handcrafted_v2_yolo'],
+            choices=['handcrafted_v1', 'handcrafted_v2', 'handcrafted_v2_yolo2'],
             help='Override features version for extraction (default: whatever the model bundle says).',
         )
         parser.add_argument(
@@ -85,6 +87,34 @@ class Command(BaseCommand):
             default=50,
             help='Log progress every N processed images (0 disables).',
         )
+        parser.add_argument(
+            '--download-workers',
+            type=int,
+            default=8,
+            help='Concurrent image downloads (paced per host; default: 8).',
+        )
+        parser.add_argument(
+            '--extract-workers',
+            type=int,
+            default=0,
+            help='Feature extraction processes (0 = extract on the download threads).',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=256,
+            help='Images per model call and per bulk upsert (default: 256).',
+        )
+        parser.add_argument(
+            '--resume',
+            action='store_true',
+            help='Skip media already predicted by this model and features version.',
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Do not read or fill the image/feature cache (MEDIA_FIRST_ASSERTION_CACHE_DIR).',
+        )
 
     def handle(self, *args, **options):
         artifact_path = options['artifact_path']
@@ -147,6 +177,11 @@ class Command(BaseCommand):
             confidence_threshold=options['confidence_threshold'],
             progress_every=max(0, int(options['progress_every'] or 0)),
             stats=stats,
+            download_workers=options['download_workers'],
+            extract_workers=options['extract_workers'],
+            batch_size=max(1, options['batch_size']),
+            resume=options['resume'],
+            use_cache=not options['no_cache'],
         )
 
         below = int(stats.get('below_threshold', 0))
@@ -154,6 +189,9 @@ class Command(BaseCommand):
             self.stdout.write(self.style.SUCCESS(f'Dry run: computed predictions for {n_ok} media (skipped {n_skip}).'))
         else:
             self.stdout.write(self.style.SUCCESS(f'Upserted predictions for {n_ok} media (skipped {n_skip}).'))
+        self.stdout.write(
+            f'{stats["elapsed_seconds"]:.1f}s, {stats["images_per_second"]:.1f} images/s'
+        )
         if options['confidence_threshold'] is not None:
             self.stdout.write(
                 self.style.NOTICE(
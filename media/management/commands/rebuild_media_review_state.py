@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from media.review_state import rebuild_media_review_state
+
+
+class Command(BaseCommand):
+    help = (
+        'Recompute the review columns on Media and the MediaReviewSummary table from MediaReview. '
+        'Run after bulk media or review changes that bypass signals (QuerySet.update, raw SQL).'
+    )
+
+    def handle(self, *args, **options):
+        summaries = rebuild_media_review_state()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {summaries} media review summaries.'))
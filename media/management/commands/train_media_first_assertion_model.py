@@ -3,6 +3,9 @@ Train a lightweight logistic model on handcrafted image features from reviewed i
 
 Example:
   python manage.py train_media_first_assertion_model --model-version first_assertion_v1
+
+Downloaded images and feature vectors are cached under MEDIA_FIRST_ASSERTION_CACHE_DIR, so
+retraining on the same --features-version skips downloading and decoding.
 """
 import logging
 from pathlib import Path
@@ -12,13 +15,14 @@ from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
 
 from media.first_assertion import DEFAULT_FEATURES_VERSION
+from media.first_assertion.cache import default_feature_cache
 from media.first_assertion.features import (
-    extract_feature_vector_from_url,
     ensure_feature_extractor_dependencies,
     feature_dim,
     feature_names,
 )
 from media.first_assertion.labels import binary_training_label, queryset_labeled_image_media
+from media.first_assertion.pipeline import iter_feature_vectors
 from media.first_assertion.train import save_artifact, train_pipeline
 
 logger = logging.getLogger(__name__)
@@ -62,7 +66,7 @@ class Command(BaseCommand):
             '--features-version',
             type=str,
             default=DEFAULT_FEATURES_VERSION,
-            choices=['handcrafted_v1', 'handcrafted_v2', 'handcrafted_v2_yolo'],
+            choices=['handcrafted_v1', 'handcrafted_v2', 'handcrafted_v2_yolo2'],
             help='Feature extraction version (must match inference).',
         )
         parser.add_argument(
@@ -71,6 +75,23 @@ class Command(BaseCommand):
             default=10,
             help='Minimum positives and negatives required after filtering.',
         )
+        parser.add_argument(
+            '--download-workers',
+            type=int,
+            default=8,
+            help='Concurrent image downloads (paced per host; default: 8).',
+        )
+        parser.add_argument(
+            '--extract-workers',
+            type=int,
+            default=0,
+            help='Feature extraction processes (0 = extract on the download threads).',
+        )
+        parser.add_argument(
+            '--no-cache',
+            action='store_true',
+            help='Do not read or fill the image/feature cache (MEDIA_FIRST_ASSERTION_CACHE_DIR).',
+        )
 
     def handle(self, *args, **options):
         out_dir = Path(options['output_dir'] or settings.MEDIA_FIRST_ASSERTION_ARTIFACTS_DIR)
@@ -102,29 +123,42 @@ class Command(BaseCommand):
                 )
             )
 
-        X_list = []
-        y_list = []
+        labels = {}
         skipped = 0
-        for i, media in enumerate(qs.iterator(chunk_size=50), start=1):
+        for media in qs.iterator(chunk_size=50):
             y = binary_training_label(media)
             if y is None:
                 skipped += 1
             else:
-                try:
-                    vec = extract_feature_vector_from_url(media.url, features_version=features_version)
-                except Exception as exc:
-                    logger.warning('Skip media %s: %s', media.id, exc)
-                    skipped += 1
-                else:
-                    if vec.shape[0] != feature_dim(features_version):
-                        skipped += 1
-                    else:
-                        X_list.append(vec)
-                        y_list.append(y)
+                labels[media.id] = (media.url, y)
+
+        vectors = {}
+        dim = feature_dim(features_version)
+        for i, result in enumerate(
+            iter_feature_vectors(
+                [(media_id, url) for media_id, (url, _y) in labels.items()],
+                features_version=features_version,
+                download_workers=options['download_workers'],
+                extract_workers=options['extract_workers'],
+                cache=None if options['no_cache'] else default_feature_cache(features_version),
+            ),
+            start=skipped + 1,
+        ):
+            if result.error is not None:
+                logger.warning('Skip media %s: %s', result.media_id, result.error)
+                skipped += 1
+            elif result.vector.shape[0] != dim:
+                skipped += 1
+            else:
+                vectors[result.media_id] = result.vector
             self._feature_progress(
-                i, total, len(y_list), skipped, use_tty_progress, verbosity, milestone
+                i, total, len(vectors), skipped, use_tty_progress, verbosity, milestone
             )
 
+        # Results arrive out of order; keep the media id order so training is reproducible.
+        X_list = [vectors[media_id] for media_id in sorted(vectors)]
+        y_list = [labels[media_id][1] for media_id in sorted(vectors)]
+
         if use_tty_progress:
             self.stdout.write('')
         elif verbosity >= 1 and total:
@@ -0,0 +1,78 @@
+"""
+Compare single-image and batched YOLO bird detection throughput on CPU.
+
+Needs MEDIA_YOLO_ONNX_PATH. Batches only run in one call when the ONNX export has a
+dynamic batch axis (e.g. yolov5 ``export.py --dynamic``); fixed-batch exports are chunked.
+
+Example:
+  python manage.py yolo_benchmark --images 128 --batch-size 16
+"""
+import time
+
+import numpy as np
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from media.first_assertion.feature_extraction.yolo import _RUNNER, yolo_bird_features, yolo_bird_features_batch
+from media.first_assertion.features import ensure_feature_extractor_dependencies
+
+
+class Command(BaseCommand):
+    help = 'Benchmark YOLO bird detection: images/sec of the single-image vs the batched path.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--images', type=int, default=64, help='Synthetic images per run')
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Images per batched call (default: MEDIA_YOLO_BATCH_SIZE)',
+        )
+        parser.add_argument('--repeat', type=int, default=3, help='Timed runs per path (best is reported)')
+
+    def handle(self, *args, **options):
+        try:
+            ensure_feature_extractor_dependencies('handcrafted_v2_yolo2')
+        except ModuleNotFoundError as exc:
+            raise CommandError(str(exc)) from exc
+        batch_size = options['batch_size'] or int(getattr(settings, 'MEDIA_YOLO_BATCH_SIZE', 16))
+        if options['images'] < 1 or batch_size < 1:
+            raise CommandError('--images and --batch-size must be positive.')
+
+        rng = np.random.default_rng(0)
+        shapes = [(384, 512), (512, 512), (512, 341), (288, 512)]
+        images = [
+            rng.integers(0, 256, size=shapes[i % len(shapes)] + (3,), dtype=np.uint8)
+            for i in range(options['images'])
+        ]
+
+        _RUNNER.configure()
+        self.stdout.write(f'Backend: {_RUNNER._backend}, fixed batch: {_RUNNER._ort_batch or "no"}')
+        yolo_bird_features(images[0])  # warm-up
+
+        def single():
+            return [yolo_bird_features(img) for img in images]
+
+        def batched():
+            results = []
+            for start in range(0, len(images), batch_size):
+                results.extend(yolo_bird_features_batch(images[start:start + batch_size]))
+            return results
+
+        rates = {}
+        outputs = {}
+        for label, fn in (('single', single), (f'batch of {batch_size}', batched)):
+            best = None
+            for _ in range(max(1, options['repeat'])):
+                started = time.perf_counter()
+                outputs[label] = fn()
+                elapsed = time.perf_counter() - started
+                best = elapsed if best is None else min(best, elapsed)
+            rates[label] = len(images) / best
+            self.stdout.write(f'{label:<16}{rates[label]:>10.1f} images/s')
+
+        single_out, batch_out = outputs.values()
+        max_diff = max(abs(a.bird_max_conf - b.bird_max_conf) for a, b in zip(single_out, batch_out))
+        self.stdout.write(f'Max confidence difference between paths: {max_diff:.2e}')
+        single_rate, batch_rate = rates.values()
+        self.stdout.write(self.style.SUCCESS(f'Speed-up: {batch_rate / single_rate:.2f}x'))
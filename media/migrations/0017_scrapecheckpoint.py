@@ -0,0 +1,34 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jizz', '0135_prepared_question'),
+        ('media', '0016_media_species_type_hide_idx'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ScrapeCheckpoint',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('run_key', models.CharField(help_text='Country and sources of the run, e.g. NL:flickr,xeno_canto', max_length=255)),
+                ('media_type', models.CharField(choices=[('image', 'Image'), ('video', 'Video'), ('audio', 'Audio')], max_length=200)),
+                ('status', models.CharField(choices=[('done', 'Done'), ('failed', 'Failed')], max_length=20)),
+                ('added', models.PositiveIntegerField(default=0)),
+                ('error', models.TextField(blank=True, default='')),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('species', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='scrape_checkpoints', to='jizz.species')),
+            ],
+            options={
+                'verbose_name': 'Scrape checkpoint',
+                'verbose_name_plural': 'Scrape checkpoints',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='scrapecheckpoint',
+            constraint=models.UniqueConstraint(fields=('run_key', 'species', 'media_type'), name='scrape_checkpoint_unique_unit'),
+        ),
+    ]
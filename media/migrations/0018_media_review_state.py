@@ -0,0 +1,104 @@
+# Review columns on Media and per-(species, media type) review summaries (media.review_state)
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+BACKFILL_MEDIA = """
+UPDATE media_media m
+SET approved_reviews = r.approved,
+    rejected_reviews = r.rejected,
+    not_sure_reviews = r.not_sure,
+    review_status = r.latest
+FROM (
+    SELECT media_id,
+           count(*) FILTER (WHERE review_type = 'approved') AS approved,
+           count(*) FILTER (WHERE review_type = 'rejected') AS rejected,
+           count(*) FILTER (WHERE review_type = 'not_sure') AS not_sure,
+           (array_agg(review_type ORDER BY id DESC))[1] AS latest
+    FROM media_mediareview
+    GROUP BY media_id
+) r
+WHERE r.media_id = m.id
+"""
+
+BACKFILL_SUMMARIES = """
+INSERT INTO media_mediareviewsummary
+    (species_id, media_type, total, reviewed, approved, rejected, not_sure, eligible, updated)
+SELECT species_id,
+       type,
+       count(*),
+       count(*) FILTER (WHERE review_status IS NOT NULL),
+       count(*) FILTER (WHERE approved_reviews > 0),
+       count(*) FILTER (WHERE rejected_reviews > 0),
+       count(*) FILTER (WHERE not_sure_reviews > 0),
+       CASE
+           WHEN count(*) FILTER (WHERE NOT hide AND approved_reviews > 0) > 0
+           THEN count(*) FILTER (WHERE NOT hide AND approved_reviews > 0)
+           ELSE count(*) FILTER (WHERE NOT hide AND rejected_reviews = 0)
+       END,
+       now()
+FROM media_media
+GROUP BY species_id, type
+"""
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('jizz', '0139_question_pool'),
+        ('media', '0017_scrapecheckpoint'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='media',
+            name='review_status',
+            field=models.CharField(
+                blank=True,
+                choices=[('approved', 'Approved'), ('rejected', 'Rejected'), ('not_sure', 'Not Sure')],
+                help_text='Review type of the latest review; empty when not reviewed.',
+                max_length=20,
+                null=True,
+            ),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='approved_reviews',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='rejected_reviews',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='media',
+            name='not_sure_reviews',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='MediaReviewSummary',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('media_type', models.CharField(choices=[('image', 'Image'), ('video', 'Video'), ('audio', 'Audio')], max_length=200)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('reviewed', models.PositiveIntegerField(default=0)),
+                ('approved', models.PositiveIntegerField(default=0)),
+                ('rejected', models.PositiveIntegerField(default=0)),
+                ('not_sure', models.PositiveIntegerField(default=0)),
+                ('eligible', models.PositiveIntegerField(default=0)),
+                ('updated', models.DateTimeField(auto_now=True)),
+                ('species', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='media_review_summaries', to='jizz.species')),
+            ],
+            options={
+                'verbose_name': 'Media review summary',
+                'verbose_name_plural': 'Media review summaries',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='mediareviewsummary',
+            constraint=models.UniqueConstraint(fields=('species', 'media_type'), name='media_review_summary_unique_species_type'),
+        ),
+        migrations.RunSQL(BACKFILL_MEDIA, migrations.RunSQL.noop),
+        migrations.RunSQL(BACKFILL_SUMMARIES, migrations.RunSQL.noop),
+    ]
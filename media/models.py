@@ -18,6 +18,12 @@ MEDIA_TYPES = [
     ('audio', 'Audio'),
 ]
 
+REVIEW_TYPES = [
+    ('approved', 'Approved'),
+    ('rejected', 'Rejected'),
+    ('not_sure', 'Not Sure'),
+]
+
 
 class Media(models.Model):
     """Model for storing image files related to species."""
@@ -38,22 +44,55 @@ class Media(models.Model):
     updated = models.DateTimeField(auto_now=True)
     type = models.CharField(max_length=200, choices=MEDIA_TYPES, blank=True, default='image')
 
+    # Review state, maintained from MediaReview by media.review_state (do not edit by hand).
+    review_status = models.CharField(
+        max_length=20,
+        choices=REVIEW_TYPES,
+        null=True,
+        blank=True,
+        help_text='Review type of the latest review; empty when not reviewed.',
+    )
+    approved_reviews = models.PositiveIntegerField(default=0)
+    rejected_reviews = models.PositiveIntegerField(default=0)
+    not_sure_reviews = models.PositiveIntegerField(default=0)
+
     class Meta:
         verbose_name = 'Media'
         verbose_name_plural = 'Media'
         ordering = ['-created']
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Review summary bucket as loaded, so moving media to another species/type refreshes both.
+        instance._loaded_summary_key = (instance.__dict__.get('species_id'), instance.__dict__.get('type'))
+        instance._loaded_playable_state = instance.playable_state()
+        return instance
+
+    def playable_state(self):
+        """Fields the playable-species index reads (species, type, hide, approved/rejected)."""
+        values = self.__dict__
+        return (
+            values.get('species_id'),
+            values.get('type'),
+            values.get('hide'),
+            bool(values.get('approved_reviews')),
+            bool(values.get('rejected_reviews')),
+        )
+
     def __str__(self):
         return f"{self.species.name} - {self.type} ({self.id})"
 
+    @property
+    def is_reviewed(self):
+        return bool(self.approved_reviews or self.rejected_reviews or self.not_sure_reviews)
+
     @property
     def effective_review_status(self):
         """Latest review as 'approved' or 'rejected' (not_sure counts as rejected). None if no reviews."""
-        reviews = list(self.reviews.all())
-        if not reviews:
+        if not self.review_status:
             return None
-        latest = max(reviews, key=lambda r: r.id)
-        if latest.review_type == MediaReview.APPROVED:
+        if self.review_status == MediaReview.APPROVED:
             return 'approved'
         return 'rejected'
 
@@ -63,11 +102,7 @@ class MediaReview(models.Model):
     APPROVED = 'approved'
     REJECTED = 'rejected'
     NOT_SURE = 'not_sure'
-    REVIEW_CHOICES = [
-        (APPROVED, 'Approved'),
-        (REJECTED, 'Rejected'),
-        (NOT_SURE, 'Not Sure'),
-    ]
+    REVIEW_CHOICES = REVIEW_TYPES
 
     media = models.ForeignKey(
         Media,
@@ -117,7 +152,8 @@ class MediaReview(models.Model):
         # Set media to hidden when rejected
         if self.review_type == self.REJECTED:
             self.media.hide = True
-        self.media.save()
+        # Only hide: the review columns on Media are recounted after the review is saved.
+        self.media.save(update_fields=['hide', 'updated'])
         return super().save(*args, **kwargs)
 
     @property
@@ -129,6 +165,44 @@ class MediaReview(models.Model):
         return f"{self.get_review_type_display()} for {self.media} by {reviewer}"
 
 
+class MediaReviewSummary(models.Model):
+    """
+    Review counts of one species' media of one type, maintained by media.review_state.
+    ``approved``/``rejected``/``not_sure`` count media with at least one such review;
+    ``eligible`` is the number of media games may use (see ``media.review_state``).
+    """
+    species = models.ForeignKey(
+        'jizz.Species',
+        on_delete=models.CASCADE,
+        related_name='media_review_summaries',
+    )
+    media_type = models.CharField(max_length=200, choices=MEDIA_TYPES)
+    total = models.PositiveIntegerField(default=0)
+    reviewed = models.PositiveIntegerField(default=0)
+    approved = models.PositiveIntegerField(default=0)
+    rejected = models.PositiveIntegerField(default=0)
+    not_sure = models.PositiveIntegerField(default=0)
+    eligible = models.PositiveIntegerField(default=0)
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Media review summary'
+        verbose_name_plural = 'Media review summaries'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['species', 'media_type'],
+                name='media_review_summary_unique_species_type',
+            ),
+        ]
+
+    @property
+    def unreviewed(self):
+        return self.total - self.reviewed
+
+    def __str__(self):
+        return f"{self.media_type} reviews for species {self.species_id}: {self.reviewed}/{self.total}"
+
+
 class FlagMedia(models.Model):
     """Model for flagging problematic media items."""
     media = models.ForeignKey(
@@ -184,4 +258,38 @@ class MediaPrediction(models.Model):
         verbose_name_plural = 'Media predictions'
 
     def __str__(self):
-        return f"{self.predicted_review_type} ({self.model_version}) for {self.media_id}"
\ No newline at end of file
+        return f"{self.predicted_review_type} ({self.model_version}) for {self.media_id}"
+
+class ScrapeCheckpoint(models.Model):
+    """Progress of a media scrape run per species and media type, so interrupted runs resume."""
+    DONE = 'done'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (DONE, 'Done'),
+        (FAILED, 'Failed'),
+    ]
+
+    run_key = models.CharField(max_length=255, help_text='Country and sources of the run, e.g. NL:flickr,xeno_canto')
+    species = models.ForeignKey(
+        'jizz.Species',
+        related_name='scrape_checkpoints',
+        on_delete=models.CASCADE,
+    )
+    media_type = models.CharField(max_length=200, choices=MEDIA_TYPES)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES)
+    added = models.PositiveIntegerField(default=0)
+    error = models.TextField(blank=True, default='')
+    updated = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        verbose_name = 'Scrape checkpoint'
+        verbose_name_plural = 'Scrape checkpoints'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['run_key', 'species', 'media_type'],
+                name='scrape_checkpoint_unique_unit',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.run_key} {self.species_id} {self.media_type}: {self.status}"
@@ -0,0 +1,156 @@
+"""
+Denormalized media review state.
+
+Each ``Media`` row carries the type of its latest review (``review_status``) and one
+counter per review type; each (species, media type) has a ``MediaReviewSummary`` with
+the media counts the review dashboards show and the number of media games may use.
+
+Eligibility for games: approved media (at least one approved review) when a species has
+any, otherwise every media item without a rejection; hidden media never count.
+``eligible_media_list`` and ``count_eligible_media`` are the only implementations of that
+rule; querysets use ``APPROVED_Q`` / ``REJECTED_Q``.
+
+``refresh_media_review_state`` runs in the transaction of every MediaReview save or
+delete (``jizz.signals``); Media saves, deletes and bulk hide/show refresh only the
+summary. ``manage.py rebuild_media_review_state`` recomputes everything.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable
+
+from django.db import transaction
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery, Value
+from django.db.models.functions import Coalesce
+
+from media.models import Media, MediaReview, MediaReviewSummary
+
+APPROVED_Q = Q(approved_reviews__gt=0)
+REJECTED_Q = Q(rejected_reviews__gt=0)
+
+_REVIEW_COUNTERS = {
+    'approved_reviews': MediaReview.APPROVED,
+    'rejected_reviews': MediaReview.REJECTED,
+    'not_sure_reviews': MediaReview.NOT_SURE,
+}
+
+
+def eligible_media_list(media_rows: Iterable[Media]) -> list[Media]:
+    """Eligible media among one species' visible media of one type, ordered by id."""
+    rows = list(media_rows)
+    approved = [m for m in rows if m.approved_reviews]
+    if approved:
+        return sorted(approved, key=lambda m: m.id)
+    return sorted((m for m in rows if not m.rejected_reviews), key=lambda m: m.id)
+
+
+def count_eligible_media(species_id: int, media_type: str) -> int:
+    return (
+        MediaReviewSummary.objects.filter(species_id=species_id, media_type=media_type)
+        .values_list('eligible', flat=True)
+        .first()
+    ) or 0
+
+
+def _review_count(review_type: str):
+    counts = (
+        MediaReview.objects.filter(media_id=OuterRef('pk'), review_type=review_type)
+        .order_by()
+        .values('media_id')
+        .annotate(n=Count('id'))
+        .values('n')
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), Value(0))
+
+
+def _review_state_fields() -> dict:
+    latest = MediaReview.objects.filter(media_id=OuterRef('pk')).order_by('-id').values('review_type')[:1]
+    fields = {field: _review_count(review_type) for field, review_type in _REVIEW_COUNTERS.items()}
+    fields['review_status'] = Subquery(latest)
+    return fields
+
+
+def _summary_aggregates() -> dict:
+    visible = Q(hide=False)
+    return {
+        'total': Count('id'),
+        'reviewed': Count('id', filter=Q(review_status__isnull=False)),
+        'approved': Count('id', filter=APPROVED_Q),
+        'rejected': Count('id', filter=REJECTED_Q),
+        'not_sure': Count('id', filter=Q(not_sure_reviews__gt=0)),
+        'visible_approved': Count('id', filter=visible & APPROVED_Q),
+        'visible_unrejected': Count('id', filter=visible & ~REJECTED_Q),
+    }
+
+
+def _summary(species_id: int, media_type: str, row: dict) -> MediaReviewSummary:
+    return MediaReviewSummary(
+        species_id=species_id,
+        media_type=media_type,
+        total=row['total'],
+        reviewed=row['reviewed'],
+        approved=row['approved'],
+        rejected=row['rejected'],
+        not_sure=row['not_sure'],
+        eligible=row['visible_approved'] or row['visible_unrejected'],
+    )
+
+
+def _store_summaries(summaries: list[MediaReviewSummary]) -> None:
+    MediaReviewSummary.objects.bulk_create(
+        summaries,
+        update_conflicts=True,
+        unique_fields=['species', 'media_type'],
+        update_fields=['total', 'reviewed', 'approved', 'rejected', 'not_sure', 'eligible', 'updated'],
+    )
+
+
+def refresh_review_summary(species_id: int, media_type: str) -> None:
+    """Recount one (species, media type) summary from the Media review columns."""
+    row = Media.objects.filter(species_id=species_id, type=media_type).aggregate(**_summary_aggregates())
+    if not row['total']:
+        MediaReviewSummary.objects.filter(species_id=species_id, media_type=media_type).delete()
+        return
+    _store_summaries([_summary(species_id, media_type, row)])
+
+
+def refresh_review_summaries(keys: Iterable[tuple[int, str]]) -> None:
+    """Refresh after bulk media updates (``QuerySet.update`` skips signals)."""
+    for species_id, media_type in sorted(set(keys)):
+        refresh_review_summary(species_id, media_type)
+
+
+def _eligibility_flags(row: dict) -> tuple[bool, bool]:
+    return bool(row['approved_reviews']), bool(row['rejected_reviews'])
+
+
+@transaction.atomic
+def refresh_media_review_state(media_id: int) -> tuple[int, bool] | None:
+    """
+    Recount one media item's reviews (row locked), then its species summary. Returns
+    ``(species_id, eligibility_changed)``, where the flag tells whether the item became or
+    stopped being approved or rejected; None when the media item is gone.
+    """
+    media = (
+        Media.objects.select_for_update()
+        .filter(pk=media_id)
+        .values('species_id', 'type', 'approved_reviews', 'rejected_reviews')
+        .first()
+    )
+    if media is None:
+        return None
+    Media.objects.filter(pk=media_id).update(**_review_state_fields())
+    refresh_review_summary(media['species_id'], media['type'])
+    after = Media.objects.filter(pk=media_id).values('approved_reviews', 'rejected_reviews').get()
+    return media['species_id'], _eligibility_flags(after) != _eligibility_flags(media)
+
+
+@transaction.atomic
+def rebuild_media_review_state() -> int:
+    """Recompute every Media review column and summary row; returns the number of summaries."""
+    Media.objects.update(**_review_state_fields())
+    rows = Media.objects.order_by().values('species_id', 'type').annotate(**_summary_aggregates())
+    summaries = [_summary(row['species_id'], row['type'], row) for row in rows]
+    MediaReviewSummary.objects.all().delete()
+    MediaReviewSummary.objects.bulk_create(summaries, batch_size=1000)
+    return len(summaries)
@@ -0,0 +1,257 @@
+"""
+Concurrent, resumable media scraping for a list of species.
+
+Work is split into units of (species, media type). Each unit fans out into one HTTP task
+per source, run on a bounded thread pool; every source has a ``TokenBucket`` shared by all
+workers so its rate limit holds regardless of the pool size. Workers only talk HTTP (each
+thread keeps its own scraper instances, since ``requests.Session`` is not thread-safe).
+The calling thread merges a unit's results once all of its sources answered, inserts the
+best items with one ``bulk_create`` and records a ``ScrapeCheckpoint`` in the same
+transaction. A rerun with the same ``run_key`` skips units already done.
+"""
+from __future__ import annotations
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.db import transaction
+from django.db.models import Count
+
+from jizz.playable_species_index import refresh_playable_species
+from media.models import Media, ScrapeCheckpoint
+from media.review_state import refresh_review_summary
+from media.scrapers.base import BaseMediaScraper
+from media.scrapers.eol import EOLScraper
+from media.scrapers.flickr import FlickrScraper
+from media.scrapers.gbif import GBIFScraper
+from media.scrapers.inaturalist import iNaturalistScraper
+from media.scrapers.observation import ObservationScraper
+from media.scrapers.rate_limit import TokenBucket
+from media.scrapers.wikimedia import WikimediaScraper
+from media.scrapers.xeno_canto import XenoCantoScraper
+from media.scrapers.youtube import YouTubeScraper
+from media.utils import normalize_contributor, parse_copyright, safe_truncate
+
+logger = logging.getLogger(__name__)
+
+# Maximum items per media type per species
+MAX_ITEMS_PER_TYPE = 50
+
+SCRAPER_CLASSES: Dict[str, Callable[[], BaseMediaScraper]] = {
+    'xeno_canto': XenoCantoScraper,
+    'inaturalist': iNaturalistScraper,
+    'wikimedia': WikimediaScraper,
+    'gbif': GBIFScraper,
+    'flickr': FlickrScraper,
+    'eol': EOLScraper,
+    'observation': ObservationScraper,
+    'youtube': YouTubeScraper,
+}
+
+# Sources per media type, and the ``media_type`` argument their search_species expects.
+SOURCES_BY_MEDIA_TYPE = {
+    'audio': ['xeno_canto'],
+    'image': ['inaturalist', 'wikimedia', 'gbif', 'flickr', 'eol', 'observation'],
+    'video': ['wikimedia', 'inaturalist', 'youtube', 'eol'],
+}
+SEARCH_MEDIA_TYPE = {
+    ('inaturalist', 'image'): 'photos',
+    ('wikimedia', 'image'): 'images',
+    ('eol', 'image'): 'images',
+    ('inaturalist', 'video'): 'videos',
+    ('wikimedia', 'video'): 'videos',
+    ('eol', 'video'): 'videos',
+}
+
+
+def make_run_key(country_code: str, sources: Iterable[str]) -> str:
+    return f"{country_code}:{','.join(sorted(sources))}"
+
+
+@dataclass
+class UnitResult:
+    """Outcome of one (species, media type) unit."""
+    species: object
+    media_type: str
+    added_by_source: Dict[str, int] = field(default_factory=dict)
+    skipped: bool = False
+    error: str = ''
+
+    @property
+    def added(self) -> int:
+        return sum(self.added_by_source.values())
+
+
+class ScrapeEngine:
+    """
+    Scrape ``media_types`` for ``species`` from ``sources`` with ``workers`` threads.
+
+    ``scraper_factories`` and ``rates`` (requests per second per source) default to the
+    real scrapers and their ``rate_limit_delay``; tests point them at a local stub.
+    """
+
+    def __init__(
+        self,
+        run_key: str,
+        sources: Iterable[str],
+        media_types: Iterable[str],
+        workers: int = 4,
+        max_items: int = MAX_ITEMS_PER_TYPE,
+        scraper_factories: Optional[Dict[str, Callable[[], BaseMediaScraper]]] = None,
+        rates: Optional[Dict[str, float]] = None,
+    ):
+        self.run_key = run_key
+        self.sources = list(sources)
+        self.media_types = list(media_types)
+        self.workers = max(1, workers)
+        self.max_items = max_items
+        self.scraper_factories = {**SCRAPER_CLASSES, **(scraper_factories or {})}
+        self.rates = rates or {}
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._buckets_lock = threading.Lock()
+        self._local = threading.local()
+
+    def reset(self) -> int:
+        """Forget the checkpoints of this run so every unit is scraped again."""
+        deleted, _ = ScrapeCheckpoint.objects.filter(run_key=self.run_key).delete()
+        return deleted
+
+    def _bucket(self, source: str, scraper: BaseMediaScraper) -> TokenBucket:
+        # Workers build their scrapers concurrently; all of them must get the same bucket.
+        with self._buckets_lock:
+            if source not in self._buckets:
+                rate = self.rates.get(source)
+                if rate is None:
+                    rate = 1.0 / scraper.rate_limit_delay if scraper.rate_limit_delay > 0 else 1000.0
+                self._buckets[source] = TokenBucket(rate)
+            return self._buckets[source]
+
+    def _scraper(self, source: str) -> BaseMediaScraper:
+        scrapers = getattr(self._local, 'scrapers', None)
+        if scrapers is None:
+            scrapers = self._local.scrapers = {}
+        if source not in scrapers:
+            scraper = self.scraper_factories[source]()
+            scraper.rate_limiter = self._bucket(source, scraper)
+            scrapers[source] = scraper
+        return scrapers[source]
+
+    def _fetch(self, species, source: str, media_type: str) -> List[Dict]:
+        scraper = self._scraper(source)
+        search_type = SEARCH_MEDIA_TYPE.get((source, media_type))
+        if search_type:
+            items = scraper.search_species(species.name_latin, species.name, media_type=search_type)
+        else:
+            items = scraper.search_species(species.name_latin, species.name)
+        for item in items:
+            item.setdefault('source', source)
+        return items
+
+    def _pending_units(self, species_list: List) -> tuple[list, list]:
+        """Split units into those to scrape and those done already or at the item limit."""
+        species_ids = [species.pk for species in species_list]
+        done = set(
+            ScrapeCheckpoint.objects.filter(
+                run_key=self.run_key, species_id__in=species_ids, status=ScrapeCheckpoint.DONE,
+            ).values_list('species_id', 'media_type')
+        )
+        full = {
+            (row['species_id'], row['type'])
+            for row in Media.objects.filter(species_id__in=species_ids, type__in=self.media_types)
+            .values('species_id', 'type').annotate(n=Count('id')).filter(n__gte=self.max_items)
+        }
+        pending, skipped = [], []
+        for species in species_list:
+            for media_type in self.media_types:
+                if not [s for s in SOURCES_BY_MEDIA_TYPE[media_type] if s in self.sources]:
+                    continue
+                key = (species.pk, media_type)
+                (skipped if key in done or key in full else pending).append((species, media_type))
+        return pending, skipped
+
+    def run(self, species: Iterable, on_result: Optional[Callable[[UnitResult], None]] = None) -> List[UnitResult]:
+        species_list = list(species)
+        pending, skipped = self._pending_units(species_list)
+        results = [UnitResult(species=s, media_type=t, skipped=True) for s, t in skipped]
+        for result in results:
+            if on_result:
+                on_result(result)
+
+        collected: Dict[tuple, Dict] = {}
+        with ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='media-scrape') as pool:
+            futures = {}
+            for species_obj, media_type in pending:
+                unit_sources = [s for s in SOURCES_BY_MEDIA_TYPE[media_type] if s in self.sources]
+                collected[(species_obj.pk, media_type)] = {
+                    'species': species_obj, 'waiting': len(unit_sources), 'items': [], 'errors': [],
+                }
+                for source in unit_sources:
+                    future = pool.submit(self._fetch, species_obj, source, media_type)
+                    futures[future] = (species_obj.pk, media_type, source)
+
+            for future in as_completed(futures):
+                species_id, media_type, source = futures[future]
+                unit = collected[(species_id, media_type)]
+                try:
+                    unit['items'].extend(future.result())
+                except Exception as e:
+                    logger.exception(f"Error scraping {source} {media_type} for species {species_id}")
+                    unit['errors'].append(f"{source}: {e}")
+                unit['waiting'] -= 1
+                if unit['waiting']:
+                    continue
+                del collected[(species_id, media_type)]
+                result = self._store(unit['species'], media_type, unit['items'], unit['errors'])
+                results.append(result)
+                if on_result:
+                    on_result(result)
+        return results
+
+    def _store(self, species, media_type: str, items: List[Dict], errors: List[str]) -> UnitResult:
+        """Insert the best new items of a unit and checkpoint it, in one transaction."""
+        result = UnitResult(species=species, media_type=media_type, error='; '.join(errors))
+        items = sorted(items, key=lambda x: x.get('quality_score', 0), reverse=True)
+        with transaction.atomic():
+            existing = set(Media.objects.filter(species=species, type=media_type).values_list('source', 'link'))
+            needed = self.max_items - len(existing)
+            rows = []
+            for item in items:
+                if len(rows) >= needed:
+                    break
+                key = (item.get('source', 'unknown'), item.get('link'))
+                if key in existing:
+                    continue
+                existing.add(key)
+                copyright_text = safe_truncate(item.get('copyright_text'), 500)
+                copyright_standardized, non_commercial_only = parse_copyright(copyright_text)
+                rows.append(Media(
+                    species=species,
+                    type=media_type,
+                    source=key[0],
+                    contributor=normalize_contributor(item.get('contributor')),
+                    copyright_text=copyright_text,
+                    copyright_standardized=copyright_standardized,
+                    non_commercial_only=non_commercial_only,
+                    url=item.get('url'),
+                    link=item.get('link'),
+                ))
+                result.added_by_source[key[0]] = result.added_by_source.get(key[0], 0) + 1
+            if rows:
+                Media.objects.bulk_create(rows)
+                # bulk_create skips the Media post_save signals that keep these current.
+                refresh_playable_species(species.pk)
+                refresh_review_summary(species.pk, media_type)
+            ScrapeCheckpoint.objects.update_or_create(
+                run_key=self.run_key,
+                species=species,
+                media_type=media_type,
+                defaults={
+                    'status': ScrapeCheckpoint.FAILED if errors else ScrapeCheckpoint.DONE,
+                    'added': result.added,
+                    'error': result.error,
+                },
+            )
+        return result
@@ -34,9 +34,14 @@ class BaseMediaScraper(ABC):
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
         self.last_request_time = 0
+        # Shared TokenBucket (see media.scrape_engine); replaces the per-instance delay.
+        self.rate_limiter = None
     
     def _rate_limit(self):
         """Enforce rate limiting."""
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+            return
         current_time = time.time()
         time_since_last = current_time - self.last_request_time
         if time_since_last < self.rate_limit_delay:
@@ -0,0 +1,160 @@
+"""Image byte cache (content addressing, LRU cap) and the memory-mapped feature store, and
+retraining from a warm cache without any downloads."""
+
+from __future__ import annotations
+
+import tempfile
+import threading
+from http.server import ThreadingHTTPServer
+from io import StringIO
+from pathlib import Path
+
+import numpy as np
+from django.core.management import call_command
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from jizz.models import Player, Species
+from media.first_assertion.cache import FeatureCache, FeatureStore, ImageCache
+from media.first_assertion.features import feature_dim
+from media.first_assertion.pipeline import iter_feature_vectors
+from media.models import Media, MediaReview
+from media.tests.test_first_assertion_inference import _ImageHandler
+
+FEATURES_VERSION = 'handcrafted_v1'
+
+
+class _CountingImageHandler(_ImageHandler):
+    def do_GET(self):
+        with self.server.lock:
+            self.server.requests += 1
+        super().do_GET()
+
+
+class _ImageServerMixin:
+    @classmethod
+    def start_server(cls):
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _CountingImageHandler)
+        cls.server.lock = threading.Lock()
+        cls.server.requests = 0
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+
+    @classmethod
+    def stop_server(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+
+class ImageCacheTestCase(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_same_bytes_behind_two_urls_are_stored_once(self):
+        cache = ImageCache(Path(self.tmp.name), max_bytes=1000)
+        first = cache.put('https://a/1.jpg', b'x' * 100, 100)
+        second = cache.put('https://b/1.jpg', b'x' * 100, 100)
+        self.assertEqual(first, second)
+        self.assertEqual(cache.total_bytes(), 100)
+        self.assertEqual(cache.get('https://b/1.jpg'), (b'x' * 100, 100))
+        self.assertIsNone(cache.get('https://c/1.jpg'))
+
+    def test_least_recently_used_images_are_evicted_past_the_cap(self):
+        cache = ImageCache(Path(self.tmp.name), max_bytes=250)
+        cache.put('https://a/1.jpg', b'1' * 100)
+        cache.put('https://a/2.jpg', b'2' * 100)
+        cache.get('https://a/1.jpg')
+        cache.put('https://a/3.jpg', b'3' * 100)
+
+        self.assertIsNone(cache.get('https://a/2.jpg'))
+        self.assertIsNotNone(cache.get('https://a/1.jpg'))
+        self.assertIsNotNone(cache.get('https://a/3.jpg'))
+        self.assertLessEqual(cache.total_bytes(), 250)
+        self.assertEqual(len(list(Path(self.tmp.name, 'images').glob('*/*'))), 2)
+
+
+class FeatureStoreTestCase(SimpleTestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def test_vectors_round_trip_by_media_and_url(self):
+        store = FeatureStore(Path(self.tmp.name), 'v', dim=3)
+        store.put_many([(1, 'https://a/1.jpg', np.array([1.0, 2.0, 3.0])), (2, 'https://a/2.jpg', np.ones(3))])
+        store.put_many([(3, 'https://a/3.jpg', np.zeros(3)), (4, 'https://a/4.jpg', np.zeros(5))])  # wrong dim
+
+        reopened = FeatureStore(Path(self.tmp.name), 'v', dim=3)
+        got = reopened.get_many([(1, 'https://a/1.jpg'), (2, 'https://a/changed.jpg'), (3, 'https://a/3.jpg'), (4, 'x')])
+        self.assertEqual(sorted(got), [1, 3])
+        np.testing.assert_array_equal(got[1], [1.0, 2.0, 3.0])
+        self.assertEqual(len(reopened), 3)
+        self.assertEqual(FeatureStore(Path(self.tmp.name), 'other', dim=3).get_many([(1, 'https://a/1.jpg')]), {})
+
+    def test_rewritten_vector_replaces_the_old_row(self):
+        store = FeatureStore(Path(self.tmp.name), 'v', dim=2)
+        store.put_many([(1, 'https://a/1.jpg', np.array([1.0, 1.0]))])
+        store.get_many([(1, 'https://a/1.jpg')])
+        store.put_many([(1, 'https://a/1.jpg', np.array([2.0, 2.0]))])
+        np.testing.assert_array_equal(store.get_many([(1, 'https://a/1.jpg')])[1], [2.0, 2.0])
+
+
+@override_settings(MEDIA_HTTP_FETCH_RATE_PER_HOST=0)
+class CachedPipelineTestCase(_ImageServerMixin, TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.start_server()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.stop_server()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.server.requests = 0
+
+    def _cache(self):
+        return FeatureCache(Path(self.tmp.name), FEATURES_VERSION, feature_dim(FEATURES_VERSION))
+
+    def test_cached_vectors_and_images_skip_the_network(self):
+        items = [(i, f'{self.base_url}/{i * 10}.png') for i in range(10)]
+        cold = {r.media_id: r.vector for r in iter_feature_vectors(items, features_version=FEATURES_VERSION, cache=self._cache())}
+        self.assertEqual(self.server.requests, 10)
+
+        warm = {r.media_id: r.vector for r in iter_feature_vectors(items, features_version=FEATURES_VERSION, cache=self._cache())}
+        self.assertEqual(self.server.requests, 10)
+        for media_id, vector in cold.items():
+            np.testing.assert_array_equal(warm[media_id], vector)
+
+        # Another features version reuses the cached bytes.
+        other = FeatureCache(Path(self.tmp.name), 'handcrafted_v2', feature_dim('handcrafted_v2'))
+        self.assertEqual(len(list(iter_feature_vectors(items[:3], features_version='handcrafted_v2', cache=other))), 3)
+        self.assertEqual(self.server.requests, 10)
+
+    def test_retraining_from_a_warm_cache_downloads_nothing(self):
+        species = Species.objects.create(name='S', name_latin='S', code='S01')
+        player = Player.objects.create(name='P', language='en')
+        for shade in range(0, 250, 10):
+            media = Media.objects.create(species=species, type='image', url=f'{self.base_url}/{shade}.png', source='test')
+            MediaReview.objects.create(
+                media=media, player=player, description='',
+                review_type=MediaReview.APPROVED if shade >= 120 else MediaReview.NOT_SURE,
+            )
+
+        def train(version):
+            with tempfile.TemporaryDirectory() as out:
+                call_command(
+                    'train_media_first_assertion_model', model_version=version, output_dir=out,
+                    features_version=FEATURES_VERSION, min_samples=10, min_per_class=3, test_size=0.4,
+                    download_workers=4, stdout=StringIO(),
+                )
+                return Path(out, f'model-{version}.meta.json').read_text()
+
+        with override_settings(MEDIA_FIRST_ASSERTION_CACHE_DIR=self.tmp.name):
+            first = train('v1')
+            self.assertEqual(self.server.requests, 25)
+            second = train('v1')
+        self.assertEqual(self.server.requests, 25)
+        self.assertEqual(first.replace('v1', ''), second.replace('v1', ''))
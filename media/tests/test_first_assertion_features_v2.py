@@ -1,13 +1,19 @@
 from __future__ import annotations
 
 from io import BytesIO
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
 
+import cv2
 import numpy as np
 from django.test import SimpleTestCase
 from PIL import Image, ImageDraw, ImageFilter
 
+from media.first_assertion.feature_extraction import yolo
 from media.first_assertion.feature_extraction.base import ExtractorInput
 from media.first_assertion.feature_extraction.handcrafted_v2 import HandcraftedV2Extractor, HandcraftedV2YoloExtractor
+from media.first_assertion.features import get_feature_extractor
 
 
 def _png_bytes(im: Image.Image) -> bytes:
@@ -80,3 +86,103 @@ class HandcraftedV2YoloVectorTestCase(SimpleTestCase):
         vec = ext.extract(ExtractorInput(image_bytes=_png_bytes(im), url='https://x/bird.jpg'))
         self.assertEqual(vec.shape, (len(names),))
 
+    def test_pre_xyxy_nms_version_is_retired(self):
+        self.assertIs(get_feature_extractor('handcrafted_v2_yolo2').__class__, HandcraftedV2YoloExtractor)
+        with self.assertRaisesMessage(ValueError, 'retired'):
+            get_feature_extractor('handcrafted_v2_yolo')
+
+
+
+class _FakeYoloSession:
+    """Stands in for an onnxruntime session: a few boxes per image, bird score from brightness."""
+
+    def __init__(self, batch=None):
+        self.batch = batch
+        self.calls = []
+
+    def get_inputs(self):
+        return [SimpleNamespace(name='images', shape=[self.batch or 'batch', 3, 640, 640])]
+
+    def run(self, _outputs, feeds):
+        blob = feeds['images']
+        if self.batch:
+            assert blob.shape[0] == self.batch
+        self.calls.append(blob.shape[0])
+        det = np.zeros((blob.shape[0], 4, 85), dtype=np.float32)
+        for i, image in enumerate(blob):
+            bird = float(image.mean())
+            det[i, 0, :6] = [320, 320, 200, 150, 0.9, 0]
+            det[i, 1, :6] = [330, 325, 200, 150, 0.8, 0]  # overlaps box 0
+            det[i, 2, :6] = [100, 100, 40, 60, 0.9, 0]
+            det[i, 3, :6] = [500, 500, 40, 40, 0.1, 0]  # below threshold
+            det[i, :, 5 + 14] = [bird, bird, 0.5, 0.9]
+        return [det]
+
+
+class BatchedYoloTestCase(SimpleTestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.images = [
+            rng.integers(0, 256, size=shape + (3,), dtype=np.uint8)
+            for shape in [(384, 512), (512, 300), (64, 64), (200, 480), (512, 512)]
+        ]
+
+    def _runner(self, batch=None):
+        runner = yolo._YoloRunner()
+        runner._path = Path('fake.onnx')
+        runner._backend = 'onnxruntime'
+        runner._ort_session = _FakeYoloSession(batch)
+        runner._ort_batch = batch
+        runner.configure = lambda: None
+        return runner
+
+    def test_letterbox_batch_matches_single_image_blob(self):
+        blob, scales, pads = yolo._letterbox_batch(self.images[:2])
+        for i, rgb in enumerate(self.images[:2]):
+            padded, scale, pad_x, pad_y = yolo._letterbox(rgb[:, :, ::-1], new_size=640)
+            expected = cv2.dnn.blobFromImage(padded, scalefactor=1.0 / 255.0, size=(640, 640), swapRB=False, crop=False)
+            np.testing.assert_allclose(blob[i:i + 1], expected, atol=1e-6)
+            self.assertEqual((scales[i], pads[i, 0], pads[i, 1]), (np.float32(scale), pad_x, pad_y))
+
+    def test_batch_matches_single_image_runs(self):
+        runner = self._runner()
+        single = [runner.run(img) for img in self.images]
+        batched = runner.run_batch(self.images)
+        self.assertEqual(batched, single)
+        self.assertEqual(runner._ort_session.calls[-1], len(self.images))
+        self.assertTrue(all(r.bird_num_boxes == 2 for r in batched))
+
+    def test_fixed_batch_export_is_chunked_and_padded(self):
+        runner = self._runner(batch=2)
+        self.assertEqual(runner.run_batch(self.images), self._runner().run_batch(self.images))
+        self.assertEqual(runner._ort_session.calls, [2, 2, 2])
+
+    def test_nms_only_suppresses_boxes_of_the_same_image(self):
+        det = np.zeros((2, 2, 85), dtype=np.float32)
+        det[:, 0, :5] = [100, 100, 50, 50, 0.9]
+        det[:, 1, :5] = [102, 101, 50, 50, 0.8]
+        det[0, :, 5 + 14] = 1.0
+        det[1, 0, 5 + 14] = 1.0
+        results = yolo._postprocess_yolov5_batch(
+            det, conf_thr=0.25, iou_thr=0.45, bird_id=14,
+            image_sizes=np.array([[640, 640], [320, 320]]),
+            scales=np.array([1.0, 0.5], dtype=np.float32),
+            pads=np.zeros((2, 2), dtype=np.float32),
+        )
+        self.assertEqual([r.bird_num_boxes for r in results], [1, 1])
+        self.assertAlmostEqual(results[0].bird_max_conf, 0.9, places=5)
+        self.assertAlmostEqual(results[0].bird_max_area_ratio, 2500 / 640 ** 2, places=5)
+        self.assertAlmostEqual(results[1].bird_max_area_ratio, 10000 / 320 ** 2, places=5)
+
+    def test_extract_many_matches_extract(self):
+        ext = HandcraftedV2YoloExtractor()
+        inputs = [
+            ExtractorInput(image_bytes=_png_bytes(Image.fromarray(img)), url=f'https://x/{i}.jpg')
+            for i, img in enumerate(self.images[:3])
+        ]
+        with patch.object(yolo, '_RUNNER', self._runner()):
+            single = [ext.extract(inp) for inp in inputs]
+            many = ext.extract_many(inputs)
+        for a, b in zip(single, many):
+            np.testing.assert_array_equal(a, b)
+        self.assertGreater(many[0][ext.feature_names().index('yolo_bird_num_boxes')], 0)
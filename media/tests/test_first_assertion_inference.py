@@ -0,0 +1,161 @@
+"""Batched first-assertion inference against a local image server: bulk upserts, skipped
+downloads, resume and a query count that does not grow per image."""
+
+from __future__ import annotations
+
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from io import BytesIO
+from pathlib import Path
+
+import numpy as np
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from PIL import Image
+
+from jizz.models import Species
+from media.first_assertion.pipeline import HostRateLimiter, iter_feature_vectors
+from media.first_assertion.run_inference import infer_media_queryset
+from media.first_assertion.train import save_artifact, train_pipeline
+from media.models import Media, MediaPrediction
+
+FEATURES_VERSION = 'handcrafted_v1'
+
+
+def _png(shade: int) -> bytes:
+    buf = BytesIO()
+    Image.new('RGB', (64, 48), (shade, 255 - shade, shade // 2)).save(buf, format='PNG')
+    return buf.getvalue()
+
+
+class _ImageHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.startswith('/missing'):
+            self.send_error(404)
+            return
+        name = self.path.strip('/').split('.')[0]
+        body = b'not an image' if name == 'broken' else _png(int(name) % 256)
+        self.send_response(200)
+        self.send_header('Content-Type', 'image/png')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(MEDIA_HTTP_FETCH_RATE_PER_HOST=0)
+class BatchedInferenceTestCase(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _ImageHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_address[1]}'
+        cls.artifacts = tempfile.TemporaryDirectory()
+
+        items = [(shade, f'{cls.base_url}/{shade}.png') for shade in range(0, 250, 10)]
+        vectors = {r.media_id: r.vector for r in iter_feature_vectors(items, features_version=FEATURES_VERSION)}
+        X = np.vstack([vectors[shade] for shade, _url in items])
+        y = np.array([int(shade >= 120) for shade, _url in items])
+        pipe, metrics = train_pipeline(X, y, test_size=0.4)
+        cls.model_path, _meta = save_artifact(
+            pipe, metrics, Path(cls.artifacts.name), 'test_v1', len(y),
+            features_version=FEATURES_VERSION, feature_names=[], class_counts={},
+        )
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        cls.artifacts.cleanup()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.species = Species.objects.create(name='S', name_latin='S', code='S01')
+
+    def _media(self, count, start=0):
+        return [
+            Media.objects.create(species=self.species, type='image', url=f'{self.base_url}/{i}.png', source='test')
+            for i in range(start, start + count)
+        ]
+
+    def _infer(self, **kwargs):
+        kwargs.setdefault('download_workers', 4)
+        return infer_media_queryset(Media.objects.all(), artifact_path=str(self.model_path), **kwargs)
+
+    def test_bulk_upsert_and_skipped_downloads(self):
+        self._media(12)
+        Media.objects.create(species=self.species, type='image', url=f'{self.base_url}/missing.png', source='test')
+        stats = {}
+        n_ok, n_skip, version = self._infer(batch_size=5, stats=stats)
+
+        self.assertEqual((n_ok, n_skip, version), (12, 1, 'test_v1'))
+        self.assertEqual(MediaPrediction.objects.count(), 12)
+        self.assertEqual(
+            set(MediaPrediction.objects.values_list('model_version', 'features_version')),
+            {('test_v1', FEATURES_VERSION)},
+        )
+        self.assertGreater(stats['images_per_second'], 0)
+
+        # Re-running updates the existing rows in place.
+        MediaPrediction.objects.update(confidence=0.0)
+        self._infer()
+        self.assertEqual(MediaPrediction.objects.count(), 12)
+        self.assertFalse(MediaPrediction.objects.filter(confidence=0.0).exists())
+
+    def test_resume_skips_media_predicted_by_this_model(self):
+        done = self._media(4)
+        self._infer()
+        stale = self._media(1, start=4)[0]
+        MediaPrediction.objects.create(media=stale, predicted_review_type='approved', confidence=0.5, model_version='old')
+        self._media(3, start=5)
+
+        n_ok, n_skip, _version = self._infer(resume=True)
+        self.assertEqual((n_ok, n_skip), (4, 0))
+        self.assertEqual(MediaPrediction.objects.get(media=stale).model_version, 'test_v1')
+        self.assertEqual(MediaPrediction.objects.filter(media__in=done).count(), 4)
+
+    def test_queries_do_not_grow_per_image(self):
+        self._media(5)
+        with CaptureQueriesContext(connection) as small:
+            self._infer(batch_size=50, dry_run=True)
+        self._media(30, start=5)
+        with CaptureQueriesContext(connection) as large:
+            self._infer(batch_size=50)
+        # One extra query: the bulk upsert skipped by the dry run.
+        self.assertLessEqual(len(large) - len(small), 1)
+
+    def test_extraction_processes_get_batches_of_images(self):
+        items = [(i, f'{self.base_url}/{i * 7}.png') for i in range(9)] + [(99, f'{self.base_url}/broken.png')]
+
+        def vectors(**kwargs):
+            results = list(iter_feature_vectors(items, features_version='handcrafted_v2_yolo2', **kwargs))
+            return {r.media_id: r.vector for r in results if r.error is None}, {r.media_id for r in results if r.error}
+
+        with override_settings(MEDIA_YOLO_BATCH_SIZE=4):
+            batched, batched_errors = vectors(download_workers=4, extract_workers=2)
+        threaded, threaded_errors = vectors(download_workers=4)
+        self.assertEqual(batched_errors, {99})
+        self.assertEqual(threaded_errors, {99})
+        self.assertEqual(sorted(batched), list(range(9)))
+        for media_id, vector in threaded.items():
+            np.testing.assert_array_equal(batched[media_id], vector)
+
+    def test_host_rate_limiter_paces_each_host(self):
+        limiter = HostRateLimiter(rate=20.0, wikimedia_rate=1.0)
+        started = time.monotonic()
+        for _ in range(4):
+            limiter.acquire('http://a.example/x.png')
+            limiter.acquire('http://b.example/x.png')
+        # 1/20 s between requests to one host; the other host's bucket adds no waiting.
+        self.assertGreaterEqual(time.monotonic() - started, 0.14)
+        self.assertLess(time.monotonic() - started, 0.3)
+
+        unpaced = HostRateLimiter(rate=0)
+        unpaced.acquire('http://a.example/x.png')
+        self.assertIsNone(unpaced._buckets['a.example'])
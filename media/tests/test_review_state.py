@@ -0,0 +1,120 @@
+"""Denormalized review state: Media review columns, MediaReviewSummary and eligibility."""
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from rest_framework.test import APIClient
+
+from jizz.models import Player, Species
+from jizz.question_play import fetch_eligible_media_for_species
+from media.models import Media, MediaReview, MediaReviewSummary
+from media.review_state import count_eligible_media, rebuild_media_review_state
+
+
+class ReviewStateTestCase(TestCase):
+    def setUp(self):
+        self.species = Species.objects.create(name='Robin', name_latin='Erithacus rubecula', code='eurrob')
+        self.players = [Player.objects.create(name=f'P{i}', language='en') for i in range(3)]
+        self.media = [
+            Media.objects.create(species=self.species, type='image', url=f'https://example.com/{i}.jpg')
+            for i in range(4)
+        ]
+
+    def _review(self, media, review_type, player=0):
+        return MediaReview.objects.create(media=media, player=self.players[player], review_type=review_type)
+
+    def _summary(self):
+        return MediaReviewSummary.objects.get(species=self.species, media_type='image')
+
+    def test_review_columns_follow_saves_and_deletes(self):
+        self._review(self.media[0], MediaReview.NOT_SURE, player=0)
+        review = self._review(self.media[0], MediaReview.APPROVED, player=1)
+        media = Media.objects.get(pk=self.media[0].pk)
+        self.assertEqual(media.review_status, MediaReview.APPROVED)
+        self.assertEqual((media.approved_reviews, media.rejected_reviews, media.not_sure_reviews), (1, 0, 1))
+
+        review.delete()
+        media.refresh_from_db()
+        self.assertEqual(media.review_status, MediaReview.NOT_SURE)
+        self.assertEqual(media.approved_reviews, 0)
+        self.assertEqual(media.effective_review_status, 'rejected')
+
+    def test_summary_counts_and_eligibility(self):
+        self.assertEqual(self._summary().total, 4)
+        self.assertEqual(count_eligible_media(self.species.pk, 'image'), 4)
+
+        self._review(self.media[1], MediaReview.REJECTED)
+        self._review(self.media[2], MediaReview.NOT_SURE)
+        summary = self._summary()
+        self.assertEqual(
+            (summary.total, summary.reviewed, summary.approved, summary.rejected, summary.not_sure),
+            (4, 2, 0, 1, 1),
+        )
+        self.assertEqual(summary.unreviewed, 2)
+        # No approved media: everything visible without a rejection.
+        self.assertEqual(summary.eligible, 3)
+
+        self._review(self.media[3], MediaReview.APPROVED)
+        self.assertEqual(count_eligible_media(self.species.pk, 'image'), 1)
+        self.assertEqual([m.pk for m in fetch_eligible_media_for_species(self.species.pk, 'image')], [self.media[3].pk])
+
+    def test_hiding_and_deleting_media_refresh_summary(self):
+        media = self.media[0]
+        media.hide = True
+        media.save()
+        self.assertEqual(self._summary().eligible, 3)
+
+        for media in self.media:
+            media.delete()
+        self.assertFalse(MediaReviewSummary.objects.filter(species=self.species).exists())
+
+    def test_moving_media_to_another_type_refreshes_both_summaries(self):
+        media = Media.objects.get(pk=self.media[0].pk)
+        media.type = 'audio'
+        media.save()
+        self.assertEqual(self._summary().total, 3)
+        self.assertEqual(MediaReviewSummary.objects.get(species=self.species, media_type='audio').total, 1)
+
+    def test_rebuild_matches_incremental_state(self):
+        self._review(self.media[0], MediaReview.APPROVED)
+        self._review(self.media[1], MediaReview.REJECTED)
+        expected = list(MediaReviewSummary.objects.values('species_id', 'media_type', 'reviewed', 'eligible'))
+        Media.objects.update(approved_reviews=0, rejected_reviews=0, review_status=None)
+        MediaReviewSummary.objects.all().delete()
+
+        self.assertEqual(rebuild_media_review_state(), 1)
+        self.assertEqual(
+            list(MediaReviewSummary.objects.values('species_id', 'media_type', 'reviewed', 'eligible')),
+            expected,
+        )
+        self.assertEqual(Media.objects.get(pk=self.media[0].pk).review_status, MediaReview.APPROVED)
+
+    def _add_other_species(self, count, start=0):
+        for i in range(start, start + count):
+            other = Species.objects.create(name=f'Other {i}', name_latin=f'Other {i}', code=f'oth{i}')
+            Media.objects.create(species=other, type='image', url=f'https://example.com/o{i}.jpg')
+
+    def test_review_dashboards_read_summaries(self):
+        self._add_other_species(3)
+        self._review(self.media[0], MediaReview.APPROVED)
+        client = APIClient()
+
+        with CaptureQueriesContext(connection) as few:
+            client.get('/api/species-review-stats/', {'type': 'image'})
+        self._add_other_species(10, start=3)
+        with CaptureQueriesContext(connection) as many:
+            response = client.get('/api/species-review-stats/', {'type': 'image'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(many), len(few))
+        self.assertEqual(response.json()['summary']['total_species'], 14)
+        robin = next(row for row in response.json()['species'] if row['id'] == self.species.pk)
+        self.assertEqual((robin['total_media'], robin['unreviewed'], robin['approved']), (4, 3, 1))
+
+        response = client.get('/api/media-review-species/', {'type': 'image', 'species': self.species.pk})
+        self.assertEqual(response.status_code, 200)
+        [row] = response.json()['results']
+        self.assertEqual(row['unreviewed'], 3)
+        self.assertEqual(
+            {m['id']: m['review_type'] for m in row['media']}[self.media[0].pk],
+            MediaReview.APPROVED,
+        )
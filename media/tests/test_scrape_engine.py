@@ -0,0 +1,167 @@
+"""
+Media scrape engine against a local HTTP stub of Xeno-Canto: bulk inserts, checkpoints
+and resume, and the shared token bucket.
+"""
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from unittest import mock
+
+from django.test import TestCase, override_settings
+
+from jizz.models import Species
+from media.models import Media, ScrapeCheckpoint
+from media.scrape_engine import ScrapeEngine
+from media.scrapers.rate_limit import TokenBucket
+from media.scrapers.xeno_canto import XenoCantoScraper
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    # genus -> number of recordings; 'Broken' answers with a server error
+    recordings = {}
+    requests = []
+
+    def do_GET(self):
+        query = parse_qs(urlparse(self.path).query).get('query', [''])[0]
+        self.requests.append(query)
+        genus = query.split()[0].removeprefix('gen:')
+        if genus == 'Broken':
+            self.send_response(500)
+            self.end_headers()
+            return
+        body = json.dumps({
+            'numRecordings': str(self.recordings.get(genus, 0)),
+            'numPages': 1,
+            'recordings': [
+                {'id': f'{genus}{i}', 'file': f'/{genus}{i}/download', 'rec': 'Stub Recordist', 'lic': '//creativecommons.org/licenses/by/4.0/', 'q': 'A'}
+                for i in range(self.recordings.get(genus, 0))
+            ],
+        }).encode()
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+@override_settings(XENO_CANTO_API_KEY='')
+class ScrapeEngineTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.server = ThreadingHTTPServer(('127.0.0.1', 0), _StubHandler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.base_url = f'http://127.0.0.1:{cls.server.server_port}'
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        _StubHandler.recordings = {'Turdus': 3, 'Erithacus': 2, 'Broken': 0}
+        _StubHandler.requests = []
+        self.species = [
+            Species.objects.create(name='Blackbird', name_latin='Turdus merula', code='eurbla'),
+            Species.objects.create(name='Robin', name_latin='Erithacus rubecula', code='eurrob1'),
+        ]
+
+    def _engine(self, **kwargs):
+        base_url = self.base_url
+
+        class StubXenoCanto(XenoCantoScraper):
+            API_BASE_V2 = base_url
+
+        return ScrapeEngine(
+            run_key='NL:xeno_canto',
+            sources=['xeno_canto'],
+            media_types=['audio'],
+            scraper_factories={'xeno_canto': lambda: StubXenoCanto(rate_limit_delay=0)},
+            rates={'xeno_canto': 1000},
+            **kwargs,
+        )
+
+    def test_run_inserts_and_checkpoints(self):
+        results = self._engine(workers=3).run(self.species)
+        self.assertEqual(sorted(r.added for r in results), [2, 3])
+        self.assertEqual(Media.objects.filter(type='audio', source='xeno_canto').count(), 5)
+        self.assertEqual(
+            set(ScrapeCheckpoint.objects.values_list('species__name', 'status', 'added')),
+            {('Blackbird', 'done', 3), ('Robin', 'done', 2)},
+        )
+
+    def test_rerun_resumes_and_restart_scrapes_again(self):
+        self._engine().run(self.species[:1])
+        _StubHandler.requests = []
+        results = self._engine().run(self.species)
+        self.assertEqual([r.skipped for r in results], [True, False])
+        self.assertTrue(all('Turdus' not in q for q in _StubHandler.requests))
+
+        engine = self._engine(max_items=4)
+        engine.reset()
+        _StubHandler.recordings['Turdus'] = 6
+        results = engine.run(self.species[:1])
+        # links already stored are not inserted twice; the item limit still holds
+        self.assertEqual(results[0].added, 1)
+        self.assertEqual(Media.objects.filter(species=self.species[0]).count(), 4)
+
+    def test_failed_source_is_retried_on_resume(self):
+        broken = Species.objects.create(name='Broken', name_latin='Broken bird', code='brkbrd')
+
+        class Exploding(XenoCantoScraper):
+            def search_species(self, scientific_name, common_name=None):
+                raise RuntimeError('stub down')
+
+        engine = self._engine()
+        engine.scraper_factories['xeno_canto'] = Exploding
+        result, = engine.run([broken])
+        self.assertIn('stub down', result.error)
+        self.assertEqual(ScrapeCheckpoint.objects.get(species=broken).status, ScrapeCheckpoint.FAILED)
+
+        result, = self._engine().run([broken])
+        self.assertFalse(result.skipped)
+        self.assertEqual(ScrapeCheckpoint.objects.get(species=broken).status, ScrapeCheckpoint.DONE)
+
+    def test_workers_starting_together_share_one_bucket(self):
+        workers = 6
+        engine = self._engine(workers=workers)
+        started = threading.Barrier(workers)
+
+        class SlowBucket(TokenBucket):
+            def __init__(self, *args, **kwargs):
+                time.sleep(0.05)  # widen the window between the check and the insert
+                super().__init__(*args, **kwargs)
+
+        def scraper():
+            started.wait(timeout=5)
+            return engine._scraper('xeno_canto')
+
+        with mock.patch('media.scrape_engine.TokenBucket', SlowBucket):
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                scrapers = list(pool.map(lambda _: scraper(), range(workers)))
+
+        self.assertEqual(len({id(s) for s in scrapers}), workers)
+        self.assertEqual(len({id(s.rate_limiter) for s in scrapers}), 1)
+        self.assertIs(scrapers[0].rate_limiter, engine._buckets['xeno_canto'])
+
+
+class TokenBucketTests(TestCase):
+    def test_waits_once_burst_is_used(self):
+        now = [0.0]
+        waits = []
+
+        def sleep(seconds):
+            waits.append(round(seconds, 3))
+            now[0] += seconds
+
+        bucket = TokenBucket(rate=4, burst=2, clock=lambda: now[0], sleep=sleep)
+        for _ in range(4):
+            bucket.acquire()
+        self.assertEqual(waits, [0.25, 0.25])